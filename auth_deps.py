@@ -1,32 +1,43 @@
 """FastAPI dependencies: get current user from Supabase Auth JWT (Bearer token)."""
-from fastapi import Depends, HTTPException
+from fastapi import Depends, HTTPException, Query
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
-from auth_utils import decode_supabase_token
+from auth_utils import decode_supabase_token_async
 
 security = HTTPBearer(auto_error=False)
 
 
-def get_current_user(
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials | None = Depends(security),
 ) -> dict:
-    """Require valid Supabase JWT; return payload with sub (user id), email, role, name."""
+    """Require valid Supabase JWT; return payload with sub (user id), email, role, name, exp. A token not yet in the
+    cache is verified in a worker thread, off the event loop."""
     if not credentials or not credentials.credentials:
         raise HTTPException(status_code=401, detail="인증이 필요합니다.")
-    payload = decode_supabase_token(credentials.credentials)
+    payload = await decode_supabase_token_async(credentials.credentials)
     if not payload or "sub" not in payload:
         raise HTTPException(status_code=401, detail="유효하지 않은 토큰입니다.")
     return payload
 
 
-def require_mentor(current: dict = Depends(get_current_user)) -> dict:
+async def get_stream_user(
+    credentials: HTTPAuthorizationCredentials | None = Depends(security),
+    access_token: str | None = Query(None, description="For EventSource, which cannot send an Authorization header"),
+) -> dict:
+    """get_current_user for streaming endpoints: the token may also come as ?access_token=."""
+    if (not credentials or not credentials.credentials) and access_token:
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=access_token)
+    return await get_current_user(credentials)
+
+
+async def require_mentor(current: dict = Depends(get_current_user)) -> dict:
     """Require current user to be mentor."""
     if current.get("role") != "mentor":
         raise HTTPException(status_code=403, detail="멘토만 이용할 수 있습니다.")
     return current
 
 
-def require_student(current: dict = Depends(get_current_user)) -> dict:
+async def require_student(current: dict = Depends(get_current_user)) -> dict:
     """Require current user to be student."""
     if current.get("role") != "student":
         raise HTTPException(status_code=403, detail="학생만 이용할 수 있습니다.")
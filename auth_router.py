@@ -8,7 +8,7 @@ router = APIRouter(prefix="/api/auth", tags=["auth"])
 
 
 @router.get("/me")
-def me(current: dict = Depends(get_current_user)):
+async def me(current: dict = Depends(get_current_user)):
     """Return current user from Supabase JWT (sub, email, role, name)."""
     return {
         "id": current["sub"],
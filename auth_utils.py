@@ -1,17 +1,86 @@
 """Verify Supabase Auth JWT (HS256). Payload includes sub, email, user_metadata (role, name)."""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 from typing import Any
 
+import anyio
 from jose import jwt
 
-from config import SUPABASE_JWT_SECRET
+import metrics
+from config import SUPABASE_JWT_SECRET, TOKEN_CACHE_SIZE
 
 SUPABASE_JWT_ALGORITHM = "HS256"
 
 
-def decode_supabase_token(token: str) -> dict[str, Any] | None:
-    """Verify Supabase access token and return normalized payload: sub, email, role, name."""
-    if not SUPABASE_JWT_SECRET:
-        return None
+class _TokenCache:
+    """Bounded LRU of verified, normalized payloads keyed by token digest. Entries expire at the token's exp."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[bytes, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: bytes) -> dict[str, Any] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, payload = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return payload
+
+    def put(self, key: bytes, payload: dict[str, Any], expires_at: float) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (expires_at, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries), "maxsize": self.maxsize}
+
+
+_token_cache = _TokenCache(TOKEN_CACHE_SIZE)
+
+metrics.Collected(
+    "auth_token_cache_hits_total", "Access tokens served from the verified-token cache.", "counter",
+    lambda: _token_cache.hits,
+)
+metrics.Collected(
+    "auth_token_cache_misses_total", "Access tokens not in the verified-token cache (verified in full).", "counter",
+    lambda: _token_cache.misses,
+)
+metrics.Collected(
+    "auth_token_cache_entries", "Verified tokens currently cached.", "gauge", lambda: len(_token_cache._entries),
+)
+
+
+def token_cache_stats() -> dict[str, int]:
+    """Hit/miss counters and current size of the verified-token cache."""
+    return _token_cache.stats()
+
+
+def _verify_supabase_token(token: str) -> tuple[dict[str, Any], float | None] | None:
+    """Full verification (signature, exp, audience) and normalization. Returns (payload, exp) or None."""
     try:
         payload = jwt.decode(
             token,
@@ -29,9 +98,48 @@ def decode_supabase_token(token: str) -> dict[str, Any] | None:
     if role not in ("mentor", "student"):
         role = "student"
     name = user_meta.get("name") or payload.get("email") or ""
-    return {
+    exp = payload.get("exp")
+    exp = float(exp) if isinstance(exp, (int, float)) else None
+    normalized = {
         "sub": payload["sub"],
         "email": payload.get("email") or "",
         "role": role,
         "name": name,
-    }
\ No newline at end of file
+        "exp": exp,
+    }
+    return normalized, exp
+
+
+def _verify_and_cache(token: str, key: bytes) -> dict[str, Any] | None:
+    verified = _verify_supabase_token(token)
+    if verified is None:
+        return None
+    payload, exp = verified
+    # Tokens without exp are not cached: there is no point at which the entry would become invalid.
+    if exp is not None:
+        _token_cache.put(key, payload, exp)
+    return dict(payload)
+
+
+def decode_supabase_token(token: str) -> dict[str, Any] | None:
+    """Verify Supabase access token and return normalized payload: sub, email, role, name, exp (None if absent).
+    Verified tokens are served from an LRU cache until their exp; invalid tokens are never cached."""
+    if not SUPABASE_JWT_SECRET:
+        return None
+    key = hashlib.sha256(token.encode()).digest()
+    cached = _token_cache.get(key)
+    if cached is not None:
+        return dict(cached)
+    return _verify_and_cache(token, key)
+
+
+async def decode_supabase_token_async(token: str) -> dict[str, Any] | None:
+    """decode_supabase_token for the event loop: a cached token is answered inline, a new one is verified (signature
+    check) in a worker thread."""
+    if not SUPABASE_JWT_SECRET:
+        return None
+    key = hashlib.sha256(token.encode()).digest()
+    cached = _token_cache.get(key)
+    if cached is not None:
+        return dict(cached)
+    return await anyio.to_thread.run_sync(_verify_and_cache, token, key)
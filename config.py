@@ -1,5 +1,6 @@
 """Load server-only env. Never use these values in the frontend."""
 import os
+import tempfile
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -24,3 +25,79 @@ _ALLOWED = os.environ.get("ALLOWED_ORIGINS", _DEFAULT_ORIGINS).strip()
 CORS_ORIGINS: list[str] = [o.strip() for o in _ALLOWED.split(",") if o.strip()]
 if not CORS_ORIGINS:
     CORS_ORIGINS = ["http://localhost:3000", "https://solstudy.vercel.app"]
+# Seconds browsers may cache a preflight (OPTIONS) response. Chromium caps this at 7200, Firefox at 86400.
+CORS_MAX_AGE: int = max(0, int(os.environ.get("CORS_MAX_AGE", "7200")))
+
+# Storage uploads in flight at once (all requests combined). Each upload runs in a worker thread.
+UPLOAD_CONCURRENCY: int = max(1, int(os.environ.get("UPLOAD_CONCURRENCY", "8")))
+# Task attachments stored once per distinct content (SHA-256, indexed in public.attachment_objects) and reused by later tasks.
+ATTACHMENT_DEDUP_ENABLED: bool = os.environ.get("ATTACHMENT_DEDUP_ENABLED", "1").strip().lower() not in ("0", "false", "no")
+
+# Verified Supabase access tokens kept in memory (LRU, evicted at token exp). 0 disables the cache.
+TOKEN_CACHE_SIZE: int = max(0, int(os.environ.get("TOKEN_CACHE_SIZE", "4096")))
+
+# In-process auth_users directory (student role checks, /api/students). Seconds.
+# After TTL the snapshot is refreshed in the background; past MAX_STALENESS lookups wait for a refresh. TTL 0 disables.
+USER_DIRECTORY_TTL: float = max(0.0, float(os.environ.get("USER_DIRECTORY_TTL", "60")))
+USER_DIRECTORY_MAX_STALENESS: float = max(USER_DIRECTORY_TTL, float(os.environ.get("USER_DIRECTORY_MAX_STALENESS", "300")))
+
+# Data access for the tasks, feedback, dashboard, stats and sync routers: "supabase" (PostgREST, default) or "postgres"
+# (asyncpg pool on DATABASE_URL).
+DATA_BACKEND: str = os.environ.get("DATA_BACKEND", "supabase").strip().lower()
+if DATA_BACKEND not in ("supabase", "postgres"):
+    raise ValueError(f"DATA_BACKEND must be 'supabase' or 'postgres', got {DATA_BACKEND!r}")
+# Direct connection or session pooler (port 5432). The transaction pooler (6543) drops prepared statements between queries.
+DATABASE_URL: str = os.environ.get("DATABASE_URL", "")
+if DATA_BACKEND == "postgres" and not DATABASE_URL:
+    raise ValueError("DATABASE_URL is required when DATA_BACKEND=postgres")
+DATABASE_POOL_MIN_SIZE: int = max(0, int(os.environ.get("DATABASE_POOL_MIN_SIZE", "2")))
+DATABASE_POOL_MAX_SIZE: int = max(1, DATABASE_POOL_MIN_SIZE, int(os.environ.get("DATABASE_POOL_MAX_SIZE", "10")))
+
+# Prometheus metrics (request/DB/storage latency) on GET /metrics. If METRICS_TOKEN is set, scrapes need "Authorization: Bearer <token>".
+METRICS_ENABLED: bool = os.environ.get("METRICS_ENABLED", "1").strip().lower() not in ("0", "false", "no")
+METRICS_TOKEN: str = os.environ.get("METRICS_TOKEN", "").strip()
+
+# Submission image variants (thumbnail + recompressed preview per image), rendered in a process pool after the submit response.
+IMAGE_PROCESSING_ENABLED: bool = os.environ.get("IMAGE_PROCESSING_ENABLED", "1").strip().lower() not in ("0", "false", "no")
+IMAGE_PROCESS_WORKERS: int = max(1, int(os.environ.get("IMAGE_PROCESS_WORKERS", str(max(1, (os.cpu_count() or 2) // 2)))))
+IMAGE_VARIANT_FORMAT: str = os.environ.get("IMAGE_VARIANT_FORMAT", "webp").strip().lower()
+if IMAGE_VARIANT_FORMAT not in ("webp", "jpeg"):
+    raise ValueError(f"IMAGE_VARIANT_FORMAT must be 'webp' or 'jpeg', got {IMAGE_VARIANT_FORMAT!r}")
+
+# Asynchronous submissions: with ASYNC_SUBMIT_ENABLED, a submit sent with "Prefer: respond-async" spools its files to
+# SUBMIT_SPOOL_DIR and returns 202 before uploading; SUBMIT_UPLOAD_WORKERS upload them in the background from a queue
+# of at most SUBMIT_UPLOAD_QUEUE_SIZE submissions (when full, submits upload inline), retrying up to SUBMIT_UPLOAD_MAX_ATTEMPTS times.
+ASYNC_SUBMIT_ENABLED: bool = os.environ.get("ASYNC_SUBMIT_ENABLED", "0").strip().lower() not in ("0", "false", "no")
+SUBMIT_SPOOL_DIR: str = os.environ.get("SUBMIT_SPOOL_DIR", "").strip() or os.path.join(tempfile.gettempdir(), "solstudy-submit-spool")
+SUBMIT_UPLOAD_WORKERS: int = max(1, int(os.environ.get("SUBMIT_UPLOAD_WORKERS", "4")))
+SUBMIT_UPLOAD_QUEUE_SIZE: int = max(1, int(os.environ.get("SUBMIT_UPLOAD_QUEUE_SIZE", "100")))
+SUBMIT_UPLOAD_MAX_ATTEMPTS: int = max(1, int(os.environ.get("SUBMIT_UPLOAD_MAX_ATTEMPTS", "5")))
+
+# Resumable chunked uploads (/api/uploads) for files larger than a single multipart request allows. Sessions live in
+# UPLOAD_SESSION_DIR (shared by the workers on one host) for UPLOAD_SESSION_TTL seconds.
+UPLOAD_SESSION_DIR: str = os.environ.get("UPLOAD_SESSION_DIR", "").strip() or os.path.join(tempfile.gettempdir(), "solstudy-upload-sessions")
+UPLOAD_CHUNK_SIZE: int = min(16 * 1024 * 1024, max(256 * 1024, int(os.environ.get("UPLOAD_CHUNK_SIZE", str(4 * 1024 * 1024)))))
+UPLOAD_SESSION_MAX_FILE_SIZE: int = max(1, int(os.environ.get("UPLOAD_SESSION_MAX_FILE_SIZE", str(100 * 1024 * 1024))))
+UPLOAD_SESSION_TTL: int = max(60, int(os.environ.get("UPLOAD_SESSION_TTL", str(24 * 3600))))
+# Per user: open (not completed, not expired) sessions and the total size of their files, so no one fills the disk.
+UPLOAD_SESSIONS_PER_USER: int = max(1, int(os.environ.get("UPLOAD_SESSIONS_PER_USER", "20")))
+UPLOAD_SESSION_BYTES_PER_USER: int = max(1, int(os.environ.get("UPLOAD_SESSION_BYTES_PER_USER", str(500 * 1024 * 1024))))
+
+# Direct uploads (POST /api/uploads/direct): clients upload straight to Storage through signed upload URLs and pass the
+# returned upload_key to task creation / submission. Keys are signed with JWT_SECRET (direct uploads are off without
+# it) and accepted for DIRECT_UPLOAD_TTL seconds; Storage's signed upload URLs themselves last 2 hours.
+DIRECT_UPLOAD_TTL: int = min(2 * 3600, max(60, int(os.environ.get("DIRECT_UPLOAD_TTL", str(2 * 3600)))))
+DIRECT_UPLOAD_MAX_FILE_SIZE: int = max(1, int(os.environ.get("DIRECT_UPLOAD_MAX_FILE_SIZE", str(100 * 1024 * 1024))))
+
+# Server push (GET /api/events, text/event-stream): task, submission and feedback events for the signed-in user.
+# EVENTS_BROKER=local delivers only to streams on the publishing process (a single worker); postgres relays events
+# through LISTEN/NOTIFY on DATABASE_URL so streams on every worker and host receive them.
+EVENTS_ENABLED: bool = os.environ.get("EVENTS_ENABLED", "1").strip().lower() not in ("0", "false", "no")
+EVENTS_BROKER: str = os.environ.get("EVENTS_BROKER", "local").strip().lower()
+if EVENTS_BROKER not in ("local", "postgres"):
+    raise ValueError(f"EVENTS_BROKER must be 'local' or 'postgres', got {EVENTS_BROKER!r}")
+if EVENTS_ENABLED and EVENTS_BROKER == "postgres" and not DATABASE_URL:
+    raise ValueError("DATABASE_URL is required when EVENTS_BROKER=postgres")
+EVENTS_HEARTBEAT_SECONDS: float = max(1.0, float(os.environ.get("EVENTS_HEARTBEAT_SECONDS", "20")))
+EVENTS_MAX_CONNECTIONS: int = max(1, int(os.environ.get("EVENTS_MAX_CONNECTIONS", "10000")))
+EVENTS_QUEUE_SIZE: int = max(1, int(os.environ.get("EVENTS_QUEUE_SIZE", "64")))
@@ -0,0 +1,82 @@
+"""Mentor dashboard: every student's tasks, submission status and feedback presence for a date range in one call."""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel, Field
+
+from auth_deps import require_mentor
+from fast_json import json_response
+from repository import get_repository
+from serializers import row_to_task
+from tasks_router import TaskOut
+from user_directory import UserDirectory, get_user_directory
+from validators import parse_date, parse_range
+
+router = APIRouter(prefix="/api", tags=["dashboard"])
+
+MAX_DASHBOARD_RANGE_DAYS = 31
+
+
+class DashboardTaskOut(TaskOut):
+    submitted: bool = False
+    submitted_at: str | None = None
+    study_time_minutes: int | None = None
+
+
+class DashboardStudentOut(BaseModel):
+    id: str
+    name: str
+    email: str
+    tasks: list[DashboardTaskOut] = []
+    feedback_dates: list[str] = []
+
+
+class DashboardOut(BaseModel):
+    date_from: str = Field(serialization_alias="from")
+    date_to: str = Field(serialization_alias="to")
+    students: list[DashboardStudentOut]
+
+
+def _resolve_range(date: str | None, from_date: str | None, to_date: str | None) -> tuple[str, str]:
+    if date:
+        parse_date(date)
+        return date, date
+    if not from_date or not to_date:
+        raise HTTPException(status_code=400, detail="date or from/to is required")
+    parse_range(from_date, to_date, MAX_DASHBOARD_RANGE_DAYS)
+    return from_date, to_date
+
+
+def _dashboard_task(row: dict) -> dict:
+    task = row_to_task(row)
+    sub = row.get("submission")
+    task["submitted"] = sub is not None
+    task["submitted_at"] = str(sub["submitted_at"]) if sub and sub.get("submitted_at") else None
+    task["study_time_minutes"] = sub.get("study_time_minutes") if sub else None
+    return task
+
+
+@router.get("/dashboard", response_model=DashboardOut)
+async def get_dashboard(
+    date: str | None = Query(None, description="Single date YYYY-MM-DD (same as from=to=date)"),
+    from_date: str | None = Query(None, alias="from", description="First date YYYY-MM-DD"),
+    to_date: str | None = Query(None, alias="to", description="Last date YYYY-MM-DD (inclusive)"),
+    current: dict = Depends(require_mentor),
+    repo=Depends(get_repository),
+    directory: UserDirectory = Depends(get_user_directory),
+):
+    """Mentor only. For every student: tasks due in the range (with submitted flag, time, study minutes) and the dates
+    that have daily feedback. Two queries (tasks + embedded submissions, feedback_daily), paged on the Supabase backend;
+    students come from the user directory."""
+    from_date, to_date = _resolve_range(date, from_date, to_date)
+    students = {
+        s["id"]: {"id": s["id"], "name": s["name"], "email": s["email"], "tasks": [], "feedback_dates": []}
+        for s in await directory.students()
+    }
+    for row in await repo.tasks_due(from_date, to_date):
+        student = students.get(str(row["student_id"]))
+        if student is not None:
+            student["tasks"].append(_dashboard_task(row))
+    for row in await repo.feedback_dates(from_date, to_date):
+        student = students.get(str(row["student_id"]))
+        if student is not None:
+            student["feedback_dates"].append(str(row["date"]))
+    return json_response({"from": from_date, "to": to_date, "students": list(students.values())})
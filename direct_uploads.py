@@ -0,0 +1,86 @@
+"""Direct-to-storage uploads (uploads_router): the backend signs a Storage upload URL per file and hands out an
+   upload_key, a short-lived HS256 token (JWT_SECRET) naming the object, its owner and purpose and the declared file.
+   The client PUTs the bytes to Storage itself; task creation / submission then only verifies the key and that the
+   object exists with the declared size, so no file byte passes through this process."""
+import time
+
+from fastapi import HTTPException
+from jose import JWTError, jwt
+
+from config import DIRECT_UPLOAD_TTL, JWT_SECRET
+from storage_helper import attachment_storage_path, create_signed_uploads, storage_path, stored_sizes, submission_storage_path
+
+_ALGORITHM = "HS256"
+# Keeps upload keys from being accepted as any other token signed with the same secret (and vice versa).
+_AUDIENCE = "solstudy-direct-upload"
+_INVALID = "유효하지 않거나 만료된 업로드 키입니다."
+
+
+def direct_uploads_enabled() -> bool:
+    return bool(JWT_SECRET)
+
+
+async def create_direct_uploads(
+    owner: str, purpose: str, files: list[dict], task_id: str | None = None,
+) -> list[dict]:
+    """Signed Storage upload URLs for files ({filename, content_type, size}), in input order: {upload_key, path,
+    signed_url, token, url, expires_at}. Upload with PUT signed_url (multipart field "file"), then pass upload_key."""
+    if not direct_uploads_enabled():
+        raise HTTPException(status_code=503, detail="직접 업로드를 사용할 수 없습니다.")
+    paths = [
+        attachment_storage_path(f["filename"]) if purpose == "attachment" else submission_storage_path(task_id, f["filename"])
+        for f in files
+    ]
+    signed = await create_signed_uploads(paths)
+    expires_at = int(time.time()) + DIRECT_UPLOAD_TTL
+    grants = []
+    for f, s in zip(files, signed):
+        claims = {
+            "aud": _AUDIENCE,
+            "sub": owner,
+            "exp": expires_at,
+            "purpose": purpose,
+            "task_id": task_id,
+            "url": s["url"],
+            "name": f["filename"],
+            "type": f["content_type"] or "application/octet-stream",
+            "size": f["size"],
+        }
+        grants.append({
+            "upload_key": jwt.encode(claims, JWT_SECRET, algorithm=_ALGORITHM),
+            "path": s["path"],
+            "signed_url": s["signed_url"],
+            "token": s["token"],
+            "url": s["url"],
+            "expires_at": expires_at,
+        })
+    return grants
+
+
+def _claims(upload_key: str) -> dict:
+    try:
+        return jwt.decode(upload_key, JWT_SECRET, algorithms=[_ALGORITHM], audience=_AUDIENCE)
+    except JWTError:
+        raise HTTPException(status_code=400, detail=_INVALID)
+
+
+async def finalized_direct_uploads(
+    owner: str, upload_keys: list[str], purpose: str, task_id: str | None = None,
+) -> list[dict]:
+    """{name, type, size, url} of directly uploaded files referenced by a create/submit request (upload_keys form
+    field), after checking each key and that its object is in Storage with the declared size (one listing per file)."""
+    if not upload_keys:
+        return []
+    if not direct_uploads_enabled():
+        raise HTTPException(status_code=400, detail=_INVALID)
+    claims = [_claims(key) for key in upload_keys]
+    for c in claims:
+        if c["sub"] != owner or c["purpose"] != purpose or (task_id is not None and c["task_id"] != task_id):
+            raise HTTPException(status_code=400, detail=_INVALID)
+    sizes = await stored_sizes([storage_path(c["url"]) for c in claims])
+    for c, size in zip(claims, sizes):
+        if size is None:
+            raise HTTPException(status_code=400, detail=f"업로드되지 않은 파일이 있습니다: {c['name']}")
+        if size != c["size"]:
+            raise HTTPException(status_code=400, detail=f"업로드된 파일 크기가 다릅니다: {c['name']}")
+    return [{"name": c["name"], "type": c["type"], "size": c["size"], "url": c["url"]} for c in claims]
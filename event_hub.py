@@ -0,0 +1,254 @@
+"""Server-push events (events_router). A per-process hub fans each event out to the open streams subscribed to one of
+   its topics ("user:<id>", "role:mentor"). An event is encoded once as an SSE frame shared by every stream; each stream
+   has a small bounded list of frames and one hub task pings the idle ones, so an idle connection costs little beyond
+   the server's own per-request state. A stream that falls EVENTS_QUEUE_SIZE frames behind is closed (the client
+   reconnects and resyncs).
+
+   Events are hints, delivered at most once: clients refetch (with If-None-Match) when a stream (re)connects or they
+   get a "resync" event. EVENTS_BROKER=local delivers in this process only; postgres publishes with pg_notify and every
+   process LISTENs on DATABASE_URL, so streams on any worker or host receive every event."""
+import asyncio
+import itertools
+import logging
+
+import orjson
+
+import metrics
+from config import (
+    DATABASE_URL,
+    EVENTS_BROKER,
+    EVENTS_ENABLED,
+    EVENTS_HEARTBEAT_SECONDS,
+    EVENTS_MAX_CONNECTIONS,
+    EVENTS_QUEUE_SIZE,
+)
+
+logger = logging.getLogger(__name__)
+
+MENTORS = "role:mentor"
+_CHANNEL = "solstudy_events"
+# NOTIFY payloads must be shorter than 8000 bytes; larger events are relayed without their data.
+_NOTIFY_LIMIT = 7900
+# Events waiting for pg_notify; more are dropped (logged) rather than holding up requests.
+_OUTBOX_SIZE = 10000
+_RECONNECT_DELAY = 1.0
+_MAX_RECONNECT_DELAY = 30.0
+
+PING = b": ping\n\n"
+CLOSE = b""  # ends a stream (dropped for falling behind, or shutdown)
+_RESYNC = b"event: resync\ndata: {}\n\n"
+
+_topics: dict[str, set["Subscriber"]] = {}
+_subscribers: set["Subscriber"] = set()
+_frame_ids = itertools.count(1)
+_tasks: set[asyncio.Task] = set()
+_outbox: asyncio.Queue | None = None
+_closing = False
+
+
+def user_topic(user_id: str) -> str:
+    return f"user:{user_id}"
+
+
+class Subscriber:
+    """One open stream: the frames (bytes) waiting to be sent, CLOSE to end it. A list and a future rather than an
+    asyncio.Queue, which allocates several deques per instance: only the stream's own task waits here."""
+    __slots__ = ("frames", "waiter", "topics")
+
+    def __init__(self, topics: list[str]):
+        self.frames: list[bytes] = []
+        self.waiter: asyncio.Future | None = None
+        self.topics = topics
+
+    def put(self, frame: bytes) -> bool:
+        """False when EVENTS_QUEUE_SIZE frames are already waiting."""
+        if len(self.frames) >= EVENTS_QUEUE_SIZE:
+            return False
+        self.frames.append(frame)
+        self._wake()
+        return True
+
+    def close(self) -> None:
+        self.frames = [CLOSE]
+        self._wake()
+
+    def _wake(self) -> None:
+        if self.waiter is not None and not self.waiter.done():
+            self.waiter.set_result(None)
+
+    async def get(self) -> bytes:
+        while not self.frames:
+            self.waiter = asyncio.get_running_loop().create_future()
+            try:
+                await self.waiter
+            finally:
+                self.waiter = None
+        return self.frames.pop(0)
+
+
+def subscribe(topics: list[str]) -> Subscriber | None:
+    """Register a stream for topics; None when this process already holds EVENTS_MAX_CONNECTIONS streams or is
+    shutting down."""
+    if _closing or len(_subscribers) >= EVENTS_MAX_CONNECTIONS:
+        return None
+    sub = Subscriber(topics)
+    _subscribers.add(sub)
+    for topic in topics:
+        _topics.setdefault(topic, set()).add(sub)
+    metrics.events_connections.inc()
+    return sub
+
+
+def unsubscribe(sub: Subscriber) -> None:
+    if sub not in _subscribers:
+        return
+    _subscribers.discard(sub)
+    for topic in sub.topics:
+        subs = _topics.get(topic)
+        if subs is not None:
+            subs.discard(sub)
+            if not subs:
+                del _topics[topic]
+    metrics.events_connections.dec()
+
+
+def end_stream(sub: Subscriber) -> None:
+    """Unsubscribe and make CLOSE the stream's next frame."""
+    unsubscribe(sub)
+    sub.close()
+
+
+def _send(sub: Subscriber, frame: bytes) -> None:
+    if not sub.put(frame):
+        # Too far behind: end the stream; its client reconnects and refetches.
+        end_stream(sub)
+        metrics.events_dropped_streams.inc()
+
+
+def _deliver(topics: list[str], event: str, data: bytes) -> None:
+    targets: set[Subscriber] = set()
+    for topic in topics:
+        targets.update(_topics.get(topic, ()))
+    if not targets:
+        return
+    frame = b"id: %d\nevent: %s\ndata: %s\n\n" % (next(_frame_ids), event.encode(), data)
+    for sub in targets:
+        _send(sub, frame)
+
+
+def publish(topics: list[str], event: str, data: dict) -> None:
+    """Send event (e.g. "task.created") with data to the streams of topics. Never blocks and never raises: call it
+    from the event loop after the change is committed."""
+    if not EVENTS_ENABLED:
+        return
+    try:
+        metrics.events_published.inc((event,))
+        if EVENTS_BROKER == "local":
+            _deliver(topics, event, orjson.dumps(data))
+            return
+        message = orjson.dumps({"topics": topics, "event": event, "data": data})
+        if len(message) > _NOTIFY_LIMIT:
+            message = orjson.dumps({"topics": topics, "event": event, "data": {"id": data.get("id")}})
+        if _outbox is None:
+            logger.warning("Event %s published before the event relay started; dropped", event)
+            return
+        _outbox.put_nowait(message)
+    except asyncio.QueueFull:
+        logger.warning("Event relay backlog full; dropped %s", event)
+    except Exception:
+        logger.exception("Could not publish %s", event)
+
+
+def _on_notify(connection, pid, channel, payload: str) -> None:
+    try:
+        message = orjson.loads(payload)
+        _deliver(message["topics"], message["event"], orjson.dumps(message["data"]))
+    except Exception:
+        logger.exception("Malformed event notification")
+
+
+async def _relay() -> None:
+    """Postgres broker: LISTEN on one connection and send the outbox with pg_notify on it, reconnecting on failure.
+    After a reconnect every stream gets a resync event, since notifications sent in between were missed."""
+    import asyncpg
+
+    delay = _RECONNECT_DELAY
+    reconnected = False
+    while True:
+        conn = None
+        lost = asyncio.get_running_loop().create_future()
+        try:
+            conn = await asyncpg.connect(DATABASE_URL)
+            conn.add_termination_listener(lambda _: lost.done() or lost.set_result(None))
+            await conn.add_listener(_CHANNEL, _on_notify)
+            if reconnected:
+                for sub in list(_subscribers):
+                    _send(sub, _RESYNC)
+            delay = _RECONNECT_DELAY
+            while True:
+                get = asyncio.ensure_future(_outbox.get())
+                try:
+                    await asyncio.wait({get, lost}, return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    if not get.done():
+                        get.cancel()
+                if not get.done() or get.cancelled():  # connection lost
+                    break
+                try:
+                    await conn.execute("select pg_notify($1, $2)", _CHANNEL, get.result().decode())
+                except (OSError, asyncpg.PostgresConnectionError, asyncpg.InterfaceError):
+                    # The connection is gone; the event is lost like the notifications missed meanwhile.
+                    break
+            logger.warning("Event relay connection lost; reconnecting")
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.warning("Event relay cannot connect; retrying in %.0fs", delay, exc_info=True)
+        finally:
+            if conn is not None and not conn.is_closed():
+                conn.terminate()
+        reconnected = True
+        await asyncio.sleep(delay)
+        delay = min(_MAX_RECONNECT_DELAY, delay * 2)
+
+
+async def _heartbeat() -> None:
+    """Ping idle streams so proxies keep them open and dead connections are noticed."""
+    while True:
+        await asyncio.sleep(EVENTS_HEARTBEAT_SECONDS)
+        for sub in list(_subscribers):
+            if not sub.frames:
+                sub.put(PING)
+
+
+def _track(task: asyncio.Task) -> None:
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+
+async def start_events() -> None:
+    """Start the heartbeat and, with EVENTS_BROKER=postgres, the LISTEN/NOTIFY relay (app startup)."""
+    global _outbox, _closing
+    if not EVENTS_ENABLED:
+        return
+    _closing = False
+    loop = asyncio.get_running_loop()
+    _track(loop.create_task(_heartbeat()))
+    if EVENTS_BROKER == "postgres":
+        _outbox = asyncio.Queue(_OUTBOX_SIZE)
+        _track(loop.create_task(_relay()))
+
+
+async def close_events() -> None:
+    """End every open stream with CLOSE, refuse new ones and stop the hub tasks (app shutdown). Signals are the
+    server's: uvicorn runs this only after open requests finish or --timeout-graceful-shutdown cancels them, so set
+    that timeout or streams hold up the exit until their tokens expire."""
+    global _outbox, _closing
+    _closing = True
+    for sub in list(_subscribers):
+        end_stream(sub)
+    tasks = list(_tasks)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    _outbox = None
@@ -0,0 +1,73 @@
+"""Server push: GET /api/events streams the signed-in user's events (Server-Sent Events) instead of polling.
+   Students get task.created and feedback.updated for themselves; every mentor gets submission.created and
+   submission.updated (a student also gets their own). Each event's data is the new row as the REST endpoints return it."""
+import asyncio
+import time
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from auth_deps import get_stream_user
+from config import EVENTS_ENABLED
+from event_hub import CLOSE, MENTORS, Subscriber, end_stream, subscribe, unsubscribe, user_topic
+
+router = APIRouter(prefix="/api", tags=["events"])
+
+# Sent first: how long EventSource waits before reconnecting (ms), and "ready" so the client refetches what it shows
+# (cheap with If-None-Match) to cover events missed while it was disconnected.
+_READY = b"retry: 3000\nevent: ready\ndata: {}\n\n"
+
+
+class _EventStreamResponse(StreamingResponse):
+    """Sends a subscriber's frames until CLOSE, the token's expiry or the client's disconnect. Lighter than
+    StreamingResponse's task group per stream: one helper task waits for the disconnect and wakes the stream through
+    its Subscriber, a timer ends it at the token's exp, and the subscriber is removed however the response ends."""
+
+    def __init__(self, sub: Subscriber, expires_at: float | None):
+        # no-transform / X-Accel-Buffering: proxies must not buffer or compress the stream.
+        super().__init__(
+            iter(()), media_type="text/event-stream", headers={"Cache-Control": "no-cache, no-transform", "X-Accel-Buffering": "no"},
+        )
+        self.sub = sub
+        self.expires_at = expires_at
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        watcher = asyncio.ensure_future(self._wait_for_disconnect(receive))
+        # At exp, not at the next frame or heartbeat after it.
+        expiry = None
+        if self.expires_at:
+            expiry = asyncio.get_running_loop().call_later(max(0.0, self.expires_at - time.time()), end_stream, self.sub)
+        try:
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+            frame = _READY
+            while frame is not CLOSE:
+                await send({"type": "http.response.body", "body": frame, "more_body": True})
+                frame = await self.sub.get()
+            if not watcher.done():
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            watcher.cancel()
+            if expiry is not None:
+                expiry.cancel()
+            unsubscribe(self.sub)
+
+    async def _wait_for_disconnect(self, receive: Receive) -> None:
+        while (await receive())["type"] != "http.disconnect":
+            pass
+        end_stream(self.sub)
+
+
+@router.get("/events")
+async def stream_events(current: dict = Depends(get_stream_user)):
+    """text/event-stream of events for the current user. Frames are "event: <type>" with JSON data; comment lines
+    (": ping") keep idle connections open. The stream ends when the access token expires; reconnect with a new one."""
+    if not EVENTS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    topics = [user_topic(current["sub"])]
+    if current.get("role") == "mentor":
+        topics.append(MENTORS)
+    sub = subscribe(topics)
+    if sub is None:
+        raise HTTPException(status_code=503, detail="연결이 너무 많습니다. 잠시 후 다시 시도해 주세요.", headers={"Retry-After": "10"})
+    return _EventStreamResponse(sub, current.get("exp"))
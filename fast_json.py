@@ -0,0 +1,12 @@
+"""Pre-serialized JSON responses (orjson) for hot read paths.
+   Rows are turned into plain dicts already shaped like the response models and serialized straight to bytes,
+   skipping FastAPI's response_model re-validation. Endpoints keep response_model for the OpenAPI schema."""
+from typing import Any
+
+import orjson
+from starlette.responses import Response
+
+
+def json_response(content: Any, headers: dict[str, str] | None = None, status_code: int = 200) -> Response:
+    """Same wire format as FastAPI's JSONResponse (compact, UTF-8, no ASCII escaping)."""
+    return Response(orjson.dumps(content), status_code=status_code, headers=headers, media_type="application/json")
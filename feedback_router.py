@@ -1,13 +1,21 @@
 """Feedback API: mentor creates/updates daily feedback; mentor and student get feedback by date."""
 from datetime import datetime, timezone
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 
 from auth_deps import require_mentor, require_student
+from event_hub import publish, user_topic
+from fast_json import json_response
+from http_cache import is_not_modified, not_modified, rows_etag
 from pydantic import BaseModel, Field
-from supabase_admin import get_supabase_admin
+from repository import get_repository
+from serializers import row_to_payload
+from user_directory import UserDirectory, get_user_directory
+from validators import parse_date, parse_range
 
 router = APIRouter(prefix="/api", tags=["feedback"])
 
+MAX_FEEDBACK_RANGE_DAYS = 93  # a calendar quarter
+
 
 # --- Pydantic models (align with frontend FeedbackItem, FeedbackPerTask, DailyFeedbackPayload) ---
 
@@ -51,37 +59,6 @@ class DailyFeedbackPayloadOut(BaseModel):
     dailySummary: str = ""
 
 
-def _normalize_payload(payload: dict) -> dict:
-    """Ensure payload has feedbackPerTask (list) and dailySummary (str)."""
-    if not isinstance(payload, dict):
-        return {"feedbackPerTask": [], "dailySummary": ""}
-    ft = payload.get("feedbackPerTask")
-    if not isinstance(ft, list):
-        ft = []
-    ds = payload.get("dailySummary")
-    if not isinstance(ds, str):
-        ds = ""
-    return {"feedbackPerTask": ft, "dailySummary": ds}
-
-
-def _row_to_payload(row: dict) -> DailyFeedbackPayloadOut:
-    payload = _normalize_payload(row.get("payload") or {})
-    feedback_per_task = []
-    for fp in payload.get("feedbackPerTask") or []:
-        task_id = fp.get("taskId") or str(fp.get("task_id", ""))
-        items = []
-        for it in fp.get("items") or []:
-            items.append(FeedbackItemOut(
-                content=it.get("content") or "",
-                isImportant=bool(it.get("isImportant", it.get("is_important", False))),
-            ))
-        feedback_per_task.append(FeedbackPerTaskOut(taskId=task_id, items=items))
-    return DailyFeedbackPayloadOut(
-        feedbackPerTask=feedback_per_task,
-        dailySummary=payload.get("dailySummary") or "",
-    )
-
-
 def _body_to_payload(body: DailyFeedbackPayloadIn) -> dict:
     ft = []
     for fp in body.feedback_per_task:
@@ -90,29 +67,45 @@ def _body_to_payload(body: DailyFeedbackPayloadIn) -> dict:
     return {"feedbackPerTask": ft, "dailySummary": body.daily_summary}
 
 
+async def _feedback_range(request: Request, repo, student_id: str, from_date: str, to_date: str) -> Response:
+    """All feedback_daily rows for a student in [from, to], in one query, keyed by date. Days without feedback are omitted."""
+    parse_range(from_date, to_date, MAX_FEEDBACK_RANGE_DAYS)
+    rows = await repo.feedback_range(student_id, from_date, to_date)
+    etag = rows_etag(rows, ("date",), "feedback-range", student_id, from_date, to_date)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    return json_response({str(row["date"]): row_to_payload(row) for row in rows}, {"ETag": etag})
+
+
+async def _feedback_day(request: Request, repo, student_id: str, date: str) -> Response:
+    """One day's feedback (or None), with an ETag from the row's updated_at; If-None-Match returns 304."""
+    parse_date(date)
+    row = await repo.get_feedback(student_id, date)
+    rows = [row] if row else []
+    etag = rows_etag(rows, ("student_id", "date"), "feedback", student_id, date)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    return json_response(row_to_payload(rows[0]) if rows else None, {"ETag": etag})
+
+
 # --- Mentor: create or update daily feedback for a student ---
 
 @router.put("/feedback", response_model=DailyFeedbackPayloadOut)
-def upsert_feedback(
+async def upsert_feedback(
     body: DailyFeedbackPayloadIn,
     student_id: str = Query(..., description="Student ID"),
     date: str = Query(..., description="Date YYYY-MM-DD"),
     current: dict = Depends(require_mentor),
-    supabase=Depends(get_supabase_admin),
+    repo=Depends(get_repository),
+    directory: UserDirectory = Depends(get_user_directory),
 ):
     """Mentor only. Create or update daily feedback for a student. One record per (student_id, date)."""
-    if len(date) != 10 or date[4] != "-" or date[7] != "-":
-        raise HTTPException(status_code=400, detail="date must be YYYY-MM-DD")
+    parse_date(date)
     # Ensure student exists and is a student
-    user_r = (
-        supabase.table("auth_users")
-        .select("id, role")
-        .eq("id", student_id)
-        .execute()
-    )
-    if not user_r.data or len(user_r.data) == 0:
+    user = await directory.get(student_id)
+    if user is None:
         raise HTTPException(status_code=404, detail="학생을 찾을 수 없습니다.")
-    if user_r.data[0].get("role") != "student":
+    if user.get("role") != "student":
         raise HTTPException(status_code=400, detail="학생에게만 피드백을 남길 수 있습니다.")
 
     payload = _body_to_payload(body)
@@ -123,59 +116,63 @@ def upsert_feedback(
         "payload": payload,
         "updated_at": now_iso,
     }
-    r = (
-        supabase.table("feedback_daily")
-        .upsert(row, on_conflict="student_id,date")
-        .execute()
-    )
-    if not r.data or len(r.data) == 0:
+    saved = await repo.upsert_feedback(row)
+    if saved is None:
         raise HTTPException(status_code=500, detail="피드백 저장에 실패했습니다.")
-    return _row_to_payload(r.data[0])
+    feedback = row_to_payload(saved)
+    publish([user_topic(student_id)], "feedback.updated", {"student_id": student_id, "date": date, **feedback})
+    return json_response(feedback)
 
 
 # --- Mentor: get daily feedback for a student ---
 
 @router.get("/feedback", response_model=DailyFeedbackPayloadOut | None)
-def get_feedback_mentor(
+async def get_feedback_mentor(
+    request: Request,
     student_id: str = Query(..., description="Student ID"),
     date: str = Query(..., description="Date YYYY-MM-DD"),
     current: dict = Depends(require_mentor),
-    supabase=Depends(get_supabase_admin),
+    repo=Depends(get_repository),
 ):
-    """Mentor only. Get daily feedback for a student. Returns null if none saved."""
-    if len(date) != 10 or date[4] != "-" or date[7] != "-":
-        raise HTTPException(status_code=400, detail="date must be YYYY-MM-DD")
-    r = (
-        supabase.table("feedback_daily")
-        .select("*")
-        .eq("student_id", student_id)
-        .eq("date", date)
-        .execute()
-    )
-    if not r.data or len(r.data) == 0:
-        return None
-    return _row_to_payload(r.data[0])
+    """Mentor only. Get daily feedback for a student. Returns null if none saved. Supports If-None-Match."""
+    return await _feedback_day(request, repo, student_id, date)
 
 
 # --- Student: get my daily feedback for a date ---
 
 @router.get("/feedback/me", response_model=DailyFeedbackPayloadOut | None)
-def get_feedback_student(
+async def get_feedback_student(
+    request: Request,
     date: str = Query(..., description="Date YYYY-MM-DD"),
     current: dict = Depends(require_student),
-    supabase=Depends(get_supabase_admin),
+    repo=Depends(get_repository),
+):
+    """Student only. Get my daily feedback for a date. Returns null if none. Supports If-None-Match."""
+    return await _feedback_day(request, repo, current["sub"], date)
+
+
+# --- Date ranges (weekly / monthly calendar views) ---
+
+@router.get("/feedback/range", response_model=dict[str, DailyFeedbackPayloadOut])
+async def get_feedback_range_mentor(
+    request: Request,
+    student_id: str = Query(..., description="Student ID"),
+    from_date: str = Query(..., alias="from", description="First date YYYY-MM-DD"),
+    to_date: str = Query(..., alias="to", description="Last date YYYY-MM-DD (inclusive)"),
+    current: dict = Depends(require_mentor),
+    repo=Depends(get_repository),
+):
+    """Mentor only. Daily feedback for a student in [from, to] keyed by date; days without feedback are omitted."""
+    return await _feedback_range(request, repo, student_id, from_date, to_date)
+
+
+@router.get("/feedback/me/range", response_model=dict[str, DailyFeedbackPayloadOut])
+async def get_feedback_range_student(
+    request: Request,
+    from_date: str = Query(..., alias="from", description="First date YYYY-MM-DD"),
+    to_date: str = Query(..., alias="to", description="Last date YYYY-MM-DD (inclusive)"),
+    current: dict = Depends(require_student),
+    repo=Depends(get_repository),
 ):
-    """Student only. Get my daily feedback for a date. Returns null if none."""
-    student_id = current["sub"]
-    if len(date) != 10 or date[4] != "-" or date[7] != "-":
-        raise HTTPException(status_code=400, detail="date must be YYYY-MM-DD")
-    r = (
-        supabase.table("feedback_daily")
-        .select("*")
-        .eq("student_id", student_id)
-        .eq("date", date)
-        .execute()
-    )
-    if not r.data or len(r.data) == 0:
-        return None
-    return _row_to_payload(r.data[0])
+    """Student only. My daily feedback in [from, to] keyed by date; days without feedback are omitted."""
+    return await _feedback_range(request, repo, current["sub"], from_date, to_date)
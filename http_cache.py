@@ -0,0 +1,47 @@
+"""Strong ETags from row versions (updated_at) and If-None-Match handling for polled GET endpoints."""
+import hashlib
+import json
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+# Bump when the response format changes so clients holding old ETags refetch.
+_FORMAT_VERSION = "1"
+
+
+def row_version(row: dict, key_cols: tuple[str, ...]) -> str:
+    """Version of one row: its key plus updated_at (or a hash of the row if it has no updated_at)."""
+    key = ":".join(str(row.get(c)) for c in key_cols)
+    updated_at = row.get("updated_at")
+    if updated_at:
+        return f"{key}@{updated_at}"
+    return f"{key}#{hashlib.sha1(json.dumps(row, sort_keys=True, default=str).encode()).hexdigest()}"
+
+
+def etag_for(*parts: str) -> str:
+    """Strong ETag over the given version strings (order matters)."""
+    h = hashlib.sha256(_FORMAT_VERSION.encode())
+    for part in parts:
+        h.update(b"\x1f")
+        h.update(part.encode())
+    return f'"{h.hexdigest()[:32]}"'
+
+
+def rows_etag(rows: list[dict], key_cols: tuple[str, ...], *extra: str) -> str:
+    return etag_for(*(row_version(r, key_cols) for r in rows), *extra)
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """True if If-None-Match lists this ETag (weak comparison, as RFC 9110 requires for If-None-Match) or is *."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def not_modified(etag: str, headers: dict[str, str] | None = None) -> Response:
+    return Response(status_code=304, headers={**(headers or {}), "ETag": etag})
@@ -0,0 +1,151 @@
+"""Submission image variants: a small thumbnail and a resized, recompressed preview of every uploaded photo.
+   Rendering (decode, EXIF rotation, resize, encode) is CPU-bound and runs in a process pool. The whole pipeline
+   (download original, render, upload variants, store URLs on task_submissions) runs after the submit response.
+   Worker processes are spawned and import only this module, Pillow and config."""
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+
+from PIL import Image, ImageOps
+
+from config import IMAGE_PROCESS_WORKERS, IMAGE_PROCESSING_ENABLED, IMAGE_VARIANT_FORMAT
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_MAX_SIDE = 320
+PREVIEW_MAX_SIDE = 1600
+THUMBNAIL_QUALITY = 70
+PREVIEW_QUALITY = 80
+CONTENT_TYPES = {"webp": "image/webp", "jpeg": "image/jpeg"}
+# Stored files keep the uploaded name's extension; only these are downloaded and rendered (formats Pillow decodes).
+IMAGE_EXTENSIONS = frozenset({"jpg", "jpeg", "png", "webp", "gif", "bmp", "tif", "tiff"})
+
+_executor: ProcessPoolExecutor | None = None
+# Images downloaded or rendering at once; bounds memory when many submissions arrive together.
+_slots = asyncio.Semaphore(IMAGE_PROCESS_WORKERS * 2)
+_pending: set[asyncio.Task] = set()
+
+
+def _fit(size: tuple[int, int], max_side: int) -> tuple[int, int]:
+    width, height = size
+    scale = min(1.0, max_side / max(width, height))
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def _encode(image: Image.Image, fmt: str, quality: int) -> bytes:
+    out = BytesIO()
+    if fmt == "webp":
+        # method 2: within ~5% of the default's size at ~60% of its encode time.
+        image.save(out, "WEBP", quality=quality, method=2)
+    else:
+        image.save(out, "JPEG", quality=quality, optimize=True, progressive=True)
+    return out.getvalue()
+
+
+def render_variants(data: bytes, fmt: str = IMAGE_VARIANT_FORMAT) -> tuple[bytes, bytes] | None:
+    """(thumbnail, preview) of an image encoded as fmt, or None if data is not a readable image. Runs in a worker process."""
+    try:
+        with Image.open(BytesIO(data)) as image:
+            # JPEG only: let the decoder scale down by 1/2..1/8 while still covering the preview size.
+            image.draft("RGB", _fit(image.size, PREVIEW_MAX_SIDE))
+            image = ImageOps.exif_transpose(image).convert("RGB")
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return None
+    image.thumbnail((PREVIEW_MAX_SIDE, PREVIEW_MAX_SIDE), Image.Resampling.LANCZOS)
+    preview = _encode(image, fmt, PREVIEW_QUALITY)
+    image.thumbnail((THUMBNAIL_MAX_SIDE, THUMBNAIL_MAX_SIDE), Image.Resampling.LANCZOS)
+    return _encode(image, fmt, THUMBNAIL_QUALITY), preview
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # spawn, not fork: the server process has event-loop and worker threads that a forked child must not inherit.
+        _executor = ProcessPoolExecutor(IMAGE_PROCESS_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _executor
+
+
+async def _render(data: bytes) -> tuple[bytes, bytes] | None:
+    global _executor
+    executor = _get_executor()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(executor, render_variants, data, IMAGE_VARIANT_FORMAT)
+    except BrokenProcessPool:
+        # A worker died (e.g. killed for memory on a huge image); start a fresh pool for the next render.
+        if _executor is executor:
+            _executor = None
+            executor.shutdown(wait=False, cancel_futures=True)
+        raise
+
+
+def _is_image_path(path: str) -> bool:
+    name = path.rpartition("/")[2]
+    return "." in name and name.rsplit(".", 1)[1].lower() in IMAGE_EXTENSIONS
+
+
+def _variant_path(path: str, kind: str) -> str:
+    directory, _, name = path.rpartition("/")
+    stem = name.rsplit(".", 1)[0] if "." in name else name
+    return f"{directory}/{stem}_{kind}.{IMAGE_VARIANT_FORMAT}"
+
+
+async def _variants_for(url: str) -> tuple[str | None, str | None]:
+    """(thumbnail URL, preview URL) for one uploaded image; (None, None) for a file that is not an image (not
+    downloaded) or cannot be rendered."""
+    from storage_helper import download_file, storage_path, upload_generated_file
+
+    path = storage_path(url)
+    if path is None or not _is_image_path(path):
+        return None, None
+    async with _slots:
+        data = await download_file(path)
+        rendered = await _render(data)
+    if rendered is None:
+        return None, None
+    thumbnail, preview = rendered
+    content_type = CONTENT_TYPES[IMAGE_VARIANT_FORMAT]
+    thumbnail_url, preview_url = await asyncio.gather(
+        upload_generated_file(_variant_path(path, "thumb"), thumbnail, content_type),
+        upload_generated_file(_variant_path(path, "preview"), preview, content_type),
+    )
+    return thumbnail_url, preview_url
+
+
+async def process_submission_images(repo, submission: dict) -> tuple[list[str | None], list[str | None]]:
+    """Render and store the variants of one submission ({"id", "image_urls", ...}). Returns (thumbnail_urls,
+    preview_urls), aligned with image_urls: None where the file is not an image."""
+    variants = await asyncio.gather(*(_variants_for(url) for url in submission["image_urls"]))
+    thumbnail_urls = [thumbnail for thumbnail, _ in variants]
+    preview_urls = [preview for _, preview in variants]
+    await repo.set_submission_images(str(submission["id"]), thumbnail_urls, preview_urls)
+    return thumbnail_urls, preview_urls
+
+
+async def _process_logged(repo, submission: dict) -> None:
+    try:
+        await process_submission_images(repo, submission)
+    except Exception:
+        # Left without variants; scripts/backfill_submission_images.py picks it up.
+        logger.warning("Could not render images of submission %s", submission.get("id"), exc_info=True)
+
+
+def schedule_submission_images(repo, submission: dict) -> None:
+    """Render a new submission's image variants in the background (the caller's response is not delayed)."""
+    if not IMAGE_PROCESSING_ENABLED or not submission.get("image_urls"):
+        return
+    task = asyncio.get_running_loop().create_task(_process_logged(repo, submission))
+    _pending.add(task)
+    task.add_done_callback(_pending.discard)
+
+
+async def close_image_processing(timeout: float = 10.0) -> None:
+    """Let in-flight renders finish (up to timeout), then stop the worker processes (app shutdown)."""
+    global _executor
+    if _pending:
+        await asyncio.wait(list(_pending), timeout=timeout)
+    executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
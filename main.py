@@ -1,80 +1,301 @@
 """Solstudy FastAPI backend. Uses Supabase (service role) and JWT_SECRET server-side only."""
+import hmac
 import logging
+import re
+from contextlib import asynccontextmanager
 
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
 from starlette.responses import JSONResponse, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
+from fastapi import FastAPI, HTTPException, Header
 
 from auth_router import router as auth_router
+from dashboard_router import router as dashboard_router
+from events_router import router as events_router
 from feedback_router import router as feedback_router
-from tasks_router import router as tasks_router
+from stats_router import router as stats_router
+from sync_router import router as sync_router
+from tasks_router import BODY_LIMITS as TASK_BODY_LIMITS, router as tasks_router
+from uploads_router import BODY_LIMITS as UPLOAD_BODY_LIMITS, router as uploads_router
+from event_hub import close_events, start_events
+from image_processing import close_image_processing
+from repository import close_repository
+from submission_uploads import close_submission_uploads, start_submission_uploads
 from supabase_admin import get_supabase_admin
-from config import CORS_ORIGINS
+import metrics
+from config import CORS_MAX_AGE, CORS_ORIGINS, METRICS_ENABLED, METRICS_TOKEN
 
 logger = logging.getLogger(__name__)
 
+_ACCESS_TOKEN_PARAM = re.compile(r"(access_token=)[^&\s]*")
+
+
+class _RedactAccessToken(logging.Filter):
+    """uvicorn's access log prints the query string, which for GET /api/events from an EventSource carries
+    ?access_token=<JWT>; replace the token before the line is written."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if isinstance(record.args, tuple) and any(isinstance(a, str) and "access_token=" in a for a in record.args):
+            record.args = tuple(
+                _ACCESS_TOKEN_PARAM.sub(r"\1[redacted]", a) if isinstance(a, str) else a for a in record.args
+            )
+        return True
+
+
+logging.getLogger("uvicorn.access").addFilter(_RedactAccessToken())
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await start_events()
+    await start_submission_uploads()
+    yield
+    # First: open event streams would otherwise hold up the shutdown.
+    await close_events()
+    await close_submission_uploads()
+    await close_image_processing()
+    await close_repository()
+
+
 app = FastAPI(
     title="Solstudy API",
     description="Backend for Solstudy (Supabase + JWT)",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 
-def _add_cors_to_response(response: Response, request: Request) -> None:
-    """Set CORS headers on response if request has an allowed origin."""
-    origin = request.headers.get("origin")
-    if origin and origin in CORS_ORIGINS:
-        response.headers.setdefault("Access-Control-Allow-Origin", origin)
-        response.headers.setdefault("Access-Control-Allow-Credentials", "true")
+_INTERNAL_ERROR_DETAIL = "서버 오류가 발생했습니다. 잠시 후 다시 시도해 주세요."
+
+
+class CORSAndErrorMiddleware:
+    """CORS for the allowed origins, and a JSON 500 (still carrying CORS headers) for any unhandled exception.
+    Preflights are answered here without reaching the app; browsers cache them for max_age seconds."""
+    def __init__(
+        self,
+        app: ASGIApp,
+        allow_origins: list[str],
+        allow_methods: list[str],
+        expose_headers: list[str],
+        max_age: int,
+    ) -> None:
+        self.app = app
+        self.allow_origins = frozenset(o.encode("latin-1") for o in allow_origins)
+        self.allow_methods = frozenset(m.encode("latin-1") for m in allow_methods)
+        self.simple_headers = [
+            (b"access-control-allow-credentials", b"true"),
+            (b"access-control-expose-headers", ", ".join(expose_headers).encode("latin-1")),
+        ]
+        self.preflight_headers = [
+            (b"content-type", b"text/plain; charset=utf-8"),
+            (b"vary", b"Origin"),
+            (b"access-control-allow-methods", ", ".join(allow_methods).encode("latin-1")),
+            (b"access-control-max-age", str(max_age).encode("latin-1")),
+            (b"access-control-allow-credentials", b"true"),
+        ]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        origin = request_method = request_headers = None
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value
+            elif name == b"access-control-request-method":
+                request_method = value
+            elif name == b"access-control-request-headers":
+                request_headers = value
+        if origin is not None and request_method is not None and scope["method"] == "OPTIONS":
+            await self._preflight(send, origin, request_method, request_headers)
+            return
+
+        cors_headers = self.simple_headers + [(b"access-control-allow-origin", origin)] if origin in self.allow_origins else None
+        response_started = False
 
+        async def send_with_cors(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+                if cors_headers is not None:
+                    message["headers"] = _with_vary_origin(list(message.get("headers", ())) + cors_headers)
+            await send(message)
 
-class EnsureCORSHeadersMiddleware(BaseHTTPMiddleware):
-    """Ensure CORS headers are on every response (including 4xx/5xx and unhandled errors)."""
-    async def dispatch(self, request: Request, call_next):
         try:
-            response = await call_next(request)
+            await self.app(scope, receive, send_with_cors)
         except Exception as e:
             logger.exception("Unhandled exception: %s", e)
-            response = JSONResponse(
-                status_code=500,
-                content={"detail": "서버 오류가 발생했습니다. 잠시 후 다시 시도해 주세요."},
-            )
-        _add_cors_to_response(response, request)
-        return response
+            metrics.http_unhandled_exceptions.inc((metrics.route_label(scope), type(e).__name__))
+            if response_started:
+                raise
+            response = JSONResponse(status_code=500, content={"detail": _INTERNAL_ERROR_DETAIL})
+            await response(scope, receive, send_with_cors)
+
+    async def _preflight(self, send: Send, origin: bytes, request_method: bytes, request_headers: bytes | None) -> None:
+        headers = list(self.preflight_headers)
+        failures = []
+        if origin in self.allow_origins:
+            headers.append((b"access-control-allow-origin", origin))
+        else:
+            failures.append("origin")
+        if request_method not in self.allow_methods:
+            failures.append("method")
+        if request_headers is not None:  # every request header is allowed
+            headers.append((b"access-control-allow-headers", request_headers))
+        body = ("Disallowed CORS " + ", ".join(failures)).encode() if failures else b"OK"
+        headers.append((b"content-length", str(len(body)).encode("latin-1")))
+        await send({"type": "http.response.start", "status": 400 if failures else 200, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+
+def _with_vary_origin(headers: list[tuple[bytes, bytes]]) -> list[tuple[bytes, bytes]]:
+    for i, (name, value) in enumerate(headers):
+        if name.lower() == b"vary":
+            if b"origin" not in value.lower():
+                headers[i] = (name, value + b", Origin")
+            return headers
+    headers.append((b"vary", b"Origin"))
+    return headers
 
 
-# Order: last added runs first. EnsureCORS runs first so it runs last on response (adds headers if missing).
-app.add_middleware(EnsureCORSHeadersMiddleware)
+# Every route without its own entry in the BODY_LIMITS of the routers (JSON and small forms).
+MAX_JSON_BODY_SIZE = 1024 * 1024
+ROUTE_BODY_LIMITS = TASK_BODY_LIMITS + UPLOAD_BODY_LIMITS
+
+
+class _PartSizeCheck:
+    """Size of the current part of a multipart body as it streams in: the bytes since the last boundary delimiter
+    (a part's headers count toward it). A delimiter split across two chunks is found through the kept tail."""
+    def __init__(self, boundary: bytes, max_part_size: int) -> None:
+        self.delimiter = b"\r\n--" + boundary
+        self.max_part_size = max_part_size
+        self.part_size = 0
+        self.tail = b""
+
+    def feed(self, chunk: bytes) -> bool:
+        """False once a part, finished in this chunk or still open, is over max_part_size."""
+        data = self.tail + chunk
+        # The tail (shorter than a delimiter) was counted already; a delimiter starting in it takes those bytes back out.
+        counted, start = len(self.tail), 0
+        while (end := data.find(self.delimiter, start)) >= 0:
+            if self.part_size + end - counted > self.max_part_size:
+                return False
+            self.part_size = 0
+            counted = start = end + len(self.delimiter)
+        self.part_size += len(data) - counted
+        self.tail = data[-(len(self.delimiter) - 1):]
+        # The part's last bytes may be the start of the next delimiter.
+        return self.part_size <= self.max_part_size + len(self.delimiter)
+
+
+def _multipart_boundary(scope: Scope) -> bytes | None:
+    for name, value in scope["headers"]:
+        if name == b"content-type":
+            media_type, _, params = value.partition(b";")
+            if media_type.strip().lower() != b"multipart/form-data":
+                return None
+            for param in params.split(b";"):
+                key, _, boundary = param.strip().partition(b"=")
+                if key.lower() == b"boundary" and boundary:
+                    return boundary.strip(b'"')
+    return None
+
+
+class RequestBodyLimitMiddleware:
+    """Reject request bodies over the route's limit with 413 while they are received, before they are parsed or buffered.
+    routes: (method, path pattern, max body size, max multipart part size or None); other requests get max_body_size.
+    With a part limit, one oversized file is rejected as soon as it passes the limit instead of after it was spooled."""
+    def __init__(self, app: ASGIApp, max_body_size: int, routes: list[tuple[str, str, int, int | None]] = ()) -> None:
+        self.app = app
+        self.max_body_size = max_body_size
+        self.routes = [(method, re.compile(pattern), body, part) for method, pattern, body, part in routes]
+
+    def _limits(self, scope: Scope) -> tuple[int, int | None]:
+        for method, pattern, max_body_size, max_part_size in self.routes:
+            if scope["method"] == method and pattern.fullmatch(scope["path"]):
+                return max_body_size, max_part_size
+        return self.max_body_size, None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        max_body_size, max_part_size = self._limits(scope)
+        detail = _size_detail("요청", max_body_size)
+        for name, value in scope["headers"]:
+            if name == b"content-length" and value.isdigit() and int(value) > max_body_size:
+                await JSONResponse(status_code=413, content={"detail": detail})(scope, receive, send)
+                return
+        boundary = _multipart_boundary(scope) if max_part_size else None
+        parts = _PartSizeCheck(boundary, max_part_size) if boundary else None
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                body = message.get("body", b"")
+                received += len(body)
+                # Raised inside the route's body parsing, so FastAPI turns it into a 413 response.
+                if received > max_body_size:
+                    raise HTTPException(status_code=413, detail=detail)
+                if parts is not None and not parts.feed(body):
+                    raise HTTPException(status_code=413, detail=_size_detail("파일", max_part_size))
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+def _size_detail(what: str, size: int) -> str:
+    return f"{what} 크기는 {size // (1024*1024)}MB 이하여야 합니다."
+
+
+# Order: last added runs first. RequestBodyLimit is innermost so its 413 responses still get CORS headers;
+# CORSAndError answers preflights before the body limit and routing, and turns unhandled errors into a 500 with CORS.
+app.add_middleware(RequestBodyLimitMiddleware, max_body_size=MAX_JSON_BODY_SIZE, routes=ROUTE_BODY_LIMITS)
 app.add_middleware(
-    CORSMiddleware,
+    CORSAndErrorMiddleware,
     allow_origins=CORS_ORIGINS,
-    allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
-    allow_headers=["*"],
-    expose_headers=["*"],
+    expose_headers=["*", "ETag", "X-Next-Cursor", "Idempotent-Replayed", "Retry-After"],
+    max_age=CORS_MAX_AGE,
 )
+# Outermost, so request latency includes every middleware and preflights are counted too.
+if METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
 
 app.include_router(auth_router)
 app.include_router(feedback_router)
 app.include_router(tasks_router)
+app.include_router(uploads_router)
+app.include_router(dashboard_router)
+app.include_router(stats_router)
+app.include_router(sync_router)
+app.include_router(events_router)
 
 
 @app.get("/")
-def root():
+async def root():
     return {"service": "solstudy-back", "status": "ok"}
 
 
 @app.get("/health")
-def health():
+async def health():
     return {"ok": True}
 
 
+if METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def prometheus_metrics(authorization: str | None = Header(None)):
+        """Prometheus scrape endpoint (text exposition format)."""
+        if METRICS_TOKEN and not hmac.compare_digest(authorization or "", f"Bearer {METRICS_TOKEN}"):
+            raise HTTPException(status_code=401, detail="인증이 필요합니다.")
+        return Response(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 # Example: use Supabase admin (e.g. in a protected route)
 @app.get("/api/demo")
-def demo():
+async def demo():
     """Example endpoint; replace with real logic."""
     # Ensure env is loaded and service role is not exposed
     _ = get_supabase_admin()
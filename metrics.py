@@ -0,0 +1,267 @@
+"""In-process Prometheus metrics: counters and histograms rendered in the text exposition format on GET /metrics.
+   Built for the request path: an observation is a dict lookup, a bisect and a few adds under an uncontended lock
+   (storage and sync-client calls observe from worker threads). Labels are positional tuples, bounded by route
+   templates, table/bucket names and operations."""
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Callable
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CALL_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50)
+STREAM_DURATION_BUCKETS = (1.0, 10.0, 60.0, 300.0, 900.0, 1800.0, 3600.0, 7200.0)
+
+# Long-lived responses: a 200 on these routes is observed in http_stream_duration_seconds instead.
+STREAM_ROUTES = frozenset({"/api/events"})
+
+_registry: list["_Metric"] = []
+
+
+def _format_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, labels: tuple = (), amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, labels: tuple = ()) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in sorted(items):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, labels: tuple = (), amount: float = 1) -> None:
+        self.inc(labels, -amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...] = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self._bounds = tuple(buckets)
+        # labels -> [count per bucket (non-cumulative, +Inf last)..., sum, count]
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, labels: tuple, value: float) -> None:
+        i = bisect_left(self._bounds, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self._bounds) + 1) + [0.0, 0]
+            series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, labels: tuple) -> int:
+        series = self._series.get(labels)
+        return series[-1] if series else 0
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        with self._lock:
+            items = [(labels, list(series)) for labels, series in self._series.items()]
+        for labels, series in sorted(items):
+            cumulative = 0
+            for bound, n in zip(self._bounds + (float("inf"),), series):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                label_str = _format_labels(self.labelnames, labels, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{label_str} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {series[-1]}")
+        return lines
+
+
+class Collected(_Metric):
+    """A counter or gauge kept elsewhere (e.g. the token cache's own hit count), read when /metrics is rendered so the
+    code that keeps it pays nothing extra per update."""
+
+    def __init__(self, name: str, help_text: str, kind: str, read: Callable[[], float]):
+        super().__init__(name, help_text)
+        self.kind = kind
+        self._read = read
+
+    def render(self) -> list[str]:
+        return super().render() + [f"{self.name} {_format_value(self._read())}"]
+
+
+def render() -> str:
+    """Every registered metric in the Prometheus text format (version 0.0.4)."""
+    lines: list[str] = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# --- Metrics ---
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template and status.", ("method", "route", "status"),
+)
+http_unhandled_exceptions = Counter(
+    "http_unhandled_exceptions_total", "Exceptions that reached the error middleware (answered with 500).", ("route", "exception"),
+)
+http_request_db_calls = Histogram(
+    "http_request_db_calls", "Database calls made while serving one request.", ("route",), CALL_COUNT_BUCKETS,
+)
+http_request_storage_calls = Histogram(
+    "http_request_storage_calls", "Storage calls made while serving one request.", ("route",), CALL_COUNT_BUCKETS,
+)
+db_query_duration = Histogram(
+    "db_query_duration_seconds", "Database call latency (PostgREST or asyncpg) by table/function and operation.",
+    ("backend", "table", "operation"),
+)
+db_query_errors = Counter(
+    "db_query_errors_total", "Failed database calls (PostgREST status >= 400 or transport/driver error).",
+    ("backend", "table", "operation"),
+)
+storage_request_duration = Histogram(
+    "storage_request_duration_seconds", "Supabase Storage call latency by bucket and operation.", ("bucket", "operation"),
+)
+storage_request_errors = Counter(
+    "storage_request_errors_total", "Failed Supabase Storage calls.", ("bucket", "operation"),
+)
+storage_upload_bytes = Counter(
+    "storage_upload_bytes_total", "Bytes uploaded to Supabase Storage.", ("bucket",),
+)
+storage_deduplicated_bytes = Counter(
+    "storage_deduplicated_bytes_total", "Attachment bytes not uploaded because the same content was already stored.", ("bucket",),
+)
+http_stream_duration = Histogram(
+    "http_stream_duration_seconds", "How long server-push streams stayed open, by route (kept out of "
+    "http_request_duration_seconds, whose latency buckets they would swamp).", ("route",), STREAM_DURATION_BUCKETS,
+)
+events_connections = Gauge(
+    "events_connections", "Open server-push streams (GET /api/events) on this process.",
+)
+events_published = Counter(
+    "events_published_total", "Server-push events published, by event type.", ("event",),
+)
+events_dropped_streams = Counter(
+    "events_dropped_streams_total", "Streams closed because the client fell too far behind.",
+)
+
+# [db calls, storage calls] of the request being served; child tasks and worker threads share the list.
+_request_calls: contextvars.ContextVar[list[int] | None] = contextvars.ContextVar("request_calls", default=None)
+
+
+def observe_db(backend: str, table: str, operation: str, seconds: float, ok: bool = True) -> None:
+    labels = (backend, table, operation)
+    db_query_duration.observe(labels, seconds)
+    if not ok:
+        db_query_errors.inc(labels)
+    calls = _request_calls.get()
+    if calls is not None:
+        calls[0] += 1
+
+
+def observe_storage(bucket: str, operation: str, seconds: float, ok: bool = True, upload_bytes: int = 0) -> None:
+    labels = (bucket, operation)
+    storage_request_duration.observe(labels, seconds)
+    if not ok:
+        storage_request_errors.inc(labels)
+    elif upload_bytes:
+        storage_upload_bytes.inc((bucket,), upload_bytes)
+    calls = _request_calls.get()
+    if calls is not None:
+        calls[1] += 1
+
+
+@lru_cache(maxsize=512)
+def postgrest_labels(method: str, path: str, prefer: str | None) -> tuple[str, str]:
+    """(table or function, operation) of a PostgREST request path such as /rest/v1/tasks or /rest/v1/rpc/submit_task."""
+    parts = path.rstrip("/").split("/")
+    if len(parts) >= 2 and parts[-2] == "rpc":
+        return parts[-1], "rpc"
+    if method == "POST":
+        return parts[-1], "upsert" if prefer and "resolution=" in prefer else "insert"
+    return parts[-1], {"GET": "select", "HEAD": "select", "PATCH": "update", "DELETE": "delete"}.get(method, method.lower())
+
+
+def route_label(scope: Scope) -> str:
+    """Route template (/api/tasks/{task_id}) so label values stay bounded; "unmatched" for 404s outside any route."""
+    route = scope.get("route")
+    return route.path if route is not None else "unmatched"
+
+
+class MetricsMiddleware:
+    """Outermost ASGI middleware: request latency by method/route/status plus DB and storage calls per request.
+    Open streams (STREAM_ROUTES) go to http_stream_duration_seconds, not the request latency histogram."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+        calls = [0, 0]
+        token = _request_calls.set(calls)
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_calls.reset(token)
+            route = route_label(scope)
+            if route in STREAM_ROUTES and status == 200:
+                http_stream_duration.observe((route,), elapsed)
+            else:
+                http_request_duration.observe((scope["method"], route, status), elapsed)
+            http_request_db_calls.observe((route,), calls[0])
+            http_request_storage_calls.observe((route,), calls[1])
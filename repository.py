@@ -0,0 +1,586 @@
+"""Data access for tasks, task submissions, daily feedback and study rollups. Routers call the repository instead of building queries.
+   DATA_BACKEND=supabase (default): PostgREST through get_supabase_db().
+   DATA_BACKEND=postgres: asyncpg pool on DATABASE_URL (same schema as supabase/migrations). Every query shape is a fixed
+   SQL string, so each pooled connection prepares it once and reuses the prepared statement."""
+import asyncio
+import time
+import uuid
+from datetime import date, datetime
+
+import orjson
+
+from config import DATA_BACKEND, DATABASE_POOL_MAX_SIZE, DATABASE_POOL_MIN_SIZE, DATABASE_URL
+from metrics import observe_db
+from supabase_admin import get_supabase_db
+
+TASK_COLS = "id, title, subject, due_date, description, goal, student_id, created_by, created_at, source, attachments, updated_at"
+FEEDBACK_COLS = "student_id, date, payload, created_at, updated_at"
+FEEDBACK_RANGE_COLS = "date, payload, updated_at"
+SUBMISSION_IMAGE_COLS = "id, task_id, image_urls"
+ATTACHMENT_OBJECT_COLS = "sha256, path"
+SUBMISSION_COLS = "id, task_id, student_id, submitted_at, study_time_minutes, image_urls, thumbnail_urls, preview_urls, upload_status"
+# Task fields returned with each submission by list_submissions.
+SUBMISSION_TASK_COLS = "id, title, subject, due_date"
+FEEDBACK_DATE_COLS = "student_id, date"
+STUDY_ROLLUP_COLS = "day, subject, tasks_assigned, tasks_submitted, study_minutes"
+# Rows per PostgREST request for reads that page through a range (Supabase caps responses at 1000 rows by default).
+FETCH_CHUNK = 1000
+# Columns written by create_task / create_tasks_bulk (see tasks_router._task_row).
+_TASK_INSERT_COLS = ("title", "subject", "due_date", "description", "goal", "student_id", "created_by", "source", "attachments")
+
+# (due_date, created_at, id) of the last row of the previous page; values validated by tasks_router._decode_cursor.
+TaskCursor = tuple[str, str, str]
+
+
+def _after_cursor_filter(cursor: TaskCursor) -> str:
+    """PostgREST or-filter for rows after the cursor in (due_date, created_at, id) order."""
+    due, created_at, task_id = cursor
+    return (
+        f"due_date.gt.{due},"
+        f'and(due_date.eq.{due},created_at.gt."{created_at}"),'
+        f'and(due_date.eq.{due},created_at.eq."{created_at}",id.gt.{task_id})'
+    )
+
+
+def _embedded_submission(row: dict) -> dict:
+    """Move PostgREST's embedded task_submissions list (one-to-many to PostgREST: unique on (task_id, student_id))
+    to row["submission"]: the task's submission or None."""
+    submissions = row.pop("task_submissions", None) or []
+    row["submission"] = submissions[0] if submissions else None
+    return row
+
+
+def _uuid(value: str) -> uuid.UUID | None:
+    try:
+        return uuid.UUID(value)
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+class SupabaseRepository:
+    """Queries through PostgREST (service-role client). Malformed ids match nothing instead of a PostgREST 400."""
+
+    async def insert_tasks(self, rows: list[dict]) -> list[dict]:
+        db = await get_supabase_db()
+        r = await db.table("tasks").insert(rows).execute()
+        return r.data or []
+
+    async def list_tasks(
+        self, *, student_id: str | None = None, due_date: str | None = None, from_date: str | None = None,
+        to_date: str | None = None, after: TaskCursor | None = None, limit: int, with_submission: bool = False,
+    ) -> list[dict]:
+        """Tasks ordered by (due_date, created_at, id), starting after the cursor. with_submission: each row's
+        "submission" is its task_submissions row (or None), embedded in the same request."""
+        if student_id and _uuid(student_id) is None:
+            return []
+        db = await get_supabase_db()
+        q = db.table("tasks").select(f"{TASK_COLS}, task_submissions({SUBMISSION_COLS})" if with_submission else TASK_COLS)
+        if student_id:
+            q = q.eq("student_id", student_id)
+        if due_date:
+            q = q.eq("due_date", due_date)
+        if from_date:
+            q = q.gte("due_date", from_date)
+        if to_date:
+            q = q.lte("due_date", to_date)
+        if after:
+            # The redundant due_date >= bound lets Postgres start the index scan at the cursor instead of filtering from the top.
+            q = q.gte("due_date", after[0]).or_(_after_cursor_filter(after))
+        r = await q.order("due_date").order("created_at").order("id").limit(limit).execute()
+        rows = r.data or []
+        return [_embedded_submission(row) for row in rows] if with_submission else rows
+
+    async def get_task(self, task_id: str, with_submission: bool = False) -> dict | None:
+        if _uuid(task_id) is None:
+            return None
+        db = await get_supabase_db()
+        cols = f"{TASK_COLS}, task_submissions({SUBMISSION_COLS})" if with_submission else TASK_COLS
+        r = await db.table("tasks").select(cols).eq("id", task_id).execute()
+        if not r.data:
+            return None
+        return _embedded_submission(r.data[0]) if with_submission else r.data[0]
+
+    async def tasks_due(self, from_date: str, to_date: str) -> list[dict]:
+        """Every student's tasks due in [from, to] with their "submission" (as list_tasks with_submission), in
+        (due_date, created_at, id) order; pages of FETCH_CHUNK rows by keyset."""
+        rows: list[dict] = []
+        after: TaskCursor | None = None
+        while True:
+            chunk = await self.list_tasks(from_date=from_date, to_date=to_date, after=after, limit=FETCH_CHUNK, with_submission=True)
+            rows.extend(chunk)
+            if len(chunk) < FETCH_CHUNK:
+                return rows
+            last = chunk[-1]
+            after = (str(last["due_date"]), str(last["created_at"]), str(last["id"]))
+
+    async def submit_task(
+        self, task_id: str, student_id: str, study_time_minutes: int, image_urls: list[str],
+        idempotency_key: str | None = None, dry_run: bool = False, upload_status: str = "done",
+    ) -> dict:
+        """One call to public.submit_task(); returns its {"status", "submission"?} result."""
+        if _uuid(task_id) is None:
+            return {"status": "not_found"}
+        db = await get_supabase_db()
+        r = await db.rpc("submit_task", {
+            "p_task_id": task_id,
+            "p_student_id": student_id,
+            "p_study_time_minutes": study_time_minutes,
+            "p_image_urls": image_urls,
+            "p_idempotency_key": idempotency_key,
+            "p_dry_run": dry_run,
+            "p_upload_status": upload_status,
+        }).execute()
+        return r.data
+
+    async def get_submission(self, task_id: str) -> dict | None:
+        if _uuid(task_id) is None:
+            return None
+        db = await get_supabase_db()
+        r = await db.table("task_submissions").select(SUBMISSION_COLS).eq("task_id", task_id).execute()
+        return r.data[0] if r.data else None
+
+    async def list_submissions(self, student_id: str, from_date: str, to_date: str) -> list[dict]:
+        """Submissions of the student's tasks due in [from, to], each with its "task" (SUBMISSION_TASK_COLS), in
+        (due_date, created_at, id) order: one request, tasks inner-joined to their submission."""
+        if _uuid(student_id) is None:
+            return []
+        db = await get_supabase_db()
+        r = await (
+            db.table("tasks")
+            .select(f"{SUBMISSION_TASK_COLS}, task_submissions!inner({SUBMISSION_COLS})")
+            .eq("student_id", student_id)
+            .gte("due_date", from_date)
+            .lte("due_date", to_date)
+            .order("due_date")
+            .order("created_at")
+            .order("id")
+            .execute()
+        )
+        rows = []
+        for task in r.data or []:
+            for sub in task.pop("task_submissions"):
+                rows.append({**sub, "task": task})
+        return rows
+
+    async def set_submission_upload(self, submission_id: str, upload_status: str, image_urls: list[str] | None = None) -> None:
+        """Record the outcome of a background upload (submission_uploads); image_urls is left as is when None."""
+        values: dict = {"upload_status": upload_status}
+        if image_urls is not None:
+            values["image_urls"] = image_urls
+        db = await get_supabase_db()
+        await db.table("task_submissions").update(values).eq("id", submission_id).execute()
+
+    async def set_submission_images(
+        self, submission_id: str, thumbnail_urls: list[str | None], preview_urls: list[str | None]
+    ) -> None:
+        db = await get_supabase_db()
+        await (
+            db.table("task_submissions")
+            .update({"thumbnail_urls": thumbnail_urls, "preview_urls": preview_urls})
+            .eq("id", submission_id)
+            .execute()
+        )
+
+    async def submissions_missing_images(self, limit: int) -> list[dict]:
+        """Oldest submissions with images but no variants yet."""
+        db = await get_supabase_db()
+        r = await (
+            db.table("task_submissions")
+            .select(SUBMISSION_IMAGE_COLS)
+            .eq("thumbnail_urls", "[]")
+            .neq("image_urls", "[]")
+            .order("submitted_at")
+            .limit(limit)
+            .execute()
+        )
+        return r.data or []
+
+    async def pending_submissions(self, submitted_before: str) -> list[dict]:
+        """Submissions still waiting for their background upload, inserted before submitted_before (ISO timestamp)."""
+        db = await get_supabase_db()
+        r = await (
+            db.table("task_submissions")
+            .select(SUBMISSION_COLS)
+            .eq("upload_status", "pending")
+            .lt("submitted_at", submitted_before)
+            .execute()
+        )
+        return r.data or []
+
+    async def find_attachment_objects(self, digests: list[str]) -> dict[str, str]:
+        """Storage paths of already stored attachment contents, by SHA-256 digest."""
+        db = await get_supabase_db()
+        r = await db.table("attachment_objects").select(ATTACHMENT_OBJECT_COLS).in_("sha256", digests).execute()
+        return {row["sha256"]: row["path"] for row in r.data or []}
+
+    async def record_attachment_objects(self, rows: list[dict]) -> None:
+        """Insert {sha256, path, size, content_type} rows; a digest recorded concurrently keeps its first row."""
+        db = await get_supabase_db()
+        await db.table("attachment_objects").upsert(rows, on_conflict="sha256", ignore_duplicates=True).execute()
+
+    async def feedback_range(self, student_id: str, from_date: str, to_date: str) -> list[dict]:
+        if _uuid(student_id) is None:
+            return []
+        db = await get_supabase_db()
+        r = await (
+            db.table("feedback_daily")
+            .select(FEEDBACK_RANGE_COLS)
+            .eq("student_id", student_id)
+            .gte("date", from_date)
+            .lte("date", to_date)
+            .order("date")
+            .execute()
+        )
+        return r.data or []
+
+    async def feedback_dates(self, from_date: str, to_date: str) -> list[dict]:
+        """(student_id, date) of every feedback_daily row in [from, to], paged by (date, student_id) keyset."""
+        db = await get_supabase_db()
+        rows: list[dict] = []
+        after: tuple[str, str] | None = None
+        while True:
+            q = db.table("feedback_daily").select(FEEDBACK_DATE_COLS).gte("date", from_date).lte("date", to_date)
+            if after:
+                q = q.or_(f"date.gt.{after[0]},and(date.eq.{after[0]},student_id.gt.{after[1]})")
+            r = await q.order("date").order("student_id").limit(FETCH_CHUNK).execute()
+            chunk = r.data or []
+            rows.extend(chunk)
+            if len(chunk) < FETCH_CHUNK:
+                return rows
+            after = (str(chunk[-1]["date"]), str(chunk[-1]["student_id"]))
+
+    async def study_rollups(self, student_id: str, from_date: str, to_date: str) -> list[dict]:
+        """study_rollup_daily rows of the student in [from, to], by (day, subject)."""
+        if _uuid(student_id) is None:
+            return []
+        db = await get_supabase_db()
+        rows: list[dict] = []
+        offset = 0
+        while True:
+            r = await (
+                db.table("study_rollup_daily")
+                .select(STUDY_ROLLUP_COLS)
+                .eq("student_id", student_id)
+                .gte("day", from_date)
+                .lte("day", to_date)
+                .order("day")
+                .order("subject")
+                .range(offset, offset + FETCH_CHUNK - 1)
+                .execute()
+            )
+            chunk = r.data or []
+            rows.extend(chunk)
+            if len(chunk) < FETCH_CHUNK:
+                return rows
+            offset += FETCH_CHUNK
+
+    async def get_feedback(self, student_id: str, date_str: str) -> dict | None:
+        if _uuid(student_id) is None:
+            return None
+        db = await get_supabase_db()
+        r = await db.table("feedback_daily").select(FEEDBACK_COLS).eq("student_id", student_id).eq("date", date_str).execute()
+        return r.data[0] if r.data else None
+
+    async def upsert_feedback(self, row: dict) -> dict | None:
+        db = await get_supabase_db()
+        r = await db.table("feedback_daily").upsert(row, on_conflict="student_id,date").execute()
+        return r.data[0] if r.data else None
+
+    async def sync_changes(self, student_id: str, since: str | None, limit: int) -> dict:
+        """One call to public.sync_changes(); returns its {cursor, reset, tasks, submissions, feedback, deleted}."""
+        db = await get_supabase_db()
+        r = await db.rpc("sync_changes", {"p_student_id": student_id, "p_since": since, "p_limit": limit}).execute()
+        return r.data
+
+
+# --- Direct Postgres (asyncpg) ---
+
+def _json_value(value):
+    # Same shapes PostgREST returns: uuid/date/timestamptz as ISO strings.
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _record(record) -> dict:
+    return {k: _json_value(v) for k, v in record.items()}
+
+
+def _timestamp(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+_SQL_INSERT_TASKS = f"""
+insert into public.tasks ({", ".join(_TASK_INSERT_COLS)})
+select {", ".join(_TASK_INSERT_COLS[:-1])}, attachments::jsonb
+from unnest($1::text[], $2::text[], $3::date[], $4::text[], $5::text[], $6::uuid[], $7::uuid[], $8::text[], $9::text[])
+  as r({", ".join(_TASK_INSERT_COLS)})
+returning {TASK_COLS}
+"""
+# The task's submission as a JSON object (or null), in the same statement; asyncpg decodes it to a dict.
+_SUBMISSION_EMBED = f"""(
+  select to_jsonb(s) from (select {SUBMISSION_COLS} from public.task_submissions where task_id = tasks.id limit 1) s
+) as submission"""
+_SQL_GET_TASK = f"select {TASK_COLS} from public.tasks where id = $1"
+_SQL_GET_TASK_WITH_SUBMISSION = f"select {TASK_COLS}, {_SUBMISSION_EMBED} from public.tasks where id = $1"
+_SQL_TASKS_DUE = f"""
+select {TASK_COLS}, {_SUBMISSION_EMBED} from public.tasks
+where due_date >= $1 and due_date <= $2
+order by due_date, created_at, id
+"""
+_SQL_SUBMIT_TASK = "select public.submit_task($1, $2, $3, $4, $5, $6, $7)"
+_SQL_GET_SUBMISSION = f"select {SUBMISSION_COLS} from public.task_submissions where task_id = $1"
+_SQL_LIST_SUBMISSIONS = f"""
+select {", ".join("s." + c for c in SUBMISSION_COLS.split(", "))},
+       jsonb_build_object({", ".join(f"'{c}', t.{c}" for c in SUBMISSION_TASK_COLS.split(", "))}) as task
+from public.tasks t join public.task_submissions s on s.task_id = t.id
+where t.student_id = $1 and t.due_date >= $2 and t.due_date <= $3
+order by t.due_date, t.created_at, t.id
+"""
+_SQL_SET_SUBMISSION_UPLOAD = (
+    "update public.task_submissions set upload_status = $2, image_urls = coalesce($3, image_urls) where id = $1"
+)
+_SQL_SET_SUBMISSION_IMAGES = "update public.task_submissions set thumbnail_urls = $2, preview_urls = $3 where id = $1"
+_SQL_SUBMISSIONS_MISSING_IMAGES = f"""
+    select {SUBMISSION_IMAGE_COLS} from public.task_submissions
+    where thumbnail_urls = '[]'::jsonb and image_urls <> '[]'::jsonb
+    order by submitted_at limit $1
+"""
+_SQL_PENDING_SUBMISSIONS = (
+    f"select {SUBMISSION_COLS} from public.task_submissions where upload_status = 'pending' and submitted_at < $1"
+)
+_SQL_FIND_ATTACHMENT_OBJECTS = f"select {ATTACHMENT_OBJECT_COLS} from public.attachment_objects where sha256 = any($1::text[])"
+_SQL_RECORD_ATTACHMENT_OBJECTS = """
+insert into public.attachment_objects (sha256, path, size, content_type)
+select * from unnest($1::text[], $2::text[], $3::bigint[], $4::text[])
+on conflict (sha256) do nothing
+"""
+_SQL_FEEDBACK_RANGE = f"""
+select {FEEDBACK_RANGE_COLS} from public.feedback_daily
+where student_id = $1 and date >= $2 and date <= $3
+order by date
+"""
+_SQL_FEEDBACK_DATES = f"""
+select {FEEDBACK_DATE_COLS} from public.feedback_daily where date >= $1 and date <= $2 order by date, student_id
+"""
+_SQL_STUDY_ROLLUPS = f"""
+select {STUDY_ROLLUP_COLS} from public.study_rollup_daily
+where student_id = $1 and day >= $2 and day <= $3
+order by day, subject
+"""
+_SQL_GET_FEEDBACK = f"select {FEEDBACK_COLS} from public.feedback_daily where student_id = $1 and date = $2"
+_SQL_UPSERT_FEEDBACK = f"""
+insert into public.feedback_daily (student_id, date, payload, updated_at)
+values ($1, $2, $3, $4)
+on conflict (student_id, date) do update set payload = excluded.payload, updated_at = excluded.updated_at
+returning {FEEDBACK_COLS}
+"""
+_SQL_SYNC_CHANGES = "select public.sync_changes($1, $2::text::xid8, $3)"
+
+
+async def _init_connection(conn) -> None:
+    for typename in ("json", "jsonb"):
+        await conn.set_type_codec(
+            typename, schema="pg_catalog", encoder=lambda v: orjson.dumps(v).decode(), decoder=orjson.loads,
+        )
+
+
+class PostgresRepository:
+    """Queries straight to Postgres over an asyncpg pool (bypasses PostgREST; the connecting role must own or bypass RLS)."""
+
+    def __init__(self, pool) -> None:
+        self._pool = pool
+
+    async def close(self) -> None:
+        await self._pool.close()
+
+    async def _timed(self, table: str, operation: str, method, sql: str, *args):
+        start = time.perf_counter()
+        ok = False
+        try:
+            result = await method(sql, *args)
+            ok = True
+            return result
+        finally:
+            observe_db("asyncpg", table, operation, time.perf_counter() - start, ok)
+
+    async def _fetch(self, table: str, operation: str, sql: str, *args) -> list[dict]:
+        return [_record(r) for r in await self._timed(table, operation, self._pool.fetch, sql, *args)]
+
+    async def _fetchrow(self, table: str, operation: str, sql: str, *args) -> dict | None:
+        row = await self._timed(table, operation, self._pool.fetchrow, sql, *args)
+        return _record(row) if row is not None else None
+
+    async def insert_tasks(self, rows: list[dict]) -> list[dict]:
+        # One statement for any number of rows: each column is sent as an array and unnested.
+        # attachments go as JSON text (a list inside an array parameter would read as another dimension).
+        columns = [[row.get(col) for row in rows] for col in _TASK_INSERT_COLS]
+        columns[2] = [date.fromisoformat(d) for d in columns[2]]
+        columns[8] = [orjson.dumps(a or []).decode() for a in columns[8]]
+        return await self._fetch("tasks", "insert", _SQL_INSERT_TASKS, *columns)
+
+    async def list_tasks(
+        self, *, student_id: str | None = None, due_date: str | None = None, from_date: str | None = None,
+        to_date: str | None = None, after: TaskCursor | None = None, limit: int, with_submission: bool = False,
+    ) -> list[dict]:
+        """Tasks ordered by (due_date, created_at, id). The SQL text depends only on which filters are set,
+        so there are a handful of shapes and each is prepared once per connection."""
+        conds: list[str] = []
+        args: list = []
+
+        def param(value) -> str:
+            args.append(value)
+            return f"${len(args)}"
+
+        if student_id:
+            sid = _uuid(student_id)
+            if sid is None:
+                return []
+            conds.append(f"student_id = {param(sid)}")
+        if due_date:
+            conds.append(f"due_date = {param(date.fromisoformat(due_date))}")
+        if from_date:
+            conds.append(f"due_date >= {param(date.fromisoformat(from_date))}")
+        if to_date:
+            conds.append(f"due_date <= {param(date.fromisoformat(to_date))}")
+        if after:
+            due = param(date.fromisoformat(after[0]))
+            conds.append(f"due_date >= {due}")
+            conds.append(f"(due_date, created_at, id) > ({due}, {param(_timestamp(after[1]))}, {param(uuid.UUID(after[2]))})")
+        where = f"where {' and '.join(conds)}" if conds else ""
+        cols = f"{TASK_COLS}, {_SUBMISSION_EMBED}" if with_submission else TASK_COLS
+        sql = f"select {cols} from public.tasks {where} order by due_date, created_at, id limit {param(limit)}"
+        return await self._fetch("tasks", "select", sql, *args)
+
+    async def get_task(self, task_id: str, with_submission: bool = False) -> dict | None:
+        tid = _uuid(task_id)
+        if tid is None:
+            return None
+        return await self._fetchrow("tasks", "select", _SQL_GET_TASK_WITH_SUBMISSION if with_submission else _SQL_GET_TASK, tid)
+
+    async def tasks_due(self, from_date: str, to_date: str) -> list[dict]:
+        return await self._fetch(
+            "tasks", "select", _SQL_TASKS_DUE, date.fromisoformat(from_date), date.fromisoformat(to_date),
+        )
+
+    async def submit_task(
+        self, task_id: str, student_id: str, study_time_minutes: int, image_urls: list[str],
+        idempotency_key: str | None = None, dry_run: bool = False, upload_status: str = "done",
+    ) -> dict:
+        tid = _uuid(task_id)
+        if tid is None:
+            return {"status": "not_found"}
+        return await self._timed(
+            "submit_task", "rpc", self._pool.fetchval, _SQL_SUBMIT_TASK, tid, uuid.UUID(student_id), study_time_minutes, image_urls, idempotency_key, dry_run, upload_status,
+        )
+
+    async def get_submission(self, task_id: str) -> dict | None:
+        tid = _uuid(task_id)
+        return await self._fetchrow("task_submissions", "select", _SQL_GET_SUBMISSION, tid) if tid else None
+
+    async def list_submissions(self, student_id: str, from_date: str, to_date: str) -> list[dict]:
+        sid = _uuid(student_id)
+        if sid is None:
+            return []
+        return await self._fetch(
+            "task_submissions", "select", _SQL_LIST_SUBMISSIONS, sid, date.fromisoformat(from_date), date.fromisoformat(to_date),
+        )
+
+    async def set_submission_upload(self, submission_id: str, upload_status: str, image_urls: list[str] | None = None) -> None:
+        await self._timed(
+            "task_submissions", "update", self._pool.execute, _SQL_SET_SUBMISSION_UPLOAD,
+            uuid.UUID(submission_id), upload_status, image_urls,
+        )
+
+    async def set_submission_images(
+        self, submission_id: str, thumbnail_urls: list[str | None], preview_urls: list[str | None]
+    ) -> None:
+        await self._timed(
+            "task_submissions", "update", self._pool.execute, _SQL_SET_SUBMISSION_IMAGES,
+            uuid.UUID(submission_id), thumbnail_urls, preview_urls,
+        )
+
+    async def submissions_missing_images(self, limit: int) -> list[dict]:
+        return await self._fetch("task_submissions", "select", _SQL_SUBMISSIONS_MISSING_IMAGES, limit)
+
+    async def pending_submissions(self, submitted_before: str) -> list[dict]:
+        return await self._fetch(
+            "task_submissions", "select", _SQL_PENDING_SUBMISSIONS, datetime.fromisoformat(submitted_before),
+        )
+
+    async def find_attachment_objects(self, digests: list[str]) -> dict[str, str]:
+        rows = await self._fetch("attachment_objects", "select", _SQL_FIND_ATTACHMENT_OBJECTS, digests)
+        return {row["sha256"]: row["path"] for row in rows}
+
+    async def record_attachment_objects(self, rows: list[dict]) -> None:
+        await self._timed(
+            "attachment_objects", "insert", self._pool.execute, _SQL_RECORD_ATTACHMENT_OBJECTS,
+            *([row[col] for row in rows] for col in ("sha256", "path", "size", "content_type")),
+        )
+
+    async def feedback_range(self, student_id: str, from_date: str, to_date: str) -> list[dict]:
+        sid = _uuid(student_id)
+        if sid is None:
+            return []
+        return await self._fetch("feedback_daily", "select", _SQL_FEEDBACK_RANGE, sid, date.fromisoformat(from_date), date.fromisoformat(to_date))
+
+    async def feedback_dates(self, from_date: str, to_date: str) -> list[dict]:
+        return await self._fetch(
+            "feedback_daily", "select", _SQL_FEEDBACK_DATES, date.fromisoformat(from_date), date.fromisoformat(to_date),
+        )
+
+    async def study_rollups(self, student_id: str, from_date: str, to_date: str) -> list[dict]:
+        sid = _uuid(student_id)
+        if sid is None:
+            return []
+        return await self._fetch(
+            "study_rollup_daily", "select", _SQL_STUDY_ROLLUPS, sid, date.fromisoformat(from_date), date.fromisoformat(to_date),
+        )
+
+    async def get_feedback(self, student_id: str, date_str: str) -> dict | None:
+        sid = _uuid(student_id)
+        return await self._fetchrow("feedback_daily", "select", _SQL_GET_FEEDBACK, sid, date.fromisoformat(date_str)) if sid else None
+
+    async def upsert_feedback(self, row: dict) -> dict | None:
+        return await self._fetchrow(
+            "feedback_daily", "upsert", _SQL_UPSERT_FEEDBACK, uuid.UUID(row["student_id"]), date.fromisoformat(row["date"]),
+            row["payload"], _timestamp(row["updated_at"]),
+        )
+
+    async def sync_changes(self, student_id: str, since: str | None, limit: int) -> dict:
+        return await self._timed(
+            "sync_changes", "rpc", self._pool.fetchval, _SQL_SYNC_CHANGES, uuid.UUID(student_id), since, limit,
+        )
+
+
+_repository: SupabaseRepository | PostgresRepository | None = None
+_repository_lock = asyncio.Lock()
+
+
+async def get_repository() -> SupabaseRepository | PostgresRepository:
+    """Repository for DATA_BACKEND. FastAPI dependency; the asyncpg pool is opened on first use."""
+    global _repository
+    if _repository is None:
+        async with _repository_lock:
+            if _repository is None:
+                if DATA_BACKEND == "postgres":
+                    import asyncpg
+
+                    pool = await asyncpg.create_pool(
+                        DATABASE_URL, min_size=DATABASE_POOL_MIN_SIZE, max_size=DATABASE_POOL_MAX_SIZE,
+                        init=_init_connection,
+                    )
+                    _repository = PostgresRepository(pool)
+                else:
+                    _repository = SupabaseRepository()
+    return _repository
+
+
+async def close_repository() -> None:
+    """Close the asyncpg pool (app shutdown)."""
+    global _repository
+    repository, _repository = _repository, None
+    if isinstance(repository, PostgresRepository):
+        await repository.close()
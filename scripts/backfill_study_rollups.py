@@ -0,0 +1,22 @@
+"""Rebuild study_rollup_daily from tasks + task_submissions (after running the rollup migration, or to repair drift).
+   Run from backend root: python scripts/backfill_study_rollups.py [student_id]
+"""
+import sys
+from pathlib import Path
+
+backend_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_root))
+
+from supabase_admin import get_supabase_admin
+
+
+def main():
+    student_id = sys.argv[1].strip() if len(sys.argv) > 1 else None
+    supabase = get_supabase_admin()
+    result = supabase.rpc("rebuild_study_rollups", {"p_student_id": student_id}).execute()
+    scope = f"student {student_id}" if student_id else "all students"
+    print(f"Rebuilt study rollups for {scope}: {result.data} (student, day, subject) rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Render thumbnails/previews for submissions that have images but no variants (after running the image variants
+   migration, or when background processing failed).
+   Run from backend root: python scripts/backfill_submission_images.py [--batch 20]
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+backend_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_root))
+
+from image_processing import close_image_processing, process_submission_images
+from repository import close_repository, get_repository
+
+
+async def run(batch: int) -> None:
+    repo = await get_repository()
+    done, failed = 0, set()
+    try:
+        while True:
+            # Failed submissions stay in the result; ask for enough rows to get past them.
+            rows = [r for r in await repo.submissions_missing_images(batch + len(failed)) if str(r["id"]) not in failed]
+            if not rows:
+                break
+            results = await asyncio.gather(*(process_submission_images(repo, r) for r in rows), return_exceptions=True)
+            for row, result in zip(rows, results):
+                if isinstance(result, Exception):
+                    failed.add(str(row["id"]))
+                    print(f"submission {row['id']}: {result!r}")
+                else:
+                    done += 1
+            print(f"{done} submissions processed, {len(failed)} failed")
+    finally:
+        await close_image_processing()
+        await close_repository()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch", type=int, default=20, help="submissions processed concurrently")
+    args = parser.parse_args()
+    asyncio.run(run(args.batch))
+
+
+if __name__ == "__main__":
+    main()
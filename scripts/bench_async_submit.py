@@ -0,0 +1,111 @@
+"""Benchmark asynchronous submissions: POST /api/tasks/{id}/submit latency (p50/p95/p99) uploading inline vs with
+   "Prefer: respond-async" (files spooled, 202, uploaded by the background queue), plus how long async submissions take
+   until upload_status is done. In-memory Supabase with injected storage latency; spool in a temporary directory.
+   Run from backend root: python scripts/bench_async_submit.py [--files 3] [--file-kb 2048] [--requests 40] [--storage-ms 150]
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+
+os.environ["ASYNC_SUBMIT_ENABLED"] = "1"
+os.environ["SUBMIT_SPOOL_DIR"] = tempfile.mkdtemp(prefix="bench-submit-spool-")
+
+from bench_common import (  # noqa: E402
+    FakeSupabase,
+    asgi_client,
+    auth_header,
+    install_fake_supabase,
+    make_token,
+    report,
+    seed_user,
+)
+
+import storage_helper  # noqa: E402
+import submission_uploads  # noqa: E402
+from config import SUBMIT_UPLOAD_WORKERS, UPLOAD_CONCURRENCY  # noqa: E402
+from main import app  # noqa: E402
+from repository import SupabaseRepository  # noqa: E402
+
+
+async def run(asynchronous: bool, args) -> tuple[list[float], list[float]]:
+    """Returns (request latencies, submit-to-done latencies) in ms; the second is empty for inline uploads."""
+    fake = install_fake_supabase(FakeSupabase(db_latency=args.db_ms / 1000, storage_latency=args.storage_ms / 1000))
+    storage_helper._bucket_ensured = False
+    mentor_id = seed_user(fake, "mentor")
+    student_id = seed_user(fake, "student")
+    headers = auth_header(make_token(student_id, "student"))
+    if asynchronous:
+        headers["Prefer"] = "respond-async"
+    task_ids = []
+    for i in range(args.requests):
+        r = fake.table("tasks").insert({
+            "title": f"t{i}", "subject": "math", "due_date": "2026-01-01",
+            "student_id": student_id, "created_by": mentor_id,
+        }).execute()
+        task_ids.append(r.data[0]["id"])
+    files = [("files", (f"page{i}.jpg", os.urandom(args.file_kb * 1024), "image/jpeg")) for i in range(args.files)]
+
+    started: dict[str, float] = {}
+    done_ms: list[float] = []
+    finished = asyncio.Event()
+    set_upload = SupabaseRepository.set_submission_upload
+
+    async def timed_set_upload(self, submission_id, upload_status, image_urls=None):
+        await set_upload(self, submission_id, upload_status, image_urls)
+        task_id = next(s["task_id"] for s in fake.tables["task_submissions"] if s["id"] == submission_id)
+        done_ms.append((time.perf_counter() - started[task_id]) * 1000)
+        if len(done_ms) == args.requests:
+            finished.set()
+
+    SupabaseRepository.set_submission_upload = timed_set_upload
+    samples: list[float] = []
+    sem = asyncio.Semaphore(args.clients)
+    try:
+        async with asgi_client(app) as client:
+            async def submit(task_id: str) -> None:
+                async with sem:
+                    t0 = started[task_id] = time.perf_counter()
+                    resp = await client.post(
+                        f"/api/tasks/{task_id}/submit", data={"study_time_minutes": "30"}, files=files, headers=headers,
+                    )
+                    samples.append((time.perf_counter() - t0) * 1000)
+                    assert resp.status_code == (202 if asynchronous else 200), resp.text
+
+            await asyncio.gather(*(submit(t) for t in task_ids))
+            if asynchronous:
+                await asyncio.wait_for(finished.wait(), 600)
+    finally:
+        SupabaseRepository.set_submission_upload = set_upload
+        await submission_uploads.close_submission_uploads()
+    return samples, done_ms
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=3, help="files per submission")
+    parser.add_argument("--file-kb", type=int, default=2048, help="size of each file (phone photo ~2 MB)")
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--clients", type=int, default=4, help="concurrent submitting clients")
+    parser.add_argument("--storage-ms", type=float, default=150.0, help="injected latency per storage call")
+    parser.add_argument("--db-ms", type=float, default=5.0, help="injected latency per DB call")
+    args = parser.parse_args()
+
+    print(
+        f"{args.requests} submissions x {args.files} files of {args.file_kb}KB, {args.clients} clients, "
+        f"storage {args.storage_ms:g}ms/call, upload concurrency {UPLOAD_CONCURRENCY}, {SUBMIT_UPLOAD_WORKERS} upload workers"
+    )
+    try:
+        inline, _ = asyncio.run(run(False, args))
+        report("inline uploads: request", inline)
+        request, done = asyncio.run(run(True, args))
+    finally:
+        shutil.rmtree(os.environ["SUBMIT_SPOOL_DIR"], ignore_errors=True)
+    report("respond-async: request (202)", request)
+    report("respond-async: submit -> done", done)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Benchmark content-addressed task attachments (ATTACHMENT_DEDUP_ENABLED) over a term of weekly assignments: every
+   week the mentor assigns each student a task (POST /api/tasks) with the same recurring files plus that week's new
+   worksheet. Reports uploads, MB uploaded, objects and MB stored, and ms per task, with dedup off vs on.
+   With --dsn, also times the attachment_objects lookup (one query for a request's hashes) as the table grows.
+   Run from backend root: python scripts/bench_attachment_dedup.py [--weeks 12] [--students 10] [--dsn <postgres dsn>]
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import time
+
+from bench_common import FakeSupabase, asgi_client, auth_header, install_fake_supabase, make_token, seed_user
+
+import storage_helper  # noqa: E402
+import user_directory  # noqa: E402
+from main import app  # noqa: E402
+
+
+def _pdf(seed: str, kb: int) -> bytes:
+    return (b"%PDF-1.4 " + hashlib.sha256(seed.encode()).digest()) * (kb * 1024 // 41)
+
+
+async def run(dedup: bool, args) -> tuple[float, FakeSupabase]:
+    fake = install_fake_supabase(FakeSupabase(db_latency=args.db_ms / 1000, storage_latency=args.storage_ms / 1000))
+    storage_helper.ATTACHMENT_DEDUP_ENABLED = dedup
+    storage_helper._bucket_ensured = False
+    user_directory._directory = user_directory.UserDirectory()
+    mentor_id = seed_user(fake, "mentor")
+    students = [seed_user(fake, "student") for _ in range(args.students)]
+    headers = auth_header(make_token(mentor_id, "mentor"))
+    recurring = [(f"답안지 양식 {i}.pdf", _pdf(f"recurring{i}", args.file_kb)) for i in range(args.recurring)]
+    elapsed = 0.0
+    async with asgi_client(app) as client:
+        await client.get("/api/students", headers=headers)
+        fake.reset_calls()
+        for week in range(args.weeks):
+            worksheet = (f"week{week + 1} worksheet.pdf", _pdf(f"week{week}", args.file_kb))
+            files = [("files", (name, data, "application/pdf")) for name, data in (*recurring, worksheet)]
+            data = {"title": f"Week {week + 1}", "subject": "math", "due_date": "2026-03-02"}
+            for sid in students:
+                t0 = time.perf_counter()
+                resp = await client.post("/api/tasks", data={**data, "student_id": sid}, files=files, headers=headers)
+                elapsed += time.perf_counter() - t0
+                assert resp.status_code == 200, resp.text
+                assert [a["name"] for a in resp.json()["attachments"]] == [name for _, (name, _, _) in files]
+    return elapsed * 1000 / (args.weeks * args.students), fake
+
+
+async def lookup_at_scale(args) -> None:
+    import asyncpg
+    from scratch_db import create_database, database_dsn
+    from repository import PostgresRepository, _init_connection
+
+    dsn = database_dsn(args.dsn, "bench_attachment_dedup")
+    await create_database(args.dsn, dsn, "bench_attachment_dedup")
+    pool = await asyncpg.create_pool(dsn, min_size=1, max_size=1, init=_init_connection)
+    repo = PostgresRepository(pool)
+    print(f"\nattachment_objects lookup ({args.lookup_hashes} hashes per query, half stored)")
+    print(f"{'rows':>10} {'p50':>9} {'p99':>9}")
+    total = 0
+    try:
+        for rows in args.rows:
+            await pool.execute(
+                "insert into public.attachment_objects (sha256, path, size) "
+                "select encode(sha256(i::text::bytea), 'hex'), 'attachments/' || i || '.pdf', 1024 "
+                "from generate_series($1::bigint, $2::bigint) i",
+                total, rows - 1,
+            )
+            await pool.execute("analyze public.attachment_objects")
+            total = rows
+            samples = []
+            for q in range(args.queries):
+                digests = [hashlib.sha256(str((q * 7919 + k) % rows).encode()).hexdigest() for k in range(args.lookup_hashes // 2)]
+                digests += [os.urandom(32).hex() for _ in range(args.lookup_hashes - len(digests))]
+                t0 = time.perf_counter()
+                found = await repo.find_attachment_objects(digests)
+                samples.append((time.perf_counter() - t0) * 1000)
+                assert len(found) == args.lookup_hashes // 2
+            samples.sort()
+            print(f"{rows:>10} {samples[len(samples) // 2]:>7.3f}ms {samples[int(len(samples) * 0.99)]:>7.3f}ms")
+    finally:
+        await pool.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--weeks", type=int, default=12)
+    parser.add_argument("--students", type=int, default=10)
+    parser.add_argument("--recurring", type=int, default=2, help="files re-attached to every task")
+    parser.add_argument("--file-kb", type=int, default=512)
+    parser.add_argument("--db-ms", type=float, default=5.0)
+    parser.add_argument("--storage-ms", type=float, default=40.0)
+    parser.add_argument("--dsn", help="Postgres DSN for the lookup-at-scale part (creates a scratch database)")
+    parser.add_argument("--rows", type=lambda v: [int(x) for x in v.split(",")], default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--lookup-hashes", type=int, default=6)
+    args = parser.parse_args()
+
+    n = args.weeks * args.students
+    print(f"{n} tasks ({args.weeks} weeks x {args.students} students), {args.recurring} recurring + 1 weekly file of {args.file_kb}KB")
+    print(f"{'dedup':<6} {'uploads':>8} {'MB up':>8} {'objects':>8} {'MB stored':>10} {'ms/task':>8}")
+    for dedup in (False, True):
+        ms, fake = asyncio.run(run(dedup, args))
+        print(
+            f"{'on' if dedup else 'off':<6} {fake.calls['storage.upload']:>8} {fake.calls['storage.upload_bytes'] / 2**20:>8.1f} "
+            f"{len(fake.objects):>8} {sum(fake.objects.values()) / 2**20:>10.1f} {ms:>8.1f}"
+        )
+    if args.dsn:
+        asyncio.run(lookup_at_scale(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Benchmark assigning one task (with attachments) to N students: N x POST /api/tasks vs one POST /api/tasks/bulk.
+   Run from backend root: python scripts/bench_bulk_assign.py [--students 10,30,100] [--files 2] [--db-ms 5] [--storage-ms 40]
+"""
+import argparse
+import asyncio
+import time
+
+from bench_common import FakeSupabase, asgi_client, auth_header, install_fake_supabase, make_token, seed_user
+
+import user_directory  # noqa: E402
+from main import app  # noqa: E402
+
+
+def _form(files: int, file_kb: int):
+    data = {"title": "Worksheet 3", "subject": "math", "due_date": "2026-03-02"}
+    attachments = [("files", (f"sheet{i}.pdf", f"%{i}".encode() * (file_kb * 512), "application/pdf")) for i in range(files)]
+    return data, attachments
+
+
+async def run(n: int, bulk: bool, args) -> tuple[float, FakeSupabase]:
+    fake = install_fake_supabase(FakeSupabase(db_latency=args.db_ms / 1000, storage_latency=args.storage_ms / 1000))
+    user_directory._directory = user_directory.UserDirectory()
+    mentor_id = seed_user(fake, "mentor")
+    students = [seed_user(fake, "student") for _ in range(n)]
+    headers = auth_header(make_token(mentor_id, "mentor"))
+    data, files = _form(args.files, args.file_kb)
+    async with asgi_client(app) as client:
+        await client.get("/api/students", headers=headers)  # warm the directory like a real mentor page load
+        fake.reset_calls()
+        t0 = time.perf_counter()
+        if bulk:
+            resp = await client.post("/api/tasks/bulk", data={**data, "student_ids": students}, files=files, headers=headers)
+            assert resp.status_code == 200 and resp.json()["created"] == n, resp.text
+        else:
+            for sid in students:
+                resp = await client.post("/api/tasks", data={**data, "student_id": sid}, files=files, headers=headers)
+                assert resp.status_code == 200, resp.text
+        elapsed = (time.perf_counter() - t0) * 1000
+    assert len(fake.tables["tasks"]) == n
+    return elapsed, fake
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--students", type=lambda v: [int(x) for x in v.split(",")], default=[10, 30, 100])
+    parser.add_argument("--files", type=int, default=2)
+    parser.add_argument("--file-kb", type=int, default=256)
+    parser.add_argument("--db-ms", type=float, default=5.0)
+    parser.add_argument("--storage-ms", type=float, default=40.0)
+    args = parser.parse_args()
+    print(f"{'N':>4}  {'mode':<16} {'total':>10} {'uploads':>8} {'MB up':>7} {'db calls':>9}")
+    for n in args.students:
+        for bulk in (False, True):
+            elapsed, fake = asyncio.run(run(n, bulk, args))
+            db_calls = sum(v for k, v in fake.calls.items() if k.startswith("db."))
+            print(
+                f"{n:>4}  {'bulk' if bulk else 'N x single':<16} {elapsed:>8.1f}ms {fake.calls['storage.upload']:>8} "
+                f"{fake.calls['storage.upload_bytes'] / 2**20:>7.1f} {db_calls:>9}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Shared helpers for scripts/bench_*.py: latency stats, ports of the processes they start, plus the in-memory Supabase stand-in and test JWTs of
+   tests/fake_supabase.py. Importing this module points config at a fake project, so benchmarks never touch a real Supabase."""
+import socket
+import statistics
+import sys
+import time
+from pathlib import Path
+
+backend_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_root))
+sys.path.insert(0, str(backend_root / "tests"))
+
+from fake_supabase import (  # noqa: E402,F401
+    FAKE_JWT_SECRET as BENCH_JWT_SECRET,
+    FakeSupabase,
+    asgi_client,
+    auth_header,
+    install_fake_supabase,
+    make_token,
+    seed_user,
+)
+
+
+
+def percentile(samples: list[float], p: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    k = min(len(ordered) - 1, max(0, round(p / 100 * (len(ordered) - 1))))
+    return ordered[k]
+
+
+def report(label: str, samples_ms: list[float]) -> None:
+    """Print n, mean, p50/p95/p99 for a list of latencies in milliseconds."""
+    print(
+        f"{label:<40} n={len(samples_ms):<5} mean={statistics.fmean(samples_ms):8.2f}ms "
+        f"p50={percentile(samples_ms, 50):8.2f}ms p95={percentile(samples_ms, 95):8.2f}ms "
+        f"p99={percentile(samples_ms, 99):8.2f}ms"
+    )
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port: int, timeout: float = 10.0) -> None:
+    """Wait until a server (a stand-in or app process started by the benchmark) accepts connections on port."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"nothing listening on port {port}")
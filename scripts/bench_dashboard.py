@@ -0,0 +1,83 @@
+"""Benchmark "today for all my students": old per-student fan-out (students, tasks, feedback) vs GET /api/dashboard.
+   The fan-out runs 6 requests at a time, like a browser's per-host connection limit.
+   Run from backend root: python scripts/bench_dashboard.py [--students 50,200] [--db-ms 5]
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from bench_common import FakeSupabase, asgi_client, auth_header, install_fake_supabase, make_token, seed_user
+
+import user_directory  # noqa: E402
+from main import app  # noqa: E402
+
+DAY = "2026-03-02"
+
+
+def _seed(fake: FakeSupabase, n: int) -> str:
+    mentor_id = seed_user(fake, "mentor")
+    for _ in range(n):
+        sid = seed_user(fake, "student")
+        for subject in ("korean", "math", "english"):
+            task = fake.table("tasks").insert({
+                "title": f"{subject} 과제", "subject": subject, "due_date": DAY, "student_id": sid, "created_by": mentor_id,
+            }).execute().data[0]
+            if random.random() < 0.5:
+                fake.table("task_submissions").insert({"task_id": task["id"], "student_id": sid, "study_time_minutes": 30}).execute()
+        if random.random() < 0.3:
+            fake.table("feedback_daily").insert({"student_id": sid, "date": DAY, "payload": {"dailySummary": "good"}}).execute()
+    return mentor_id
+
+
+async def fan_out(client, headers) -> int:
+    students = (await client.get("/api/students", headers=headers)).json()["students"]
+    sem = asyncio.Semaphore(6)
+
+    async def get(url, params):
+        async with sem:
+            resp = await client.get(url, params=params, headers=headers)
+            assert resp.status_code == 200, resp.text
+
+    calls = [get("/api/tasks", {"student_id": s["id"], "from": DAY, "to": DAY}) for s in students]
+    calls += [get("/api/feedback", {"student_id": s["id"], "date": DAY}) for s in students]
+    await asyncio.gather(*calls)
+    return 1 + len(calls)
+
+
+async def dashboard(client, headers) -> int:
+    resp = await client.get("/api/dashboard", params={"date": DAY}, headers=headers)
+    assert resp.status_code == 200, resp.text
+    return 1
+
+
+async def run(n: int, args) -> None:
+    fake = install_fake_supabase(FakeSupabase(db_latency=args.db_ms / 1000))
+    user_directory._directory = user_directory.UserDirectory()
+    headers = auth_header(make_token(_seed(fake, n), "mentor"))
+    async with asgi_client(app) as client:
+        await client.get("/api/students", headers=headers)  # warm the user directory
+        for label, fn in (("fan-out (old)", fan_out), ("GET /api/dashboard", dashboard)):
+            samples = []
+            for _ in range(args.reps):
+                fake.reset_calls()
+                t0 = time.perf_counter()
+                http_calls = await fn(client, headers)
+                samples.append((time.perf_counter() - t0) * 1000)
+            db_calls = sum(v for k, v in fake.calls.items() if k.startswith("db."))
+            print(f"{n:>4}  {label:<20} {sorted(samples)[len(samples) // 2]:>9.1f}ms {http_calls:>6} {db_calls:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--students", type=lambda v: [int(x) for x in v.split(",")], default=[50, 200])
+    parser.add_argument("--db-ms", type=float, default=5.0)
+    parser.add_argument("--reps", type=int, default=5)
+    args = parser.parse_args()
+    print(f"{'N':>4}  {'mode':<20} {'p50':>11} {'HTTP':>6} {'DB calls':>8}")
+    for n in args.students:
+        asyncio.run(run(n, args))
+
+
+if __name__ == "__main__":
+    main()
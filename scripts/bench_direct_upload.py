@@ -0,0 +1,168 @@
+"""Benchmark direct-to-storage uploads (POST /api/uploads/direct) against multipart uploads through the API: the app
+   under uvicorn and scripts/supabase_standin.py, a mentor creating tasks with attachments over HTTP. Reports per task
+   the app's CPU time, bytes it received and sent on to Storage (storage_upload_bytes_total from /metrics), its peak
+   RSS during the run, and latency. Linux only (reads the app's /proc).
+   Run from backend root: python scripts/bench_direct_upload.py --dsn postgresql://postgres@localhost/postgres
+       [--tasks 40] [--files 2] [--file-mb 4] [--clients 4] [--storage-ms 20]
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import re
+import time
+from types import SimpleNamespace
+
+from bench_common import auth_header, free_port, make_token, percentile, wait_for_port
+from bench_load import _start_app
+from bench_repository import _seed
+from scratch_db import create_database, database_dsn
+from supabase_standin import serve
+
+import httpx
+
+_CLK_TCK = os.sysconf("SC_CLK_TCK")
+
+
+def _cpu_seconds(pid: int) -> float:
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / _CLK_TCK  # utime + stime
+
+
+def _rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as f:
+        return int(re.search(r"VmRSS:\s+(\d+)", f.read()).group(1)) / 1024
+
+
+async def _storage_upload_bytes(client: httpx.AsyncClient) -> float:
+    text = (await client.get("/metrics")).text
+    return sum(float(m.group(1)) for m in re.finditer(r"^storage_upload_bytes_total\{[^}]*\} (\S+)$", text, re.M))
+
+
+async def _create_multipart(client: httpx.AsyncClient, headers: dict, form: dict, files: list[tuple[str, bytes]]) -> None:
+    r = await client.post(
+        "/api/tasks", data=form, files=[("files", (name, data, "application/pdf")) for name, data in files], headers=headers,
+    )
+    assert r.status_code == 200, r.text
+
+
+async def _create_direct(client: httpx.AsyncClient, headers: dict, form: dict, files: list[tuple[str, bytes]]) -> None:
+    r = await client.post(
+        "/api/uploads/direct",
+        json={"purpose": "attachment", "files": [
+            {"filename": name, "content_type": "application/pdf", "size": len(data)} for name, data in files
+        ]},
+        headers=headers,
+    )
+    assert r.status_code == 200, r.text
+    grants = r.json()["uploads"]
+    # The client sends the bytes straight to Storage (here: the stand-in), not to the app.
+    async with httpx.AsyncClient() as storage:
+        puts = await asyncio.gather(*(
+            storage.put(g["signed_url"], files={"file": (name, data, "application/pdf")})
+            for g, (name, data) in zip(grants, files)
+        ))
+    assert all(p.status_code == 200 for p in puts), [p.text for p in puts]
+    r = await client.post("/api/tasks", data={**form, "upload_keys": [g["upload_key"] for g in grants]}, headers=headers)
+    assert r.status_code == 200, r.text
+
+
+async def _run(mode: str, base_url: str, pid: int, mentor_id: str, students: list[str], args) -> dict:
+    headers = auth_header(make_token(mentor_id, "mentor"))
+    create = _create_direct if mode == "direct" else _create_multipart
+    latencies: list[float] = []
+    peak_rss = 0.0
+    done = asyncio.Event()
+
+    async def sample_rss() -> None:
+        nonlocal peak_rss
+        while not done.is_set():
+            peak_rss = max(peak_rss, _rss_mb(pid))
+            await asyncio.sleep(0.02)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+        queue: asyncio.Queue = asyncio.Queue()
+        for i in range(args.tasks):
+            queue.put_nowait(i)
+
+        async def worker() -> None:
+            while not queue.empty():
+                i = queue.get_nowait()
+                files = [(f"{mode} {i}-{k}.pdf", os.urandom(args.file_mb * 1024 * 1024)) for k in range(args.files)]
+                form = {"title": f"{mode} {i}", "subject": "math", "due_date": "2026-03-02", "student_id": students[i % len(students)]}
+                t0 = time.perf_counter()
+                await create(client, headers, form, files)
+                latencies.append((time.perf_counter() - t0) * 1000)
+
+        uploaded_before, cpu_before = await _storage_upload_bytes(client), _cpu_seconds(pid)
+        sampler = asyncio.create_task(sample_rss())
+        await asyncio.gather(*(worker() for _ in range(args.clients)))
+        done.set()
+        await sampler
+        cpu = _cpu_seconds(pid) - cpu_before
+        uploaded = await _storage_upload_bytes(client) - uploaded_before
+    received = args.files * args.file_mb if mode == "multipart" else 0
+    return {
+        "cpu_ms": cpu * 1000 / args.tasks,
+        "in_mb": received,
+        "out_mb": uploaded / args.tasks / 2**20,
+        "peak_rss": peak_rss,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dsn", default=os.environ.get("DATABASE_URL", "postgresql://postgres@localhost/postgres"),
+                        help="Postgres to create the scratch database on")
+    parser.add_argument("--database", default="solstudy_direct_upload", help="scratch database (dropped and recreated)")
+    parser.add_argument("--tasks", type=int, default=40, help="tasks created per mode")
+    parser.add_argument("--files", type=int, default=2, help="attachments per task")
+    parser.add_argument("--file-mb", type=int, default=4)
+    parser.add_argument("--clients", type=int, default=4, help="concurrent mentors")
+    parser.add_argument("--db-ms", type=float, default=5.0, help="latency added per PostgREST request")
+    parser.add_argument("--storage-ms", type=float, default=20.0, help="latency added per Storage request")
+    args = parser.parse_args()
+
+    dsn = database_dsn(args.dsn, args.database)
+    asyncio.run(create_database(args.dsn, dsn, args.database))
+    mentor_id, students, _ = asyncio.run(_seed(dsn, SimpleNamespace(students=10, tasks_per_student=1)))
+
+    standin_port, app_port = free_port(), free_port()
+    standin = multiprocessing.Process(
+        target=serve, args=(dsn, standin_port, args.db_ms / 1000, 10, args.storage_ms / 1000), daemon=True,
+    )
+    standin.start()
+    # Distinct random files, so attachment dedup never skips an upload.
+    os.environ["ATTACHMENT_DEDUP_ENABLED"] = "0"
+    results = {}
+    try:
+        wait_for_port(standin_port)
+        for mode in ("multipart", "direct"):
+            # A fresh app per mode: its RSS never shrinks back after a run.
+            app = _start_app(
+                app_port, f"http://127.0.0.1:{standin_port}", dsn, SimpleNamespace(pool_size=10, backend="supabase", workers=1),
+            )
+            try:
+                wait_for_port(app_port, timeout=30)
+                results[mode] = asyncio.run(_run(mode, f"http://127.0.0.1:{app_port}", app.pid, mentor_id, students, args))
+            finally:
+                app.terminate()
+                app.wait()
+    finally:
+        standin.terminate()
+        standin.join()
+
+    print(f"{args.tasks} tasks x {args.files} files of {args.file_mb}MB, {args.clients} concurrent mentors")
+    print(f"{'mode':<10} {'app CPU/task':>13} {'MB in/task':>11} {'MB out/task':>12} {'peak RSS':>9} {'p50':>8} {'p95':>8}")
+    for mode, r in results.items():
+        print(
+            f"{mode:<10} {r['cpu_ms']:>11.1f}ms {r['in_mb']:>11.1f} {r['out_mb']:>12.1f} {r['peak_rss']:>7.0f}MB "
+            f"{r['p50']:>6.0f}ms {r['p95']:>6.0f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Benchmark polling with and without If-None-Match: bytes and server time per poll for GET /api/tasks and /api/feedback/me.
+   Run from backend root: python scripts/bench_etag.py [--tasks 500] [--polls 200]
+"""
+import argparse
+import asyncio
+import time
+
+from bench_common import FakeSupabase, asgi_client, auth_header, install_fake_supabase, make_token, seed_user
+
+from main import app  # noqa: E402
+
+
+async def poll(client, url, params, headers, polls: int, conditional: bool) -> tuple[float, float, int]:
+    etag = None
+    total_bytes, not_modified = 0, 0
+    t0 = time.perf_counter()
+    for _ in range(polls):
+        h = dict(headers)
+        if conditional and etag:
+            h["If-None-Match"] = etag
+        resp = await client.get(url, params=params, headers=h)
+        assert resp.status_code in (200, 304), resp.text
+        etag = resp.headers.get("etag")
+        total_bytes += len(resp.content)
+        not_modified += resp.status_code == 304
+    return (time.perf_counter() - t0) / polls * 1000, total_bytes / polls, not_modified
+
+
+async def run(args) -> None:
+    fake = install_fake_supabase(FakeSupabase())
+    mentor_id = seed_user(fake, "mentor")
+    student_id = seed_user(fake, "student")
+    for i in range(args.tasks):
+        fake.table("tasks").insert({
+            "title": f"과제 {i}", "subject": "math", "due_date": f"2026-03-{1 + i % 28:02d}", "description": "문제집 p.10-12 풀기",
+            "student_id": student_id, "created_by": mentor_id,
+            "attachments": [{"name": "sheet.pdf", "type": "application/pdf", "size": 1024, "url": "https://x/sheet.pdf"}],
+        }).execute()
+    items = [{"content": f"피드백 {i}", "isImportant": i % 2 == 0} for i in range(5)]
+    fake.table("feedback_daily").insert({
+        "student_id": student_id, "date": "2026-03-02",
+        "payload": {"feedbackPerTask": [{"taskId": str(i), "items": items} for i in range(10)], "dailySummary": "잘했어요"},
+    }).execute()
+    headers = auth_header(make_token(student_id, "student"))
+    print(f"{'endpoint':<22} {'mode':<16} {'ms/poll':>8} {'bytes/poll':>11} {'304s':>6}")
+    async with asgi_client(app) as client:
+        for url, params in (("/api/tasks", {"limit": args.tasks}), ("/api/feedback/me", {"date": "2026-03-02"})):
+            for conditional in (False, True):
+                ms, size, hits = await poll(client, url, params, headers, args.polls, conditional)
+                mode = "If-None-Match" if conditional else "unconditional"
+                print(f"{url:<22} {mode:<16} {ms:>8.2f} {size:>11.0f} {hits:>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=500)
+    parser.add_argument("--polls", type=int, default=200)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""Benchmark the server-push stream (GET /api/events): the app under uvicorn and scripts/supabase_standin.py. Opens
+--connections idle mentor streams and reports the app's RSS per connection, then event latency while they stay open:
+task.created to one student's stream (measured from sending POST /api/tasks) and submission.created fanned out to
+every mentor stream (until the last one receives it). Linux only (reads the app's /proc).
+   Run from backend root: python scripts/bench_events.py --dsn postgresql://postgres@localhost/postgres
+       [--connections 2000] [--events 50] [--broker local|postgres] [--workers 1]
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import time
+from types import SimpleNamespace
+
+import orjson
+
+from bench_common import auth_header, free_port, make_token, percentile, wait_for_port
+from bench_direct_upload import _rss_mb
+from bench_load import _start_app
+from bench_repository import _seed
+from scratch_db import create_database, database_dsn
+from supabase_standin import serve
+
+import httpx
+
+
+def _process_tree(pid: int) -> list[int]:
+    pids = [pid]
+    for p in pids:
+        try:
+            with open(f"/proc/{p}/task/{p}/children") as f:
+                pids.extend(int(c) for c in f.read().split())
+        except FileNotFoundError:
+            pass
+    return pids
+
+
+def _tree_rss_mb(pid: int) -> float:
+    """RSS of uvicorn and its workers (--workers > 1)."""
+    return sum(_rss_mb(p) for p in _process_tree(pid))
+
+
+class Stream:
+    """A raw SSE connection: records when each event (by its data's id) arrived."""
+
+    def __init__(self):
+        self.ready = asyncio.Event()
+        self.received: dict[str, float] = {}
+        self.waiters: dict[str, asyncio.Future] = {}
+
+    async def run(self, port: int, token: str) -> None:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(
+            f"GET /api/events HTTP/1.1\r\nHost: 127.0.0.1\r\nAuthorization: Bearer {token}\r\n"
+            f"Accept: text/event-stream\r\n\r\n".encode()
+        )
+        try:
+            event = None
+            while line := await reader.readline():
+                if line.startswith(b"event: "):
+                    event = line[7:].strip()
+                elif line.startswith(b"data: ") and event is not None:
+                    if event == b"ready":
+                        self.ready.set()
+                    else:
+                        event_id = orjson.loads(line[6:])["id"]
+                        self.received[event_id] = time.perf_counter()
+                        waiter = self.waiters.pop(event_id, None)
+                        if waiter is not None and not waiter.done():
+                            waiter.set_result(None)
+                    event = None
+        finally:
+            writer.close()
+
+    async def wait_for(self, event_id: str) -> float:
+        if event_id not in self.received:
+            await self.waiters.setdefault(event_id, asyncio.get_running_loop().create_future())
+        return self.received[event_id]
+
+
+async def _run(port: int, pid: int, mentor_id: str, student_id: str, task_ids: list[str], args) -> dict:
+    mentor_token = make_token(mentor_id, "mentor", ttl_seconds=3600)
+    mentor = auth_header(mentor_token)
+    student_token = make_token(student_id, "student", ttl_seconds=3600)
+    student = auth_header(student_token)
+
+    rss_before = _tree_rss_mb(pid)
+    idle = [Stream() for _ in range(args.connections)]
+    readers = []
+    t0 = time.perf_counter()
+    for i in range(0, len(idle), 200):  # in batches, within the listen backlog
+        batch = idle[i:i + 200]
+        readers += [asyncio.create_task(s.run(port, mentor_token)) for s in batch]
+        await asyncio.gather(*(s.ready.wait() for s in batch))
+    connect_seconds = time.perf_counter() - t0
+    await asyncio.sleep(1)
+    rss_open = _tree_rss_mb(pid)
+
+    own = Stream()
+    readers.append(asyncio.create_task(own.run(port, student_token)))
+    await own.ready.wait()
+    unicast: list[float] = []
+    fanout: list[float] = []
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60) as client:
+        for i in range(args.events):
+            form = {"title": f"bench {i}", "subject": "math", "due_date": "2026-03-02", "student_id": student_id}
+            sent = time.perf_counter()
+            r = await client.post("/api/tasks", data=form, headers=mentor)
+            assert r.status_code == 200, r.text
+            unicast.append((await own.wait_for(r.json()["id"]) - sent) * 1000)
+
+        for task_id in task_ids[:args.events]:
+            sent = time.perf_counter()
+            r = await client.post(f"/api/tasks/{task_id}/submit", data={"study_time_minutes": "10"}, headers=student)
+            assert r.status_code == 200, r.text
+            submission_id = r.json()["id"]
+            arrivals = await asyncio.gather(*(s.wait_for(submission_id) for s in idle))
+            fanout.append((max(arrivals) - sent) * 1000)
+        metrics_text = (await client.get("/metrics")).text
+    for reader in readers:
+        reader.cancel()
+    await asyncio.gather(*readers, return_exceptions=True)
+    dropped = sum(
+        float(line.rsplit(" ", 1)[1]) for line in metrics_text.splitlines() if line.startswith("events_dropped_streams_total")
+    )
+    return {
+        "connect_s": connect_seconds,
+        "rss_before": rss_before,
+        "rss_open": rss_open,
+        "kb_per_conn": (rss_open - rss_before) * 1024 / args.connections,
+        "unicast": unicast,
+        "fanout": fanout,
+        "dropped": dropped,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dsn", default=os.environ.get("DATABASE_URL", "postgresql://postgres@localhost/postgres"),
+                        help="Postgres to create the scratch database on")
+    parser.add_argument("--database", default="solstudy_events", help="scratch database (dropped and recreated)")
+    parser.add_argument("--connections", type=int, default=2000, help="idle mentor streams held open")
+    parser.add_argument("--events", type=int, default=50, help="events measured per kind")
+    parser.add_argument("--broker", choices=("local", "postgres"), default="local")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--db-ms", type=float, default=5.0, help="latency added per PostgREST request")
+    args = parser.parse_args()
+    if args.workers > 1 and args.broker != "postgres":
+        parser.error("--workers > 1 needs --broker postgres (streams and publishers are on different workers)")
+
+    dsn = database_dsn(args.dsn, args.database)
+    asyncio.run(create_database(args.dsn, dsn, args.database))
+    mentor_id, (student_id,), task_ids = asyncio.run(_seed(dsn, SimpleNamespace(students=1, tasks_per_student=args.events)))
+
+    standin_port, app_port = free_port(), free_port()
+    standin = multiprocessing.Process(target=serve, args=(dsn, standin_port, args.db_ms / 1000, 10, 0.0), daemon=True)
+    standin.start()
+    os.environ.update(EVENTS_BROKER=args.broker, EVENTS_MAX_CONNECTIONS=str(args.connections + 10))
+    app = None
+    try:
+        wait_for_port(standin_port)
+        app = _start_app(
+            app_port, f"http://127.0.0.1:{standin_port}", dsn,
+            SimpleNamespace(pool_size=10, backend="supabase", workers=args.workers),
+        )
+        wait_for_port(app_port, timeout=30)
+        time.sleep(1)  # workers and the event relay starting
+        r = asyncio.run(_run(app_port, app.pid, mentor_id, student_id, task_ids, args))
+    finally:
+        if app is not None:
+            app.terminate()
+            app.wait()
+        standin.terminate()
+        standin.join()
+
+    print(f"broker {args.broker}, {args.workers} worker(s), {args.connections} idle streams "
+          f"(opened in {r['connect_s']:.1f}s, {r['dropped']:.0f} dropped)")
+    print(f"app RSS {r['rss_before']:.0f}MB -> {r['rss_open']:.0f}MB: {r['kb_per_conn']:.1f}KB per idle connection")
+    print(f"{'event':<40} {'p50':>8} {'p99':>8} {'max':>8}")
+    for name, samples in (
+        ("task.created -> 1 student stream", r["unicast"]),
+        (f"submission.created -> {args.connections} mentor streams", r["fanout"]),
+    ):
+        print(f"{name:<40} {percentile(samples, 50):>6.1f}ms {percentile(samples, 99):>6.1f}ms {max(samples):>6.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
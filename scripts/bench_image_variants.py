@@ -0,0 +1,123 @@
+"""Benchmark submission image processing (image_processing.render_variants) on synthetic 12 MP phone photos of
+   handwritten pages: bytes a review page downloads (originals vs thumbnails vs previews), render throughput inline and
+   in the process pool at several worker counts, and the longest event-loop stall while rendering (inline vs pool).
+   Run from backend root: python scripts/bench_image_variants.py [--images 16] [--workers 1,2,4] [--format webp]
+"""
+import argparse
+import asyncio
+import io
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import bench_common  # noqa: F401  (sets sys.path and fake config)
+
+from PIL import Image, ImageDraw, ImageFilter  # noqa: E402
+
+from image_processing import render_variants  # noqa: E402
+
+
+def _phone_photo(seed: int, width: int = 4032, height: int = 3024) -> bytes:
+    """A photographed notebook page: uneven lighting, ruled lines, pen strokes, sensor noise; JPEG q95 like a phone."""
+    rnd = random.Random(seed)
+    light = Image.linear_gradient("L").resize((width, height)).point(lambda v: 200 + v // 5)
+    page = Image.merge("RGB", (light, light, light.point(lambda v: v - 12)))
+    draw = ImageDraw.Draw(page)
+    for row in range(60, height - 60, 90):
+        draw.line([(0, row + 60), (width, row + 60)], fill=(170, 190, 220), width=3)
+        x = rnd.randrange(80, 300)
+        while x < width - 200:
+            points = [(x + i * 12, row + rnd.randrange(10, 55)) for i in range(rnd.randrange(3, 9))]
+            draw.line(points, fill=(30, 30, 60), width=6)
+            x = points[-1][0] + rnd.randrange(20, 60)
+    noise = Image.effect_noise((width, height), 12).convert("RGB")
+    page = Image.blend(page, noise, 0.3).filter(ImageFilter.GaussianBlur(0.6))
+    out = io.BytesIO()
+    page.save(out, "JPEG", quality=95)
+    return out.getvalue()
+
+
+async def _max_stall_ms(work) -> tuple[float, float]:
+    """Run `work` (a coroutine) while a 1 ms ticker measures the longest event-loop stall. Returns (seconds, stall ms)."""
+    stall = 0.0
+    done = False
+
+    async def ticker() -> None:
+        nonlocal stall
+        while not done:
+            t0 = time.perf_counter()
+            await asyncio.sleep(0.001)
+            stall = max(stall, (time.perf_counter() - t0) * 1000 - 1)
+
+    tick = asyncio.create_task(ticker())
+    start = time.perf_counter()
+    await work
+    elapsed = time.perf_counter() - start
+    done = True
+    await tick
+    return elapsed, stall
+
+
+async def _inline(images: list[bytes], fmt: str) -> list:
+    results = []
+    for data in images:
+        results.append(render_variants(data, fmt))
+        await asyncio.sleep(0)
+    return results
+
+
+async def _pooled(executor: ProcessPoolExecutor, images: list[bytes], fmt: str) -> list:
+    loop = asyncio.get_running_loop()
+    return await asyncio.gather(*(loop.run_in_executor(executor, render_variants, data, fmt) for data in images))
+
+
+async def run(args) -> None:
+    print(f"generating {args.distinct} distinct photos ...")
+    photos = [_phone_photo(seed) for seed in range(args.distinct)]
+    images = [photos[i % len(photos)] for i in range(args.images)]
+
+    variants = [render_variants(data, args.format) for data in photos]
+    original = sum(len(p) for p in photos) / len(photos)
+    thumbnail = sum(len(t) for t, _ in variants) / len(variants)
+    preview = sum(len(p) for _, p in variants) / len(variants)
+    n = args.page_submissions * args.images_per_submission
+    print(f"\nreview page: {args.page_submissions} submissions x {args.images_per_submission} images ({args.format})")
+    print(f"{'':<28} {'per image':>10} {'per page':>10} {'vs originals':>12}")
+    for label, size in (("originals", original), ("thumbnails (grid)", thumbnail), ("previews (every image)", preview),
+                        ("grid + 1 preview/submission", None)):
+        per_page = size * n if size is not None else thumbnail * n + preview * args.page_submissions
+        per_image = f"{size / 1024:8.0f}KB" if size is not None else ""
+        print(f"{label:<28} {per_image:>10} {per_page / 1024 / 1024:8.2f}MB {original * n / per_page:11.1f}x")
+
+    total_mb = sum(len(d) for d in images) / 1024 / 1024
+    print(f"\nrender throughput: {args.images} images ({total_mb:.0f}MB of JPEG), {os.cpu_count()} CPU(s)")
+    print(f"{'mode':<16} {'images/s':>9} {'MB/s in':>8} {'max loop stall':>15}")
+    elapsed, stall = await _max_stall_ms(_inline(images, args.format))
+    print(f"{'inline':<16} {args.images / elapsed:9.2f} {total_mb / elapsed:8.1f} {stall:13.0f}ms")
+    for workers in args.workers:
+        executor = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+        try:
+            await _pooled(executor, images[:workers], args.format)  # spawn and import in every worker first
+            elapsed, stall = await _max_stall_ms(_pooled(executor, images, args.format))
+        finally:
+            executor.shutdown()
+        print(f"{f'pool x{workers}':<16} {args.images / elapsed:9.2f} {total_mb / elapsed:8.1f} {stall:13.0f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=16, help="images rendered per mode")
+    parser.add_argument("--distinct", type=int, default=4, help="distinct synthetic photos (generation is slow)")
+    parser.add_argument("--workers", default="1,2,4", help="pool sizes to measure")
+    parser.add_argument("--format", choices=("webp", "jpeg"), default="webp")
+    parser.add_argument("--page-submissions", type=int, default=10, help="submissions on one review page")
+    parser.add_argument("--images-per-submission", type=int, default=3)
+    args = parser.parse_args()
+    args.workers = [int(w) for w in args.workers.split(",")]
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""End-to-end load test: the app under uvicorn against scripts/supabase_standin.py (PostgREST + Storage on a scratch
+   Postgres database, with injected latency), driven over HTTP by concurrent clients with a weighted mix of student and
+   mentor traffic. Access tokens are minted with the JWT secret the app is started with.
+   Reports throughput and p50/p95/p99 per endpoint. --save writes the results as JSON; --baseline compares against a
+   saved run and exits 1 when an endpoint's p95 or throughput regressed by more than --tolerance.
+   Run from backend root: python scripts/bench_load.py --dsn postgresql://postgres@localhost/postgres
+       [--clients 32] [--seconds 20] [--mix list=35,get=20,submit=10,feedback=20,feedback_day=5,feedback_write=5,dashboard=5]
+       [--db-ms 5] [--storage-ms 20] [--backend supabase|postgres] [--workers 1] [--save run.json] [--baseline run.json]
+"""
+import argparse
+import asyncio
+import io
+import json
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import time
+import uuid
+from datetime import timedelta
+
+from bench_common import BENCH_JWT_SECRET, auth_header, backend_root, free_port, make_token, percentile, wait_for_port
+from bench_repository import _START, _seed
+from scratch_db import create_database, database_dsn
+from supabase_standin import serve
+
+import asyncpg
+import httpx
+from jose import jwt
+from PIL import Image
+
+_DEFAULT_MIX = "list=35,get=20,submit=10,feedback=20,feedback_day=5,feedback_write=5,dashboard=5"
+
+
+def _photo() -> bytes:
+    """A small real JPEG, so submissions go through image processing like phone photos do."""
+    out = io.BytesIO()
+    Image.effect_noise((800, 600), 40).convert("RGB").save(out, "JPEG", quality=85)
+    return out.getvalue()
+
+
+class Traffic:
+    """Builds requests for each endpoint of the mix from the seeded users and tasks."""
+
+    def __init__(self, mentor_id: str, tasks_by_student: dict[str, list[str]], args):
+        self.mentor = auth_header(make_token(mentor_id, "mentor", ttl_seconds=86400))
+        self.students = {sid: auth_header(make_token(sid, "student", ttl_seconds=86400)) for sid in tasks_by_student}
+        self.tasks_by_student = tasks_by_student
+        # Each task can be submitted once; submits draw from these.
+        self.unsubmitted = {sid: list(reversed(tasks)) for sid, tasks in tasks_by_student.items()}
+        self.files = args.files
+        self.photo = _photo()
+        self.end = (_START + timedelta(days=29)).isoformat()
+        self.feedback_body = {
+            "feedbackPerTask": [{"taskId": "t", "items": [{"content": "다시 풀어 보세요.", "isImportant": False}]}],
+            "dailySummary": "수고했어요",
+        }
+
+    def _student(self) -> str:
+        return random.choice(list(self.students))
+
+    def list(self):
+        return "GET", "/api/tasks?limit=20", {"headers": self.students[self._student()]}
+
+    def get(self):
+        sid = self._student()
+        return "GET", f"/api/tasks/{random.choice(self.tasks_by_student[sid])}", {"headers": self.students[sid]}
+
+    def submit(self):
+        candidates = [sid for sid, tasks in self.unsubmitted.items() if tasks]
+        if not candidates:
+            return None
+        sid = random.choice(candidates)
+        task_id = self.unsubmitted[sid].pop()
+        kwargs = {
+            "headers": {**self.students[sid], "Idempotency-Key": str(uuid.uuid4())},
+            "data": {"study_time_minutes": "30"},
+        }
+        if self.files:
+            kwargs["files"] = [("files", (f"page{i}.jpg", self.photo, "image/jpeg")) for i in range(self.files)]
+        return "POST", f"/api/tasks/{task_id}/submit", kwargs
+
+    def feedback(self):
+        return "GET", f"/api/feedback/me/range?from={_START.isoformat()}&to={self.end}", {"headers": self.students[self._student()]}
+
+    def feedback_day(self):
+        return "GET", f"/api/feedback/me?date={_START.isoformat()}", {"headers": self.students[self._student()]}
+
+    def feedback_write(self):
+        day = (_START + timedelta(days=random.randrange(30))).isoformat()
+        return "PUT", f"/api/feedback?student_id={self._student()}&date={day}", {"headers": self.mentor, "json": self.feedback_body}
+
+    def dashboard(self):
+        return "GET", f"/api/dashboard?date={_START.isoformat()}", {"headers": self.mentor}
+
+
+def _parse_mix(text: str) -> dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if not hasattr(Traffic, name.strip()) or name.startswith("_"):
+            raise SystemExit(f"unknown endpoint in --mix: {name!r}")
+        mix[name.strip()] = float(weight or 1)
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+
+async def _tasks_by_student(dsn: str) -> dict[str, list[str]]:
+    conn = await asyncpg.connect(dsn)
+    try:
+        rows = await conn.fetch("select id, student_id from public.tasks order by due_date, id")
+    finally:
+        await conn.close()
+    tasks: dict[str, list[str]] = {}
+    for r in rows:
+        tasks.setdefault(str(r["student_id"]), []).append(str(r["id"]))
+    return tasks
+
+
+def _start_app(port: int, standin_url: str, dsn: str, args) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "SUPABASE_URL": standin_url,
+        # supabase-py only accepts JWT-shaped keys; the stand-in does not check it.
+        "SUPABASE_SERVICE_ROLE_KEY": jwt.encode({"role": "service_role"}, BENCH_JWT_SECRET, algorithm="HS256"),
+        "SUPABASE_JWT_SECRET": BENCH_JWT_SECRET,
+        "DATA_BACKEND": args.backend,
+        "DATABASE_URL": dsn,
+        "DATABASE_POOL_MAX_SIZE": str(args.pool_size),
+        "IMAGE_PROCESSING_ENABLED": "1",
+    }
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(args.workers), "--log-level", "warning", "--no-access-log"],
+        cwd=backend_root, env=env,
+    )
+
+
+async def _drive(base_url: str, traffic: Traffic, mix: dict[str, float], args) -> dict[str, dict]:
+    names, weights = list(mix), list(mix.values())
+    samples: dict[str, list[float]] = {name: [] for name in names}
+    errors: dict[str, int] = {name: 0 for name in names}
+    first_error: dict[str, str] = {}
+    limits = httpx.Limits(max_connections=args.clients, max_keepalive_connections=args.clients)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        measure_from = time.perf_counter() + args.warmup
+        stop_at = measure_from + args.seconds
+
+        async def worker() -> None:
+            while (now := time.perf_counter()) < stop_at:
+                name = random.choices(names, weights)[0]
+                request = getattr(traffic, name)()
+                if request is None:  # no unsubmitted tasks left
+                    await asyncio.sleep(0)
+                    continue
+                method, path, kwargs = request
+                t0 = time.perf_counter()
+                resp = await client.request(method, path, **kwargs)
+                elapsed = (time.perf_counter() - t0) * 1000
+                if now < measure_from:
+                    continue
+                samples[name].append(elapsed)
+                if resp.status_code >= 400:
+                    errors[name] += 1
+                    first_error.setdefault(name, f"{resp.status_code} {resp.text[:120]}")
+
+        await asyncio.gather(*(worker() for _ in range(args.clients)))
+    for name, text in first_error.items():
+        print(f"  first error on {name}: {text}")
+    return {
+        name: {
+            "requests": len(s), "rps": len(s) / args.seconds, "errors": errors[name],
+            "p50": percentile(s, 50), "p95": percentile(s, 95), "p99": percentile(s, 99),
+        }
+        for name, s in samples.items()
+    }
+
+
+def _report(results: dict[str, dict], args) -> None:
+    total = sum(r["requests"] for r in results.values())
+    print(f"{args.clients} clients x {args.seconds:g}s, backend {args.backend}, {args.workers} worker(s), "
+          f"DB +{args.db_ms:g}ms, storage +{args.storage_ms:g}ms, {args.files} file(s)/submit")
+    print(f"{'endpoint':<16} {'requests':>8} {'req/s':>8} {'p50':>9} {'p95':>9} {'p99':>9} {'errors':>6}")
+    for name, r in results.items():
+        print(f"{name:<16} {r['requests']:8d} {r['rps']:8.1f} {r['p50']:7.1f}ms {r['p95']:7.1f}ms {r['p99']:7.1f}ms {r['errors']:6d}")
+    print(f"{'total':<16} {total:8d} {total / args.seconds:8.1f}")
+
+
+def _regressions(results: dict[str, dict], baseline: dict[str, dict], tolerance: float) -> list[str]:
+    found = []
+    for name, r in results.items():
+        base = baseline.get(name)
+        if not base or not base["requests"]:
+            continue
+        if r["p95"] > base["p95"] * (1 + tolerance):
+            found.append(f"{name}: p95 {base['p95']:.1f}ms -> {r['p95']:.1f}ms")
+        if r["rps"] < base["rps"] * (1 - tolerance):
+            found.append(f"{name}: {base['rps']:.1f} -> {r['rps']:.1f} req/s")
+        if r["errors"] > base["errors"]:
+            found.append(f"{name}: errors {base['errors']} -> {r['errors']}")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dsn", default=os.environ.get("DATABASE_URL", "postgresql://postgres@localhost/postgres"),
+                        help="Postgres to create the scratch database on")
+    parser.add_argument("--database", default="solstudy_load", help="scratch database (dropped and recreated)")
+    parser.add_argument("--clients", type=int, default=32, help="concurrent clients")
+    parser.add_argument("--seconds", type=float, default=20.0, help="measured duration")
+    parser.add_argument("--warmup", type=float, default=3.0, help="seconds of traffic before measuring")
+    parser.add_argument("--mix", default=_DEFAULT_MIX, help="endpoint=weight,...")
+    parser.add_argument("--files", type=int, default=1, help="800x600 JPEGs per submit")
+    parser.add_argument("--students", type=int, default=50)
+    parser.add_argument("--tasks-per-student", type=int, default=60)
+    parser.add_argument("--db-ms", type=float, default=5.0, help="latency added per PostgREST request")
+    parser.add_argument("--storage-ms", type=float, default=20.0, help="latency added per Storage request")
+    parser.add_argument("--backend", choices=("supabase", "postgres"), default="supabase", help="DATA_BACKEND of the app")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers")
+    parser.add_argument("--pool-size", type=int, default=10, help="connections for the app's pools and the stand-in")
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare with results saved by --save")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p95/throughput regression vs --baseline")
+    args = parser.parse_args()
+    mix = _parse_mix(args.mix)
+
+    dsn = database_dsn(args.dsn, args.database)
+    asyncio.run(create_database(args.dsn, dsn, args.database))
+    mentor_id, _, _ = asyncio.run(_seed(dsn, args))
+    traffic = Traffic(mentor_id, asyncio.run(_tasks_by_student(dsn)), args)
+
+    standin_port, app_port = free_port(), free_port()
+    standin = multiprocessing.Process(
+        target=serve, args=(dsn, standin_port, args.db_ms / 1000, args.pool_size, args.storage_ms / 1000), daemon=True,
+    )
+    standin.start()
+    app = None
+    try:
+        wait_for_port(standin_port)
+        app = _start_app(app_port, f"http://127.0.0.1:{standin_port}", dsn, args)
+        wait_for_port(app_port, timeout=30)
+        results = asyncio.run(_drive(f"http://127.0.0.1:{app_port}", traffic, mix, args))
+    finally:
+        if app is not None:
+            app.terminate()
+            app.wait()
+        standin.terminate()
+        standin.join()
+
+    _report(results, args)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"args": vars(args), "endpoints": results}, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = _regressions(results, json.load(f)["endpoints"], args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
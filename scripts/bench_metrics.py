@@ -0,0 +1,69 @@
+"""Benchmark the cost of metrics collection: MetricsMiddleware per request (around a bare ASGI app, so only the
+   middleware is measured), one DB/storage observation, PostgREST label lookup, and rendering /metrics.
+   Run from backend root: python scripts/bench_metrics.py [--requests 200000]
+"""
+import argparse
+import asyncio
+import time
+
+import bench_common  # noqa: F401  (sets sys.path and fake config)
+
+import metrics  # noqa: E402
+
+
+class _Route:
+    path = "/api/tasks/{task_id}"
+
+
+async def _bare_app(scope, receive, send) -> None:
+    scope["route"] = _Route  # what FastAPI's router leaves in the scope
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def _receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _send(message) -> None:
+    pass
+
+
+async def _per_request_us(app, requests: int) -> float:
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app({"type": "http", "method": "GET", "path": "/api/tasks/1", "headers": []}, _receive, _send)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+def _per_call_us(call, n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        call()
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200_000)
+    args = parser.parse_args()
+    n = args.requests
+
+    bare = asyncio.run(_per_request_us(_bare_app, n))
+    wrapped = asyncio.run(_per_request_us(metrics.MetricsMiddleware(_bare_app), n))
+    print(f"{'ASGI request, no middleware':<44} {bare:8.2f} us")
+    print(f"{'ASGI request, MetricsMiddleware':<44} {wrapped:8.2f} us  (+{wrapped - bare:.2f} us/request)")
+    print(f"{'observe_db':<44} {_per_call_us(lambda: metrics.observe_db('postgrest', 'tasks', 'select', 0.012), n):8.2f} us")
+    print(f"{'observe_storage (upload)':<44} "
+          f"{_per_call_us(lambda: metrics.observe_storage('task-files', 'upload', 0.04, True, 1024), n):8.2f} us")
+    print(f"{'postgrest_labels (cached)':<44} "
+          f"{_per_call_us(lambda: metrics.postgrest_labels('GET', '/rest/v1/tasks', None), n):8.2f} us")
+    for i in range(200):  # a realistic number of label sets
+        metrics.http_request_duration.observe(("GET", f"/api/route{i % 40}", 200 + i // 40), 0.01)
+    body = metrics.render()
+    render_ms = _per_call_us(metrics.render, 200) / 1000
+    print(f"{'render /metrics':<44} {render_ms:8.2f} ms  ({len(body.splitlines())} lines)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Benchmark the middleware stack: the previous Starlette CORSMiddleware + BaseHTTPMiddleware error handler vs the
+   single pure-ASGI CORSAndErrorMiddleware. Same routes and in-memory Supabase; requests are driven straight into the
+   ASGI app by concurrent workers (no HTTP client in the measurement). Reports req/s and µs per request for a trivial
+   route, a task list, and CORS preflights.
+   Run from backend root: python scripts/bench_middleware.py [--seconds 3] [--clients 16]
+"""
+import argparse
+import asyncio
+import time
+
+from bench_common import FakeSupabase, auth_header, install_fake_supabase, make_token, seed_user
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.middleware.cors import CORSMiddleware  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+from starlette.responses import JSONResponse  # noqa: E402
+
+from main import (  # noqa: E402
+    _INTERNAL_ERROR_DETAIL, MAX_JSON_BODY_SIZE, ROUTE_BODY_LIMITS, CORSAndErrorMiddleware, RequestBodyLimitMiddleware,
+    app as main_app,
+)
+from config import CORS_MAX_AGE, CORS_ORIGINS  # noqa: E402
+
+_METHODS = ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"]
+_EXPOSE = ["*", "ETag", "X-Next-Cursor", "Idempotent-Replayed"]
+
+
+class _PreviousEnsureCORSHeadersMiddleware(BaseHTTPMiddleware):
+    """The error/CORS middleware this benchmark compares against."""
+    async def dispatch(self, request, call_next):
+        try:
+            response = await call_next(request)
+        except Exception:
+            response = JSONResponse(status_code=500, content={"detail": _INTERNAL_ERROR_DETAIL})
+        origin = request.headers.get("origin")
+        if origin and origin in CORS_ORIGINS:
+            response.headers.setdefault("Access-Control-Allow-Origin", origin)
+            response.headers.setdefault("Access-Control-Allow-Credentials", "true")
+        return response
+
+
+def _previous_app() -> FastAPI:
+    app = FastAPI(routes=main_app.routes)
+    app.add_middleware(RequestBodyLimitMiddleware, max_body_size=MAX_JSON_BODY_SIZE, routes=ROUTE_BODY_LIMITS)
+    app.add_middleware(_PreviousEnsureCORSHeadersMiddleware)
+    app.add_middleware(
+        CORSMiddleware, allow_origins=CORS_ORIGINS, allow_credentials=True, allow_methods=_METHODS,
+        allow_headers=["*"], expose_headers=_EXPOSE,
+    )
+    return app
+
+
+def _current_app() -> FastAPI:
+    app = FastAPI(routes=main_app.routes)
+    app.add_middleware(RequestBodyLimitMiddleware, max_body_size=MAX_JSON_BODY_SIZE, routes=ROUTE_BODY_LIMITS)
+    app.add_middleware(
+        CORSAndErrorMiddleware, allow_origins=CORS_ORIGINS, allow_methods=_METHODS, expose_headers=_EXPOSE,
+        max_age=CORS_MAX_AGE,
+    )
+    return app
+
+
+def _scope(method: str, path: str, headers: dict[str, str]) -> dict:
+    path, _, query = path.partition("?")
+    return {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "scheme": "http", "server": ("bench", 80),
+        "client": ("127.0.0.1", 1234), "root_path": "", "method": method, "path": path, "raw_path": path.encode(),
+        "query_string": query.encode(), "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+    }
+
+
+async def _request(app, method: str, path: str, headers: dict[str, str]) -> int:
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(_scope(method, path, headers), receive, send)
+    return status
+
+
+async def _load(app, request: tuple, args) -> tuple[int, int]:
+    done = errors = 0
+    stop_at = time.perf_counter() + args.seconds
+
+    async def worker() -> None:
+        nonlocal done, errors
+        while time.perf_counter() < stop_at:
+            if await _request(app, *request) != 200:
+                errors += 1
+            done += 1
+
+    await asyncio.gather(*(worker() for _ in range(args.clients)))
+    return done, errors
+
+
+async def run(args) -> None:
+    fake = install_fake_supabase(FakeSupabase())
+    student_id = seed_user(fake, "student")
+    origin = {"Origin": CORS_ORIGINS[0]}
+    cases = {
+        "GET /health": ("GET", "/health", origin),
+        "GET /api/tasks": ("GET", "/api/tasks?limit=20", {**origin, **auth_header(make_token(student_id, "student"))}),
+        "OPTIONS preflight": ("OPTIONS", "/api/tasks", {
+            **origin, "Access-Control-Request-Method": "POST", "Access-Control-Request-Headers": "authorization, content-type",
+        }),
+    }
+    apps = {"before": _previous_app(), "after": _current_app()}
+    print(f"{args.clients} clients x {args.seconds:g}s; preflight max-age before 600s (Starlette default), after {CORS_MAX_AGE}s")
+    print(f"{'case':<20} {'stack':<7} {'req/s':>8} {'us/req':>8} {'errors':>6}")
+    for name, request in cases.items():
+        for label, app in apps.items():
+            await _load(app, request, argparse.Namespace(seconds=0.2, clients=args.clients))  # warm up
+            done, errors = await _load(app, request, args)
+            print(f"{name:<20} {label:<7} {done / args.seconds:8.0f} {args.seconds / max(1, done) * 1e6:8.1f} {errors:6d}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=3.0, help="duration per case and stack")
+    parser.add_argument("--clients", type=int, default=16, help="concurrent workers")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""Benchmark the repository backends on a local Postgres: PostgREST (DATA_BACKEND=supabase) vs asyncpg (DATA_BACKEND=postgres).
+   Creates a scratch database from supabase/migrations, seeds students/tasks/feedback, and serves PostgREST from
+   scripts/supabase_standin.py (separate process) on the same database. For each endpoint, N concurrent clients loop
+   against the in-process app; reports requests/sec, p50/p99 and app CPU per request for each backend.
+   Run from backend root: python scripts/bench_repository.py --dsn postgresql://postgres@localhost/postgres
+       [--clients 32] [--seconds 5] [--standin-ms 0]
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import time
+import uuid
+from datetime import date, timedelta
+
+from bench_common import BENCH_JWT_SECRET, asgi_client, auth_header, free_port, make_token, percentile, wait_for_port
+from scratch_db import create_database, database_dsn
+from supabase_standin import serve
+
+import asyncpg
+from jose import jwt
+
+_START = date(2026, 3, 2)
+
+
+async def _seed(dsn: str, args) -> tuple[str, list[str], list[str]]:
+    """Returns (mentor id, student ids, task ids)."""
+    conn = await asyncpg.connect(dsn)
+    try:
+        mentor_id = str(uuid.uuid4())
+        student_ids = [str(uuid.uuid4()) for _ in range(args.students)]
+        users = [(mentor_id, "mentor")] + [(sid, "student") for sid in student_ids]
+        await conn.executemany(
+            "insert into public.auth_users (id, email, password_hash, name, role) values ($1::uuid, $2, '.', $3, $4)",
+            [(uid, f"{uid[:8]}@bench.local", f"{role}-{uid[:8]}", role) for uid, role in users],
+        )
+        subjects = ("korean", "math", "english")
+        attachments = json.dumps([{"name": "page.jpg", "type": "image/jpeg", "size": 1024, "url": "https://example.com/page.jpg"}])
+        task_rows = [
+            (f"과제 {i}", subjects[i % 3], _START + timedelta(days=i // 3), "설명", None, sid, mentor_id, attachments)
+            for sid in student_ids
+            for i in range(args.tasks_per_student)
+        ]
+        await conn.executemany(
+            "insert into public.tasks (title, subject, due_date, description, goal, student_id, created_by, attachments) "
+            "values ($1, $2, $3, $4, $5, $6::uuid, $7::uuid, $8::jsonb)",
+            task_rows,
+        )
+        payload = json.dumps({
+            "feedbackPerTask": [{"taskId": str(uuid.uuid4()), "items": [{"content": "풀이 과정을 적어 보세요.", "isImportant": True}]}] * 3,
+            "dailySummary": "잘했어요",
+        })
+        await conn.executemany(
+            "insert into public.feedback_daily (student_id, date, payload) values ($1::uuid, $2, $3::jsonb)",
+            [(sid, _START + timedelta(days=d), payload) for sid in student_ids for d in range(0, 30, 2)],
+        )
+        task_ids = [str(r["id"]) for r in await conn.fetch("select id from public.tasks")]
+        await conn.execute("analyze")
+    finally:
+        await conn.close()
+    return mentor_id, student_ids, task_ids
+
+
+def _endpoints(mentor_id: str, student_ids: list[str], task_ids: list[str]) -> dict:
+    """name -> (method, make request kwargs)."""
+    mentor = auth_header(make_token(mentor_id, "mentor"))
+    students = {sid: auth_header(make_token(sid, "student")) for sid in student_ids}
+    end = (_START + timedelta(days=29)).isoformat()
+    body = {"feedbackPerTask": [{"taskId": "t", "items": [{"content": "다시 풀어 보세요.", "isImportant": False}]}], "dailySummary": "수고했어요"}
+
+    def student() -> tuple[str, dict]:
+        sid = random.choice(student_ids)
+        return sid, students[sid]
+
+    def list_tasks():
+        _, headers = student()
+        return "GET", "/api/tasks?limit=20", {"headers": headers}
+
+    def get_task():
+        return "GET", f"/api/tasks/{random.choice(task_ids)}", {"headers": mentor}
+
+    def feedback_range():
+        _, headers = student()
+        return "GET", f"/api/feedback/me/range?from={_START.isoformat()}&to={end}", {"headers": headers}
+
+    def feedback_day():
+        _, headers = student()
+        return "GET", f"/api/feedback/me?date={_START.isoformat()}", {"headers": headers}
+
+    def upsert_feedback():
+        sid, _ = student()
+        day = (_START + timedelta(days=random.randrange(30))).isoformat()
+        return "PUT", f"/api/feedback?student_id={sid}&date={day}", {"headers": mentor, "json": body}
+
+    return {
+        "GET /api/tasks": list_tasks,
+        "GET /api/tasks/{id}": get_task,
+        "GET /api/feedback/me/range": feedback_range,
+        "GET /api/feedback/me": feedback_day,
+        "PUT /api/feedback": upsert_feedback,
+    }
+
+
+async def _load(client, make_request, args) -> tuple[list[float], int, float]:
+    samples: list[float] = []
+    errors = 0
+    cpu_start = time.process_time()
+    stop_at = time.perf_counter() + args.seconds
+
+    async def worker() -> None:
+        nonlocal errors
+        while time.perf_counter() < stop_at:
+            method, path, kwargs = make_request()
+            t0 = time.perf_counter()
+            resp = await client.request(method, path, **kwargs)
+            samples.append((time.perf_counter() - t0) * 1000)
+            if resp.status_code != 200:
+                errors += 1
+
+    await asyncio.gather(*(worker() for _ in range(args.clients)))
+    return samples, errors, time.process_time() - cpu_start
+
+
+async def run(dsn: str, endpoints: dict, args) -> dict[tuple[str, str], tuple[list[float], int, float]]:
+    import repository
+    from main import app
+
+    results = {}
+    async with asgi_client(app) as client:
+        for backend in ("supabase", "postgres"):
+            await repository.close_repository()
+            repository.DATA_BACKEND = backend
+            repository.DATABASE_URL = dsn
+            for name, make_request in endpoints.items():
+                for _ in range(args.clients):  # warm up connections, prepared statements and caches
+                    method, path, kwargs = make_request()
+                    resp = await client.request(method, path, **kwargs)
+                    assert resp.status_code == 200, (backend, name, resp.status_code, resp.text)
+                results[backend, name] = await _load(client, make_request, args)
+    await repository.close_repository()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dsn", default=os.environ.get("DATABASE_URL", "postgresql://postgres@localhost/postgres"),
+                        help="Postgres to create the scratch database on")
+    parser.add_argument("--database", default="solstudy_bench", help="scratch database (dropped and recreated)")
+    parser.add_argument("--clients", type=int, default=32, help="concurrent clients")
+    parser.add_argument("--seconds", type=float, default=5.0, help="duration per endpoint and backend")
+    parser.add_argument("--students", type=int, default=50)
+    parser.add_argument("--tasks-per-student", type=int, default=60)
+    parser.add_argument("--standin-ms", type=float, default=0.0, help="latency added per PostgREST request (network hop)")
+    parser.add_argument("--pool-size", type=int, default=10, help="connections for asyncpg and the stand-in")
+    args = parser.parse_args()
+
+    dsn = database_dsn(args.dsn, args.database)
+    asyncio.run(create_database(args.dsn, dsn, args.database))
+    mentor_id, student_ids, task_ids = asyncio.run(_seed(dsn, args))
+
+    port = free_port()
+    standin = multiprocessing.Process(target=serve, args=(dsn, port, args.standin_ms / 1000, args.pool_size), daemon=True)
+    standin.start()
+    try:
+        wait_for_port(port)
+        os.environ.update({
+            "SUPABASE_URL": f"http://127.0.0.1:{port}",
+            # supabase-py only accepts JWT-shaped keys; the stand-in does not check it.
+            "SUPABASE_SERVICE_ROLE_KEY": jwt.encode({"role": "service_role"}, BENCH_JWT_SECRET, algorithm="HS256"),
+            "DATABASE_POOL_MAX_SIZE": str(args.pool_size),
+        })
+        results = asyncio.run(run(dsn, _endpoints(mentor_id, student_ids, task_ids), args))
+    finally:
+        standin.terminate()
+        standin.join()
+
+    print(f"{args.clients} clients x {args.seconds:g}s per endpoint, {len(task_ids)} tasks, pool {args.pool_size}, "
+          f"stand-in +{args.standin_ms:g}ms (app CPU excludes Postgres and the stand-in)")
+    print(f"{'endpoint':<26} {'backend':<9} {'req/s':>7} {'p50':>9} {'p99':>9} {'cpu/req':>9} {'errors':>6}")
+    for (backend, name), (samples, errors, cpu) in sorted(results.items(), key=lambda kv: (kv[0][1], kv[0][0] != "supabase")):
+        print(
+            f"{name:<26} {backend:<9} {len(samples) / args.seconds:7.0f} {percentile(samples, 50):7.1f}ms "
+            f"{percentile(samples, 99):7.1f}ms {cpu / max(1, len(samples)) * 1000:7.2f}ms {errors:6d}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Benchmark resumable chunked uploads (/api/uploads): peak Python heap while a large file is uploaded in parallel
+   chunks and completed into storage (by file size), and bytes sent over a connection that drops at random (each MB in
+   flight fails with --drop-per-mb probability): one request for the whole file (simulated: every drop resends
+   everything) vs chunks against the app (only missing chunks are resent).
+   Run from backend root: python scripts/bench_resumable_upload.py [--sizes-mb 16,64] [--parallel 4] [--drop-per-mb 0.05]
+"""
+import argparse
+import asyncio
+import gc
+import os
+import random
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+os.environ["UPLOAD_SESSION_DIR"] = tempfile.mkdtemp(prefix="bench-upload-sessions-")
+os.environ["UPLOAD_SESSION_MAX_FILE_SIZE"] = str(1024 * 1024 * 1024)
+
+from bench_common import FakeSupabase, asgi_client, auth_header, install_fake_supabase, make_token, seed_user  # noqa: E402
+
+from main import app  # noqa: E402
+
+MB = 1024 * 1024
+
+
+def _survives(rnd: random.Random, nbytes: int, drop_per_mb: float) -> int | None:
+    """None if nbytes get through, else how many were sent before the connection dropped."""
+    if rnd.random() < 1 - (1 - drop_per_mb) ** (nbytes / MB):
+        return rnd.randrange(nbytes)
+    return None
+
+
+def single_request_bytes(size: int, drop_per_mb: float, rnd: random.Random) -> int:
+    sent = 0
+    while (dropped := _survives(rnd, size, drop_per_mb)) is not None:
+        sent += dropped
+    return sent + size
+
+
+async def chunked_upload(client, headers: dict, data: bytes, args, rnd: random.Random | None) -> tuple[int, int]:
+    """Upload data through a session, resending missing chunks until complete. Returns (bytes sent, requests)."""
+    r = await client.post(
+        "/api/uploads", json={"filename": "lecture.pdf", "size": len(data), "purpose": "attachment"}, headers=headers,
+    )
+    session = r.json()
+    chunk_size = session["chunk_size"]
+    sent = requests = 0
+    sem = asyncio.Semaphore(args.parallel)
+
+    async def put(index: int) -> None:
+        nonlocal sent, requests
+        async with sem:
+            body = data[index * chunk_size:(index + 1) * chunk_size]
+            dropped = _survives(rnd, len(body), args.drop_per_mb) if rnd else None
+            # A dropped connection delivers a truncated body, which the server rejects without recording the chunk.
+            sent += len(body) if dropped is None else dropped
+            resp = await client.put(
+                f"/api/uploads/{session['id']}?offset={index * chunk_size}",
+                content=body if dropped is None else body[:dropped], headers=headers,
+            )
+            status = resp.status_code
+            # The in-process client leaves each request body in a reference cycle; collect it so the peak is the server's.
+            del body, resp
+            gc.collect()
+        requests += 1
+        assert status == (200 if dropped is None else 400), status
+
+    missing = session["missing_chunks"]
+    while missing:
+        await asyncio.gather(*(put(i) for i in missing))
+        missing = (await client.get(f"/api/uploads/{session['id']}", headers=headers)).json()["missing_chunks"]
+    r = await client.post(f"/api/uploads/{session['id']}/complete", headers=headers)
+    assert r.status_code == 200 and r.json()["completed"], r.text
+    return sent, requests
+
+
+async def run(args) -> None:
+    fake = install_fake_supabase(FakeSupabase())
+    headers = auth_header(make_token(seed_user(fake, "mentor"), "mentor"))
+    async with asgi_client(app) as client:
+        print(f"peak heap while uploading ({args.parallel} chunks in parallel)")
+        print(f"{'file':>8} {'time':>8} {'peak heap':>10}")
+        for size_mb in args.sizes_mb:
+            data = os.urandom(size_mb * MB)
+            tracemalloc.start()
+            t0 = time.perf_counter()
+            await chunked_upload(client, headers, data, args, None)
+            elapsed = time.perf_counter() - t0
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"{size_mb:>6}MB {elapsed * 1000:>6.0f}ms {peak / MB:>8.1f}MB")
+
+        print(f"\nflaky connection: {args.drop_per_mb:.0%} chance of a drop per MB sent, {args.trials} uploads each")
+        print(f"{'file':>8} {'mode':<16} {'MB sent':>9} {'x file':>7} {'requests':>9}")
+        for size_mb in args.sizes_mb:
+            data = os.urandom(size_mb * MB)
+            rnd = random.Random(size_mb)
+            single = sum(single_request_bytes(len(data), args.drop_per_mb, rnd) for _ in range(args.trials)) / args.trials
+            print(f"{size_mb:>6}MB {'one request':<16} {single / MB:>9.1f} {single / len(data):>7.2f} {'':>9}")
+            sent = requests = 0
+            for _ in range(args.trials):
+                s, n = await chunked_upload(client, headers, data, args, rnd)
+                sent += s
+                requests += n
+            print(
+                f"{size_mb:>6}MB {'chunked':<16} {sent / args.trials / MB:>9.1f} {sent / args.trials / len(data):>7.2f} "
+                f"{requests / args.trials:>9.1f}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes-mb", type=lambda v: [int(x) for x in v.split(",")], default=[16, 64])
+    parser.add_argument("--parallel", type=int, default=4, help="chunks in flight at once")
+    parser.add_argument("--drop-per-mb", type=float, default=0.05)
+    parser.add_argument("--trials", type=int, default=5)
+    args = parser.parse_args()
+    try:
+        asyncio.run(run(args))
+    finally:
+        shutil.rmtree(os.environ["UPLOAD_SESSION_DIR"], ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Benchmark response serialization: FastAPI's default path (validate against response_model, dump, json.dumps)
+   vs the orjson fast path (plain dicts -> bytes). Asserts both produce byte-identical JSON before timing.
+   Run from backend root: python scripts/bench_serialization.py [--repeat 20]
+"""
+import argparse
+import json
+import time
+import uuid
+
+import bench_common  # noqa: F401  (sets sys.path and fake config)
+
+import orjson  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from dashboard_router import DashboardOut, _dashboard_task  # noqa: E402
+from feedback_router import DailyFeedbackPayloadOut  # noqa: E402
+from serializers import row_to_payload, row_to_task  # noqa: E402
+from tasks_router import TaskOut  # noqa: E402
+
+
+def _task_row(i: int) -> dict:
+    return {
+        "id": str(uuid.uuid4()), "title": f"수학 문제집 {i}쪽", "subject": "math", "due_date": "2026-03-02",
+        "description": "풀이 과정까지 작성", "goal": None, "student_id": str(uuid.uuid4()),
+        "created_by": str(uuid.uuid4()), "created_at": "2026-03-01T09:00:00+00:00", "source": "mentor",
+        "attachments": [{"name": "p.pdf", "type": "application/pdf", "size": 1024, "url": "https://x/p.pdf"}],
+        "task_submissions": [{"id": str(uuid.uuid4()), "submitted_at": "2026-03-02T10:00:00+00:00", "study_time_minutes": 40}] if i % 2 else [],
+    }
+
+
+def _feedback_row(tasks: int, items: int) -> dict:
+    return {"payload": {
+        "feedbackPerTask": [
+            {"taskId": str(uuid.uuid4()), "items": [{"content": "풀이 순서를 다시 확인하세요. " * 4, "isImportant": j % 3 == 0} for j in range(items)]}
+            for _ in range(tasks)
+        ],
+        "dailySummary": "오늘 학습 요약 " * 20,
+    }}
+
+
+class _DashboardAdapter:
+    """DashboardOut validates date_from/date_to and serializes them as from/to."""
+
+    def __init__(self, adapter: TypeAdapter):
+        self._adapter = adapter
+
+    def validate_python(self, content: dict):
+        return self._adapter.validate_python({
+            "date_from": content["from"], "date_to": content["to"], "students": content["students"],
+        })
+
+    def dump_python(self, value, **kwargs):
+        return self._adapter.dump_python(value, **kwargs)
+
+
+def _fastapi_default(adapter, content) -> bytes:
+    # What FastAPI does for a plain return value: validate/serialize via response_model, then JSONResponse.render.
+    value = adapter.dump_python(adapter.validate_python(content), mode="json", by_alias=True)
+    return json.dumps(value, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def _time(fn, repeat: int) -> float:
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    cases = []
+    for n in (1000, 10000):
+        rows = [_task_row(i) for i in range(n)]
+        cases.append((f"tasks list ({n})", TypeAdapter(list[TaskOut]), lambda rows=rows: [row_to_task(r) for r in rows]))
+    dash_rows = [_task_row(i) for i in range(2000)]
+    dash_adapter = TypeAdapter(DashboardOut)
+    cases.append(("dashboard (2000 tasks)", _DashboardAdapter(dash_adapter), lambda: {
+        "from": "2026-03-02", "to": "2026-03-02",
+        "students": [{"id": "s", "name": "학생", "email": "s@x", "tasks": [_dashboard_task(r) for r in dash_rows], "feedback_dates": []}],
+    }))
+    fb_row = _feedback_row(30, 20)
+    cases.append(("feedback (30 tasks x 20 items)", TypeAdapter(DailyFeedbackPayloadOut), lambda: row_to_payload(fb_row)))
+
+    print(f"{'case':<32} {'default ms':>11} {'orjson ms':>10} {'speedup':>8} {'bytes':>9}")
+    for label, adapter, build in cases:
+        expected = _fastapi_default(adapter, build())
+        fast = orjson.dumps(build())
+        assert fast == expected, label
+        default_ms = _time(lambda: _fastapi_default(adapter, build()), args.repeat)
+        fast_ms = _time(lambda: orjson.dumps(build()), args.repeat)
+        print(f"{label:<32} {default_ms:11.2f} {fast_ms:10.2f} {default_ms / fast_ms:7.1f}x {len(fast):9d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Benchmark POST /api/tasks/{id}/submit: database round trips and latency per submit, with injected DB latency.
+   Cases: no files, with files, retry with the same Idempotency-Key, and a burst of concurrent duplicate submits
+   of one task (exactly one may succeed; the rest must get a clean 400, never a 500).
+   Run from backend root: python scripts/bench_submit_roundtrips.py [--requests 50] [--db-ms 20] [--storage-ms 40]
+"""
+import argparse
+import asyncio
+import time
+
+from bench_common import (
+    FakeSupabase,
+    asgi_client,
+    auth_header,
+    install_fake_supabase,
+    make_token,
+    percentile,
+    seed_user,
+)
+
+import storage_helper  # noqa: E402
+from main import app  # noqa: E402
+
+
+def _calls_during(fake: FakeSupabase, before: dict[str, int], totals: dict[str, int]) -> None:
+    for name, n in fake.calls.items():
+        totals[name] = totals.get(name, 0) + n - before.get(name, 0)
+
+
+async def run(args) -> None:
+    fake = install_fake_supabase(FakeSupabase(db_latency=args.db_ms / 1000, storage_latency=args.storage_ms / 1000))
+    storage_helper._bucket_ensured = False
+    mentor_id = seed_user(fake, "mentor")
+    student_id = seed_user(fake, "student")
+    headers = auth_header(make_token(student_id, "student"))
+
+    def new_task() -> str:
+        r = fake.table("tasks").insert({
+            "title": "t", "subject": "math", "due_date": "2026-01-01", "student_id": student_id, "created_by": mentor_id,
+        })._execute_now()
+        return r.data[0]["id"]
+
+    files = [("files", (f"page{i}.jpg", b"x" * 1024, "image/jpeg")) for i in range(args.files)]
+    cases = {
+        "no files": {},
+        f"{args.files} files": {"files": files},
+    }
+    print(f"{'case':<30} {'db calls/req':>12} {'uploads/req':>11} {'p50':>9} {'p99':>9}")
+    async with asgi_client(app) as client:
+        for label, extra in cases.items():
+            for retry in (False, True):
+                samples: list[float] = []
+                totals: dict[str, int] = {}
+                for _ in range(args.requests):
+                    task_id = new_task()
+                    url = f"/api/tasks/{task_id}/submit"
+                    request_headers = {**headers, "Idempotency-Key": f"submit-{task_id}"}
+                    if retry:  # the first attempt's response is "lost"; only the retry is measured
+                        await client.post(url, data={"study_time_minutes": "30"}, headers=request_headers, **extra)
+                    before = dict(fake.calls)
+                    t0 = time.perf_counter()
+                    resp = await client.post(url, data={"study_time_minutes": "30"}, headers=request_headers, **extra)
+                    samples.append((time.perf_counter() - t0) * 1000)
+                    _calls_during(fake, before, totals)
+                    assert resp.status_code == 200, resp.text
+                    assert (resp.headers.get("Idempotent-Replayed") == "true") == retry
+                db_calls = sum(n for name, n in totals.items() if name.startswith("db."))
+                name = f"{label}{', retry (same key)' if retry else ''}"
+                print(
+                    f"{name:<30} {db_calls / args.requests:12.1f} {totals.get('storage.upload', 0) / args.requests:11.1f} "
+                    f"{percentile(samples, 50):7.1f}ms {percentile(samples, 99):7.1f}ms"
+                )
+
+        task_id = new_task()
+        statuses = await asyncio.gather(*(
+            client.post(f"/api/tasks/{task_id}/submit", data={"study_time_minutes": "30"}, headers=headers)
+            for _ in range(args.duplicates)
+        ))
+        codes = sorted(r.status_code for r in statuses)
+        print(f"{args.duplicates} concurrent submits of one task: " + ", ".join(f"{c} x{codes.count(c)}" for c in sorted(set(codes))))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=50, help="submits per case")
+    parser.add_argument("--files", type=int, default=3, help="files in the with-files case")
+    parser.add_argument("--duplicates", type=int, default=20, help="concurrent submits of one task")
+    parser.add_argument("--db-ms", type=float, default=20.0, help="injected latency per DB call")
+    parser.add_argument("--storage-ms", type=float, default=40.0, help="injected latency per storage call")
+    args = parser.parse_args()
+    print(f"DB {args.db_ms:g}ms/call, storage {args.storage_ms:g}ms/call")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Benchmark POST /api/tasks/{id}/submit latency (p50/p99) against an in-memory storage stand-in.
+   Compares serial uploads (limit 1) with the concurrent upload pipeline (UPLOAD_CONCURRENCY).
+   Run from backend root: python scripts/bench_submit_uploads.py [--files 10] [--requests 50] [--storage-ms 40]
+"""
+import argparse
+import asyncio
+import time
+
+from bench_common import (
+    FakeSupabase,
+    asgi_client,
+    auth_header,
+    install_fake_supabase,
+    make_token,
+    report,
+    seed_user,
+)
+
+import storage_helper  # noqa: E402
+from config import UPLOAD_CONCURRENCY  # noqa: E402
+from main import app  # noqa: E402
+
+
+async def run(limit: int, args) -> list[float]:
+    fake = install_fake_supabase(FakeSupabase(db_latency=args.db_ms / 1000, storage_latency=args.storage_ms / 1000))
+    storage_helper._bucket_ensured = False
+    storage_helper._upload_limiter.total_tokens = limit
+    mentor_id = seed_user(fake, "mentor")
+    student_id = seed_user(fake, "student")
+    token = make_token(student_id, "student")
+    task_ids = []
+    for i in range(args.requests):
+        r = fake.table("tasks").insert({
+            "title": f"t{i}", "subject": "math", "due_date": "2026-01-01",
+            "student_id": student_id, "created_by": mentor_id,
+        }).execute()
+        task_ids.append(r.data[0]["id"])
+    files = [("files", (f"page{i}.jpg", b"x" * args.file_kb * 1024, "image/jpeg")) for i in range(args.files)]
+
+    samples: list[float] = []
+    sem = asyncio.Semaphore(args.clients)
+    async with asgi_client(app) as client:
+        async def submit(task_id: str) -> None:
+            async with sem:
+                t0 = time.perf_counter()
+                resp = await client.post(
+                    f"/api/tasks/{task_id}/submit",
+                    data={"study_time_minutes": "30"},
+                    files=files,
+                    headers=auth_header(token),
+                )
+                samples.append((time.perf_counter() - t0) * 1000)
+                assert resp.status_code == 200, resp.text
+
+        await asyncio.gather(*(submit(t) for t in task_ids))
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=10, help="files per submission")
+    parser.add_argument("--file-kb", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--clients", type=int, default=4, help="concurrent submitting clients")
+    parser.add_argument("--storage-ms", type=float, default=40.0, help="injected latency per storage call")
+    parser.add_argument("--db-ms", type=float, default=5.0, help="injected latency per DB call")
+    args = parser.parse_args()
+
+    print(f"{args.requests} submissions x {args.files} files, {args.clients} clients, storage {args.storage_ms}ms/call")
+    for label, limit in (("serial uploads (limit 1)", 1), (f"concurrent uploads (limit {UPLOAD_CONCURRENCY})", UPLOAD_CONCURRENCY)):
+        report(label, asyncio.run(run(limit, args)))
+
+
+if __name__ == "__main__":
+    main()
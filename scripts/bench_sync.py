@@ -0,0 +1,172 @@
+"""Benchmark delta sync (GET /api/sync) against reloading everything (every GET /api/tasks page and the feedback
+   calendar in 93-day ranges) for a student app opened after a few changes, as the history grows. Runs the app
+   in-process on DATA_BACKEND=postgres against a scratch database; reports response bytes, requests and latency.
+   Run from backend root: python scripts/bench_sync.py --dsn postgresql://postgres@localhost/postgres
+       [--history 100,1000,10000] [--students 20] [--rounds 20]
+"""
+import argparse
+import asyncio
+import os
+import time
+import uuid
+from datetime import date, timedelta
+
+import asyncpg
+
+from bench_common import asgi_client, auth_header, make_token, percentile
+from scratch_db import create_database, database_dsn
+
+_START = date(2020, 1, 1)
+
+
+async def _seed(conn, students: list[str], mentor_id: str, history: int) -> None:
+    """history tasks per student (every other one submitted) and feedback on every third day."""
+    await conn.execute("truncate public.auth_users cascade")
+    await conn.execute("truncate public.sync_tombstones")
+    await conn.executemany(
+        "insert into public.auth_users (id, email, password_hash, name, role) values ($1::uuid, $2, '.', $2, $3)",
+        [(mentor_id, "mentor@bench.local", "mentor")] + [(sid, f"{sid[:8]}@bench.local", "student") for sid in students],
+    )
+    await conn.execute(
+        """
+        insert into public.tasks (title, subject, due_date, description, student_id, created_by, attachments)
+        select '과제 ' || i, (array['korean', 'math', 'english'])[1 + i % 3], $3::date + i / 3, '설명', s, $2::uuid,
+               '[{"name": "page.jpg", "type": "image/jpeg", "size": 1024, "url": "https://example.com/page.jpg"}]'
+        from unnest($1::uuid[]) s, generate_series(0, $4 - 1) i
+        """,
+        students, mentor_id, _START, history,
+    )
+    await conn.execute(
+        """
+        insert into public.task_submissions (task_id, student_id, study_time_minutes, image_urls)
+        select id, student_id, 30, '["https://example.com/a.jpg"]' from public.tasks where title ~ '[02468]$'
+        """
+    )
+    await conn.execute(
+        """
+        insert into public.feedback_daily (student_id, date, payload)
+        select s, $2::date + d, '{"feedbackPerTask": [], "dailySummary": "잘했어요"}'
+        from unnest($1::uuid[]) s, generate_series(0, $3 / 3 - 1, 3) d
+        """,
+        students, _START, history,
+    )
+    await conn.execute("analyze")
+
+
+async def _change(conn, student_id: str, mentor_id: str, n: int) -> None:
+    """A day's worth of change for the student: n new tasks, a submission, a feedback update and a deleted task."""
+    sid = uuid.UUID(student_id)
+    await conn.execute(
+        "insert into public.tasks (title, subject, due_date, student_id, created_by) "
+        "select '새 과제', 'math', current_date, $1, $2 from generate_series(1, $3)",
+        sid, uuid.UUID(mentor_id), n,
+    )
+    await conn.execute(
+        "insert into public.task_submissions (task_id, student_id, study_time_minutes) "
+        "select id, student_id, 20 from public.tasks t where student_id = $1 "
+        "and not exists (select 1 from public.task_submissions s where s.task_id = t.id) limit 1",
+        sid,
+    )
+    await conn.execute(
+        "update public.feedback_daily set payload = payload || '{\"dailySummary\": \"수고했어요\"}' "
+        "where (student_id, date) = (select student_id, max(date) from public.feedback_daily where student_id = $1 group by 1)",
+        sid,
+    )
+    await conn.execute("delete from public.tasks where id = (select min(id::text)::uuid from public.tasks where student_id = $1)", sid)
+
+
+async def _reload(client, headers: dict, history: int) -> tuple[int, int]:
+    """Everything the app shows, through the list endpoints. Returns (bytes, requests)."""
+    size = requests = 0
+    cursor = None
+    while True:
+        r = await client.get("/api/tasks", params={"limit": 100, **({"cursor": cursor} if cursor else {})}, headers=headers)
+        size += len(r.content)
+        requests += 1
+        cursor = r.headers.get("x-next-cursor")
+        if not cursor:
+            break
+    start, end = _START, _START + timedelta(days=history // 3 + 1)
+    while start <= end:
+        to = min(end, start + timedelta(days=92))
+        r = await client.get("/api/feedback/me/range", params={"from": start.isoformat(), "to": to.isoformat()}, headers=headers)
+        size += len(r.content)
+        requests += 1
+        start = to + timedelta(days=1)
+    return size, requests
+
+
+async def run(dsn: str, args) -> list[dict]:
+    import repository
+    from main import app
+
+    repository.DATA_BACKEND = "postgres"
+    repository.DATABASE_URL = dsn
+    conn = await asyncpg.connect(dsn)
+    students = [str(uuid.uuid4()) for _ in range(args.students)]
+    mentor_id = str(uuid.uuid4())
+    student_id = students[0]
+    headers = auth_header(make_token(student_id, "student"))
+    results = []
+    try:
+        async with asgi_client(app) as client:
+            for history in args.history:
+                await _seed(conn, students, mentor_id, history)
+                r = await client.get("/api/sync", headers=headers)
+                cursor = r.json()["cursor"]
+                reload_ms, sync_ms, sync_bytes = [], [], []
+                for _ in range(args.rounds):
+                    await _change(conn, student_id, mentor_id, args.new_tasks)
+                    t0 = time.perf_counter()
+                    reload_bytes, reload_requests = await _reload(client, headers, history)
+                    reload_ms.append((time.perf_counter() - t0) * 1000)
+                    t0 = time.perf_counter()
+                    r = await client.get("/api/sync", params={"cursor": cursor}, headers=headers)
+                    sync_ms.append((time.perf_counter() - t0) * 1000)
+                    body = r.json()
+                    assert r.status_code == 200 and not body["reset"], r.text
+                    sync_bytes.append(len(r.content))
+                    cursor = body["cursor"]
+                results.append({
+                    "history": history,
+                    "rows": await conn.fetchval("select count(*) from public.tasks"),
+                    "reload_bytes": reload_bytes,
+                    "reload_requests": reload_requests,
+                    "reload_p50": percentile(reload_ms, 50),
+                    "sync_bytes": percentile(sync_bytes, 50),
+                    "sync_p50": percentile(sync_ms, 50),
+                    "sync_p99": percentile(sync_ms, 99),
+                })
+    finally:
+        await conn.close()
+        await repository.close_repository()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dsn", default=os.environ.get("DATABASE_URL", "postgresql://postgres@localhost/postgres"),
+                        help="Postgres to create the scratch database on")
+    parser.add_argument("--database", default="solstudy_sync", help="scratch database (dropped and recreated)")
+    parser.add_argument("--history", type=lambda v: [int(x) for x in v.split(",")], default=[100, 1000, 10000],
+                        help="tasks per student")
+    parser.add_argument("--students", type=int, default=20, help="students with the same history (table size)")
+    parser.add_argument("--new-tasks", type=int, default=3, help="tasks assigned between two app opens")
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    dsn = database_dsn(args.dsn, args.database)
+    asyncio.run(create_database(args.dsn, dsn, args.database))
+    results = asyncio.run(run(dsn, args))
+
+    print(f"app open after {args.new_tasks} new tasks, a submission, a feedback update and a deleted task; {args.students} students")
+    print(f"{'tasks/student':>13} {'task rows':>10} | {'reload':>10} {'requests':>9} {'p50':>8} | {'sync':>8} {'p50':>7} {'p99':>7}")
+    for r in results:
+        print(
+            f"{r['history']:>13} {r['rows']:>10} | {r['reload_bytes'] / 1024:>8.0f}KB {r['reload_requests']:>9} "
+            f"{r['reload_p50']:>6.1f}ms | {r['sync_bytes'] / 1024:>6.1f}KB {r['sync_p50']:>5.1f}ms {r['sync_p99']:>5.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
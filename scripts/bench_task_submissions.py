@@ -0,0 +1,128 @@
+"""Benchmark showing tasks with their submission status: the task list plus GET /api/tasks/{id}/submission per task
+(sent concurrently) vs one GET /api/tasks?include=submission, and a mentor's per-task lookups vs one
+GET /api/submissions. The app under uvicorn against scripts/supabase_standin.py with --db-ms latency per PostgREST request.
+   Run from backend root: python scripts/bench_task_submissions.py --dsn postgresql://postgres@localhost/postgres
+       [--tasks-per-student 300] [--days 7,31] [--rounds 30] [--db-ms 5]
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import time
+from datetime import timedelta
+from types import SimpleNamespace
+
+import asyncpg
+import httpx
+
+from bench_common import auth_header, free_port, make_token, percentile, wait_for_port
+from bench_load import _start_app
+from bench_repository import _START, _seed
+from scratch_db import create_database, database_dsn
+from supabase_standin import serve
+
+
+async def _submit_half(dsn: str) -> None:
+    """Every other task (by due date) submitted, as after a few weeks of use."""
+    conn = await asyncpg.connect(dsn)
+    try:
+        await conn.execute(
+            """
+            insert into public.task_submissions (task_id, student_id, study_time_minutes, image_urls)
+            select id, student_id, 30, '["https://example.com/a.jpg"]'
+            from (select id, student_id, row_number() over (order by due_date, created_at) n from public.tasks) t
+            where n % 2 = 0
+            """
+        )
+        await conn.execute("analyze")
+    finally:
+        await conn.close()
+
+
+async def _per_task(client, headers: dict, params: dict) -> int:
+    """The task list, then each task's submission (404 when not submitted). Returns requests sent."""
+    r = await client.get("/api/tasks", params=params, headers=headers)
+    assert r.status_code == 200, r.text
+    tasks = r.json()
+    lookups = await asyncio.gather(*(client.get(f"/api/tasks/{t['id']}/submission", headers=headers) for t in tasks))
+    assert all(x.status_code in (200, 404) for x in lookups)
+    return 1 + len(tasks)
+
+
+async def _one(client, path: str, headers: dict, params: dict) -> int:
+    r = await client.get(path, params=params, headers=headers)
+    assert r.status_code == 200, r.text
+    return 1
+
+
+async def _run(port: int, mentor_id: str, student_id: str, args) -> list[dict]:
+    student = auth_header(make_token(student_id, "student", ttl_seconds=3600))
+    mentor = auth_header(make_token(mentor_id, "mentor", ttl_seconds=3600))
+    results = []
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60) as client:
+        for days in args.days:
+            window = {"from": _START.isoformat(), "to": (_START + timedelta(days=days - 1)).isoformat()}
+            scenarios = {
+                "student: per-task lookups": lambda: _per_task(client, student, window),
+                "student: include=submission": lambda: _one(client, "/api/tasks", student, {**window, "include": "submission"}),
+                "mentor: per-task lookups": lambda: _per_task(client, mentor, {**window, "student_id": student_id}),
+                "mentor: GET /api/submissions": lambda: _one(client, "/api/submissions", mentor, {**window, "student_id": student_id}),
+            }
+            for name, call in scenarios.items():
+                await call()  # warm-up
+                samples, requests = [], 0
+                for _ in range(args.rounds):
+                    t0 = time.perf_counter()
+                    requests = await call()
+                    samples.append((time.perf_counter() - t0) * 1000)
+                results.append({"days": days, "name": name, "requests": requests, "samples": samples})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dsn", default=os.environ.get("DATABASE_URL", "postgresql://postgres@localhost/postgres"),
+                        help="Postgres to create the scratch database on")
+    parser.add_argument("--database", default="solstudy_task_submissions", help="scratch database (dropped and recreated)")
+    parser.add_argument("--tasks-per-student", type=int, default=300, help="3 tasks due per day")
+    parser.add_argument("--days", type=lambda v: [int(x) for x in v.split(",")], default=[7, 31], help="windows shown")
+    parser.add_argument("--rounds", type=int, default=30)
+    parser.add_argument("--pool-size", type=int, default=10, help="the stand-in's Postgres connections")
+    parser.add_argument("--db-ms", type=float, default=5.0, help="latency added per PostgREST request")
+    args = parser.parse_args()
+
+    dsn = database_dsn(args.dsn, args.database)
+    asyncio.run(create_database(args.dsn, dsn, args.database))
+    mentor_id, (student_id,), _ = asyncio.run(_seed(dsn, SimpleNamespace(students=1, tasks_per_student=args.tasks_per_student)))
+    asyncio.run(_submit_half(dsn))
+
+    standin_port, app_port = free_port(), free_port()
+    standin = multiprocessing.Process(
+        target=serve, args=(dsn, standin_port, args.db_ms / 1000, args.pool_size, 0.0), daemon=True,
+    )
+    standin.start()
+    app = None
+    try:
+        wait_for_port(standin_port)
+        app = _start_app(
+            app_port, f"http://127.0.0.1:{standin_port}", dsn,
+            SimpleNamespace(pool_size=args.pool_size, backend="supabase", workers=1),
+        )
+        wait_for_port(app_port, timeout=30)
+        results = asyncio.run(_run(app_port, mentor_id, student_id, args))
+    finally:
+        if app is not None:
+            app.terminate()
+            app.wait()
+        standin.terminate()
+        standin.join()
+
+    print(f"3 tasks due per day, every other one submitted; {args.db_ms:.0f}ms per PostgREST request")
+    print(f"{'days':>4} {'':<30} {'requests':>8} {'p50':>8} {'p99':>8}")
+    for r in results:
+        print(f"{r['days']:>4} {r['name']:<30} {r['requests']:>8} "
+              f"{percentile(r['samples'], 50):>6.1f}ms {percentile(r['samples'], 99):>6.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
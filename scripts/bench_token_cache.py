@@ -0,0 +1,54 @@
+"""Microbenchmark: auth cost per request with and without the verified-token cache.
+   Measures decode_supabase_token alone and GET /api/auth/me end to end (in-process).
+   Run from backend root: python scripts/bench_token_cache.py [--iterations 20000]
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+from bench_common import asgi_client, auth_header, make_token
+
+import auth_utils  # noqa: E402
+from main import app  # noqa: E402
+
+
+def _per_call_us(fn, iterations: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - t0) / iterations * 1e6
+
+
+async def _per_request_us(token: str, iterations: int) -> float:
+    async with asgi_client(app) as client:
+        headers = auth_header(token)
+        t0 = time.perf_counter()
+        for _ in range(iterations):
+            resp = await client.get("/api/auth/me", headers=headers)
+            assert resp.status_code == 200, resp.text
+        return (time.perf_counter() - t0) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    token = make_token(str(uuid.uuid4()), "student")
+    cache = auth_utils._token_cache
+
+    results = {}
+    for label, maxsize in (("uncached", 0), ("cached", cache.maxsize or 4096)):
+        cache.maxsize = maxsize
+        cache.clear()
+        decode_us = _per_call_us(lambda: auth_utils.decode_supabase_token(token), args.iterations)
+        request_us = asyncio.run(_per_request_us(token, args.requests))
+        results[label] = (decode_us, request_us)
+        print(f"{label:<9} decode={decode_us:8.2f}us/call  GET /api/auth/me={request_us:8.1f}us/request  {auth_utils.token_cache_stats()}")
+    (u_dec, u_req), (c_dec, c_req) = results["uncached"], results["cached"]
+    print(f"decode speedup x{u_dec / c_dec:.1f}; saved {u_req - c_req:.1f}us per request")
+
+
+if __name__ == "__main__":
+    main()
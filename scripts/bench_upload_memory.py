@@ -0,0 +1,64 @@
+"""Benchmark peak Python heap per submission while uploading large files (tracemalloc).
+   Uploads are streamed from Starlette's spooled temp files, so the peak should stay flat as files are added.
+   Also checks that an oversize file and an oversize body are rejected before anything reaches storage.
+   Run from backend root: python scripts/bench_upload_memory.py [--file-mb 8]
+"""
+import argparse
+import asyncio
+import io
+import tracemalloc
+
+from bench_common import FakeSupabase, asgi_client, auth_header, install_fake_supabase, make_token, seed_user
+
+from main import app  # noqa: E402
+from tasks_router import MAX_FILE_SIZE, MAX_FILES_SUBMIT  # noqa: E402
+
+MB = 1024 * 1024
+
+
+def _new_task(fake: FakeSupabase, student_id: str, mentor_id: str) -> str:
+    r = fake.table("tasks").insert({
+        "title": "t", "subject": "math", "due_date": "2026-01-01", "student_id": student_id, "created_by": mentor_id,
+    }).execute()
+    return r.data[0]["id"]
+
+
+async def run(args) -> None:
+    fake = install_fake_supabase(FakeSupabase())
+    mentor_id = seed_user(fake, "mentor")
+    student_id = seed_user(fake, "student")
+    headers = auth_header(make_token(student_id, "student"))
+    payload = b"\xff" * (args.file_mb * MB)
+
+    async with asgi_client(app) as client:
+        print(f"{'files':>5} {'uploaded':>10} {'peak heap':>10}")
+        for n in (1, 5, MAX_FILES_SUBMIT):
+            task_id = _new_task(fake, student_id, mentor_id)
+            # File objects make httpx send 64 KB chunks, like a real client connection.
+            files = [("files", (f"p{i}.jpg", io.BytesIO(payload), "image/jpeg")) for i in range(n)]
+            tracemalloc.start()
+            resp = await client.post(f"/api/tasks/{task_id}/submit", files=files, headers=headers)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            assert resp.status_code == 200, resp.text
+            print(f"{n:>5} {n * args.file_mb:>8}MB {peak / MB:>8.2f}MB")
+
+        fake.reset_calls()
+        task_id = _new_task(fake, student_id, mentor_id)
+        big = b"\xff" * (MAX_FILE_SIZE + 1)
+        resp = await client.post(f"/api/tasks/{task_id}/submit", files=[("files", ("big.jpg", big, "image/jpeg"))], headers=headers)
+        print(f"oversize file: {resp.status_code}, storage uploads={fake.calls['storage.upload']}")
+        bigger = b"\xff" * (MAX_FILE_SIZE + MB)
+        files = [("files", (f"p{i}.jpg", bigger, "image/jpeg")) for i in range(MAX_FILES_SUBMIT)]
+        resp = await client.post(f"/api/tasks/{task_id}/submit", files=files, headers=headers)
+        print(f"oversize body: {resp.status_code}, storage uploads={fake.calls['storage.upload']}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--file-mb", type=int, default=8)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
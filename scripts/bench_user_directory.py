@@ -0,0 +1,61 @@
+"""Benchmark auth_users round trips for create_task, upsert_feedback and /api/students, with and without the user directory.
+   Run from backend root: python scripts/bench_user_directory.py [--students 200] [--requests 200] [--db-ms 5]
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from bench_common import FakeSupabase, asgi_client, auth_header, install_fake_supabase, make_token, report, seed_user
+
+import user_directory  # noqa: E402
+from main import app  # noqa: E402
+
+
+async def run(ttl: float, args) -> None:
+    fake = install_fake_supabase(FakeSupabase(db_latency=args.db_ms / 1000))
+    user_directory._directory = user_directory.UserDirectory(ttl=ttl, max_staleness=max(ttl, 300))
+    mentor_id = seed_user(fake, "mentor")
+    students = [seed_user(fake, "student") for _ in range(args.students)]
+    headers = auth_header(make_token(mentor_id, "mentor"))
+    create_ms, feedback_ms, list_ms = [], [], []
+
+    async with asgi_client(app) as client:
+        for i in range(args.requests):
+            sid = random.choice(students)
+            t0 = time.perf_counter()
+            resp = await client.post("/api/tasks", data={
+                "title": f"t{i}", "subject": "math", "due_date": "2026-01-01", "student_id": sid,
+            }, headers=headers)
+            create_ms.append((time.perf_counter() - t0) * 1000)
+            assert resp.status_code == 200, resp.text
+
+            t0 = time.perf_counter()
+            resp = await client.put(f"/api/feedback?student_id={sid}&date=2026-01-01", json={"dailySummary": "ok"}, headers=headers)
+            feedback_ms.append((time.perf_counter() - t0) * 1000)
+            assert resp.status_code == 200, resp.text
+
+            t0 = time.perf_counter()
+            resp = await client.get("/api/students", headers=headers)
+            list_ms.append((time.perf_counter() - t0) * 1000)
+            assert resp.status_code == 200 and len(resp.json()["students"]) == args.students
+
+    label = f"directory ttl={ttl:g}s" if ttl else "no directory"
+    print(f"{label}: auth_users round trips = {fake.calls['db.auth_users.select']} for {3 * args.requests} requests")
+    report("  POST /api/tasks", create_ms)
+    report("  PUT /api/feedback", feedback_ms)
+    report("  GET /api/students", list_ms)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--students", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--db-ms", type=float, default=5.0, help="injected latency per DB call")
+    args = parser.parse_args()
+    asyncio.run(run(0, args))
+    asyncio.run(run(60, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+"""Delete sync tombstones older than N days (default 90); clients last synced before them get reset on their next sync.
+   Run from backend root (daily, e.g. cron): python scripts/prune_sync_tombstones.py [days]
+"""
+import sys
+from pathlib import Path
+
+backend_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_root))
+
+from supabase_admin import get_supabase_admin
+
+
+def main():
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 90
+    supabase = get_supabase_admin()
+    result = supabase.rpc("prune_sync_tombstones", {"p_keep": f"{days} days"}).execute()
+    print(f"Pruned {result.data} sync tombstones older than {days} days")
+
+
+if __name__ == "__main__":
+    main()
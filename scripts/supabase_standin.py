@@ -0,0 +1,551 @@
+"""Local Supabase stand-in for benchmarks: serves /rest/v1 from a Postgres database that has supabase/migrations applied,
+   and /storage/v1 from memory.
+   PostgREST: the subset the backend uses: select (columns and one-to-many embeds), eq/neq/gt/gte/lt/lte/like/ilike/is/in
+   filters, or/and trees, order, limit/offset, insert/upsert, update, delete and rpc. Rows are built with json_agg in
+   Postgres, like PostgREST. Every request runs as the connecting role (use a superuser: service role).
+   Storage: create bucket, upload (multipart, x-upsert), signed upload URLs (sign, then PUT with the token), list,
+   remove and download (public or authenticated), with Supabase's error bodies.
+   Run from backend root: python scripts/supabase_standin.py --dsn postgresql://postgres@localhost/solstudy [--port 54321]
+       [--latency-ms 0] [--storage-latency-ms 0]
+"""
+import argparse
+import asyncio
+import json
+import re
+import uuid
+
+import asyncpg
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+
+_OPS = {"eq": "=", "neq": "<>", "gt": ">", "gte": ">=", "lt": "<", "lte": "<=", "like": "like", "ilike": "ilike"}
+_RESERVED = {"select", "order", "limit", "offset", "columns", "on_conflict"}
+_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, code: str, message: str, details: str | None = None, hint: str | None = None):
+        super().__init__(message)
+        self.status, self.code, self.message, self.details, self.hint = status, code, message, details, hint
+
+
+def _split_top_level(text: str) -> list[str]:
+    """Split on commas outside parentheses and double quotes."""
+    parts, depth, quoted, start = [], 0, False, 0
+    for i, ch in enumerate(text):
+        if ch == '"':
+            quoted = not quoted
+        elif not quoted and ch == "(":
+            depth += 1
+        elif not quoted and ch == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and ch == ",":
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return [p.strip() for p in parts if p.strip()]
+
+
+def _unquote(value: str) -> str:
+    return value[1:-1] if len(value) >= 2 and value[0] == value[-1] == '"' else value
+
+
+class Schema:
+    """Column types and foreign keys of the public schema, loaded once per table."""
+
+    def __init__(self, pool):
+        self._pool = pool
+        self._columns: dict[str, dict[str, str]] = {}
+        self._fks: dict[tuple[str, str], tuple[str, str]] = {}
+        self._functions: dict[str, tuple] = {}
+
+    async def columns(self, table: str) -> dict[str, str]:
+        if table not in self._columns:
+            rows = await self._pool.fetch(
+                "select a.attname, format_type(a.atttypid, a.atttypmod) as type from pg_attribute a "
+                "join pg_class c on c.oid = a.attrelid join pg_namespace n on n.oid = c.relnamespace "
+                "where n.nspname = 'public' and c.relname = $1 and a.attnum > 0 and not a.attisdropped",
+                table,
+            )
+            if not rows:
+                raise ApiError(404, "42P01", f'relation "public.{table}" does not exist')
+            self._columns[table] = {r["attname"]: r["type"] for r in rows}
+        return self._columns[table]
+
+    async def column(self, table: str, name: str) -> str:
+        columns = await self.columns(table)
+        if name not in columns:
+            raise ApiError(400, "42703", f"column {table}.{name} does not exist")
+        return columns[name]
+
+    async def foreign_key(self, parent: str, child: str) -> tuple[str, str]:
+        """(parent column, child column) of the single-column FK from child to parent."""
+        key = (parent, child)
+        if key not in self._fks:
+            row = await self._pool.fetchrow(
+                "select pa.attname as parent_col, ca.attname as child_col from pg_constraint k "
+                "join pg_attribute ca on ca.attrelid = k.conrelid and ca.attnum = k.conkey[1] "
+                "join pg_attribute pa on pa.attrelid = k.confrelid and pa.attnum = k.confkey[1] "
+                "where k.contype = 'f' and k.conrelid = ('public.' || quote_ident($2))::regclass "
+                "and k.confrelid = ('public.' || quote_ident($1))::regclass limit 1",
+                parent, child,
+            )
+            if row is None:
+                raise ApiError(400, "PGRST200", f"Could not find a relationship between '{parent}' and '{child}'")
+            self._fks[key] = (row["parent_col"], row["child_col"])
+        return self._fks[key]
+
+    async def function(self, name: str) -> tuple[dict[str, str], bool, bool]:
+        """({arg: type}, returns set, returns composite) for public.<name>."""
+        if name not in self._functions:
+            row = await self._pool.fetchrow(
+                "select p.proargnames[1:p.pronargs] as names, "
+                "array(select format_type(t, null) from unnest(p.proargtypes) t) as types, "
+                "p.proretset, rt.typtype = 'c' or p.prorettype = 'record'::regtype as composite "
+                "from pg_proc p join pg_namespace n on n.oid = p.pronamespace join pg_type rt on rt.oid = p.prorettype "
+                "where n.nspname = 'public' and p.proname = $1 limit 1",
+                name,
+            )
+            if row is None:
+                raise ApiError(404, "PGRST202", f"Could not find the function public.{name}")
+            self._functions[name] = (dict(zip(row["names"] or [], row["types"])), row["proretset"], row["composite"])
+        return self._functions[name]
+
+
+class Query:
+    """SQL fragments and parameters for one request."""
+
+    def __init__(self, schema: Schema, table: str):
+        self.schema, self.table, self.args = schema, table, []
+        # exists (...) conditions of top-level "!inner" embeds, added to the where clause.
+        self.inner: list[str] = []
+
+    def param(self, value) -> str:
+        self.args.append(value)
+        return f"${len(self.args)}"
+
+    async def select_list(self, select: str, table: str, alias: str, depth: int = 0) -> str:
+        items = []
+        for item in _split_top_level(select or "*"):
+            if item == "*":
+                items.append(f"{alias}.*")
+            elif "(" in item and item.endswith(")"):
+                child, inner = item[:-1].split("(", 1)
+                child, _, hint = child.strip().partition("!")
+                if not _NAME.match(child) or hint not in ("", "inner"):
+                    raise ApiError(400, "PGRST100", f"invalid embed {child!r}")
+                parent_col, child_col = await self.schema.foreign_key(table, child)
+                child_alias = f"_e{depth}"
+                cols = await self.select_list(inner, child, child_alias, depth + 1)
+                if hint == "inner" and depth == 0:
+                    self.inner.append(
+                        f'exists (select 1 from public."{child}" _x where _x."{child_col}" = {alias}."{parent_col}")'
+                    )
+                items.append(
+                    f'(select coalesce(json_agg(_j{depth}), \'[]\') from (select {cols} from public."{child}" {child_alias} '
+                    f'where {child_alias}."{child_col}" = {alias}."{parent_col}") _j{depth}) as "{child}"'
+                )
+            else:
+                await self.schema.column(table, item)
+                items.append(f'{alias}."{item}"')
+        return ", ".join(items)
+
+    async def condition(self, column: str, expr: str) -> str:
+        negate = expr.startswith("not.")
+        if negate:
+            expr = expr[4:]
+        op, _, value = expr.partition(".")
+        col_type = await self.schema.column(self.table, column)
+        col = f'_t."{column}"'
+        if op == "is":
+            sql = f"{col} is {dict(null='null', true='true', false='false')[value.lower()]}"
+        elif op == "in":
+            values = [_unquote(v) for v in _split_top_level(value.strip()[1:-1])]
+            sql = f"{col} = any({self.param(values)}::text[]::{col_type}[])"
+        elif op in _OPS:
+            value = _unquote(value)
+            if op in ("like", "ilike"):
+                value = value.replace("*", "%")
+            sql = f"{col} {_OPS[op]} {self.param(value)}::text::{col_type}"
+        else:
+            raise ApiError(400, "PGRST100", f"unknown operator {op!r}")
+        return f"not ({sql})" if negate else sql
+
+    async def logic(self, kind: str, tree: str) -> str:
+        """or=(a.eq.1,and(b.gt.2,c.lt.3)) -> (a = $1 or (b > $2 and c < $3))"""
+        parts = []
+        for item in _split_top_level(tree.strip()[1:-1]):
+            negate = item.startswith("not.")
+            body = item[4:] if negate else item
+            if body.startswith(("and(", "or(")):
+                sub_kind, _, rest = body.partition("(")
+                sql = await self.logic(sub_kind, "(" + rest)
+            else:
+                column, _, expr = body.partition(".")
+                sql = await self.condition(column, expr)
+            parts.append(f"not {sql}" if negate else sql)
+        return "(" + f" {kind} ".join(parts) + ")"
+
+    async def where(self, params) -> str:
+        conds = []
+        for key, value in params:
+            if key in _RESERVED:
+                continue
+            if key in ("or", "and", "not.or", "not.and"):
+                sql = await self.logic(key.removeprefix("not."), value)
+                conds.append(f"not {sql}" if key.startswith("not.") else sql)
+            else:
+                conds.append(await self.condition(key, value))
+        conds += self.inner
+        return f"where {' and '.join(conds)}" if conds else ""
+
+    async def order_by(self, order: str | None) -> str:
+        if not order:
+            return ""
+        terms = []
+        for term in order.split(","):
+            column, *mods = term.strip().split(".")
+            await self.schema.column(self.table, column)
+            sql = f'_t."{column}"'
+            for mod in mods:
+                sql += {"asc": " asc", "desc": " desc", "nullsfirst": " nulls first", "nullslast": " nulls last"}[mod]
+            terms.append(sql)
+        return "order by " + ", ".join(terms)
+
+
+def _prefer(request: Request) -> set[str]:
+    return {p.strip() for p in request.headers.get("prefer", "").split(",") if p.strip()}
+
+
+def _json(body: str | None, status: int = 200, single: bool = False) -> Response:
+    if single:
+        rows = json.loads(body)
+        if len(rows) != 1:
+            raise ApiError(406, "PGRST116", "JSON object requested, multiple (or no) rows returned")
+        body = json.dumps(rows[0])
+    return Response(body or "", status_code=status, media_type="application/json")
+
+
+async def _table(request: Request) -> Response:
+    state = request.app.state
+    table = request.path_params["table"]
+    if not _NAME.match(table):
+        raise ApiError(400, "PGRST100", f"invalid table {table!r}")
+    params = request.query_params
+    q = Query(state.schema, table)
+    single = "vnd.pgrst.object" in request.headers.get("accept", "")
+    prefer = _prefer(request)
+
+    if request.method == "GET":
+        cols = await q.select_list(params.get("select"), table, "_t")
+        where = await q.where(params.multi_items())
+        order = await q.order_by(params.get("order"))
+        page = ""
+        if "limit" in params:
+            page += f" limit {int(params['limit'])}"
+        if "offset" in params:
+            page += f" offset {int(params['offset'])}"
+        sql = (
+            f"select coalesce(json_agg(_r), '[]')::text from "
+            f'(select {cols} from public."{table}" _t {where} {order}{page}) _r'
+        )
+        return _json(await state.pool.fetchval(sql, *q.args), single=single)
+
+    body = await request.body()
+    if request.method == "POST":
+        rows = json.loads(body or b"[]")
+        if isinstance(rows, dict):
+            rows = [rows]
+        if "columns" in params:
+            columns = [_unquote(c.strip()) for c in params["columns"].split(",")]
+        else:
+            columns = list(dict.fromkeys(k for row in rows for k in row))
+        for c in columns:
+            await state.schema.column(table, c)
+        col_list = ", ".join(f'"{c}"' for c in columns)
+        payload = q.param(json.dumps(rows))
+        sql = f'insert into public."{table}" as _t ({col_list}) select {col_list} from json_populate_recordset(null::public."{table}", {payload}::json)'
+        if "on_conflict" in params or "resolution=merge-duplicates" in prefer or "resolution=ignore-duplicates" in prefer:
+            if "on_conflict" in params:
+                conflict = [c.strip() for c in params["on_conflict"].split(",")]
+            else:
+                conflict = list(await state.pool.fetchval(
+                    "select array(select a.attname from pg_index i join pg_attribute a on a.attrelid = i.indrelid "
+                    "and a.attnum = any(i.indkey) where i.indrelid = ('public.' || quote_ident($1))::regclass and i.indisprimary)",
+                    table,
+                ))
+            for c in conflict:
+                await state.schema.column(table, c)
+            target = ", ".join(f'"{c}"' for c in conflict)
+            updates = ", ".join(f'"{c}" = excluded."{c}"' for c in columns if c not in conflict)
+            if "resolution=ignore-duplicates" in prefer or not updates:
+                sql += f" on conflict ({target}) do nothing"
+            else:
+                sql += f" on conflict ({target}) do update set {updates}"
+        status = 201
+    elif request.method == "PATCH":
+        values = json.loads(body or b"{}")
+        for c in values:
+            await state.schema.column(table, c)
+        payload = q.param(json.dumps(values))
+        sets = ", ".join(f'"{c}" = _v."{c}"' for c in values)
+        where = await q.where(params.multi_items())
+        sql = f'update public."{table}" _t set {sets} from json_populate_record(null::public."{table}", {payload}::json) _v {where}'
+        status = 200
+    elif request.method == "DELETE":
+        where = await q.where(params.multi_items())
+        sql = f'delete from public."{table}" _t {where}'
+        status = 200
+    else:
+        raise ApiError(405, "PGRST117", f"Unsupported HTTP method: {request.method}")
+
+    if "return=representation" not in prefer:
+        await state.pool.execute(sql, *q.args)
+        return Response(status_code=201 if status == 201 else 204)
+    cols = await q.select_list(params.get("select"), table, "_w")
+    sql = f"with _w as ({sql} returning _t.*) select coalesce(json_agg(_r), '[]')::text from (select {cols} from _w) _r"
+    return _json(await state.pool.fetchval(sql, *q.args), status=status, single=single)
+
+
+async def _rpc(request: Request) -> Response:
+    state = request.app.state
+    name = request.path_params["fn"]
+    if not _NAME.match(name):
+        raise ApiError(400, "PGRST100", f"invalid function {name!r}")
+    arg_types, returns_set, composite = await state.schema.function(name)
+    body = json.loads(await request.body() or b"{}")
+    named = []
+    for arg in body:
+        if arg not in arg_types:
+            raise ApiError(404, "PGRST202", f"Could not find the function public.{name}({arg})")
+        if arg_types[arg] in ("json", "jsonb"):
+            named.append(f'"{arg}" := ($1::json->\'{arg}\')::{arg_types[arg]}')
+        else:
+            named.append(f'"{arg}" := ($1::json->>\'{arg}\')::{arg_types[arg]}')
+    call = f'public."{name}"({", ".join(named)})'
+    if returns_set:
+        sql = f"select coalesce(json_agg(_r), '[]')::text from {call} _r"
+    elif composite:
+        sql = f"select row_to_json(_r)::text from {call} _r"
+    else:
+        sql = f"select to_json({call})::text"
+    return _json(await state.pool.fetchval(sql, json.dumps(body)))
+
+
+def _error(exc: ApiError) -> Response:
+    body = {"code": exc.code, "message": exc.message, "details": exc.details, "hint": exc.hint}
+    return Response(json.dumps(body), status_code=exc.status, media_type="application/json")
+
+
+def _pg_status(sqlstate: str) -> int:
+    if sqlstate in ("23505", "23503"):
+        return 409
+    if sqlstate == "42501":
+        return 403
+    if sqlstate == "42P01":
+        return 404
+    return 400
+
+
+# --- Storage ---
+
+class StorageError(Exception):
+    """Storage API error; `code` is the statusCode in the body when it differs from the HTTP status (Duplicate: 400/409)."""
+    def __init__(self, status: int, error: str, message: str, code: str | None = None):
+        super().__init__(message)
+        self.status, self.error, self.message, self.code = status, error, message, code or str(status)
+
+
+def _storage_json(body, status: int = 200) -> Response:
+    return Response(json.dumps(body), status_code=status, media_type="application/json")
+
+
+async def _create_bucket(request: Request) -> Response:
+    buckets = request.app.state.buckets
+    body = await request.json()
+    bucket = body["id"]
+    if bucket in buckets:
+        raise StorageError(400, "Duplicate", "The resource already exists", "409")
+    buckets[bucket] = {}
+    return _storage_json({"name": bucket})
+
+
+async def _upload_object(request: Request) -> Response:
+    bucket, path = request.path_params["bucket"], request.path_params["path"]
+    objects = request.app.state.buckets.get(bucket)
+    if objects is None:
+        raise StorageError(404, "Bucket not found", "Bucket not found")
+    if path in objects and request.headers.get("x-upsert", "false") != "true":
+        raise StorageError(400, "Duplicate", "The resource already exists", "409")
+    form = await request.form()
+    try:
+        upload = form["file"]
+        data = await upload.read()
+        content_type = upload.content_type or "application/octet-stream"
+    finally:
+        await form.close()
+    objects[path] = (data, content_type)
+    request.app.state.storage_bytes += len(data)
+    return _storage_json({"Key": f"{bucket}/{path}", "Id": str(uuid.uuid4())})
+
+
+async def _sign_upload(request: Request) -> Response:
+    bucket, path = request.path_params["bucket"], request.path_params["path"]
+    if bucket not in request.app.state.buckets:
+        raise StorageError(404, "Bucket not found", "Bucket not found")
+    token = uuid.uuid4().hex
+    request.app.state.signed_uploads[token] = (bucket, path)
+    return _storage_json({"url": f"/object/upload/sign/{bucket}/{path}?token={token}"})
+
+
+async def _upload_signed(request: Request) -> Response:
+    bucket, path = request.path_params["bucket"], request.path_params["path"]
+    if request.app.state.signed_uploads.get(request.query_params.get("token")) != (bucket, path):
+        raise StorageError(400, "InvalidSignature", "The signature is invalid", "403")
+    objects = request.app.state.buckets[bucket]
+    if path in objects:
+        raise StorageError(400, "Duplicate", "The resource already exists", "409")
+    form = await request.form()
+    try:
+        upload = form["file"]
+        data = await upload.read()
+        content_type = upload.content_type or "application/octet-stream"
+    finally:
+        await form.close()
+    objects[path] = (data, content_type)
+    request.app.state.storage_bytes += len(data)
+    return _storage_json({"Key": f"{bucket}/{path}"})
+
+
+async def _list_objects(request: Request) -> Response:
+    objects = request.app.state.buckets.get(request.path_params["bucket"])
+    if objects is None:
+        raise StorageError(404, "Bucket not found", "Bucket not found")
+    body = await request.json()
+    prefix = body.get("prefix", "").strip("/")
+    prefix = f"{prefix}/" if prefix else ""
+    search = body.get("search", "")
+    entries: dict[str, dict] = {}
+    for path, (data, content_type) in objects.items():
+        if not path.startswith(prefix):
+            continue
+        name, sep, _ = path[len(prefix):].partition("/")
+        if not name.startswith(search):
+            continue
+        if sep:
+            entries.setdefault(name, {"name": name, "id": None, "metadata": None})
+        else:
+            entries[name] = {
+                "name": name,
+                "id": str(uuid.uuid5(uuid.NAMESPACE_URL, path)),
+                "metadata": {"size": len(data), "mimetype": content_type},
+            }
+    offset = int(body.get("offset", 0))
+    return _storage_json([entries[name] for name in sorted(entries)][offset:offset + int(body.get("limit", 100))])
+
+
+async def _remove_objects(request: Request) -> Response:
+    objects = request.app.state.buckets.get(request.path_params["bucket"])
+    if objects is None:
+        raise StorageError(404, "Bucket not found", "Bucket not found")
+    removed = []
+    for path in (await request.json()).get("prefixes", []):
+        if objects.pop(path, None) is not None:
+            removed.append({"name": path, "bucket_id": request.path_params["bucket"]})
+    return _storage_json(removed)
+
+
+async def _download(request: Request) -> Response:
+    objects = request.app.state.buckets.get(request.path_params["bucket"], {})
+    found = objects.get(request.path_params["path"])
+    if found is None:
+        raise StorageError(400, "not_found", "Object not found")
+    data, content_type = found
+    return Response(data, media_type=content_type)
+
+
+def _storage_handler(endpoint):
+    async def handle(request: Request) -> Response:
+        latency = request.app.state.storage_latency
+        if latency:
+            await asyncio.sleep(latency)
+        try:
+            return await endpoint(request)
+        except StorageError as exc:
+            return _storage_json({"statusCode": exc.code, "error": exc.error, "message": exc.message}, exc.status)
+        except (ValueError, KeyError) as exc:
+            return _storage_json({"statusCode": "400", "error": "invalid_request", "message": str(exc)}, 400)
+
+    return handle
+
+
+def _handler(endpoint):
+    async def handle(request: Request) -> Response:
+        latency = request.app.state.latency
+        if latency:
+            await asyncio.sleep(latency)
+        try:
+            return await endpoint(request)
+        except ApiError as exc:
+            return _error(exc)
+        except asyncpg.PostgresError as exc:
+            return _error(ApiError(_pg_status(exc.sqlstate), exc.sqlstate, exc.message, exc.detail, exc.hint))
+        except (ValueError, KeyError) as exc:
+            return _error(ApiError(400, "PGRST100", f"invalid request: {exc}"))
+
+    return handle
+
+
+def create_app(dsn: str, latency: float = 0.0, pool_size: int = 10, storage_latency: float = 0.0) -> Starlette:
+    """Stand-in on `dsn`. `latency` seconds are added to every PostgREST request (network + PostgREST overhead),
+    `storage_latency` to every Storage request."""
+
+    async def lifespan(app: Starlette):
+        app.state.pool = await asyncpg.create_pool(dsn, min_size=1, max_size=pool_size)
+        app.state.schema = Schema(app.state.pool)
+        app.state.latency = latency
+        app.state.storage_latency = storage_latency
+        app.state.buckets = {}  # bucket -> {path: (bytes, content type)}
+        app.state.storage_bytes = 0
+        app.state.signed_uploads = {}  # token -> (bucket, path)
+        yield
+        await app.state.pool.close()
+
+    methods = ["GET", "POST", "PATCH", "DELETE"]
+    return Starlette(
+        routes=[
+            Route("/rest/v1/rpc/{fn}", _handler(_rpc), methods=["POST"]),
+            Route("/rest/v1/{table}", _handler(_table), methods=methods),
+            Route("/storage/v1/bucket", _storage_handler(_create_bucket), methods=["POST"]),
+            Route("/storage/v1/object/public/{bucket}/{path:path}", _storage_handler(_download), methods=["GET"]),
+            Route("/storage/v1/object/upload/sign/{bucket}/{path:path}", _storage_handler(_sign_upload), methods=["POST"]),
+            Route("/storage/v1/object/upload/sign/{bucket}/{path:path}", _storage_handler(_upload_signed), methods=["PUT"]),
+            Route("/storage/v1/object/list/{bucket}", _storage_handler(_list_objects), methods=["POST"]),
+            Route("/storage/v1/object/{bucket}/{path:path}", _storage_handler(_upload_object), methods=["POST"]),
+            Route("/storage/v1/object/{bucket}/{path:path}", _storage_handler(_download), methods=["GET"]),
+            Route("/storage/v1/object/{bucket}", _storage_handler(_remove_objects), methods=["DELETE"]),
+        ],
+        lifespan=lifespan,
+    )
+
+
+def serve(dsn: str, port: int, latency: float = 0.0, pool_size: int = 10, storage_latency: float = 0.0) -> None:
+    uvicorn.run(create_app(dsn, latency, pool_size, storage_latency), host="127.0.0.1", port=port, log_level="warning")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dsn", required=True, help="Postgres with supabase/migrations applied")
+    parser.add_argument("--port", type=int, default=54321)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="added to every PostgREST request")
+    parser.add_argument("--storage-latency-ms", type=float, default=0.0, help="added to every Storage request")
+    parser.add_argument("--pool-size", type=int, default=10, help="Postgres connections")
+    args = parser.parse_args()
+    serve(args.dsn, args.port, args.latency_ms / 1000, args.pool_size, args.storage_latency_ms / 1000)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Rows as the repository returns them -> response dicts, shared by the routers (serialized directly with
+   fast_json, without building the response models)."""
+
+
+def row_to_task(row: dict) -> dict:
+    due = row["due_date"]
+    due_str = due.isoformat() if hasattr(due, "isoformat") else str(due)
+    created_at = row.get("created_at")
+    created_at_str = created_at.isoformat() if created_at and hasattr(created_at, "isoformat") else (str(created_at) if created_at else None)
+    # Same fields as TaskAttachmentOut, so the dict can be serialized without model validation.
+    attachments = [
+        {"name": a.get("name"), "type": a.get("type"), "size": a.get("size"), "url": a.get("url")}
+        for a in (row.get("attachments") or [])
+    ]
+    return {
+        "id": str(row["id"]),
+        "title": row["title"],
+        "subject": row["subject"],
+        "due_date": due_str,
+        "description": row.get("description"),
+        "goal": row.get("goal"),
+        "student_id": str(row["student_id"]),
+        "created_by": str(row["created_by"]) if row.get("created_by") else None,
+        "created_at": created_at_str,
+        "source": row.get("source") or "mentor",
+        "attachments": attachments,
+    }
+
+
+def row_to_task_with_submission(row: dict) -> dict:
+    """row_to_task plus "submission": the embedded submission as GET /api/tasks/{id}/submission returns it, or None."""
+    task = row_to_task(row)
+    sub = row.get("submission")
+    task["submission"] = submission_body(sub) if sub else None
+    return task
+
+
+def submission_body(sub: dict) -> dict:
+    return {
+        "id": str(sub["id"]),
+        "task_id": str(sub["task_id"]),
+        "submitted_at": sub.get("submitted_at"),
+        "study_time_minutes": sub.get("study_time_minutes", 0),
+        "image_urls": sub.get("image_urls") or [],
+        # Filled in the background after the submit (image_processing); empty until then.
+        "thumbnail_urls": sub.get("thumbnail_urls") or [],
+        "preview_urls": sub.get("preview_urls") or [],
+        # pending: files still uploading (asynchronous submit), image_urls empty until done; failed: upload gave up.
+        "upload_status": sub.get("upload_status") or "done",
+    }
+
+
+def _normalize_payload(payload: dict) -> dict:
+    """Ensure payload has feedbackPerTask (list) and dailySummary (str)."""
+    if not isinstance(payload, dict):
+        return {"feedbackPerTask": [], "dailySummary": ""}
+    ft = payload.get("feedbackPerTask")
+    if not isinstance(ft, list):
+        ft = []
+    ds = payload.get("dailySummary")
+    if not isinstance(ds, str):
+        ds = ""
+    return {"feedbackPerTask": ft, "dailySummary": ds}
+
+
+def row_to_payload(row: dict) -> dict:
+    """Row -> dict shaped like DailyFeedbackPayloadOut (serialized directly, without building nested models)."""
+    payload = _normalize_payload(row.get("payload") or {})
+    feedback_per_task = []
+    for fp in payload.get("feedbackPerTask") or []:
+        task_id = fp.get("taskId") or str(fp.get("task_id", ""))
+        items = [
+            {
+                "content": it.get("content") or "",
+                "isImportant": bool(it.get("isImportant", it.get("is_important", False))),
+            }
+            for it in fp.get("items") or []
+        ]
+        feedback_per_task.append({"taskId": task_id, "items": items})
+    return {
+        "feedbackPerTask": feedback_per_task,
+        "dailySummary": payload.get("dailySummary") or "",
+    }
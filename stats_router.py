@@ -0,0 +1,73 @@
+"""Study stats from the study_rollup_daily rollup: minutes per subject per week, completion rate per month.
+   Reads at most one row per subject per day in the range, however long the student's history is."""
+from datetime import date as date_type, timedelta
+
+from fastapi import APIRouter, Depends, Query
+
+from auth_deps import get_current_user
+from repository import get_repository
+from tasks_router import SUBJECTS
+from validators import parse_range, target_student
+
+router = APIRouter(prefix="/api", tags=["stats"])
+
+MAX_STATS_RANGE_DAYS = 366
+
+
+@router.get("/stats/study-time")
+async def get_study_time(
+    from_date: str = Query(..., alias="from", description="First date YYYY-MM-DD"),
+    to_date: str = Query(..., alias="to", description="Last date YYYY-MM-DD (inclusive)"),
+    student_id: str | None = Query(None, description="Mentor: student ID (students always get their own)"),
+    current: dict = Depends(get_current_user),
+    repo=Depends(get_repository),
+):
+    """Study minutes per subject per week (weeks start on Monday; the first/last week are clipped to from/to)."""
+    sid = target_student(current, student_id)
+    start, end = parse_range(from_date, to_date, MAX_STATS_RANGE_DAYS)
+    weeks: dict[str, dict[str, int]] = {}
+    monday = start - timedelta(days=start.weekday())
+    while monday <= end:
+        weeks[monday.isoformat()] = {s: 0 for s in sorted(SUBJECTS)}
+        monday += timedelta(days=7)
+    for row in await repo.study_rollups(sid, start.isoformat(), end.isoformat()):
+        day = date_type.fromisoformat(str(row["day"]))
+        week = (day - timedelta(days=day.weekday())).isoformat()
+        minutes = weeks[week]
+        minutes[row["subject"]] = minutes.get(row["subject"], 0) + (row.get("study_minutes") or 0)
+    return {
+        "student_id": sid,
+        "weeks": [
+            {"week_start": week, "minutes": minutes, "total": sum(minutes.values())}
+            for week, minutes in weeks.items()
+        ],
+    }
+
+
+@router.get("/stats/completion")
+async def get_completion(
+    from_date: str = Query(..., alias="from", description="First date YYYY-MM-DD"),
+    to_date: str = Query(..., alias="to", description="Last date YYYY-MM-DD (inclusive)"),
+    student_id: str | None = Query(None, description="Mentor: student ID (students always get their own)"),
+    current: dict = Depends(get_current_user),
+    repo=Depends(get_repository),
+):
+    """Tasks due per month, how many were submitted, and the completion rate (null when nothing was due)."""
+    sid = target_student(current, student_id)
+    start, end = parse_range(from_date, to_date, MAX_STATS_RANGE_DAYS)
+    months: dict[str, list[int]] = {}
+    month = start.replace(day=1)
+    while month <= end:
+        months[month.strftime("%Y-%m")] = [0, 0]
+        month = (month + timedelta(days=32)).replace(day=1)
+    for row in await repo.study_rollups(sid, start.isoformat(), end.isoformat()):
+        counts = months[str(row["day"])[:7]]
+        counts[0] += row.get("tasks_assigned") or 0
+        counts[1] += row.get("tasks_submitted") or 0
+    return {
+        "student_id": sid,
+        "months": [
+            {"month": m, "assigned": a, "submitted": s, "rate": round(s / a, 4) if a else None}
+            for m, (a, s) in months.items()
+        ],
+    }
@@ -1,13 +1,50 @@
 """Upload files to Supabase Storage and return public URLs."""
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
 import uuid
+from functools import partial
+from typing import BinaryIO, Callable
 
+import anyio
 from fastapi import HTTPException
 from storage3.utils import StorageException
 
-from config import SUPABASE_TASK_BUCKET, SUPABASE_URL
+from config import ATTACHMENT_DEDUP_ENABLED, SUPABASE_TASK_BUCKET, SUPABASE_URL, UPLOAD_CONCURRENCY
+from metrics import observe_storage, storage_deduplicated_bytes
+from repository import get_repository
 from supabase_admin import get_supabase_admin
 
+logger = logging.getLogger(__name__)
+
 _bucket_ensured = False
+_bucket_lock = threading.Lock()
+# Shared by every request so a burst of submissions cannot open unbounded storage connections.
+_upload_limiter = anyio.CapacityLimiter(UPLOAD_CONCURRENCY)
+
+
+def _observed(operation: str, call: Callable, *args, upload_bytes: int = 0, **kwargs):
+    """Run a blocking storage call, recording its latency (and uploaded bytes on success) in the metrics."""
+    start = time.perf_counter()
+    ok = False
+    try:
+        result = call(*args, **kwargs)
+        ok = True
+        return result
+    finally:
+        observe_storage(SUPABASE_TASK_BUCKET, operation, time.perf_counter() - start, ok, upload_bytes)
+
+
+def _size(file_data: bytes | BinaryIO) -> int:
+    if isinstance(file_data, bytes):
+        return len(file_data)
+    position = file_data.tell()
+    size = file_data.seek(0, os.SEEK_END)
+    file_data.seek(position)
+    return size - position
 
 
 def _ensure_task_bucket() -> None:
@@ -15,23 +52,27 @@ def _ensure_task_bucket() -> None:
     global _bucket_ensured
     if _bucket_ensured:
         return
-    supabase = get_supabase_admin()
-    storage = supabase.storage
-    try:
-        storage.create_bucket(SUPABASE_TASK_BUCKET, options={"public": True})
-    except StorageException as e:
-        err = (e.args[0] or {}) if e.args else {}
-        msg = str(err.get("message", "")).lower()
-        code = err.get("statusCode")
-        # Bucket already exists (e.g. created in Dashboard or by another process)
-        if code in (400, 409) and ("already exists" in msg or "duplicate" in msg or "conflict" in msg):
-            pass
-        else:
-            raise HTTPException(
-                status_code=503,
-                detail=f"Storage bucket '{SUPABASE_TASK_BUCKET}' could not be created. Create it in Supabase Dashboard → Storage (set to Public), or check service role permissions.",
-            ) from e
-    _bucket_ensured = True
+    # Uploads run in worker threads; only one of them should try to create the bucket.
+    with _bucket_lock:
+        if _bucket_ensured:
+            return
+        supabase = get_supabase_admin()
+        storage = supabase.storage
+        try:
+            _observed("create_bucket", storage.create_bucket, SUPABASE_TASK_BUCKET, options={"public": True})
+        except StorageException as e:
+            err = (e.args[0] or {}) if e.args else {}
+            msg = str(err.get("message", "")).lower()
+            code = err.get("statusCode")
+            # Bucket already exists (e.g. created in Dashboard or by another process)
+            if code in (400, 409) and ("already exists" in msg or "duplicate" in msg or "conflict" in msg):
+                pass
+            else:
+                raise HTTPException(
+                    status_code=503,
+                    detail=f"Storage bucket '{SUPABASE_TASK_BUCKET}' could not be created. Create it in Supabase Dashboard → Storage (set to Public), or check service role permissions.",
+                ) from e
+        _bucket_ensured = True
 
 
 def _public_url(path: str) -> str:
@@ -41,21 +82,33 @@ def _public_url(path: str) -> str:
     return f"{base}/storage/v1/object/public/{bucket}/{path}"
 
 
+def _rewind(file_data: bytes | BinaryIO) -> None:
+    """Reset a file reader before retrying an upload (bytes need nothing)."""
+    if not isinstance(file_data, bytes):
+        file_data.seek(0)
+
+
 def _upload_task_attachment_once(
-    file_data: bytes, path: str, content_type: str
+    file_data: bytes | BinaryIO, path: str, content_type: str, upsert: bool
 ) -> None:
     supabase = get_supabase_admin()
-    supabase.storage.from_(SUPABASE_TASK_BUCKET).upload(
+    file_options = {"content-type": content_type or "application/octet-stream"}
+    if upsert:
+        file_options["upsert"] = "true"
+    _observed(
+        "upload",
+        supabase.storage.from_(SUPABASE_TASK_BUCKET).upload,
         path,
         file_data,
-        file_options={"content-type": content_type or "application/octet-stream"},
+        file_options=file_options,
+        upload_bytes=_size(file_data),
     )
 
 
-def _ascii_safe_storage_path(filename: str) -> str:
+def _ascii_safe_storage_path(filename: str, key: str | None = None, folder: str = "attachments") -> str:
     """
     Build an ASCII-only path for Supabase Storage (rejects non-ASCII keys).
-    Returns: attachments/{uuid}.{ext} with extension limited to ASCII alphanumeric.
+    Returns: {folder}/{key or uuid}.{ext} with extension limited to ASCII alphanumeric.
     """
     ext = ""
     if "." in filename:
@@ -63,62 +116,90 @@ def _ascii_safe_storage_path(filename: str) -> str:
         ext = "".join(c for c in raw_ext if c.isascii() and c.isalnum()).lower() or ""
     if not ext:
         ext = "bin"
-    return f"attachments/{uuid.uuid4().hex}.{ext}"
+    return f"{folder}/{key or uuid.uuid4().hex}.{ext}"
+
+
+def _content_hash(file_data: bytes | BinaryIO) -> tuple[str, int]:
+    """(SHA-256 hex digest, size) of the remaining content; a reader is left where it was."""
+    if isinstance(file_data, bytes):
+        return hashlib.sha256(file_data).hexdigest(), len(file_data)
+    position = file_data.tell()
+    h = hashlib.sha256()
+    size = 0
+    while chunk := file_data.read(1024 * 1024):
+        h.update(chunk)
+        size += len(chunk)
+    file_data.seek(position)
+    return h.hexdigest(), size
 
 
 def upload_task_attachment(
-    file_data: bytes,
+    file_data: bytes | BinaryIO,
     filename: str,
     content_type: str,
+    digest: str | None = None,
 ) -> str:
     """
-    Upload a mentor task attachment. Returns public URL.
+    Upload a mentor task attachment (bytes or a binary reader, streamed from disk). Returns public URL.
     Storage path is ASCII-only (Supabase rejects non-ASCII keys). Original filename is kept in task attachments[].name.
+    With a content digest the path is attachments/{digest}.{ext}, overwritten in place if a concurrent upload of the
+    same content got there first.
     """
     global _bucket_ensured
-    path = _ascii_safe_storage_path(filename)
+    path = _ascii_safe_storage_path(filename, digest)
     content_type = content_type or "application/octet-stream"
+    upsert = digest is not None
     _ensure_task_bucket()
     try:
-        _upload_task_attachment_once(file_data, path, content_type)
+        _upload_task_attachment_once(file_data, path, content_type, upsert)
     except StorageException as e:
         err = (e.args[0] or {}) if e.args else {}
         if err.get("message") == "Bucket not found":
             _bucket_ensured = False
             _ensure_task_bucket()
-            _upload_task_attachment_once(file_data, path, content_type)
+            _rewind(file_data)
+            _upload_task_attachment_once(file_data, path, content_type, upsert)
         else:
             raise
     return _public_url(path)
 
 
+def attachment_storage_path(filename: str) -> str:
+    """attachments/{uuid}.{ext}: a new object for a mentor attachment that is not stored by content hash."""
+    return _ascii_safe_storage_path(filename)
+
+
+def submission_storage_path(task_id: str, filename: str) -> str:
+    """submissions/{task_id}/{uuid}.{ext}: where a student's file for the task is stored."""
+    return _ascii_safe_storage_path(filename, folder=f"submissions/{task_id}")
+
+
 def _upload_submission_file_once(
-    task_id: str, file_data: bytes, path: str, content_type: str
+    task_id: str, file_data: bytes | BinaryIO, path: str, content_type: str
 ) -> None:
     supabase = get_supabase_admin()
-    supabase.storage.from_(SUPABASE_TASK_BUCKET).upload(
+    _observed(
+        "upload",
+        supabase.storage.from_(SUPABASE_TASK_BUCKET).upload,
         path,
         file_data,
         file_options={"content-type": content_type or "application/octet-stream"},
+        upload_bytes=_size(file_data),
     )
 
 
 def upload_submission_file(
     task_id: str,
-    file_data: bytes,
+    file_data: bytes | BinaryIO,
     filename: str,
     content_type: str,
 ) -> str:
     """
-    Upload a student submission file (image, etc.). Returns public URL.
+    Upload a student submission file (image, etc.; bytes or a binary reader). Returns public URL.
     Storage path is ASCII-only (Supabase rejects non-ASCII keys).
     """
     global _bucket_ensured
-    ext = ""
-    if "." in filename:
-        raw_ext = filename.rsplit(".", 1)[-1]
-        ext = "".join(c for c in raw_ext if c.isascii() and c.isalnum()).lower() or ""
-    path = f"submissions/{task_id}/{uuid.uuid4().hex}.{ext or 'bin'}"
+    path = submission_storage_path(task_id, filename)
     content_type = content_type or "application/octet-stream"
     _ensure_task_bucket()
     try:
@@ -128,7 +209,171 @@ def upload_submission_file(
         if err.get("message") == "Bucket not found":
             _bucket_ensured = False
             _ensure_task_bucket()
+            _rewind(file_data)
             _upload_submission_file_once(task_id, file_data, path, content_type)
         else:
             raise
     return _public_url(path)
+
+
+# --- Concurrent upload pipeline (async endpoints) ---
+
+async def _gather_uploads(calls: list[Callable[[], str]]) -> list[str | BaseException]:
+    """Run blocking upload calls concurrently in worker threads and wait for all of them (a thread cannot be
+    cancelled mid-upload). Returns the URL or the exception of each call, in input order."""
+    async def run(call: Callable[[], str]) -> str:
+        return await anyio.to_thread.run_sync(call, limiter=_upload_limiter)
+
+    return await asyncio.gather(*(run(call) for call in calls), return_exceptions=True)
+
+
+def _raise_first_error(results: list[str | BaseException]) -> None:
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
+
+async def _run_uploads(calls: list[Callable[[], str]]) -> list[str]:
+    """Run blocking upload calls concurrently. Returns URLs in input order; if any upload fails, the files that did
+    upload are deleted and the first error is raised, so a failed request leaves no orphaned objects."""
+    results = await _gather_uploads(calls)
+    if any(isinstance(result, BaseException) for result in results):
+        await remove_uploaded_files([result for result in results if not isinstance(result, BaseException)])
+        _raise_first_error(results)
+    return results
+
+
+async def upload_task_attachments(files: list[tuple[bytes | BinaryIO, str, str]]) -> list[str]:
+    """
+    Upload mentor attachments (file_data, filename, content_type) concurrently without blocking the event loop.
+    At most UPLOAD_CONCURRENCY uploads run at once across all requests. Returns public URLs in input order.
+    With ATTACHMENT_DEDUP_ENABLED, content already stored (looked up by SHA-256 in one query) is not uploaded again:
+    its URL is reused, and each distinct new content is uploaded once and recorded for later tasks.
+    """
+    if not ATTACHMENT_DEDUP_ENABLED or not files:
+        return await _run_uploads([partial(upload_task_attachment, *f) for f in files])
+    hashes = await anyio.to_thread.run_sync(lambda: [_content_hash(file_data) for file_data, _, _ in files])
+    repo = await get_repository()
+    stored = await repo.find_attachment_objects(list({digest for digest, _ in hashes}))
+    new: dict[str, tuple[bytes | BinaryIO, str, str, int]] = {}
+    for (file_data, filename, content_type), (digest, size) in zip(files, hashes):
+        if digest in stored or digest in new:
+            storage_deduplicated_bytes.inc((SUPABASE_TASK_BUCKET,), size)
+        else:
+            new[digest] = (file_data, filename, content_type, size)
+    if new:
+        results = await _gather_uploads([partial(upload_task_attachment, *f[:3], digest) for digest, f in new.items()])
+        # Recorded even when another upload failed: a content-addressed object may also be what a concurrent upload of
+        # the same content points at, so it is kept for reuse rather than deleted.
+        rows = [
+            {"sha256": digest, "path": storage_path(url), "size": size, "content_type": content_type}
+            for (digest, (_, _, content_type, size)), url in zip(new.items(), results)
+            if not isinstance(url, BaseException)
+        ]
+        if rows:
+            try:
+                await repo.record_attachment_objects(rows)
+            except Exception:
+                # The files are stored and the task can use them; only later reuse is lost (they upload again next time).
+                logger.warning("Could not record %d attachment object(s)", len(rows), exc_info=True)
+        _raise_first_error(results)
+        stored = {**stored, **{row["sha256"]: row["path"] for row in rows}}
+    return [_public_url(stored[digest]) for digest, _ in hashes]
+
+
+async def upload_submission_files(task_id: str, files: list[tuple[bytes | BinaryIO, str, str]]) -> list[str]:
+    """Upload student submission files concurrently (see upload_task_attachments). Returns public URLs in input order."""
+    return await _run_uploads([partial(upload_submission_file, task_id, *f) for f in files])
+
+
+def _create_signed_upload(path: str) -> dict:
+    return _observed(
+        "create_signed_upload_url", get_supabase_admin().storage.from_(SUPABASE_TASK_BUCKET).create_signed_upload_url, path,
+    )
+
+
+async def create_signed_uploads(paths: list[str]) -> list[dict]:
+    """Signed upload URLs ({signed_url, token, path, url}) for new objects in the task bucket, in input order. Each accepts
+    one upload (it cannot overwrite an existing object) for 2 hours; the bytes never pass through this backend."""
+    await anyio.to_thread.run_sync(_ensure_task_bucket)
+    signed = await asyncio.gather(
+        *(anyio.to_thread.run_sync(_create_signed_upload, path, limiter=_upload_limiter) for path in paths)
+    )
+    base = SUPABASE_URL.rstrip("/")
+    # Built from the token: storage3 joins its base URL and the returned path with a double slash.
+    return [
+        {
+            "signed_url": f"{base}/storage/v1/object/upload/sign/{SUPABASE_TASK_BUCKET}/{path}?token={s['token']}",
+            "token": s["token"],
+            "path": path,
+            "url": _public_url(path),
+        }
+        for s, path in zip(signed, paths)
+    ]
+
+
+def _stored_size(path: str) -> int | None:
+    folder, _, name = path.rpartition("/")
+    entries = _observed(
+        "list", get_supabase_admin().storage.from_(SUPABASE_TASK_BUCKET).list, folder, {"search": name, "limit": 10},
+    )
+    for entry in entries:
+        # Folders are listed with id null and no metadata.
+        if entry.get("name") == name and entry.get("id"):
+            return int((entry.get("metadata") or {}).get("size", 0))
+    return None
+
+
+async def stored_sizes(paths: list[str]) -> list[int | None]:
+    """Size in bytes of each object in the task bucket (None if it does not exist), in input order."""
+    return list(await asyncio.gather(
+        *(anyio.to_thread.run_sync(_stored_size, path, limiter=_upload_limiter) for path in paths)
+    ))
+
+
+def storage_path(url: str) -> str | None:
+    """Path in the task bucket of a public URL built by _public_url (None for any other URL)."""
+    prefix = _public_url("")
+    return url[len(prefix):] if url.startswith(prefix) else None
+
+
+def _download_file(path: str) -> bytes:
+    return _observed("download", get_supabase_admin().storage.from_(SUPABASE_TASK_BUCKET).download, path)
+
+
+def _upload_generated_file(path: str, data: bytes, content_type: str) -> str:
+    _ensure_task_bucket()
+    _observed(
+        "upload",
+        get_supabase_admin().storage.from_(SUPABASE_TASK_BUCKET).upload,
+        path,
+        data,
+        file_options={"content-type": content_type, "upsert": "true"},
+        upload_bytes=len(data),
+    )
+    return _public_url(path)
+
+
+async def download_file(path: str) -> bytes:
+    """Download a file from the task bucket in a worker thread (shares the upload concurrency limit)."""
+    return await anyio.to_thread.run_sync(_download_file, path, limiter=_upload_limiter)
+
+
+async def upload_generated_file(path: str, data: bytes, content_type: str) -> str:
+    """Upload (or replace) bytes produced by this backend, e.g. image variants. Returns public URL."""
+    return await anyio.to_thread.run_sync(_upload_generated_file, path, data, content_type, limiter=_upload_limiter)
+
+
+def _remove_files(paths: list[str]) -> None:
+    _observed("remove", get_supabase_admin().storage.from_(SUPABASE_TASK_BUCKET).remove, paths)
+
+
+async def remove_uploaded_files(urls: list[str]) -> None:
+    """Best-effort delete of files uploaded by this backend (public URLs from _public_url), e.g. after a lost submit race."""
+    paths = [path for path in map(storage_path, urls) if path is not None]
+    if not paths:
+        return
+    try:
+        await anyio.to_thread.run_sync(_remove_files, paths, limiter=_upload_limiter)
+    except Exception:
+        logger.warning("Could not remove %d orphaned upload(s)", len(paths), exc_info=True)
@@ -0,0 +1,348 @@
+"""Background uploads for asynchronous submissions (POST /api/tasks/{id}/submit with "Prefer: respond-async").
+   The request copies its files into a spool directory and inserts the submission as 'pending'; a bounded queue worked by
+   SUBMIT_UPLOAD_WORKERS tasks uploads them, stores image_urls with 'done' and schedules the image variants. A failed
+   upload is retried with exponential backoff; after SUBMIT_UPLOAD_MAX_ATTEMPTS the submission is marked 'failed' and its
+   files stay spooled until the next start retries them.
+
+   Spool layout: SUBMIT_SPOOL_DIR/<submission id>.<owner pid>/{job.json, 0, 1, ...}. A request writes its spool (files
+   and job.json, fsynced) as incoming-<random>.<pid> before inserting the row, and renames it to the submission id once
+   the row exists. Every process sharing the directory owns the spools named with its pid; at startup it claims
+   (renames) those of processes that are no longer running, hands an incoming spool to its pending row if the row was
+   inserted, and marks 'failed' the pending rows left with no spool at all."""
+import asyncio
+import json
+import logging
+import os
+import random
+import shutil
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import BinaryIO
+
+import anyio
+
+from config import ASYNC_SUBMIT_ENABLED, SUBMIT_SPOOL_DIR, SUBMIT_UPLOAD_MAX_ATTEMPTS, SUBMIT_UPLOAD_QUEUE_SIZE, SUBMIT_UPLOAD_WORKERS
+from event_hub import MENTORS, publish, user_topic
+from image_processing import schedule_submission_images
+from repository import get_repository
+from storage_helper import upload_submission_files
+
+logger = logging.getLogger(__name__)
+
+# Backoff before retry n: RETRY_BASE_DELAY * 2**(n-1) seconds, capped, with jitter.
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 60.0
+# After startup, how long other processes get to claim the rows they just inserted before pending rows that have no
+# spool are marked failed (seconds).
+PENDING_GRACE = 60.0
+_JOB_FILE = "job.json"
+
+_queue: asyncio.Queue | None = None
+_tasks: set[asyncio.Task] = set()
+
+
+def _spool_root() -> Path:
+    return Path(SUBMIT_SPOOL_DIR)
+
+
+def _fsync_dir(path: Path) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _copy_to_spool(files: list[tuple[BinaryIO, str, str]], job: dict) -> dict:
+    directory = _spool_root() / f"incoming-{uuid.uuid4().hex}.{os.getpid()}"
+    directory.mkdir(parents=True)
+    try:
+        for i, (reader, _, _) in enumerate(files):
+            with open(directory / str(i), "wb") as out:
+                shutil.copyfileobj(reader, out, 1024 * 1024)
+                out.flush()
+                os.fsync(out.fileno())
+        job = {
+            **job,
+            "dir": str(directory),
+            "files": [{"name": name, "content_type": content_type, "url": None} for _, name, content_type in files],
+        }
+        _save(job)
+        _fsync_dir(directory.parent)
+    except BaseException:
+        shutil.rmtree(directory, ignore_errors=True)
+        raise
+    return job
+
+
+async def spool_submission_files(
+    files: list[tuple[BinaryIO, str, str]], task_id: str, student_id: str, stored_urls: list[str],
+) -> dict:
+    """Copy (reader, filename, content_type) uploads and the job describing them to a new spool directory and flush
+    both to disk (in a worker thread), before the submission is inserted. Returns the job; stored_urls (files already
+    in storage) come first in image_urls."""
+    job = {"task_id": task_id, "student_id": student_id, "stored_urls": stored_urls}
+    return await anyio.to_thread.run_sync(_copy_to_spool, files, job)
+
+
+async def discard_spool(job: dict) -> None:
+    await anyio.to_thread.run_sync(shutil.rmtree, job["dir"], True)
+
+
+def _save(job: dict) -> None:
+    """Write job.json atomically and durably (uploaded URLs survive a restart or a crash)."""
+    path = Path(job["dir"]) / _JOB_FILE
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w") as out:
+        out.write(json.dumps({k: v for k, v in job.items() if k != "dir"}))
+        out.flush()
+        os.fsync(out.fileno())
+    os.replace(tmp, path)
+    _fsync_dir(path.parent)
+
+
+def _claim_new(job: dict) -> None:
+    _save(job)
+    claimed = _spool_root() / f"{job['submission_id']}.{os.getpid()}"
+    os.rename(job["dir"], claimed)
+    _fsync_dir(claimed.parent)
+    job["dir"] = str(claimed)
+
+
+def has_upload_capacity() -> bool:
+    """False while the queue is full; submits then upload inline instead of spooling."""
+    return _queue is None or not _queue.full()
+
+
+async def enqueue_submission_upload(job: dict, submission: dict) -> None:
+    """Hand a spooled job to the background workers once its 'pending' submission row exists."""
+    job.update(submission_id=str(submission["id"]), attempts=0)
+    await anyio.to_thread.run_sync(_claim_new, job)
+    # Waits only if the queue filled up since has_upload_capacity() was checked.
+    await _get_queue().put(job)
+
+
+def _get_queue() -> asyncio.Queue:
+    global _queue
+    if _queue is None:
+        _queue = asyncio.Queue(SUBMIT_UPLOAD_QUEUE_SIZE)
+        for _ in range(SUBMIT_UPLOAD_WORKERS):
+            _track(asyncio.get_running_loop().create_task(_worker(_queue)))
+    return _queue
+
+
+def _track(task: asyncio.Task) -> None:
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+
+async def _worker(queue: asyncio.Queue) -> None:
+    while True:
+        job = await queue.get()
+        try:
+            await _process(job)
+        except Exception:
+            logger.exception("Upload of submission %s failed", job.get("submission_id"))
+        finally:
+            queue.task_done()
+
+
+async def _upload_missing(job: dict) -> None:
+    """Upload every file that has no URL yet; files that succeed keep their URL even if another one fails."""
+    directory = Path(job["dir"])
+
+    async def upload(i: int, file: dict) -> None:
+        with open(directory / str(i), "rb") as reader:
+            [file["url"]] = await upload_submission_files(job["task_id"], [(reader, file["name"], file["content_type"])])
+
+    results = await asyncio.gather(
+        *(upload(i, f) for i, f in enumerate(job["files"]) if f["url"] is None), return_exceptions=True,
+    )
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
+
+async def _process(job: dict) -> None:
+    repo = await get_repository()
+    while True:
+        job["attempts"] += 1
+        try:
+            await _upload_missing(job)
+            image_urls = job.get("stored_urls", []) + [f["url"] for f in job["files"]]
+            await repo.set_submission_upload(job["submission_id"], "done", image_urls)
+            break
+        except Exception:
+            await anyio.to_thread.run_sync(_save, job)
+            if job["attempts"] >= SUBMIT_UPLOAD_MAX_ATTEMPTS:
+                logger.error(
+                    "Giving up on submission %s after %d upload attempts; files kept in %s",
+                    job["submission_id"], job["attempts"], job["dir"], exc_info=True,
+                )
+                await repo.set_submission_upload(job["submission_id"], "failed")
+                _publish_upload(job, "failed", [])
+                return
+            delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (job["attempts"] - 1)) * random.uniform(0.5, 1.0)
+            logger.warning(
+                "Upload of submission %s failed (attempt %d), retrying in %.1fs", job["submission_id"], job["attempts"], delay,
+                exc_info=True,
+            )
+            await asyncio.sleep(delay)
+    await discard_spool(job)
+    _publish_upload(job, "done", image_urls)
+    schedule_submission_images(repo, {"id": job["submission_id"], "image_urls": image_urls})
+
+
+def _publish_upload(job: dict, upload_status: str, image_urls: list[str]) -> None:
+    topics = [MENTORS, user_topic(job["student_id"])]
+    data = {"id": job["submission_id"], "task_id": job["task_id"], "upload_status": upload_status, "image_urls": image_urls}
+    publish(topics, "submission.updated", data)
+
+
+def _owner_running(pid: int) -> bool:
+    if pid == os.getpid():
+        # A previous process with our pid (e.g. a restarted container); this process owns nothing yet.
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _claim_orphans() -> tuple[list[dict], list[dict]]:
+    """Rename to our pid every spool whose owner is gone; the rename fails for all but one claiming process.
+    Returns (jobs, incoming): jobs of inserted submissions, and incoming jobs whose request died before handing them
+    over (their row may or may not have been inserted)."""
+    root = _spool_root()
+    if not root.is_dir():
+        return [], []
+    jobs, incoming = [], []
+    for entry in root.iterdir():
+        name, _, owner = entry.name.rpartition(".")
+        if not name or not owner.isdigit() or _owner_running(int(owner)):
+            continue
+        claimed = root / f"{name}.{os.getpid()}"
+        try:
+            entry.rename(claimed)
+        except FileNotFoundError:
+            continue  # claimed by another process first
+        try:
+            job = json.loads((claimed / _JOB_FILE).read_text())
+        except FileNotFoundError:
+            if name.startswith("incoming-"):
+                # Died while copying the files: the row was never inserted.
+                shutil.rmtree(claimed, ignore_errors=True)
+            else:
+                logger.error("Upload spool %s has no %s", claimed, _JOB_FILE)
+            continue
+        except (OSError, ValueError):
+            logger.error("Unreadable upload spool %s", claimed, exc_info=True)
+            continue
+        job["dir"] = str(claimed)
+        (incoming if name.startswith("incoming-") else jobs).append(job)
+    return jobs, incoming
+
+
+def _spooled() -> tuple[set[str], set[str]]:
+    """(submission ids, task ids of incoming spools) of every spool in the directory, whoever owns it."""
+    root = _spool_root()
+    submission_ids, task_ids = set(), set()
+    if not root.is_dir():
+        return submission_ids, task_ids
+    for entry in root.iterdir():
+        name = entry.name.rpartition(".")[0] or entry.name
+        if not name.startswith("incoming-"):
+            submission_ids.add(name)
+            continue
+        try:
+            task_ids.add(json.loads((entry / _JOB_FILE).read_text())["task_id"])
+        except (OSError, ValueError, KeyError):
+            pass
+    return submission_ids, task_ids
+
+
+async def _adopt(repo, incoming: list[dict]) -> list[dict]:
+    """Jobs for the incoming spools whose pending row was inserted; the others are discarded."""
+    jobs = []
+    submission_ids, _ = await anyio.to_thread.run_sync(_spooled)
+    for job in incoming:
+        row = await repo.get_submission(job["task_id"])
+        if (
+            row is None
+            or str(row["student_id"]) != job["student_id"]
+            or row.get("upload_status") != "pending"
+            or str(row["id"]) in submission_ids
+        ):
+            await discard_spool(job)
+            continue
+        job.update(submission_id=str(row["id"]), attempts=0)
+        await anyio.to_thread.run_sync(_claim_new, job)
+        submission_ids.add(job["submission_id"])
+        jobs.append(job)
+    return jobs
+
+
+async def _fail_stranded(repo, submitted_before: str) -> None:
+    """Mark 'failed' the pending submissions inserted before submitted_before that have no spool: their files were
+    lost with the process that received them, so they would otherwise stay pending forever."""
+    rows = await repo.pending_submissions(submitted_before)
+    if not rows:
+        return
+    submission_ids, task_ids = await anyio.to_thread.run_sync(_spooled)
+    for row in rows:
+        if str(row["id"]) in submission_ids or str(row["task_id"]) in task_ids:
+            continue
+        logger.error("Submission %s was left pending without spooled files; marking it failed", row["id"])
+        await repo.set_submission_upload(str(row["id"]), "failed")
+        _publish_upload(
+            {"submission_id": str(row["id"]), "task_id": str(row["task_id"]), "student_id": str(row["student_id"])},
+            "failed", [],
+        )
+
+
+async def _resume(jobs: list[dict], incoming: list[dict], started: str) -> None:
+    try:
+        repo = await get_repository()
+        jobs = jobs + await _adopt(repo, incoming)
+        if jobs:
+            logger.info("Resuming %d spooled submission uploads", len(jobs))
+        queue = _get_queue()
+        for job in jobs:
+            if job["attempts"] >= SUBMIT_UPLOAD_MAX_ATTEMPTS:
+                await repo.set_submission_upload(job["submission_id"], "pending")
+            job["attempts"] = 0
+            await queue.put(job)
+        await asyncio.sleep(PENDING_GRACE)
+        await _fail_stranded(repo, started)
+    except Exception:
+        # Spools not handed to the queue stay claimed by this process; the next start picks them up again.
+        logger.exception("Could not resume spooled submission uploads")
+
+
+async def start_submission_uploads() -> None:
+    """Resume the uploads left in the spool by stopped processes, then reconcile pending rows without a spool
+    (app startup). Nothing runs without ASYNC_SUBMIT_ENABLED."""
+    if not ASYNC_SUBMIT_ENABLED:
+        return
+    started = datetime.now(timezone.utc).isoformat()
+    jobs, incoming = await anyio.to_thread.run_sync(_claim_orphans)
+    _track(asyncio.get_running_loop().create_task(_resume(jobs, incoming, started)))
+
+
+async def close_submission_uploads(timeout: float = 10.0) -> None:
+    """Let queued uploads finish (up to timeout), then stop the workers (app shutdown). Unfinished jobs stay spooled."""
+    global _queue
+    queue, _queue = _queue, None
+    if queue is not None:
+        try:
+            await asyncio.wait_for(queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("%d submission uploads left in the spool at shutdown", queue.qsize())
+    tasks = list(_tasks)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,7 @@
+-- Keyset pagination for GET /api/tasks: order by (due_date, created_at, id), optionally per student.
+-- Lets "next page after cursor" and from/to ranges use an index range scan + LIMIT instead of sorting the table.
+
+create index if not exists idx_tasks_due_created_id
+  on public.tasks (due_date, created_at, id);
+create index if not exists idx_tasks_student_due_created_id
+  on public.tasks (student_id, due_date, created_at, id);
@@ -0,0 +1,127 @@
+-- Study-time / completion rollups per (student, subject, day). Run in Supabase SQL Editor.
+-- day = the task's due_date. Maintained incrementally by triggers on tasks and task_submissions,
+-- so weekly/monthly stats read at most one row per subject per day instead of scanning every submission.
+
+create table if not exists public.study_rollup_daily (
+  student_id uuid not null references public.auth_users(id) on delete cascade,
+  day date not null,
+  subject text not null,
+  tasks_assigned int not null default 0,
+  tasks_submitted int not null default 0,
+  study_minutes int not null default 0,
+  primary key (student_id, day, subject)
+);
+
+alter table public.study_rollup_daily enable row level security;
+
+comment on table public.study_rollup_daily is 'Per student/day/subject: tasks assigned (due that day), submitted, and study minutes. Trigger-maintained; rebuild with rebuild_study_rollups().';
+
+create or replace function public.bump_study_rollup(
+  p_student_id uuid, p_day date, p_subject text, p_assigned int, p_submitted int, p_minutes int
+)
+returns void
+language sql
+as $$
+  insert into public.study_rollup_daily as r (student_id, day, subject, tasks_assigned, tasks_submitted, study_minutes)
+  values (p_student_id, p_day, p_subject, p_assigned, p_submitted, p_minutes)
+  on conflict (student_id, day, subject) do update set
+    tasks_assigned = r.tasks_assigned + excluded.tasks_assigned,
+    tasks_submitted = r.tasks_submitted + excluded.tasks_submitted,
+    study_minutes = r.study_minutes + excluded.study_minutes;
+$$;
+
+-- tasks: +1 assigned on insert; on delete remove the task and its submission (BEFORE, while submissions still exist,
+-- because the FK cascade deletes them before AFTER triggers run); on a move (student/due_date/subject) shift everything.
+create or replace function public.study_rollup_tasks_trigger()
+returns trigger
+language plpgsql
+as $$
+declare
+  sub_count int;
+  sub_minutes int;
+begin
+  if tg_op = 'INSERT' then
+    perform public.bump_study_rollup(new.student_id, new.due_date, new.subject, 1, 0, 0);
+    return new;
+  end if;
+  if tg_op = 'UPDATE'
+     and new.student_id = old.student_id and new.due_date = old.due_date and new.subject = old.subject then
+    return new;
+  end if;
+  select count(*), coalesce(sum(study_time_minutes), 0) into sub_count, sub_minutes
+  from public.task_submissions where task_id = old.id;
+  perform public.bump_study_rollup(old.student_id, old.due_date, old.subject, -1, -sub_count, -sub_minutes);
+  if tg_op = 'UPDATE' then
+    perform public.bump_study_rollup(new.student_id, new.due_date, new.subject, 1, sub_count, sub_minutes);
+    return new;
+  end if;
+  return old;
+end;
+$$;
+
+drop trigger if exists study_rollup_tasks_insert_update on public.tasks;
+create trigger study_rollup_tasks_insert_update
+  after insert or update of student_id, due_date, subject on public.tasks
+  for each row execute function public.study_rollup_tasks_trigger();
+
+drop trigger if exists study_rollup_tasks_delete on public.tasks;
+create trigger study_rollup_tasks_delete
+  before delete on public.tasks
+  for each row execute function public.study_rollup_tasks_trigger();
+
+-- task_submissions: +/-1 submitted and +/- minutes on the task's (student, due_date, subject).
+-- A missing task means it is being deleted; study_rollup_tasks_delete already removed its submission.
+create or replace function public.study_rollup_submissions_trigger()
+returns trigger
+language plpgsql
+as $$
+declare
+  t record;
+begin
+  if tg_op in ('UPDATE', 'DELETE') then
+    select student_id, due_date, subject into t from public.tasks where id = old.task_id;
+    if found then
+      perform public.bump_study_rollup(t.student_id, t.due_date, t.subject, 0, -1, -old.study_time_minutes);
+    end if;
+  end if;
+  if tg_op in ('INSERT', 'UPDATE') then
+    select student_id, due_date, subject into t from public.tasks where id = new.task_id;
+    if found then
+      perform public.bump_study_rollup(t.student_id, t.due_date, t.subject, 0, 1, new.study_time_minutes);
+    end if;
+    return new;
+  end if;
+  return old;
+end;
+$$;
+
+drop trigger if exists study_rollup_submissions on public.task_submissions;
+create trigger study_rollup_submissions
+  after insert or delete or update of task_id, study_time_minutes on public.task_submissions
+  for each row execute function public.study_rollup_submissions_trigger();
+
+-- Backfill / repair: recompute rollups from tasks + task_submissions (all students, or one).
+-- Blocks task/submission writes while it runs so no trigger update is lost.
+create or replace function public.rebuild_study_rollups(p_student_id uuid default null)
+returns int
+language plpgsql
+as $$
+declare
+  n int;
+begin
+  lock table public.tasks, public.task_submissions in share mode;
+  delete from public.study_rollup_daily where p_student_id is null or student_id = p_student_id;
+  insert into public.study_rollup_daily (student_id, day, subject, tasks_assigned, tasks_submitted, study_minutes)
+  select t.student_id, t.due_date, t.subject, count(*), count(s.id), coalesce(sum(s.study_time_minutes), 0)
+  from public.tasks t
+  left join public.task_submissions s on s.task_id = t.id
+  where p_student_id is null or t.student_id = p_student_id
+  group by t.student_id, t.due_date, t.subject;
+  get diagnostics n = row_count;
+  return n;
+end;
+$$;
+
+-- Server-only (service role): not callable with the anon/authenticated keys.
+revoke execute on function public.bump_study_rollup(uuid, date, text, int, int, int) from public, anon, authenticated;
+revoke execute on function public.rebuild_study_rollups(uuid) from public, anon, authenticated;
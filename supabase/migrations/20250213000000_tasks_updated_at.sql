@@ -0,0 +1,21 @@
+-- Row version for tasks (ETags on GET /api/tasks, GET /api/tasks/{id}). feedback_daily already has updated_at.
+
+alter table public.tasks
+  add column if not exists updated_at timestamptz not null default now();
+
+create or replace function public.set_updated_at()
+returns trigger
+language plpgsql
+as $$
+begin
+  new.updated_at := now();
+  return new;
+end;
+$$;
+
+drop trigger if exists tasks_set_updated_at on public.tasks;
+create trigger tasks_set_updated_at
+  before update on public.tasks
+  for each row execute function public.set_updated_at();
+
+comment on column public.tasks.updated_at is 'Set on insert and every update; used as the row version for ETags.';
@@ -0,0 +1,62 @@
+-- Atomic task submission in one round trip. Run in Supabase SQL Editor.
+-- submit_task() checks ownership, enforces one submission per (task, student) and inserts in a single statement,
+-- so a concurrent duplicate gets 'already_submitted' instead of a unique-index error.
+-- A retry carrying the same idempotency key gets the stored submission back ('replayed').
+
+alter table public.task_submissions add column if not exists idempotency_key text;
+
+comment on column public.task_submissions.idempotency_key is 'Idempotency-Key of the submit request; a retry with the same key returns this row.';
+
+-- Returns {"status": ...}:
+--   created            inserted; "submission" holds the row
+--   replayed           already submitted with the same idempotency key; "submission" holds the stored row
+--   already_submitted  submitted before (different or no key)
+--   not_found          no such task
+--   forbidden          task belongs to another student
+--   ok                 p_dry_run only: a submission would be created (nothing written)
+create or replace function public.submit_task(
+  p_task_id uuid,
+  p_student_id uuid,
+  p_study_time_minutes int default 0,
+  p_image_urls jsonb default '[]'::jsonb,
+  p_idempotency_key text default null,
+  p_dry_run boolean default false
+)
+returns jsonb
+language plpgsql
+as $$
+declare
+  owner uuid;
+  sub public.task_submissions;
+begin
+  select student_id into owner from public.tasks where id = p_task_id;
+  if not found then
+    return jsonb_build_object('status', 'not_found');
+  end if;
+  if owner <> p_student_id then
+    return jsonb_build_object('status', 'forbidden');
+  end if;
+
+  if not p_dry_run then
+    insert into public.task_submissions (task_id, student_id, study_time_minutes, image_urls, idempotency_key)
+    values (p_task_id, p_student_id, greatest(coalesce(p_study_time_minutes, 0), 0), coalesce(p_image_urls, '[]'::jsonb), p_idempotency_key)
+    on conflict (task_id, student_id) do nothing
+    returning * into sub;
+    if found then
+      return jsonb_build_object('status', 'created', 'submission', to_jsonb(sub));
+    end if;
+  end if;
+
+  select * into sub from public.task_submissions where task_id = p_task_id and student_id = p_student_id;
+  if not found then
+    return jsonb_build_object('status', 'ok');
+  end if;
+  if p_idempotency_key is not null and sub.idempotency_key = p_idempotency_key then
+    return jsonb_build_object('status', 'replayed', 'submission', to_jsonb(sub));
+  end if;
+  return jsonb_build_object('status', 'already_submitted');
+end;
+$$;
+
+-- Server-only (service role): p_student_id is trusted, so not callable with the anon/authenticated keys.
+revoke execute on function public.submit_task(uuid, uuid, int, jsonb, text, boolean) from public, anon, authenticated;
@@ -0,0 +1,14 @@
+-- Thumbnails and recompressed previews of submission images. Run in Supabase SQL Editor.
+-- Rendered in the background after a submission is created (image_processing.py); index i of each array belongs to
+-- image_urls[i]. Empty until processing finishes; a file that is not a readable image gets null at its index.
+
+alter table public.task_submissions
+  add column if not exists thumbnail_urls jsonb not null default '[]'::jsonb,
+  add column if not exists preview_urls jsonb not null default '[]'::jsonb;
+
+comment on column public.task_submissions.thumbnail_urls is 'Small thumbnails of image_urls (same order), for lists and review grids.';
+comment on column public.task_submissions.preview_urls is 'Resized, recompressed previews of image_urls (same order), for the review page.';
+
+-- Submissions still waiting for variants (scripts/backfill_submission_images.py).
+create index if not exists idx_task_submissions_missing_variants on public.task_submissions (submitted_at)
+  where thumbnail_urls = '[]'::jsonb and image_urls <> '[]'::jsonb;
@@ -0,0 +1,71 @@
+-- Asynchronous submissions: the row is inserted before its files are uploaded. Run in Supabase SQL Editor.
+-- With "Prefer: respond-async" the submit endpoint spools the files on the server, inserts the submission as
+-- 'pending' with empty image_urls and returns; a background queue (submission_uploads.py) uploads the files, then
+-- sets image_urls and 'done' (or 'failed' after its retries; the spooled files are kept and retried on restart).
+
+alter table public.task_submissions
+  add column if not exists upload_status text not null default 'done'
+    check (upload_status in ('pending', 'done', 'failed'));
+
+comment on column public.task_submissions.upload_status is 'pending: files still uploading in the background; done: image_urls complete; failed: upload gave up (retried on server restart).';
+
+-- submit_task() gains p_upload_status; drop the old signature so the new one is not an overload.
+drop function if exists public.submit_task(uuid, uuid, int, jsonb, text, boolean);
+
+-- Returns {"status": ...}:
+--   created            inserted; "submission" holds the row
+--   replayed           already submitted with the same idempotency key; "submission" holds the stored row
+--   already_submitted  submitted before (different or no key)
+--   not_found          no such task
+--   forbidden          task belongs to another student
+--   ok                 p_dry_run only: a submission would be created (nothing written)
+create or replace function public.submit_task(
+  p_task_id uuid,
+  p_student_id uuid,
+  p_study_time_minutes int default 0,
+  p_image_urls jsonb default '[]'::jsonb,
+  p_idempotency_key text default null,
+  p_dry_run boolean default false,
+  p_upload_status text default 'done'
+)
+returns jsonb
+language plpgsql
+as $$
+declare
+  owner uuid;
+  sub public.task_submissions;
+begin
+  select student_id into owner from public.tasks where id = p_task_id;
+  if not found then
+    return jsonb_build_object('status', 'not_found');
+  end if;
+  if owner <> p_student_id then
+    return jsonb_build_object('status', 'forbidden');
+  end if;
+
+  if not p_dry_run then
+    insert into public.task_submissions (task_id, student_id, study_time_minutes, image_urls, idempotency_key, upload_status)
+    values (
+      p_task_id, p_student_id, greatest(coalesce(p_study_time_minutes, 0), 0), coalesce(p_image_urls, '[]'::jsonb),
+      p_idempotency_key, coalesce(p_upload_status, 'done')
+    )
+    on conflict (task_id, student_id) do nothing
+    returning * into sub;
+    if found then
+      return jsonb_build_object('status', 'created', 'submission', to_jsonb(sub));
+    end if;
+  end if;
+
+  select * into sub from public.task_submissions where task_id = p_task_id and student_id = p_student_id;
+  if not found then
+    return jsonb_build_object('status', 'ok');
+  end if;
+  if p_idempotency_key is not null and sub.idempotency_key = p_idempotency_key then
+    return jsonb_build_object('status', 'replayed', 'submission', to_jsonb(sub));
+  end if;
+  return jsonb_build_object('status', 'already_submitted');
+end;
+$$;
+
+-- Server-only (service role): p_student_id is trusted, so not callable with the anon/authenticated keys.
+revoke execute on function public.submit_task(uuid, uuid, int, jsonb, text, boolean, text) from public, anon, authenticated;
@@ -0,0 +1,16 @@
+-- Content-addressed task attachments. Run in Supabase SQL Editor.
+-- One row per distinct attachment content, keyed by the SHA-256 of its bytes. Before uploading, the backend looks the
+-- hashes up (primary key index, one query per request) and reuses the stored object's URL instead of uploading it again;
+-- tasks.attachments[].name keeps the filename of each upload. New content is stored at attachments/{sha256}.{ext}.
+
+create table if not exists public.attachment_objects (
+  sha256 text primary key check (sha256 ~ '^[0-9a-f]{64}$'),
+  path text not null,
+  size bigint not null check (size >= 0),
+  content_type text,
+  created_at timestamptz not null default now()
+);
+
+alter table public.attachment_objects enable row level security;
+
+comment on table public.attachment_objects is 'Stored task attachment contents by SHA-256 (path in the task-files bucket); shared by every task attaching the same file.';
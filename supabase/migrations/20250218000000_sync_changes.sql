@@ -0,0 +1,232 @@
+-- Delta sync (GET /api/sync): a student's tasks, submissions and feedback changed since a client's cursor.
+-- Run in Supabase SQL Editor.
+-- Every insert and update stamps the row's change_xid with the writing transaction's id; deletes (and a task moved to
+-- another student) leave a tombstone in sync_tombstones. The cursor handed to the client is the xmin of the snapshot
+-- the changes were read in: every transaction below it had finished, so its changes were either read or are gone.
+-- The next sync asks for change_xid >= cursor, which also covers transactions still running at the time; rows of
+-- transactions at or above xmin that were already read come again (clients apply changes idempotently).
+-- updated_at cannot be used as the cursor: a transaction can commit after a later-stamped row was read.
+
+alter table public.tasks add column if not exists change_xid xid8 not null default pg_current_xact_id();
+alter table public.task_submissions add column if not exists change_xid xid8 not null default pg_current_xact_id();
+alter table public.feedback_daily add column if not exists change_xid xid8 not null default pg_current_xact_id();
+
+create or replace function public.set_change_xid()
+returns trigger
+language plpgsql
+as $$
+begin
+  new.change_xid := pg_current_xact_id();
+  return new;
+end;
+$$;
+
+drop trigger if exists tasks_set_change_xid on public.tasks;
+create trigger tasks_set_change_xid
+  before update on public.tasks
+  for each row execute function public.set_change_xid();
+
+drop trigger if exists task_submissions_set_change_xid on public.task_submissions;
+create trigger task_submissions_set_change_xid
+  before update on public.task_submissions
+  for each row execute function public.set_change_xid();
+
+drop trigger if exists feedback_daily_set_change_xid on public.feedback_daily;
+create trigger feedback_daily_set_change_xid
+  before update on public.feedback_daily
+  for each row execute function public.set_change_xid();
+
+-- A sync reads only the student's changes since the cursor, however long their history is.
+create index if not exists idx_tasks_student_change on public.tasks (student_id, change_xid);
+create index if not exists idx_task_submissions_student_change on public.task_submissions (student_id, change_xid);
+create index if not exists idx_feedback_daily_student_change on public.feedback_daily (student_id, change_xid);
+
+-- key: task or submission id, feedback date (YYYY-MM-DD). No foreign key: a student's rows are deleted (and leave
+-- tombstones) while the student is being deleted.
+create table if not exists public.sync_tombstones (
+  id bigint generated always as identity primary key,
+  student_id uuid not null,
+  kind text not null check (kind in ('task', 'submission', 'feedback')),
+  key text not null,
+  change_xid xid8 not null default pg_current_xact_id(),
+  deleted_at timestamptz not null default now()
+);
+
+create index if not exists idx_sync_tombstones_student_change on public.sync_tombstones (student_id, change_xid);
+create index if not exists idx_sync_tombstones_deleted_at on public.sync_tombstones (deleted_at);
+
+alter table public.sync_tombstones enable row level security;
+
+comment on table public.sync_tombstones is 'Deleted (or moved away) tasks, submissions and feedback days per student, for delta sync. Pruned by prune_sync_tombstones().';
+
+-- Trigger arguments: kind, and the column holding the key.
+create or replace function public.record_sync_tombstone()
+returns trigger
+language plpgsql
+as $$
+begin
+  insert into public.sync_tombstones (student_id, kind, key)
+  values (old.student_id, tg_argv[0], to_jsonb(old) ->> tg_argv[1]);
+  return null;
+end;
+$$;
+
+drop trigger if exists tasks_sync_tombstone on public.tasks;
+create trigger tasks_sync_tombstone
+  after delete on public.tasks
+  for each row execute function public.record_sync_tombstone('task', 'id');
+
+drop trigger if exists tasks_sync_tombstone_move on public.tasks;
+create trigger tasks_sync_tombstone_move
+  after update of student_id on public.tasks
+  for each row when (old.student_id is distinct from new.student_id)
+  execute function public.record_sync_tombstone('task', 'id');
+
+drop trigger if exists task_submissions_sync_tombstone on public.task_submissions;
+create trigger task_submissions_sync_tombstone
+  after delete on public.task_submissions
+  for each row execute function public.record_sync_tombstone('submission', 'id');
+
+drop trigger if exists feedback_daily_sync_tombstone on public.feedback_daily;
+create trigger feedback_daily_sync_tombstone
+  after delete on public.feedback_daily
+  for each row execute function public.record_sync_tombstone('feedback', 'date');
+
+-- Highest change_xid of the pruned tombstones: older cursors may have missed a delete and must start over.
+create table if not exists public.sync_state (
+  id boolean primary key default true check (id),
+  pruned_xid xid8 not null default '0'
+);
+insert into public.sync_state default values on conflict do nothing;
+alter table public.sync_state enable row level security;
+
+-- Returns {cursor, reset, tasks, submissions, feedback, deleted: {tasks, submissions, feedback}}: rows as stored
+-- (feedback rows without change_xid; submissions without idempotency_key), deleted ids / feedback dates.
+-- reset: the client must reload everything through the list endpoints, then sync from the returned cursor. Set when
+-- more than p_limit rows of one kind changed, or the cursor is older than the pruned tombstones or was never issued.
+-- No cursor (p_since null) returns the whole history, or reset if it is too large.
+-- stable: every statement reads in the calling query's snapshot, whose xmin becomes the cursor. plpgsql so the
+-- (student_id, change_xid) index scans take p_since as a bound and their plans are cached per connection.
+create or replace function public.sync_changes(p_student_id uuid, p_since xid8 default null, p_limit int default 1000)
+returns jsonb
+language plpgsql
+stable
+as $$
+declare
+  snapshot pg_snapshot := pg_current_snapshot();
+  since xid8 := coalesce(p_since, '0'::xid8);
+  reset boolean;
+  over boolean;
+  tasks jsonb;
+  submissions jsonb;
+  feedback jsonb;
+  deleted jsonb;
+begin
+  reset := p_since is not null and (
+    p_since <= (select pruned_xid from public.sync_state) or p_since > pg_snapshot_xmax(snapshot)
+  );
+
+  if not reset then
+    select coalesce(jsonb_agg(to_jsonb(t) - 'change_xid' order by t.change_xid), '[]'::jsonb), count(*) > p_limit
+    into tasks, over
+    from (
+      select * from public.tasks
+      where student_id = p_student_id and change_xid >= since
+      order by change_xid
+      limit p_limit + 1
+    ) t;
+    reset := over;
+  end if;
+
+  if not reset then
+    select coalesce(jsonb_agg(to_jsonb(s) - 'change_xid' - 'idempotency_key' order by s.change_xid), '[]'::jsonb),
+           count(*) > p_limit
+    into submissions, over
+    from (
+      select * from public.task_submissions
+      where student_id = p_student_id and change_xid >= since
+      order by change_xid
+      limit p_limit + 1
+    ) s;
+    reset := over;
+  end if;
+
+  if not reset then
+    select coalesce(jsonb_agg(to_jsonb(f) - 'change_xid' order by f.change_xid), '[]'::jsonb), count(*) > p_limit
+    into feedback, over
+    from (
+      select * from public.feedback_daily
+      where student_id = p_student_id and change_xid >= since
+      order by change_xid
+      limit p_limit + 1
+    ) f;
+    reset := over;
+  end if;
+
+  -- A tombstone is dropped when the row exists again for the student (feedback re-saved, task moved back).
+  if not reset then
+    select jsonb_build_object(
+             'tasks', coalesce(jsonb_agg(d.key) filter (where d.kind = 'task'), '[]'::jsonb),
+             'submissions', coalesce(jsonb_agg(d.key) filter (where d.kind = 'submission'), '[]'::jsonb),
+             'feedback', coalesce(jsonb_agg(d.key) filter (where d.kind = 'feedback'), '[]'::jsonb)
+           ),
+           count(*) > p_limit
+    into deleted, over
+    from (
+      select d.kind, d.key from public.sync_tombstones d
+      where d.student_id = p_student_id and d.change_xid >= since
+        and not case d.kind
+          when 'task' then exists (select 1 from public.tasks x where x.id = d.key::uuid and x.student_id = p_student_id)
+          when 'submission' then exists (
+            select 1 from public.task_submissions x where x.id = d.key::uuid and x.student_id = p_student_id
+          )
+          else exists (select 1 from public.feedback_daily x where x.student_id = p_student_id and x.date = d.key::date)
+        end
+      group by d.kind, d.key
+      order by max(d.change_xid)
+      limit p_limit + 1
+    ) d;
+    reset := over;
+  end if;
+
+  if reset then
+    tasks := '[]'::jsonb;
+    submissions := '[]'::jsonb;
+    feedback := '[]'::jsonb;
+    deleted := jsonb_build_object('tasks', '[]'::jsonb, 'submissions', '[]'::jsonb, 'feedback', '[]'::jsonb);
+  end if;
+  return jsonb_build_object(
+    'cursor', pg_snapshot_xmin(snapshot)::text,
+    'reset', reset,
+    'tasks', tasks,
+    'submissions', submissions,
+    'feedback', feedback,
+    'deleted', deleted
+  );
+end;
+$$;
+
+-- Delete tombstones older than p_keep and raise the pruned watermark; returns how many were deleted.
+-- Schedule it (e.g. pg_cron daily) or run scripts/prune_sync_tombstones.py. Clients offline for longer get reset.
+create or replace function public.prune_sync_tombstones(p_keep interval default interval '90 days')
+returns int
+language plpgsql
+as $$
+declare
+  pruned xid8;
+  n int;
+begin
+  with gone as (
+    delete from public.sync_tombstones where deleted_at < now() - p_keep returning change_xid
+  )
+  select max(change_xid), count(*) into pruned, n from gone;
+  if pruned is not null then
+    update public.sync_state set pruned_xid = greatest(pruned_xid, pruned);
+  end if;
+  return n;
+end;
+$$;
+
+-- Server-only (service role): p_student_id is trusted.
+revoke execute on function public.sync_changes(uuid, xid8, int) from public, anon, authenticated;
+revoke execute on function public.prune_sync_tombstones(interval) from public, anon, authenticated;
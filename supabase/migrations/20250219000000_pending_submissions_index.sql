@@ -0,0 +1,6 @@
+-- Pending asynchronous submissions, looked up at startup (submission_uploads.py) to find rows whose spooled files
+-- were lost with the process that received them. Run in Supabase SQL Editor.
+
+create index if not exists task_submissions_pending_idx
+  on public.task_submissions (submitted_at)
+  where upload_status = 'pending';
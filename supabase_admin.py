@@ -1,15 +1,70 @@
 """Supabase admin client (service role). Server-only.
-   Used only for database access (PostgREST). Not used for Supabase Auth."""
+   Used only for database access (PostgREST) and Storage. Not used for Supabase Auth."""
+import time
+
+import anyio
 from supabase import create_client
 
 from config import SUPABASE_SERVICE_ROLE_KEY, SUPABASE_URL
+from metrics import observe_db, postgrest_labels
 
 _admin_client = None
+_db_client = None
 
 
 def get_supabase_admin():
-    """Singleton Supabase client with service role. Database only (auth_users, etc.). Use only on the server."""
+    """Singleton Supabase client with service role. Sync: for scripts, storage uploads (worker threads) and the
+    background work that is not on the event loop. Request handlers use get_supabase_db()."""
     global _admin_client
     if _admin_client is None:
         _admin_client = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
     return _admin_client
+
+
+class _ThreadedQuery:
+    """Sync request builder behind the async interface: builder calls pass through, execute() runs in a worker thread."""
+
+    def __init__(self, builder):
+        self._builder = builder
+
+    def __getattr__(self, name):
+        method = getattr(self._builder, name)
+
+        def call(*args, **kwargs):
+            return _ThreadedQuery(method(*args, **kwargs))
+
+        return call
+
+    async def execute(self):
+        builder = self._builder
+        table, operation = postgrest_labels(builder.http_method, builder.path, builder.headers.get("Prefer"))
+        start = time.perf_counter()
+        ok = False
+        try:
+            result = await anyio.to_thread.run_sync(builder.execute)
+            ok = True
+            return result
+        finally:
+            observe_db("postgrest", table, operation, time.perf_counter() - start, ok)
+
+
+class ThreadedDb:
+    """The sync client behind an async interface, each query blocking a threadpool worker."""
+
+    def __init__(self, client):
+        self._client = client
+
+    def table(self, name: str) -> _ThreadedQuery:
+        return _ThreadedQuery(self._client.table(name))
+
+    def rpc(self, fn: str, params: dict | None = None) -> _ThreadedQuery:
+        return _ThreadedQuery(self._client.rpc(fn, params or {}))
+
+
+async def get_supabase_db():
+    """Database client for request handlers: table()/rpc() builders whose execute() is awaited (the sync client in
+    worker threads). FastAPI dependency (async, so it never takes a worker thread)."""
+    global _db_client
+    if _db_client is None:
+        _db_client = ThreadedDb(get_supabase_admin())
+    return _db_client
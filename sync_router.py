@@ -0,0 +1,41 @@
+"""Delta sync: GET /api/sync returns a student's tasks, submissions and feedback changed or deleted since the client's
+   cursor, and the next cursor, in one public.sync_changes() call. Reads only the changes (change_xid and tombstone
+   indexes per student), so the payload and query cost follow the amount of change, not the length of the history."""
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from auth_deps import get_current_user
+from fast_json import json_response
+from repository import get_repository
+from serializers import row_to_payload, row_to_task, submission_body
+from validators import target_student
+
+router = APIRouter(prefix="/api", tags=["sync"])
+
+# Changed rows of one kind per response; more mean the client reloads everything (reset) instead.
+MAX_SYNC_CHANGES = 1000
+
+
+@router.get("/sync")
+async def sync_changes(
+    cursor: str | None = Query(None, description="cursor from the previous sync; omit for the first"),
+    student_id: str | None = Query(None, description="Mentor: the student to sync (required)"),
+    current: dict = Depends(get_current_user),
+    repo=Depends(get_repository),
+):
+    """Changes since cursor: {cursor, reset, tasks, submissions, feedback, deleted: {tasks, submissions, feedback}}.
+    Apply upserts by id (feedback by date) and deletes, then store cursor. Changes may repeat across syncs.
+    reset: too much changed or the cursor expired; reload through the list endpoints, then sync from cursor."""
+    sid = target_student(current, student_id)
+    # A cursor is a transaction id (xid8) this endpoint returned.
+    if cursor is not None and not (cursor.isascii() and cursor.isdigit() and int(cursor) < 2**64):
+        raise HTTPException(status_code=400, detail="유효하지 않은 cursor입니다.")
+    result = await repo.sync_changes(sid, cursor, MAX_SYNC_CHANGES)
+    return json_response({
+        "cursor": result["cursor"],
+        "reset": result["reset"],
+        "student_id": sid,
+        "tasks": [row_to_task(row) for row in result["tasks"]],
+        "submissions": [submission_body(row) for row in result["submissions"]],
+        "feedback": [{"date": row["date"], **row_to_payload(row)} for row in result["feedback"]],
+        "deleted": result["deleted"],
+    })
@@ -1,10 +1,29 @@
 """과제 (tasks) API: mentor creates tasks (with optional file uploads), student gets and submits (with optional file uploads)."""
-from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile
+import base64
+import json
+import os
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import BinaryIO, Iterator
+
+from fastapi import APIRouter, Depends, File, Form, Header, HTTPException, Query, Request, Response, UploadFile
 from pydantic import BaseModel
 
 from auth_deps import get_current_user, require_mentor, require_student
-from storage_helper import upload_submission_file, upload_task_attachment
-from supabase_admin import get_supabase_admin
+from config import ASYNC_SUBMIT_ENABLED
+from direct_uploads import finalized_direct_uploads
+from event_hub import MENTORS, publish, user_topic
+from fast_json import json_response
+from http_cache import etag_for, is_not_modified, not_modified, row_version, rows_etag
+from image_processing import schedule_submission_images
+from repository import get_repository
+from serializers import row_to_task, row_to_task_with_submission, submission_body
+from storage_helper import remove_uploaded_files, upload_submission_files, upload_task_attachments
+from submission_uploads import discard_spool, enqueue_submission_upload, has_upload_capacity, spool_submission_files
+from upload_sessions import completed_uploads
+from user_directory import UserDirectory, get_user_directory
+from validators import is_uuid, parse_date, parse_range
 
 router = APIRouter(prefix="/api", tags=["tasks"])
 
@@ -12,6 +31,21 @@ SUBJECTS = {"korean", "math", "english"}
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10 MB
 MAX_FILES_CREATE = 5
 MAX_FILES_SUBMIT = 10
+MAX_BULK_STUDENTS = 200
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+# Request body limits of the multipart routes, enforced in main while the body is received (before it is spooled):
+# (method, path pattern, whole body: every file at the limit plus form fields / boundaries, one part: a file plus its headers).
+_MAX_PART_SIZE = MAX_FILE_SIZE + 64 * 1024
+BODY_LIMITS = [
+    ("POST", r"/api/tasks", MAX_FILES_CREATE * MAX_FILE_SIZE + 1024 * 1024, _MAX_PART_SIZE),
+    ("POST", r"/api/tasks/bulk", MAX_FILES_CREATE * MAX_FILE_SIZE + 1024 * 1024, _MAX_PART_SIZE),
+    ("POST", r"/api/tasks/[^/]+/submit", MAX_FILES_SUBMIT * MAX_FILE_SIZE + 1024 * 1024, _MAX_PART_SIZE),
+]
+# GET /api/tasks page size (keyset pagination on due_date, created_at, id)
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+# GET /api/submissions: due-date window per request
+MAX_SUBMISSION_RANGE_DAYS = 93
 
 
 # --- Pydantic models (for JSON responses and optional JSON body) ---
@@ -35,31 +69,131 @@ class TaskOut(BaseModel):
     source: str = "mentor"
     attachments: list[TaskAttachmentOut] | None = None
 
+class BulkAssignResult(BaseModel):
+    student_id: str
+    ok: bool
+    task: TaskOut | None = None
+    detail: str | None = None
+
+class BulkAssignOut(BaseModel):
+    created: int
+    results: list[BulkAssignResult]
+
 # --- Helpers ---
 
-def _row_to_task(row: dict) -> dict:
-    due = row["due_date"]
-    due_str = due.isoformat() if hasattr(due, "isoformat") else str(due)
-    created_at = row.get("created_at")
-    created_at_str = created_at.isoformat() if created_at and hasattr(created_at, "isoformat") else (str(created_at) if created_at else None)
-    attachments = row.get("attachments")
-    if attachments is None:
-        attachments = []
+def _include_submission(include: str | None) -> bool:
+    if include is None:
+        return False
+    if include != "submission":
+        raise HTTPException(status_code=400, detail="include must be submission")
+    return True
+
+
+def _tasks_etag(rows: list[dict], with_submission: bool, *extra: str) -> str:
+    """rows_etag over (id, updated_at); with submissions, each submission's version too (a submit leaves
+    tasks.updated_at alone)."""
+    if not with_submission:
+        return rows_etag(rows, ("id",), *extra)
+    return etag_for(
+        *(row_version(r, ("id",)) for r in rows),
+        *(row_version(r["submission"], ("id",)) if r.get("submission") else "-" for r in rows),
+        "submission", *extra,
+    )
+
+
+def _check_task_fields(title: str, subject: str, file_count: int) -> None:
+    if subject not in SUBJECTS:
+        raise HTTPException(status_code=400, detail="subject must be korean, math, or english")
+    if not title or not title.strip():
+        raise HTTPException(status_code=400, detail="과제명을 입력해 주세요.")
+    if file_count > MAX_FILES_CREATE:
+        raise HTTPException(status_code=400, detail=f"최대 {MAX_FILES_CREATE}개 파일만 첨부할 수 있습니다.")
+
+
+def _task_row(
+    title: str, subject: str, due_date: str, description: str, goal: str,
+    student_id: str, mentor_id: str, attachments: list[dict],
+) -> dict:
     return {
-        "id": str(row["id"]),
-        "title": row["title"],
-        "subject": row["subject"],
-        "due_date": due_str,
-        "description": row.get("description"),
-        "goal": row.get("goal"),
-        "student_id": str(row["student_id"]),
-        "created_by": str(row["created_by"]) if row.get("created_by") else None,
-        "created_at": created_at_str,
-        "source": row.get("source") or "mentor",
+        "title": title.strip(),
+        "subject": subject,
+        "due_date": due_date,
+        "description": description.strip() or None,
+        "goal": goal.strip() or None,
+        "student_id": student_id,
+        "created_by": mentor_id,
+        "source": "mentor",
         "attachments": attachments,
     }
 
 
+def _encode_cursor(row: dict) -> str:
+    """Opaque cursor for the last row of a page: its (due_date, created_at, id) sort key."""
+    key = [str(row["due_date"]), str(row["created_at"]), str(row["id"])]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[str, str, str]:
+    try:
+        due, created_at, task_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        # Validated so the values are safe to embed in a PostgREST filter.
+        parse_date(due, "cursor")
+        datetime.fromisoformat(created_at)
+        uuid.UUID(task_id)
+    except (ValueError, TypeError, HTTPException):
+        raise HTTPException(status_code=400, detail="유효하지 않은 cursor입니다.")
+    return due, created_at, task_id
+
+
+def _open_upload(f: UploadFile) -> tuple[BinaryIO, str, str, int]:
+    """
+    Return (reader, filename, content_type, size) for an uploaded file without loading it into memory.
+    Starlette has already spooled the part to a temp file; oversize files are rejected from that size before
+    any byte is read, and the part is rolled to disk so storage uploads stream from disk in chunks.
+    """
+    size = f.size
+    if size is not None and size > MAX_FILE_SIZE:
+        raise HTTPException(status_code=400, detail=f"파일 크기는 {MAX_FILE_SIZE // (1024*1024)}MB 이하여야 합니다.")
+    fd = f.file.fileno()  # SpooledTemporaryFile rolls over to disk
+    if size is None:
+        size = os.fstat(fd).st_size
+        if size > MAX_FILE_SIZE:
+            raise HTTPException(status_code=400, detail=f"파일 크기는 {MAX_FILE_SIZE // (1024*1024)}MB 이하여야 합니다.")
+    reader = open(os.dup(fd), "rb")
+    reader.seek(0)
+    return reader, f.filename, f.content_type or "application/octet-stream", size
+
+
+@contextmanager
+def _open_uploads(files: list[UploadFile]) -> Iterator[list[tuple[BinaryIO, str, str, int]]]:
+    """Validate and open every named upload before any storage call; close the readers afterwards."""
+    opened: list[tuple[BinaryIO, str, str, int]] = []
+    try:
+        for f in files:
+            if f.filename:
+                opened.append(_open_upload(f))
+        yield opened
+    finally:
+        for reader, *_ in opened:
+            reader.close()
+
+
+async def _upload_attachments(
+    files: list[UploadFile], upload_ids: list[str], upload_keys: list[str], mentor_id: str,
+) -> list[dict]:
+    """Upload mentor attachments concurrently; returns tasks.attachments entries ({name, type, size, url}),
+    followed by those of completed resumable uploads (upload_ids) and direct uploads (upload_keys, see uploads_router)."""
+    # Resolved first so a bad upload id or key fails before anything is uploaded.
+    stored = await completed_uploads(mentor_id, upload_ids, "attachment")
+    stored += await finalized_direct_uploads(mentor_id, upload_keys, "attachment")
+    with _open_uploads(files) as uploads:
+        urls = await upload_task_attachments([(reader, name, content_type) for reader, name, content_type, _ in uploads])
+    return [
+        {"name": name, "type": content_type, "size": size, "url": url}
+        for (_, name, content_type, size), url in zip(uploads, urls)
+    ] + stored
+
+
 # --- Mentor: create task (multipart: form fields + optional files) ---
 
 @router.post("/tasks", response_model=TaskOut)
@@ -71,181 +205,335 @@ async def create_task(
     goal: str = Form(""),
     student_id: str = Form(...),
     files: list[UploadFile] = File(default=[]),
+    upload_ids: list[str] = Form(default=[], description="Completed resumable uploads (purpose attachment)"),
+    upload_keys: list[str] = Form(default=[], description="Direct uploads to storage (purpose attachment)"),
     current: dict = Depends(require_mentor),
-    supabase=Depends(get_supabase_admin),
+    repo=Depends(get_repository),
+    directory: UserDirectory = Depends(get_user_directory),
 ):
-    """Create a 과제 (mentor only). Form fields + optional file uploads (attachments)."""
-    if subject not in SUBJECTS:
-        raise HTTPException(status_code=400, detail="subject must be korean, math, or english")
-    if not title or not title.strip():
-        raise HTTPException(status_code=400, detail="과제명을 입력해 주세요.")
-    if len(files) > MAX_FILES_CREATE:
-        raise HTTPException(status_code=400, detail=f"최대 {MAX_FILES_CREATE}개 파일만 첨부할 수 있습니다.")
+    """Create a 과제 (mentor only). Form fields + optional file uploads (attachments), upload_ids and/or upload_keys."""
+    _check_task_fields(title, subject, len(files) + len(upload_ids) + len(upload_keys))
     mentor_id = current["sub"]
-    student_row = (
-        supabase.table("auth_users")
-        .select("id, role")
-        .eq("id", student_id)
-        .execute()
-    )
-    if not student_row.data or len(student_row.data) == 0:
+    student = await directory.get(student_id)
+    if student is None:
         raise HTTPException(status_code=404, detail="학생을 찾을 수 없습니다.")
-    if student_row.data[0].get("role") != "student":
+    if student.get("role") != "student":
         raise HTTPException(status_code=400, detail="학생에게만 과제를 배정할 수 있습니다.")
 
-    attachments: list[dict] = []
-    for f in files:
-        if not f.filename:
-            continue
-        data = await f.read()
-        if len(data) > MAX_FILE_SIZE:
-            raise HTTPException(status_code=400, detail=f"파일 크기는 {MAX_FILE_SIZE // (1024*1024)}MB 이하여야 합니다.")
-        content_type = f.content_type or "application/octet-stream"
-        url = upload_task_attachment(data, f.filename, content_type)
-        attachments.append({"name": f.filename, "type": content_type, "size": len(data), "url": url})
-
-    row = {
-        "title": title.strip(),
-        "subject": subject,
-        "due_date": due_date,
-        "description": description.strip() or None,
-        "goal": goal.strip() or None,
-        "student_id": student_id,
-        "created_by": mentor_id,
-        "source": "mentor",
-        "attachments": attachments,
-    }
-    insert = supabase.table("tasks").insert(row).execute()
-    if not insert.data or len(insert.data) == 0:
+    attachments = await _upload_attachments(files, upload_ids, upload_keys, mentor_id)
+    row = _task_row(title, subject, due_date, description, goal, student_id, mentor_id, attachments)
+    created = await repo.insert_tasks([row])
+    if not created:
         raise HTTPException(status_code=500, detail="과제 생성에 실패했습니다.")
-    return _row_to_task(insert.data[0])
+    task = row_to_task(created[0])
+    publish([user_topic(student_id)], "task.created", task)
+    return json_response(task)
+
+
+# --- Mentor: assign one task to many students ---
+
+@router.post("/tasks/bulk", response_model=BulkAssignOut)
+async def create_tasks_bulk(
+    title: str = Form(...),
+    subject: str = Form(...),
+    due_date: str = Form(...),
+    description: str = Form(""),
+    goal: str = Form(""),
+    student_ids: list[str] = Form(..., description="Repeat the field (or comma-separate) for each student"),
+    files: list[UploadFile] = File(default=[]),
+    upload_ids: list[str] = Form(default=[], description="Completed resumable uploads (purpose attachment)"),
+    upload_keys: list[str] = Form(default=[], description="Direct uploads to storage (purpose attachment)"),
+    current: dict = Depends(require_mentor),
+    repo=Depends(get_repository),
+    directory: UserDirectory = Depends(get_user_directory),
+):
+    """Assign the same 과제 to many students (mentor only). Students are validated in one lookup, attachments are
+    uploaded once and shared, and all task rows are written in one insert. Returns a result per requested student."""
+    _check_task_fields(title, subject, len(files) + len(upload_ids) + len(upload_keys))
+    ids = list(dict.fromkeys(sid.strip() for raw in student_ids for sid in raw.split(",") if sid.strip()))
+    if not ids:
+        raise HTTPException(status_code=400, detail="학생을 선택해 주세요.")
+    if len(ids) > MAX_BULK_STUDENTS:
+        raise HTTPException(status_code=400, detail=f"한 번에 최대 {MAX_BULK_STUDENTS}명에게 배정할 수 있습니다.")
+    mentor_id = current["sub"]
+    users = await directory.get_many([sid for sid in ids if is_uuid(sid)])
+
+    results: dict[str, BulkAssignResult] = {}
+    targets: list[str] = []
+    for sid in ids:
+        user = users.get(sid)
+        if user is None:
+            results[sid] = BulkAssignResult(student_id=sid, ok=False, detail="학생을 찾을 수 없습니다.")
+        elif user.get("role") != "student":
+            results[sid] = BulkAssignResult(student_id=sid, ok=False, detail="학생에게만 과제를 배정할 수 있습니다.")
+        else:
+            targets.append(sid)
+
+    if targets:
+        attachments = await _upload_attachments(files, upload_ids, upload_keys, mentor_id)
+        rows = [_task_row(title, subject, due_date, description, goal, sid, mentor_id, attachments) for sid in targets]
+        inserted = await repo.insert_tasks(rows)
+        if len(inserted) != len(rows):
+            raise HTTPException(status_code=500, detail="과제 생성에 실패했습니다.")
+        for created in inserted:
+            task = row_to_task(created)
+            results[task["student_id"]] = BulkAssignResult(student_id=task["student_id"], ok=True, task=task)
+            publish([user_topic(task["student_id"])], "task.created", task)
+    return BulkAssignOut(created=len(targets), results=[results[sid] for sid in ids])
 
 
 # --- List students (mentor) ---
 
 @router.get("/students")
-def list_students(
+async def list_students(
     current: dict = Depends(require_mentor),
-    supabase=Depends(get_supabase_admin),
+    directory: UserDirectory = Depends(get_user_directory),
 ):
-    """List all students (mentor only). For dropdown when creating tasks."""
-    r = (
-        supabase.table("auth_users")
-        .select("id, email, name")
-        .eq("role", "student")
-        .order("name")
-        .execute()
-    )
-    return {
-        "students": [
-            {"id": str(x["id"]), "email": x["email"], "name": x.get("name") or x["email"]}
-            for x in (r.data or [])
-        ]
-    }
+    """List all students (mentor only). For dropdown when creating tasks. Served from the user directory."""
+    return {"students": await directory.students()}
 
 
 # --- Student: list my tasks ---
 
 @router.get("/tasks", response_model=list[TaskOut])
-def list_tasks(
+async def list_tasks(
+    request: Request,
     current: dict = Depends(get_current_user),
     due_date: str | None = Query(None, description="Filter by due_date YYYY-MM-DD"),
     student_id: str | None = Query(None, description="Mentor: filter by student_id"),
-    supabase=Depends(get_supabase_admin),
+    from_date: str | None = Query(None, alias="from", description="due_date >= YYYY-MM-DD"),
+    to_date: str | None = Query(None, alias="to", description="due_date <= YYYY-MM-DD"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    cursor: str | None = Query(None, description="X-Next-Cursor from the previous page"),
+    include: str | None = Query(None, description="submission: each task's submission (or null), same query"),
+    repo=Depends(get_repository),
 ):
-    """List tasks. Student: only own tasks (optional due_date). Mentor: optional student_id filter."""
+    """List tasks ordered by due_date, created_at. Student: only own tasks (optional due_date). Mentor: optional student_id filter.
+    Both: optional from/to range. Paginated: when more rows exist, the X-Next-Cursor header holds the cursor for the next page.
+    ETag from the rows' (id, updated_at); If-None-Match returns 304 without building the body.
+    include=submission adds "submission" to each task, embedded in the same query instead of a lookup per task."""
     user_id = current["sub"]
     role = current.get("role") or "student"
-    cols = "id, title, subject, due_date, description, goal, student_id, created_by, created_at, source, attachments"
     if role == "student":
-        q = supabase.table("tasks").select(cols).eq("student_id", user_id)
-        if due_date:
-            q = q.eq("due_date", due_date)
+        student_id = user_id
     else:
-        q = supabase.table("tasks").select(cols)
-        if student_id:
-            q = q.eq("student_id", student_id)
-    r = q.order("due_date").order("created_at").execute()
-    return [_row_to_task(row) for row in (r.data or [])]
+        due_date = None
+    if due_date:
+        parse_date(due_date, "due_date")
+    if from_date:
+        parse_date(from_date, "from")
+    if to_date:
+        parse_date(to_date, "to")
+    with_submission = _include_submission(include)
+    after = _decode_cursor(cursor) if cursor else None
+    # One extra row tells us whether there is a next page.
+    rows = await repo.list_tasks(
+        student_id=student_id, due_date=due_date, from_date=from_date, to_date=to_date, after=after, limit=limit + 1,
+        with_submission=with_submission,
+    )
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1])
+    etag = _tasks_etag(rows, with_submission, "tasks", next_cursor or "")
+    headers = {"ETag": etag}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    if is_not_modified(request, etag):
+        return not_modified(etag, headers)
+    to_task = row_to_task_with_submission if with_submission else row_to_task
+    return json_response([to_task(row) for row in rows], headers)
 
 
 # --- Get single task ---
 
 @router.get("/tasks/{task_id}", response_model=TaskOut)
-def get_task(
+async def get_task(
     task_id: str,
+    request: Request,
     current: dict = Depends(get_current_user),
-    supabase=Depends(get_supabase_admin),
+    include: str | None = Query(None, description="submission: the task's submission (or null), same query"),
+    repo=Depends(get_repository),
 ):
-    """Get one task. Student: only own. Mentor: any."""
+    """Get one task. Student: only own. Mentor: any. ETag from (id, updated_at); If-None-Match returns 304.
+    include=submission adds "submission" as in GET /api/tasks."""
     user_id = current["sub"]
     role = current.get("role") or "student"
-    r = supabase.table("tasks").select("*").eq("id", task_id).execute()
-    if not r.data or len(r.data) == 0:
+    with_submission = _include_submission(include)
+    row = await repo.get_task(task_id, with_submission=with_submission)
+    if row is None or (role == "student" and str(row["student_id"]) != user_id):
         raise HTTPException(status_code=404, detail="과제를 찾을 수 없습니다.")
-    row = r.data[0]
-    if role == "student" and str(row["student_id"]) != user_id:
-        raise HTTPException(status_code=404, detail="과제를 찾을 수 없습니다.")
-    return _row_to_task(row)
+    etag = _tasks_etag([row], with_submission, "task")
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    return json_response((row_to_task_with_submission if with_submission else row_to_task)(row), {"ETag": etag})
 
 
 # --- Student: submit task (multipart: form fields + optional files) ---
 
+# public.submit_task() statuses that end the request with an error.
+_SUBMIT_ERRORS = {
+    "not_found": (404, "과제를 찾을 수 없습니다."),
+    "forbidden": (403, "본인 과제만 제출할 수 있습니다."),
+    "already_submitted": (400, "이미 제출했습니다."),
+}
+
+
+def _check_submit_status(result: dict) -> None:
+    error = _SUBMIT_ERRORS.get(result.get("status"))
+    if error:
+        raise HTTPException(status_code=error[0], detail=error[1])
+
+
+def _publish_submission(sub: dict) -> None:
+    publish([user_topic(str(sub["student_id"])), MENTORS], "submission.created", submission_body(sub))
+
+
+def _submission_response(result: dict) -> Response:
+    if result.get("status") not in ("created", "replayed"):
+        raise HTTPException(status_code=500, detail="제출에 실패했습니다.")
+    return json_response(
+        submission_body(result["submission"]),
+        {"Idempotent-Replayed": "true"} if result["status"] == "replayed" else None,
+    )
+
+
+def _prefers_async(prefer: str | None) -> bool:
+    """Prefer: respond-async (RFC 7240), possibly among other preferences."""
+    if not prefer:
+        return False
+    return any(p.split(";", 1)[0].split("=", 1)[0].strip().lower() == "respond-async" for p in prefer.split(","))
+
+
 @router.post("/tasks/{task_id}/submit")
 async def submit_task(
     task_id: str,
     study_time_minutes: int = Form(0),
     files: list[UploadFile] = File(default=[]),
+    upload_ids: list[str] = Form(default=[], description="Completed resumable uploads (purpose submission, this task)"),
+    upload_keys: list[str] = Form(default=[], description="Direct uploads to storage (purpose submission, this task)"),
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key", max_length=MAX_IDEMPOTENCY_KEY_LENGTH),
+    prefer: str | None = Header(None),
     current: dict = Depends(require_student),
-    supabase=Depends(get_supabase_admin),
+    repo=Depends(get_repository),
 ):
-    """Submit a 과제 (student only). Form: study_time_minutes + optional file uploads. One submission per task."""
+    """Submit a 과제 (student only). Form: study_time_minutes + optional file uploads. One submission per task.
+    Checked and written in one public.submit_task() call; with files, a dry run of the same call first keeps duplicates
+    from uploading. A retry with the same Idempotency-Key returns the stored submission (Idempotent-Replayed: true).
+    Thumbnails and previews of the images are rendered after the response (thumbnail_urls / preview_urls).
+    Files uploaded through /api/uploads are passed as upload_ids (resumable) or upload_keys (direct to storage) and
+    come first in image_urls.
+    With ASYNC_SUBMIT_ENABLED and "Prefer: respond-async", files are spooled and uploaded after a 202 response
+    (upload_status pending; poll GET /api/tasks/{task_id}/submission)."""
     student_id = current["sub"]
-    task_r = supabase.table("tasks").select("id, student_id").eq("id", task_id).execute()
-    if not task_r.data or len(task_r.data) == 0:
-        raise HTTPException(status_code=404, detail="과제를 찾을 수 없습니다.")
-    if str(task_r.data[0]["student_id"]) != student_id:
-        raise HTTPException(status_code=403, detail="본인 과제만 제출할 수 있습니다.")
-    existing = (
-        supabase.table("task_submissions")
-        .select("id")
-        .eq("task_id", task_id)
-        .eq("student_id", student_id)
-        .execute()
-    )
-    if existing.data and len(existing.data) > 0:
-        raise HTTPException(status_code=400, detail="이미 제출했습니다.")
-    if len(files) > MAX_FILES_SUBMIT:
+    if len(files) + len(upload_ids) + len(upload_keys) > MAX_FILES_SUBMIT:
         raise HTTPException(status_code=400, detail=f"최대 {MAX_FILES_SUBMIT}개 파일만 첨부할 수 있습니다.")
+    minutes = max(0, study_time_minutes)
+    stored = await completed_uploads(student_id, upload_ids, "submission", task_id)
+    stored += await finalized_direct_uploads(student_id, upload_keys, "submission", task_id)
+    stored_urls = [f["url"] for f in stored]
+
+    has_files = any(f.filename for f in files)
+    if has_files and ASYNC_SUBMIT_ENABLED and _prefers_async(prefer) and has_upload_capacity():
+        return await _submit_async(task_id, student_id, minutes, files, stored_urls, idempotency_key, repo)
 
     image_urls: list[str] = []
-    for f in files:
-        if not f.filename:
-            continue
-        data = await f.read()
-        if len(data) > MAX_FILE_SIZE:
-            raise HTTPException(status_code=400, detail=f"파일 크기는 {MAX_FILE_SIZE // (1024*1024)}MB 이하여야 합니다.")
-        content_type = f.content_type or "application/octet-stream"
-        url = upload_submission_file(task_id, data, f.filename, content_type)
-        image_urls.append(url)
+    if has_files:
+        # Dry run first so a duplicate or retried submit never uploads.
+        result = await repo.submit_task(task_id, student_id, minutes, [], idempotency_key, dry_run=True)
+        _check_submit_status(result)
+        if result["status"] == "replayed":
+            return _submission_response(result)
+        with _open_uploads(files) as uploads:
+            image_urls = await upload_submission_files(
+                task_id, [(reader, name, content_type) for reader, name, content_type, _ in uploads]
+            )
+    result = await repo.submit_task(task_id, student_id, minutes, stored_urls + image_urls, idempotency_key)
+    if result["status"] != "created" and image_urls:
+        # Lost a race with a concurrent submit of the same task.
+        await remove_uploaded_files(image_urls)
+    _check_submit_status(result)
+    if result["status"] == "created":
+        schedule_submission_images(repo, result["submission"])
+        _publish_submission(result["submission"])
+    return _submission_response(result)
 
-    row = {
-        "task_id": task_id,
-        "student_id": student_id,
-        "study_time_minutes": max(0, study_time_minutes),
-        "image_urls": image_urls,
-    }
-    insert = supabase.table("task_submissions").insert(row).execute()
-    if not insert.data or len(insert.data) == 0:
-        raise HTTPException(status_code=500, detail="제출에 실패했습니다.")
-    sub = insert.data[0]
-    submitted_at = sub.get("submitted_at")
-    if submitted_at is not None and hasattr(submitted_at, "isoformat"):
-        submitted_at = submitted_at.isoformat()
-    return {
-        "id": str(sub["id"]),
-        "task_id": task_id,
-        "submitted_at": submitted_at,
-        "study_time_minutes": sub.get("study_time_minutes", 0),
-        "image_urls": sub.get("image_urls") or [],
-    }
+
+async def _submit_async(
+    task_id: str, student_id: str, minutes: int, files: list[UploadFile], stored_urls: list[str],
+    idempotency_key: str | None, repo,
+) -> Response:
+    """Spool the files locally, insert the submission as pending and queue the uploads (submission_uploads).
+    No dry run: spooling a duplicate costs a local copy, not storage uploads."""
+    with _open_uploads(files) as uploads:
+        job = await spool_submission_files(
+            [(reader, name, content_type) for reader, name, content_type, _ in uploads], task_id, student_id, stored_urls,
+        )
+    created = False
+    try:
+        result = await repo.submit_task(task_id, student_id, minutes, stored_urls, idempotency_key, upload_status="pending")
+        _check_submit_status(result)
+        created = result["status"] == "created"
+    finally:
+        if not created:
+            await discard_spool(job)
+    if not created:
+        return _submission_response(result)
+    await enqueue_submission_upload(job, result["submission"])
+    _publish_submission(result["submission"])
+    return json_response(
+        submission_body(result["submission"]),
+        {"Location": f"/api/tasks/{task_id}/submission", "Preference-Applied": "respond-async"},
+        status_code=202,
+    )
+
+
+@router.get("/tasks/{task_id}/submission")
+async def get_submission(
+    task_id: str,
+    request: Request,
+    current: dict = Depends(get_current_user),
+    repo=Depends(get_repository),
+):
+    """The submission of a task (student: own only; mentor: any), e.g. to poll upload_status after an asynchronous
+    submit. ETag over the row; If-None-Match returns 304. Retry-After while uploads are pending."""
+    row = await repo.get_submission(task_id)
+    if row is None or (current.get("role") != "mentor" and str(row["student_id"]) != current["sub"]):
+        raise HTTPException(status_code=404, detail="제출 내역이 없습니다.")
+    etag = rows_etag([row], ("id",), "submission")
+    headers = {"ETag": etag}
+    if row.get("upload_status") == "pending":
+        headers["Retry-After"] = "1"
+    if is_not_modified(request, etag):
+        return not_modified(etag, headers)
+    return json_response(submission_body(row), headers)
+
+
+# --- Mentor: a student's submissions ---
+
+def _submission_task(task: dict) -> dict:
+    return {"id": str(task["id"]), "title": task["title"], "subject": task["subject"], "due_date": str(task["due_date"])}
+
+
+@router.get("/submissions")
+async def list_submissions(
+    request: Request,
+    student_id: str = Query(..., description="Student whose submissions to list"),
+    from_date: str = Query(..., alias="from", description="Tasks due on or after YYYY-MM-DD"),
+    to_date: str = Query(..., alias="to", description="Tasks due on or before YYYY-MM-DD"),
+    current: dict = Depends(require_mentor),
+    repo=Depends(get_repository),
+):
+    """Mentor only. Submissions of the student's tasks due in [from, to] (max MAX_SUBMISSION_RANGE_DAYS days), each as
+    GET /api/tasks/{id}/submission returns it plus "task" {id, title, subject, due_date}, in due-date order. One query
+    instead of a lookup per task. ETag over the rows; If-None-Match returns 304."""
+    parse_range(from_date, to_date, MAX_SUBMISSION_RANGE_DAYS)
+    if not is_uuid(student_id):
+        raise HTTPException(status_code=404, detail="학생을 찾을 수 없습니다.")
+    rows = await repo.list_submissions(student_id, from_date, to_date)
+    etag = rows_etag(rows, ("id",), "submissions")
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    return json_response(
+        [{**submission_body(row), "task": _submission_task(row["task"])} for row in rows], {"ETag": etag},
+    )
@@ -0,0 +1,110 @@
+"""Fixtures: the app against the in-memory Supabase stand-in of fake_supabase.py (never a real project), and,
+   when TEST_DATABASE_URL points at a Postgres server, a scratch database with every migration applied for the tests of
+   the SQL functions (submit_task, sync_changes).
+   Run from backend root: python -m pytest [with TEST_DATABASE_URL=postgresql://postgres@localhost/postgres]
+"""
+import asyncio
+import os
+import sys
+import uuid
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# The backend modules, when pytest is not run as python -m pytest from the backend root.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Points config at the fake project before any app module is imported.
+from fake_supabase import FakeSupabase, asgi_client, auth_header, install_fake_supabase, make_token, seed_user  # noqa: E402
+from scratch_db import create_database, database_dsn  # noqa: E402
+
+TEST_DATABASE = "solstudy_pytest"
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def fake():
+    import user_directory
+
+    fake = install_fake_supabase(FakeSupabase())
+    user_directory._directory = user_directory.UserDirectory()
+    return fake
+
+
+@pytest.fixture
+def users(fake):
+    """A mentor and a student (ids and Authorization headers) in the fake auth_users."""
+    mentor, student = seed_user(fake, "mentor"), seed_user(fake, "student")
+    return SimpleNamespace(
+        mentor=mentor, student=student,
+        mentor_headers=auth_header(make_token(mentor, "mentor")), student_headers=auth_header(make_token(student, "student")),
+    )
+
+
+@pytest.fixture
+async def client():
+    from main import app
+
+    async with asgi_client(app) as client:
+        yield client
+
+
+def add_task(fake, student_id: str, created_by: str, due_date: str = "2026-03-02", **fields) -> str:
+    """Insert a task into the fake tasks table; returns its id."""
+    row = {"title": "과제", "subject": "math", "due_date": due_date, "student_id": student_id, "created_by": created_by, **fields}
+    return fake.table("tasks").insert(row).execute().data[0]["id"]
+
+
+@pytest.fixture(scope="session")
+def pg_dsn():
+    """DSN of a scratch database with the migrations applied; skips when TEST_DATABASE_URL is not set."""
+    admin_dsn = os.environ.get("TEST_DATABASE_URL")
+    if not admin_dsn:
+        pytest.skip("TEST_DATABASE_URL not set")
+    dsn = database_dsn(admin_dsn, TEST_DATABASE)
+    asyncio.run(create_database(admin_dsn, dsn, TEST_DATABASE))
+    return dsn
+
+
+@pytest.fixture
+async def pg_repo(pg_dsn, monkeypatch):
+    """The app's repository on DATA_BACKEND=postgres against the scratch database (pool closed after the test)."""
+    import repository
+
+    monkeypatch.setattr(repository, "DATA_BACKEND", "postgres")
+    monkeypatch.setattr(repository, "DATABASE_URL", pg_dsn)
+    monkeypatch.setattr(repository, "_repository", None)
+    repo = await repository.get_repository()
+    yield repo
+    await repository.close_repository()
+
+
+@pytest.fixture
+async def pg_conn(pg_dsn):
+    import asyncpg
+
+    conn = await asyncpg.connect(pg_dsn)
+    yield conn
+    await conn.close()
+
+
+async def pg_user(conn, role: str = "student") -> str:
+    user_id = str(uuid.uuid4())
+    await conn.execute(
+        "insert into public.auth_users (id, email, password_hash, name, role) values ($1::uuid, $2, '.', $2, $3)",
+        user_id, f"{user_id[:8]}@test.local", role,
+    )
+    return user_id
+
+
+async def pg_task(conn, student_id: str, created_by: str, due_date: str = "2026-03-02", title: str = "과제") -> str:
+    return str(await conn.fetchval(
+        "insert into public.tasks (title, subject, due_date, student_id, created_by) "
+        "values ($1, 'math', $2::text::date, $3::uuid, $4::uuid) returning id",
+        title, due_date, student_id, created_by,
+    ))
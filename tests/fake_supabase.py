@@ -0,0 +1,496 @@
+"""In-memory stand-in for the Supabase service-role client (PostgREST tables, rpc, Storage) and test JWTs, shared by
+   the tests and scripts/bench_*.py. Importing this module points config at a fake project, so nothing here ever
+   touches a real Supabase."""
+import asyncio
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+FAKE_JWT_SECRET = "bench-jwt-secret"
+os.environ["SUPABASE_URL"] = "http://supabase.bench.local"
+os.environ["SUPABASE_SERVICE_ROLE_KEY"] = "bench-service-role-key"
+os.environ["SUPABASE_JWT_SECRET"] = FAKE_JWT_SECRET
+os.environ.setdefault("JWT_SECRET", "bench-server-secret")
+# The in-memory storage keeps sizes, not bytes; scripts/bench_image_variants.py measures image processing.
+os.environ.setdefault("IMAGE_PROCESSING_ENABLED", "0")
+
+from jose import jwt  # noqa: E402
+from storage3.utils import StorageException  # noqa: E402
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+# Column defaults applied on insert (mirrors supabase/migrations).
+_TABLE_DEFAULTS = {
+    "tasks": lambda: {"id": str(uuid.uuid4()), "created_at": _now_iso(), "updated_at": _now_iso(), "source": "mentor", "attachments": []},
+    "task_submissions": lambda: {"id": str(uuid.uuid4()), "submitted_at": _now_iso(), "study_time_minutes": 0, "image_urls": [], "thumbnail_urls": [], "preview_urls": [], "upload_status": "done"},
+    "feedback_daily": lambda: {"created_at": _now_iso(), "updated_at": _now_iso()},
+    "attachment_objects": lambda: {"created_at": _now_iso()},
+    "auth_users": lambda: {"id": str(uuid.uuid4()), "created_at": _now_iso(), "role": "student"},
+}
+
+
+# Tables whose updated_at is bumped by a trigger on update.
+_UPDATED_AT_TRIGGER = {"tasks"}
+
+# Embedded resources: (parent table, child table) -> (parent key, child foreign key)
+_EMBEDS = {
+    ("tasks", "task_submissions"): ("id", "task_id"),
+}
+
+
+class FakeResponse:
+    def __init__(self, data: list[dict], count: int | None = None):
+        self.data = data
+        self.count = count
+
+
+_OPS = {
+    "eq": lambda x, v: x is not None and str(x) == v,
+    "neq": lambda x, v: str(x) != v,
+    "gt": lambda x, v: x is not None and str(x) > v,
+    "gte": lambda x, v: x is not None and str(x) >= v,
+    "lt": lambda x, v: x is not None and str(x) < v,
+    "lte": lambda x, v: x is not None and str(x) <= v,
+}
+
+
+def _split_top_level(expr: str) -> list[str]:
+    parts, depth, quoted, start = [], 0, False, 0
+    for i, c in enumerate(expr):
+        if c == '"':
+            quoted = not quoted
+        elif not quoted and c == "(":
+            depth += 1
+        elif not quoted and c == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and c == ",":
+            parts.append(expr[start:i])
+            start = i + 1
+    parts.append(expr[start:])
+    return parts
+
+
+def _parse_logic(kind: str, expr: str):
+    """PostgREST logic tree, e.g. 'a.gt.1,and(a.eq.1,b.gt."x")' -> row predicate (string comparison)."""
+    preds = []
+    for part in _split_top_level(expr):
+        if part.startswith(("and(", "or(")):
+            sub_kind, rest = part.split("(", 1)
+            preds.append(_parse_logic(sub_kind, rest[:-1]))
+            continue
+        col, op, value = part.split(".", 2)
+        value = value.strip('"')
+        preds.append(lambda r, col=col, op=op, value=value: _OPS[op](r.get(col), value))
+    combine = any if kind == "or" else all
+    return lambda r: combine(p(r) for p in preds)
+
+
+class FakeQuery:
+    """Subset of the postgrest request builder used by the routers (filters, order, limit, writes)."""
+
+    def __init__(self, db: "FakeSupabase", table: str):
+        self._db = db
+        self._table = table
+        self._op = "select"
+        self._filters: list = []
+        self._orders: list[tuple[str, bool]] = []
+        self._limit: int | None = None
+        self._offset = 0
+        self._payload = None
+        self._on_conflict: str | None = None
+        self._ignore_duplicates = False
+        self._embeds: list[str] = []
+        self._inner: set[str] = set()
+
+    # Request attributes of the real builder (read by the metrics labels in supabase_admin).
+    headers: dict = {}
+
+    @property
+    def http_method(self) -> str:
+        return {"select": "GET", "insert": "POST", "upsert": "POST", "update": "PATCH", "delete": "DELETE"}.get(self._op, "GET")
+
+    @property
+    def path(self) -> str:
+        return f"/{self._table}"
+
+    def select(self, *cols, **_kwargs):
+        self._op = "select"
+        # Embedded resources such as "task_submissions(id, submitted_at)" are joined in _run; "!inner" drops parents
+        # without children.
+        names = [c.split("(", 1)[0].strip().lstrip("!") for c in _split_top_level(",".join(cols)) if "(" in c]
+        self._embeds = [n.split("!", 1)[0] for n in names]
+        self._inner = {n.split("!", 1)[0] for n in names if n.endswith("!inner")}
+        return self
+
+    def insert(self, rows):
+        self._op, self._payload = "insert", rows
+        return self
+
+    def upsert(self, rows, on_conflict: str | None = None, ignore_duplicates: bool = False, **_kwargs):
+        self._op, self._payload, self._on_conflict = "upsert", rows, on_conflict
+        self._ignore_duplicates = ignore_duplicates
+        return self
+
+    def update(self, values):
+        self._op, self._payload = "update", values
+        return self
+
+    def delete(self):
+        self._op = "delete"
+        return self
+
+    def _filter(self, col, fn):
+        self._filters.append(lambda r: fn(r.get(col)))
+        return self
+
+    def eq(self, col, v):
+        return self._filter(col, lambda x: x is not None and str(x) == str(v))
+
+    def neq(self, col, v):
+        return self._filter(col, lambda x: str(x) != str(v))
+
+    def in_(self, col, values):
+        vs = {str(v) for v in values}
+        return self._filter(col, lambda x: str(x) in vs)
+
+    def gt(self, col, v):
+        return self._filter(col, lambda x: x is not None and str(x) > str(v))
+
+    def gte(self, col, v):
+        return self._filter(col, lambda x: x is not None and str(x) >= str(v))
+
+    def lt(self, col, v):
+        return self._filter(col, lambda x: x is not None and str(x) < str(v))
+
+    def lte(self, col, v):
+        return self._filter(col, lambda x: x is not None and str(x) <= str(v))
+
+    def or_(self, filters: str, **_kwargs):
+        self._filters.append(_parse_logic("or", filters))
+        return self
+
+    def order(self, col, desc: bool = False, **_kwargs):
+        self._orders.append((col, desc))
+        return self
+
+    def limit(self, n: int, **_kwargs):
+        self._limit = n
+        return self
+
+    def range(self, start: int, end: int, **_kwargs):
+        self._offset, self._limit = start, end - start + 1
+        return self
+
+    def _match(self, row: dict) -> bool:
+        return all(f(row) for f in self._filters)
+
+    def execute(self) -> FakeResponse:
+        if self._db.db_latency:
+            time.sleep(self._db.db_latency)
+        return self._execute_now()
+
+    def _execute_now(self) -> FakeResponse:
+        with self._db.lock:
+            self._db.calls[f"db.{self._table}.{self._op}"] += 1
+            return FakeResponse(self._run())
+
+    def _run(self) -> list[dict]:
+        rows = self._db.tables.setdefault(self._table, [])
+        if self._op == "select":
+            out = [dict(r) for r in rows if self._match(r)]
+            for child in self._embeds:
+                parent_key, fk = _EMBEDS[(self._table, child)]
+                children: dict[str, list[dict]] = {}
+                for c in self._db.tables.get(child, []):
+                    children.setdefault(str(c.get(fk)), []).append(dict(c))
+                for r in out:
+                    r[child] = children.get(str(r.get(parent_key)), [])
+                if child in self._inner:
+                    out = [r for r in out if r[child]]
+            for col, desc in reversed(self._orders):
+                out.sort(key=lambda r: (r.get(col) is None, str(r.get(col) or "")), reverse=desc)
+            out = out[self._offset:]
+            if self._limit is not None:
+                out = out[: self._limit]
+            return out
+        if self._op in ("insert", "upsert"):
+            payload = self._payload if isinstance(self._payload, list) else [self._payload]
+            keys = self._on_conflict.split(",") if self._on_conflict else None
+            out = []
+            for item in payload:
+                existing = None
+                if keys:
+                    existing = next((r for r in rows if all(str(r.get(k)) == str(item.get(k)) for k in keys)), None)
+                if existing is not None and self._ignore_duplicates:
+                    continue
+                if existing is not None:
+                    existing.update(item)
+                    if self._table in _UPDATED_AT_TRIGGER:
+                        existing["updated_at"] = _now_iso()
+                    out.append(dict(existing))
+                    continue
+                defaults = _TABLE_DEFAULTS.get(self._table, dict)()
+                row = {**defaults, **item}
+                rows.append(row)
+                out.append(dict(row))
+            return out
+        if self._op == "update":
+            out = []
+            for r in rows:
+                if self._match(r):
+                    r.update(self._payload)
+                    if self._table in _UPDATED_AT_TRIGGER:
+                        r["updated_at"] = _now_iso()
+                    out.append(dict(r))
+            return out
+        if self._op == "delete":
+            kept, out = [], []
+            for r in rows:
+                (out if self._match(r) else kept).append(r)
+            self._db.tables[self._table] = kept
+            return [dict(r) for r in out]
+        raise ValueError(self._op)
+
+
+def _fake_submit_task(db: "FakeSupabase", p: dict) -> dict:
+    """public.submit_task() (supabase/migrations/20250216000000_submission_upload_status.sql)."""
+    task = next((t for t in db.tables.get("tasks", []) if str(t["id"]) == p["p_task_id"]), None)
+    if task is None:
+        return {"status": "not_found"}
+    if str(task["student_id"]) != p["p_student_id"]:
+        return {"status": "forbidden"}
+    subs = db.tables.setdefault("task_submissions", [])
+    existing = next((s for s in subs if s["task_id"] == p["p_task_id"] and s["student_id"] == p["p_student_id"]), None)
+    if existing is None:
+        if p.get("p_dry_run"):
+            return {"status": "ok"}
+        row = {
+            **_TABLE_DEFAULTS["task_submissions"](),
+            "task_id": p["p_task_id"],
+            "student_id": p["p_student_id"],
+            "study_time_minutes": max(p.get("p_study_time_minutes") or 0, 0),
+            "image_urls": p.get("p_image_urls") or [],
+            "idempotency_key": p.get("p_idempotency_key"),
+            "upload_status": p.get("p_upload_status") or "done",
+        }
+        subs.append(row)
+        return {"status": "created", "submission": dict(row)}
+    if p.get("p_idempotency_key") is not None and existing.get("idempotency_key") == p["p_idempotency_key"]:
+        return {"status": "replayed", "submission": dict(existing)}
+    return {"status": "already_submitted"}
+
+
+FAKE_RPCS = {
+    "submit_task": _fake_submit_task,
+}
+
+
+class FakeRpc:
+    def __init__(self, db: "FakeSupabase", name: str, params: dict):
+        self._db = db
+        self._name = name
+        self._params = params
+
+    http_method = "POST"
+    headers: dict = {}
+
+    @property
+    def path(self) -> str:
+        return f"/rpc/{self._name}"
+
+    def execute(self) -> FakeResponse:
+        if self._db.db_latency:
+            time.sleep(self._db.db_latency)
+        return self._execute_now()
+
+    def _execute_now(self) -> FakeResponse:
+        with self._db.lock:
+            self._db.calls[f"db.rpc.{self._name}"] += 1
+            return FakeResponse(FAKE_RPCS[self._name](self._db, self._params))
+
+
+class FakeAsyncQuery:
+    """FakeQuery behind the async client interface (get_supabase_db): latency is awaited, not slept in a thread."""
+
+    def __init__(self, query: FakeQuery):
+        self._query = query
+
+    def __getattr__(self, name):
+        method = getattr(self._query, name)
+
+        def call(*args, **kwargs):
+            method(*args, **kwargs)
+            return self
+
+        return call
+
+    async def execute(self) -> FakeResponse:
+        if self._query._db.db_latency:
+            await asyncio.sleep(self._query._db.db_latency)
+        return self._query._execute_now()
+
+
+class FakeAsyncDb:
+    def __init__(self, db: "FakeSupabase"):
+        self._db = db
+
+    def table(self, name: str) -> FakeAsyncQuery:
+        return FakeAsyncQuery(FakeQuery(self._db, name))
+
+    def rpc(self, name: str, params: dict) -> FakeAsyncQuery:
+        return FakeAsyncQuery(FakeRpc(self._db, name, params))
+
+
+class FakeBucket:
+    def __init__(self, db: "FakeSupabase", bucket: str):
+        self._db = db
+        self._bucket = bucket
+
+    def upload(self, path, file, file_options=None):
+        # Consume readers in 64 KB chunks like httpx's multipart stream, so memory benchmarks stay honest.
+        if isinstance(file, bytes):
+            size = len(file)
+        else:
+            size = 0
+            while chunk := file.read(64 * 1024):
+                size += len(chunk)
+        if self._db.storage_latency:
+            time.sleep(self._db.storage_latency)
+        with self._db.lock:
+            self._db.calls["storage.upload"] += 1
+            self._db.calls["storage.upload_bytes"] += size
+            self._db.objects[f"{self._bucket}/{path}"] = size
+        return {"Key": f"{self._bucket}/{path}"}
+
+    def create_signed_upload_url(self, path):
+        if self._db.storage_latency:
+            time.sleep(self._db.storage_latency)
+        token = uuid.uuid4().hex
+        with self._db.lock:
+            self._db.calls["storage.create_signed_upload_url"] += 1
+            self._db.signed_uploads[token] = f"{self._bucket}/{path}"
+        return {"signed_url": f"{os.environ['SUPABASE_URL']}/storage/v1/object/upload/sign/{self._bucket}/{path}?token={token}", "token": token, "path": path}
+
+    def upload_to_signed_url(self, path, token, file, file_options=None):
+        """What a client does with a signed URL: goes straight to storage, so it is not counted as a backend upload."""
+        key = f"{self._bucket}/{path}"
+        with self._db.lock:
+            if self._db.signed_uploads.get(token) != key or key in self._db.objects:
+                raise StorageException({"statusCode": 400, "error": "invalid_signature", "message": "invalid token"})
+            self._db.objects[key] = len(file)
+        return {"path": path, "Key": key}
+
+    def list(self, path=None, options=None):
+        if self._db.storage_latency:
+            time.sleep(self._db.storage_latency)
+        prefix = f"{self._bucket}/{path}/" if path else f"{self._bucket}/"
+        search = (options or {}).get("search", "")
+        with self._db.lock:
+            self._db.calls["storage.list"] += 1
+            names = [(key[len(prefix):], size) for key, size in self._db.objects.items() if key.startswith(prefix)]
+        return [
+            {"name": name, "id": str(uuid.uuid5(uuid.NAMESPACE_URL, name)), "metadata": {"size": size}}
+            for name, size in sorted(names) if "/" not in name and name.startswith(search)
+        ][:(options or {}).get("limit", 100)]
+
+    def remove(self, paths):
+        if self._db.storage_latency:
+            time.sleep(self._db.storage_latency)
+        with self._db.lock:
+            self._db.calls["storage.remove"] += 1
+            for path in paths:
+                self._db.objects.pop(f"{self._bucket}/{path}", None)
+        return [{"name": path} for path in paths]
+
+
+class FakeStorage:
+    def __init__(self, db: "FakeSupabase"):
+        self._db = db
+
+    def create_bucket(self, bucket_id, options=None):
+        if self._db.storage_latency:
+            time.sleep(self._db.storage_latency)
+        with self._db.lock:
+            self._db.calls["storage.create_bucket"] += 1
+
+    def from_(self, bucket: str) -> FakeBucket:
+        return FakeBucket(self._db, bucket)
+
+
+class _Counter(dict):
+    def __missing__(self, key):
+        return 0
+
+
+class FakeSupabase:
+    """In-memory stand-in for the service-role client: tables + storage, with injected latency (seconds)."""
+
+    def __init__(self, db_latency: float = 0.0, storage_latency: float = 0.0):
+        self.db_latency = db_latency
+        self.storage_latency = storage_latency
+        self.tables: dict[str, list[dict]] = {}
+        self.objects: dict[str, int] = {}
+        self.signed_uploads: dict[str, str] = {}
+        self.calls: dict[str, int] = _Counter()
+        self.lock = threading.Lock()
+        self.storage = FakeStorage(self)
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    def rpc(self, name: str, params: dict) -> FakeRpc:
+        return FakeRpc(self, name, params)
+
+    def reset_calls(self) -> None:
+        self.calls.clear()
+
+
+def install_fake_supabase(fake: FakeSupabase) -> FakeSupabase:
+    """Make get_supabase_admin() and the request handlers' get_supabase_db() use the fake client."""
+    import supabase_admin
+
+    supabase_admin._admin_client = fake
+    supabase_admin._db_client = FakeAsyncDb(fake)
+    return fake
+
+
+def make_token(sub: str, role: str = "student", name: str = "", ttl_seconds: int = 3600, secret: str = FAKE_JWT_SECRET) -> str:
+    """Mint a Supabase-style access token signed with FAKE_JWT_SECRET (or `secret`)."""
+    exp = datetime.now(timezone.utc) + timedelta(seconds=ttl_seconds)
+    claims = {
+        "sub": sub,
+        "email": f"{sub[:8]}@bench.local",
+        "aud": "authenticated",
+        "exp": int(exp.timestamp()),
+        "user_metadata": {"role": role, "name": name or sub[:8]},
+    }
+    return jwt.encode(claims, secret, algorithm="HS256")
+
+
+def auth_header(token: str) -> dict[str, str]:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def seed_user(fake: FakeSupabase, role: str = "student", name: str | None = None) -> str:
+    user_id = str(uuid.uuid4())
+    fake.tables.setdefault("auth_users", []).append({
+        "id": user_id,
+        "email": f"{user_id[:8]}@bench.local",
+        "password_hash": ".",
+        "name": name or f"{role}-{user_id[:8]}",
+        "role": role,
+        "created_at": _now_iso(),
+    })
+    return user_id
+
+
+def asgi_client(app):
+    """httpx.AsyncClient that calls the ASGI app in-process."""
+    import httpx
+
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench.local")
@@ -0,0 +1,37 @@
+"""A scratch Postgres database with supabase/migrations applied, for the SQL tests and the scripts/bench_*.py that
+   run against Postgres."""
+from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit
+
+import asyncpg
+
+MIGRATIONS = Path(__file__).resolve().parent.parent / "supabase" / "migrations"
+# Needs the Supabase auth schema; the backend reads public.auth_users instead.
+SKIP_MIGRATIONS = ("supabase_auth_profiles",)
+
+
+def database_dsn(dsn: str, database: str) -> str:
+    """dsn with its database replaced."""
+    parts = urlsplit(dsn)
+    return urlunsplit(parts._replace(path=f"/{database}"))
+
+
+async def create_database(admin_dsn: str, dsn: str, database: str) -> None:
+    """(Re)create `database` through admin_dsn, then create the Supabase roles and apply every migration through dsn."""
+    conn = await asyncpg.connect(admin_dsn)
+    try:
+        await conn.execute(f'drop database if exists "{database}"')
+        await conn.execute(f'create database "{database}"')
+    finally:
+        await conn.close()
+    conn = await asyncpg.connect(dsn)
+    try:
+        for role in ("anon", "authenticated", "service_role"):
+            await conn.execute(
+                f"do $$ begin if not exists (select from pg_roles where rolname = '{role}') then create role {role}; end if; end $$"
+            )
+        for path in sorted(MIGRATIONS.glob("*.sql")):
+            if not any(skip in path.name for skip in SKIP_MIGRATIONS):
+                await conn.execute(path.read_text())
+    finally:
+        await conn.close()
@@ -0,0 +1,77 @@
+"""The verified-token cache of auth_utils: hits until the token's exp, then a full verification; invalid and expired
+   tokens are never cached, and the least recently used entry is evicted first."""
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import auth_utils
+from fake_supabase import make_token
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    """An empty cache of 2 entries, and a clock for auth_utils that tests can move forward (clock.now)."""
+    clock = SimpleNamespace(now=time.time())
+    monkeypatch.setattr(auth_utils, "_token_cache", auth_utils._TokenCache(2))
+    monkeypatch.setattr(auth_utils, "time", SimpleNamespace(time=lambda: clock.now))
+    return clock
+
+
+def test_cached_until_exp(cache):
+    token = make_token("user-1", "mentor", ttl_seconds=60)
+    first = auth_utils.decode_supabase_token(token)
+    assert first["role"] == "mentor"
+    assert auth_utils.decode_supabase_token(token) == first
+    assert auth_utils.token_cache_stats() == {"hits": 1, "misses": 1, "size": 1, "maxsize": 2}
+
+    cache.now += 61
+    # Past exp the entry is dropped and the token verified again (jose still sees it as valid on the real clock).
+    assert auth_utils.decode_supabase_token(token) == first
+    assert auth_utils.token_cache_stats()["misses"] == 2
+
+
+def test_returned_payload_is_a_copy(cache):
+    token = make_token("user-1")
+    auth_utils.decode_supabase_token(token)["role"] = "mentor"
+    assert auth_utils.decode_supabase_token(token)["role"] == "student"
+
+
+def test_invalid_and_expired_tokens_not_cached(cache):
+    assert auth_utils.decode_supabase_token(make_token("user-1", secret="other-secret")) is None
+    assert auth_utils.decode_supabase_token(make_token("user-1", ttl_seconds=-10)) is None
+    assert auth_utils.decode_supabase_token("not a token") is None
+    assert auth_utils.token_cache_stats()["size"] == 0
+
+
+def test_least_recently_used_evicted(cache):
+    a, b, c = (make_token(f"user-{i}") for i in range(3))
+    auth_utils.decode_supabase_token(a)
+    auth_utils.decode_supabase_token(b)
+    auth_utils.decode_supabase_token(a)
+    auth_utils.decode_supabase_token(c)
+    hits = auth_utils.token_cache_stats()["hits"]
+    auth_utils.decode_supabase_token(a)
+    assert auth_utils.token_cache_stats()["hits"] == hits + 1
+    auth_utils.decode_supabase_token(b)
+    assert auth_utils.token_cache_stats()["hits"] == hits + 1
+
+
+@pytest.mark.anyio
+async def test_async_decode_verifies_misses_in_a_thread(cache, monkeypatch):
+    token = make_token("user-1", "mentor")
+    threads = []
+    run_sync = auth_utils.anyio.to_thread.run_sync
+
+    async def counting_run_sync(*args, **kwargs):
+        threads.append(1)
+        return await run_sync(*args, **kwargs)
+
+    monkeypatch.setattr(auth_utils.anyio.to_thread, "run_sync", counting_run_sync)
+    first = await auth_utils.decode_supabase_token_async(token)
+    assert first == auth_utils.decode_supabase_token(token)
+    # The cached token is answered without another thread.
+    assert await auth_utils.decode_supabase_token_async(token) == first
+    assert threads == [1]
+    assert auth_utils.token_cache_stats() == {"hits": 2, "misses": 1, "size": 1, "maxsize": 2}
+    assert await auth_utils.decode_supabase_token_async("not a token") is None
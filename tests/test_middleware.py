@@ -0,0 +1,126 @@
+"""main's ASGI middleware without a database: the streaming multipart part-size check of RequestBodyLimitMiddleware,
+   and CORS preflights answered by CORSAndErrorMiddleware before routing."""
+import pytest
+from fastapi import FastAPI, Request
+
+from config import CORS_ORIGINS
+from fake_supabase import asgi_client
+from main import RequestBodyLimitMiddleware, _PartSizeCheck
+
+pytestmark = pytest.mark.anyio
+
+BOUNDARY = b"XyZ"
+
+
+def _part(name: str, data: bytes) -> bytes:
+    return b"--" + BOUNDARY + f'\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n'.encode() + data + b"\r\n"
+
+
+def _multipart(*parts: bytes) -> bytes:
+    return b"".join(parts) + b"--" + BOUNDARY + b"--\r\n"
+
+
+def _feed(check: _PartSizeCheck, body: bytes, chunk_size: int) -> bool:
+    return all(check.feed(body[i:i + chunk_size]) for i in range(0, len(body), chunk_size))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 64, 10_000])
+def test_parts_under_the_limit_pass_in_any_chunking(chunk_size):
+    body = _multipart(_part("a", b"x" * 900), _part("b", b"y" * 900), _part("c", b"z" * 900))
+    assert _feed(_PartSizeCheck(BOUNDARY, 1000), body, chunk_size)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 64, 10_000])
+def test_one_oversized_part_is_caught(chunk_size):
+    body = _multipart(_part("a", b"x" * 100), _part("b", b"y" * 1100), _part("c", b"z" * 100))
+    assert not _feed(_PartSizeCheck(BOUNDARY, 1000), body, chunk_size)
+
+
+def test_delimiter_split_across_chunks_resets_the_part():
+    check = _PartSizeCheck(BOUNDARY, 1000)
+    # "\r\n--XyZ" arrives in two pieces; the second part starts fresh instead of adding to the first.
+    assert check.feed(_part("a", b"x" * 900) + b"--X")
+    assert check.feed(b'yZ\r\nContent-Disposition: form-data; name="b"\r\n\r\n' + b"y" * 900)
+    assert check.part_size < 1000
+
+
+@pytest.fixture
+def limited_app():
+    """An app echoing the body size behind RequestBodyLimitMiddleware: /upload takes 10 KB with 1 KB parts."""
+    inner = FastAPI()
+
+    @inner.post("/upload")
+    @inner.post("/json")
+    async def echo(request: Request):
+        return {"size": len(await request.body())}
+
+    return RequestBodyLimitMiddleware(inner, max_body_size=2000, routes=[("POST", r"/upload", 10_000, 1000)])
+
+
+async def _post(app, path: str, body: bytes, content_type: bytes):
+    async with asgi_client(app) as client:
+        return await client.post(path, content=body, headers={"Content-Type": content_type.decode()})
+
+
+async def test_route_limits(limited_app):
+    multipart = b"multipart/form-data; boundary=" + BOUNDARY
+    ok = _multipart(*(_part(str(i), b"x" * 900) for i in range(5)))
+    assert (await _post(limited_app, "/upload", ok, multipart)).json() == {"size": len(ok)}
+
+    r = await _post(limited_app, "/upload", _multipart(_part("a", b"x" * 1500)), multipart)
+    assert r.status_code == 413
+    assert r.json()["detail"].startswith("파일 크기는")
+    # Other routes get max_body_size, and a part limit only applies to multipart bodies.
+    r = await _post(limited_app, "/json", b"{}" + b" " * 2500, b"application/json")
+    assert r.status_code == 413
+    assert r.json()["detail"].startswith("요청 크기는")
+
+
+async def test_declared_content_length_over_the_limit_rejected_before_reading(limited_app):
+    received = []
+
+    async def receive():
+        received.append(1)
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http", "method": "POST", "path": "/json", "headers": [(b"content-length", b"5000")],
+        "query_string": b"", "root_path": "",
+    }
+    await limited_app(scope, receive, send)
+    assert sent[0]["status"] == 413
+    assert received == []
+
+
+async def test_preflight_for_allowed_origin(client):
+    origin = CORS_ORIGINS[0]
+    r = await client.options("/api/tasks", headers={
+        "Origin": origin, "Access-Control-Request-Method": "POST", "Access-Control-Request-Headers": "authorization, x-custom",
+    })
+    assert r.status_code == 200
+    assert r.headers["access-control-allow-origin"] == origin
+    assert r.headers["access-control-allow-headers"] == "authorization, x-custom"
+    assert "POST" in r.headers["access-control-allow-methods"]
+    assert r.headers["access-control-allow-credentials"] == "true"
+    assert int(r.headers["access-control-max-age"]) >= 0
+    assert r.headers["vary"] == "Origin"
+
+
+async def test_preflight_rejects_unknown_origin_and_method(client):
+    r = await client.options("/api/tasks", headers={"Origin": "https://evil.example", "Access-Control-Request-Method": "TRACE"})
+    assert r.status_code == 400
+    assert r.text == "Disallowed CORS origin, method"
+    assert "access-control-allow-origin" not in r.headers
+
+
+async def test_simple_request_gets_cors_headers_only_for_allowed_origin(client):
+    r = await client.get("/health", headers={"Origin": CORS_ORIGINS[0]})
+    assert r.headers["access-control-allow-origin"] == CORS_ORIGINS[0]
+    assert "Origin" in r.headers["vary"]
+    r = await client.get("/health", headers={"Origin": "https://evil.example"})
+    assert "access-control-allow-origin" not in r.headers
@@ -0,0 +1,140 @@
+"""POST /api/tasks/{id}/submit against the fake submit_task(): duplicates, idempotent replays, and the dry run that
+   keeps a duplicate or replayed submit with files from uploading anything."""
+import pytest
+
+import fake_supabase
+
+from conftest import add_task
+
+pytestmark = pytest.mark.anyio
+
+FILES = [("files", ("a.jpg", b"a" * 1000, "image/jpeg")), ("files", ("b.png", b"b" * 500, "image/png"))]
+
+
+@pytest.fixture
+def events(monkeypatch):
+    """("rpc", dry_run) and ("upload", path) in the order the fake project saw them."""
+    seen = []
+    submit_task = fake_supabase.FAKE_RPCS["submit_task"]
+    upload = fake_supabase.FakeBucket.upload
+
+    def recording_submit_task(db, p):
+        seen.append(("rpc", bool(p.get("p_dry_run"))))
+        return submit_task(db, p)
+
+    def recording_upload(self, path, file, file_options=None):
+        seen.append(("upload", path))
+        return upload(self, path, file, file_options)
+
+    monkeypatch.setitem(fake_supabase.FAKE_RPCS, "submit_task", recording_submit_task)
+    monkeypatch.setattr(fake_supabase.FakeBucket, "upload", recording_upload)
+    return seen
+
+
+async def test_submit_creates_submission(fake, users, client):
+    task_id = add_task(fake, users.student, users.mentor)
+    r = await client.post(f"/api/tasks/{task_id}/submit", data={"study_time_minutes": "25"}, headers=users.student_headers)
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert body["task_id"] == task_id
+    assert body["study_time_minutes"] == 25
+    assert body["upload_status"] == "done"
+    assert "idempotent-replayed" not in r.headers
+    assert len(fake.tables["task_submissions"]) == 1
+
+
+async def test_duplicate_submission_rejected(fake, users, client):
+    task_id = add_task(fake, users.student, users.mentor)
+    first = await client.post(f"/api/tasks/{task_id}/submit", data={"study_time_minutes": "5"}, headers=users.student_headers)
+    assert first.status_code == 200
+    r = await client.post(f"/api/tasks/{task_id}/submit", data={"study_time_minutes": "9"}, headers=users.student_headers)
+    assert r.status_code == 400
+    assert r.json()["detail"] == "이미 제출했습니다."
+    [row] = fake.tables["task_submissions"]
+    assert row["study_time_minutes"] == 5
+
+
+async def test_duplicate_with_different_idempotency_key_rejected(fake, users, client):
+    task_id = add_task(fake, users.student, users.mentor)
+    await client.post(f"/api/tasks/{task_id}/submit", headers={**users.student_headers, "Idempotency-Key": "first"})
+    r = await client.post(f"/api/tasks/{task_id}/submit", headers={**users.student_headers, "Idempotency-Key": "second"})
+    assert r.status_code == 400
+
+
+async def test_idempotent_replay_returns_stored_submission(fake, users, client):
+    task_id = add_task(fake, users.student, users.mentor)
+    headers = {**users.student_headers, "Idempotency-Key": "retry-1"}
+    first = await client.post(f"/api/tasks/{task_id}/submit", data={"study_time_minutes": "5"}, headers=headers)
+    assert first.status_code == 200
+    replay = await client.post(f"/api/tasks/{task_id}/submit", data={"study_time_minutes": "99"}, headers=headers)
+    assert replay.status_code == 200
+    assert replay.headers["idempotent-replayed"] == "true"
+    assert replay.json() == first.json()
+    assert len(fake.tables["task_submissions"]) == 1
+
+
+async def test_submit_other_students_task_forbidden(fake, users, client):
+    from fake_supabase import seed_user
+
+    task_id = add_task(fake, seed_user(fake, "student"), users.mentor)
+    r = await client.post(f"/api/tasks/{task_id}/submit", headers=users.student_headers)
+    assert r.status_code == 403
+    assert not fake.tables.get("task_submissions")
+
+
+async def test_submit_unknown_task(fake, users, client):
+    for task_id in ("00000000-0000-0000-0000-000000000000", "not-a-uuid"):
+        r = await client.post(f"/api/tasks/{task_id}/submit", headers=users.student_headers)
+        assert r.status_code == 404
+
+
+async def test_files_upload_between_dry_run_and_commit(fake, users, client, events):
+    task_id = add_task(fake, users.student, users.mentor)
+    r = await client.post(f"/api/tasks/{task_id}/submit", files=FILES, headers=users.student_headers)
+    assert r.status_code == 200, r.text
+    assert events[0] == ("rpc", True)
+    assert [kind for kind, _ in events[1:3]] == ["upload", "upload"]
+    assert events[3:] == [("rpc", False)]
+    assert len(r.json()["image_urls"]) == 2
+    assert len(fake.objects) == 2
+
+
+async def test_duplicate_with_files_uploads_nothing(fake, users, client, events):
+    task_id = add_task(fake, users.student, users.mentor)
+    await client.post(f"/api/tasks/{task_id}/submit", headers=users.student_headers)
+    events.clear()
+    r = await client.post(f"/api/tasks/{task_id}/submit", files=FILES, headers=users.student_headers)
+    assert r.status_code == 400
+    assert events == [("rpc", True)]
+    assert fake.objects == {}
+
+
+async def test_replay_with_files_uploads_nothing(fake, users, client, events):
+    task_id = add_task(fake, users.student, users.mentor)
+    headers = {**users.student_headers, "Idempotency-Key": "retry-2"}
+    first = await client.post(f"/api/tasks/{task_id}/submit", files=FILES, headers=headers)
+    assert first.status_code == 200
+    stored = dict(fake.objects)
+    events.clear()
+    replay = await client.post(f"/api/tasks/{task_id}/submit", files=FILES, headers=headers)
+    assert replay.status_code == 200
+    assert replay.headers["idempotent-replayed"] == "true"
+    assert replay.json()["image_urls"] == first.json()["image_urls"]
+    assert events == [("rpc", True)]
+    assert fake.objects == stored
+
+
+async def test_failed_upload_removes_the_uploaded_files(fake, users, client, monkeypatch):
+    upload = fake_supabase.FakeBucket.upload
+
+    def failing_upload(self, path, file, file_options=None):
+        if path.endswith(".png"):
+            raise RuntimeError("storage unavailable")
+        return upload(self, path, file, file_options)
+
+    monkeypatch.setattr(fake_supabase.FakeBucket, "upload", failing_upload)
+    task_id = add_task(fake, users.student, users.mentor)
+    r = await client.post(f"/api/tasks/{task_id}/submit", files=FILES, headers=users.student_headers)
+    assert r.status_code == 500
+    assert fake.objects == {}
+    assert not fake.tables.get("task_submissions")
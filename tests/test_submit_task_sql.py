@@ -0,0 +1,49 @@
+"""public.submit_task() on Postgres (skipped without TEST_DATABASE_URL): ownership check and insert in one call, so
+   concurrent submits of one task create exactly one submission."""
+import asyncio
+
+import pytest
+
+from conftest import pg_task, pg_user
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_concurrent_submits_create_one_submission(pg_repo, pg_conn):
+    mentor, student = await pg_user(pg_conn, "mentor"), await pg_user(pg_conn)
+    task_id = await pg_task(pg_conn, student, mentor)
+    results = await asyncio.gather(*(pg_repo.submit_task(task_id, student, 10, []) for _ in range(8)))
+    statuses = sorted(r["status"] for r in results)
+    assert statuses == ["already_submitted"] * 7 + ["created"]
+    assert await pg_conn.fetchval("select count(*) from public.task_submissions where task_id = $1::uuid", task_id) == 1
+
+
+async def test_concurrent_retries_with_one_key_replay(pg_repo, pg_conn):
+    mentor, student = await pg_user(pg_conn, "mentor"), await pg_user(pg_conn)
+    task_id = await pg_task(pg_conn, student, mentor)
+    results = await asyncio.gather(*(pg_repo.submit_task(task_id, student, 10, [], "key-1") for _ in range(8)))
+    statuses = sorted(r["status"] for r in results)
+    assert statuses == ["created"] + ["replayed"] * 7
+    assert len({r["submission"]["id"] for r in results}) == 1
+
+
+async def test_dry_run_checks_without_inserting(pg_repo, pg_conn):
+    mentor, student = await pg_user(pg_conn, "mentor"), await pg_user(pg_conn)
+    task_id = await pg_task(pg_conn, student, mentor)
+    assert (await pg_repo.submit_task(task_id, student, 0, [], "key-2", dry_run=True))["status"] == "ok"
+    assert await pg_conn.fetchval("select count(*) from public.task_submissions where task_id = $1::uuid", task_id) == 0
+
+    created = await pg_repo.submit_task(task_id, student, 15, ["https://example.com/a.jpg"], "key-2")
+    assert created["status"] == "created"
+    assert created["submission"]["image_urls"] == ["https://example.com/a.jpg"]
+    # After the commit, a dry run with the same key replays and a different key is a duplicate.
+    assert (await pg_repo.submit_task(task_id, student, 0, [], "key-2", dry_run=True))["status"] == "replayed"
+    assert (await pg_repo.submit_task(task_id, student, 0, [], "other", dry_run=True))["status"] == "already_submitted"
+
+
+async def test_ownership_and_unknown_task(pg_repo, pg_conn):
+    mentor, student, other = await pg_user(pg_conn, "mentor"), await pg_user(pg_conn), await pg_user(pg_conn)
+    task_id = await pg_task(pg_conn, student, mentor)
+    assert (await pg_repo.submit_task(task_id, other, 10, []))["status"] == "forbidden"
+    assert (await pg_repo.submit_task("00000000-0000-0000-0000-000000000000", student, 10, []))["status"] == "not_found"
+    assert (await pg_repo.submit_task("not-a-uuid", student, 10, []))["status"] == "not_found"
@@ -0,0 +1,99 @@
+"""GET /api/sync on Postgres (skipped without TEST_DATABASE_URL): deltas since a cursor, deletions, and the resets that
+   send a client back to the list endpoints (too many changes, pruned tombstones, a cursor that was never issued)."""
+import pytest
+
+import sync_router
+from fake_supabase import auth_header, make_token
+from conftest import pg_task, pg_user
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def people(pg_conn):
+    mentor, student = await pg_user(pg_conn, "mentor"), await pg_user(pg_conn)
+    return mentor, student, auth_header(make_token(student, "student"))
+
+
+async def _sync(client, headers: dict, cursor: str | None = None, **params) -> dict:
+    r = await client.get("/api/sync", params={**params, **({"cursor": cursor} if cursor else {})}, headers=headers)
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+async def test_first_sync_then_deltas(pg_repo, pg_conn, client, people):
+    mentor, student, headers = people
+    task_ids = [await pg_task(pg_conn, student, mentor, title=f"t{i}") for i in range(3)]
+
+    first = await _sync(client, headers)
+    assert first["reset"] is False
+    assert first["cursor"].isdigit()
+    assert sorted(t["id"] for t in first["tasks"]) == sorted(task_ids)
+
+    quiet = await _sync(client, headers, first["cursor"])
+    assert (quiet["tasks"], quiet["submissions"], quiet["feedback"]) == ([], [], [])
+    assert quiet["deleted"] == {"tasks": [], "submissions": [], "feedback": []}
+
+    await pg_conn.execute("update public.tasks set title = 'renamed' where id = $1::uuid", task_ids[0])
+    await pg_conn.execute("delete from public.tasks where id = $1::uuid", task_ids[1])
+    await pg_repo.submit_task(task_ids[2], student, 20, [])
+    delta = await _sync(client, headers, quiet["cursor"])
+    assert delta["reset"] is False
+    assert [t["title"] for t in delta["tasks"]] == ["renamed"]
+    assert delta["deleted"]["tasks"] == [task_ids[1]]
+    assert [s["task_id"] for s in delta["submissions"]] == [task_ids[2]]
+
+
+async def test_other_students_changes_not_included(pg_conn, pg_repo, client, people):
+    mentor, student, headers = people
+    other = await pg_user(pg_conn)
+    cursor = (await _sync(client, headers))["cursor"]
+    await pg_task(pg_conn, other, mentor)
+    assert (await _sync(client, headers, cursor))["tasks"] == []
+
+
+async def test_reset_when_too_much_changed(pg_repo, pg_conn, client, people, monkeypatch):
+    mentor, student, headers = people
+    monkeypatch.setattr(sync_router, "MAX_SYNC_CHANGES", 2)
+    cursor = (await _sync(client, headers))["cursor"]
+    for i in range(3):
+        await pg_task(pg_conn, student, mentor, title=f"t{i}")
+    reset = await _sync(client, headers, cursor)
+    assert reset["reset"] is True
+    assert reset["tasks"] == []
+    # After reloading through the list endpoints, the client syncs from the cursor that came with the reset.
+    after = await _sync(client, headers, reset["cursor"])
+    assert after["reset"] is False
+    assert after["tasks"] == []
+
+
+async def test_reset_for_cursor_never_issued(pg_repo, client, people):
+    _, _, headers = people
+    assert (await _sync(client, headers, str(2**62)))["reset"] is True
+
+
+async def test_reset_for_cursor_older_than_pruned_tombstones(pg_repo, pg_conn, client, people):
+    mentor, student, headers = people
+    task_id = await pg_task(pg_conn, student, mentor)
+    old = (await _sync(client, headers))["cursor"]
+    await pg_conn.execute("delete from public.tasks where id = $1::uuid", task_id)
+    await pg_conn.fetchval("select public.prune_sync_tombstones('0 seconds')")
+    stale = await _sync(client, headers, old)
+    assert stale["reset"] is True
+    assert (await _sync(client, headers, stale["cursor"]))["reset"] is False
+
+
+@pytest.mark.parametrize("cursor", ["abc", "-1", "1.5", str(2**64), "１２"])
+async def test_invalid_cursor_is_400(pg_repo, client, people, cursor):
+    _, _, headers = people
+    r = await client.get("/api/sync", params={"cursor": cursor}, headers=headers)
+    assert r.status_code == 400
+
+
+async def test_mentor_must_name_a_valid_student(pg_repo, pg_conn, client, people):
+    mentor, student, _ = people
+    headers = auth_header(make_token(mentor, "mentor"))
+    assert (await client.get("/api/sync", headers=headers)).status_code == 400
+    assert (await client.get("/api/sync", params={"student_id": "not-a-uuid"}, headers=headers)).status_code == 404
+    body = await _sync(client, headers, student_id=student)
+    assert body["student_id"] == student
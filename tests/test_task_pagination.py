@@ -0,0 +1,107 @@
+"""Keyset pagination of GET /api/tasks: the (due_date, created_at, id) cursor round-trips, malformed cursors are
+   rejected, and following X-Next-Cursor visits every task exactly once in order, ties included."""
+import pytest
+from fastapi import HTTPException
+
+from conftest import add_task, pg_task, pg_user
+from tasks_router import _decode_cursor, _encode_cursor
+
+pytestmark = pytest.mark.anyio
+
+ROW = {"due_date": "2026-03-02", "created_at": "2026-02-20T09:30:00.123456+00:00", "id": "3f1c8f9e-1b7a-4c3e-9a51-0d6c2b9f4e10"}
+
+
+def test_cursor_round_trip():
+    cursor = _encode_cursor(ROW)
+    assert "=" not in cursor
+    assert _decode_cursor(cursor) == (ROW["due_date"], ROW["created_at"], ROW["id"])
+
+
+def test_cursor_from_database_types():
+    from datetime import date, datetime, timezone
+    from uuid import UUID
+
+    row = {"due_date": date(2026, 3, 2), "created_at": datetime(2026, 2, 20, 9, 30, tzinfo=timezone.utc), "id": UUID(ROW["id"])}
+    assert _decode_cursor(_encode_cursor(row)) == ("2026-03-02", "2026-02-20 09:30:00+00:00", ROW["id"])
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    "e30",  # {}
+    _encode_cursor({**ROW, "due_date": "2026-3-2"}),
+    _encode_cursor({**ROW, "created_at": "yesterday"}),
+    _encode_cursor({**ROW, "id": "1),or(student_id.neq.x"}),
+])
+def test_malformed_cursor_rejected(cursor):
+    with pytest.raises(HTTPException) as exc:
+        _decode_cursor(cursor)
+    assert exc.value.status_code == 400
+
+
+async def _walk(client, headers: dict, params: dict) -> tuple[list[str], int]:
+    """Ids of every page following X-Next-Cursor, and the number of pages."""
+    ids, pages, cursor = [], 0, None
+    while True:
+        r = await client.get("/api/tasks", params={**params, **({"cursor": cursor} if cursor else {})}, headers=headers)
+        assert r.status_code == 200, r.text
+        ids += [t["id"] for t in r.json()]
+        pages += 1
+        cursor = r.headers.get("x-next-cursor")
+        if not cursor:
+            return ids, pages
+
+
+async def test_pages_visit_every_task_once_in_order(fake, users, client):
+    same_instant = "2026-02-20T09:30:00+00:00"
+    expected = []
+    for due in ("2026-03-01", "2026-03-02", "2026-03-02", "2026-03-02", "2026-03-03"):
+        expected.append(add_task(fake, users.student, users.mentor, due_date=due, created_at=same_instant))
+    rows = sorted(fake.tables["tasks"], key=lambda t: (t["due_date"], t["created_at"], t["id"]))
+    ids, pages = await _walk(client, users.student_headers, {"limit": 2})
+    assert ids == [t["id"] for t in rows]
+    assert sorted(ids) == sorted(expected)
+    assert pages == 3
+
+
+async def test_last_full_page_has_no_cursor(fake, users, client):
+    for _ in range(4):
+        add_task(fake, users.student, users.mentor)
+    r = await client.get("/api/tasks", params={"limit": 4}, headers=users.student_headers)
+    assert len(r.json()) == 4
+    assert "x-next-cursor" not in r.headers
+
+
+async def test_mentor_pages_one_student(fake, users, client):
+    from fake_supabase import seed_user
+
+    other = seed_user(fake, "student")
+    mine = [add_task(fake, users.student, users.mentor, due_date=f"2026-03-0{i}") for i in range(1, 6)]
+    for i in range(1, 4):
+        add_task(fake, other, users.mentor, due_date=f"2026-03-0{i}")
+    ids, _ = await _walk(client, users.mentor_headers, {"limit": 2, "student_id": users.student})
+    assert ids == mine
+
+
+async def test_invalid_cursor_is_400(fake, users, client):
+    r = await client.get("/api/tasks", params={"cursor": "garbage"}, headers=users.student_headers)
+    assert r.status_code == 400
+    assert r.json()["detail"] == "유효하지 않은 cursor입니다."
+
+
+async def test_postgres_pages_match_order(pg_repo, pg_conn):
+    mentor, student = await pg_user(pg_conn, "mentor"), await pg_user(pg_conn)
+    for due in ("2026-03-02", "2026-03-01", "2026-03-02", "2026-03-02", "2026-03-03"):
+        await pg_task(pg_conn, student, mentor, due_date=due)
+    # Same created_at for every task, so id breaks the ties.
+    await pg_conn.execute("update public.tasks set created_at = '2026-02-20 09:30+00' where student_id = $1::uuid", student)
+    expected = [str(r["id"]) for r in await pg_conn.fetch(
+        "select id from public.tasks where student_id = $1::uuid order by due_date, created_at, id", student,
+    )]
+    ids, after = [], None
+    while True:
+        rows = await pg_repo.list_tasks(student_id=student, after=after, limit=3)
+        ids += [str(r["id"]) for r in rows[:2]]
+        if len(rows) <= 2:
+            break
+        after = _decode_cursor(_encode_cursor(rows[1]))
+    assert ids == expected
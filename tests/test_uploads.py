@@ -0,0 +1,156 @@
+"""/api/uploads against the fake project: resumable sessions (chunks in any order, resends, completion, per-user caps)
+   and the upload keys of direct uploads (owner, purpose, signature, and the object that must be in Storage)."""
+import hashlib
+
+import pytest
+from fastapi import HTTPException
+
+import upload_sessions
+from config import SUPABASE_TASK_BUCKET
+from conftest import add_task
+from direct_uploads import finalized_direct_uploads
+from fake_supabase import make_token
+
+pytestmark = pytest.mark.anyio
+
+CHUNK = 1024
+DATA = bytes(range(256)) * 10  # 2560 bytes: chunks of 1024, 1024 and 512
+
+
+@pytest.fixture(autouse=True)
+def session_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(upload_sessions, "UPLOAD_SESSION_DIR", str(tmp_path))
+    monkeypatch.setattr(upload_sessions, "UPLOAD_CHUNK_SIZE", CHUNK)
+
+
+async def _create(client, headers: dict, **fields) -> dict:
+    r = await client.post("/api/uploads", json={"filename": "a.pdf", "size": len(DATA), "purpose": "attachment", **fields}, headers=headers)
+    assert r.status_code == 201, r.text
+    return r.json()
+
+
+async def _put(client, headers: dict, upload_id: str, index: int, data: bytes = DATA):
+    return await client.put(
+        f"/api/uploads/{upload_id}", params={"offset": index * CHUNK}, content=data[index * CHUNK:(index + 1) * CHUNK],
+        headers=headers,
+    )
+
+
+async def test_chunks_in_any_order_then_complete(fake, users, client):
+    session = await _create(client, users.mentor_headers, sha256=hashlib.sha256(DATA).hexdigest())
+    assert (session["chunk_size"], session["missing_chunks"]) == (CHUNK, [0, 1, 2])
+    upload_id = session["id"]
+
+    assert (await _put(client, users.mentor_headers, upload_id, 2)).json()["missing_chunks"] == [0, 1]
+    r = await client.post(f"/api/uploads/{upload_id}/complete", headers=users.mentor_headers)
+    assert r.status_code == 409
+    await _put(client, users.mentor_headers, upload_id, 0)
+    progress = (await _put(client, users.mentor_headers, upload_id, 1)).json()
+    assert (progress["missing_chunks"], progress["received_bytes"]) == ([], len(DATA))
+
+    r = await client.post(f"/api/uploads/{upload_id}/complete", headers=users.mentor_headers)
+    assert r.status_code == 200, r.text
+    assert r.json()["completed"] is True
+    assert list(fake.objects.values()) == [len(DATA)]
+    # Completing again returns the same URL without storing the file twice.
+    again = await client.post(f"/api/uploads/{upload_id}/complete", headers=users.mentor_headers)
+    assert again.json()["url"] == r.json()["url"]
+    assert len(fake.objects) == 1
+    assert (await _put(client, users.mentor_headers, upload_id, 0)).status_code == 409
+
+
+async def test_bad_chunks_rejected(fake, users, client):
+    upload_id = (await _create(client, users.mentor_headers))["id"]
+    r = await client.put(f"/api/uploads/{upload_id}", params={"offset": 100}, content=b"x", headers=users.mentor_headers)
+    assert r.status_code == 400
+    r = await client.put(f"/api/uploads/{upload_id}", params={"offset": 0}, content=b"x" * 10, headers=users.mentor_headers)
+    assert r.status_code == 400
+    r = await client.put(f"/api/uploads/{upload_id}", params={"offset": 2 * CHUNK}, content=b"x" * CHUNK, headers=users.mentor_headers)
+    assert r.status_code == 400
+    assert (await client.get(f"/api/uploads/{upload_id}", headers=users.mentor_headers)).json()["missing_chunks"] == [0, 1, 2]
+
+
+async def test_sha256_mismatch_asks_for_every_chunk_again(fake, users, client):
+    upload_id = (await _create(client, users.mentor_headers, sha256=hashlib.sha256(DATA).hexdigest()))["id"]
+    corrupted = b"\xff" + DATA[1:]
+    for i in range(3):
+        await _put(client, users.mentor_headers, upload_id, i, corrupted)
+    r = await client.post(f"/api/uploads/{upload_id}/complete", headers=users.mentor_headers)
+    assert r.status_code == 422
+    assert (await client.get(f"/api/uploads/{upload_id}", headers=users.mentor_headers)).json()["missing_chunks"] == [0, 1, 2]
+    assert fake.objects == {}
+
+
+async def test_sessions_belong_to_their_owner(fake, users, client):
+    upload_id = (await _create(client, users.mentor_headers))["id"]
+    other = {"Authorization": f"Bearer {make_token(users.student, 'mentor')}"}
+    assert (await client.get(f"/api/uploads/{upload_id}", headers=other)).status_code == 404
+    assert (await _put(client, other, upload_id, 0)).status_code == 404
+    assert (await client.get("/api/uploads/..%2F..%2Fetc", headers=users.mentor_headers)).status_code == 404
+
+
+async def test_submission_session_needs_own_task(fake, users, client):
+    task_id = add_task(fake, users.student, users.mentor)
+    await _create(client, users.student_headers, purpose="submission", task_id=task_id)
+    r = await client.post(
+        "/api/uploads", json={"filename": "a.jpg", "size": 10, "purpose": "attachment"}, headers=users.student_headers,
+    )
+    assert r.status_code == 403
+
+
+async def test_open_sessions_capped_per_user(fake, users, client, monkeypatch):
+    monkeypatch.setattr(upload_sessions, "UPLOAD_SESSIONS_PER_USER", 2)
+    monkeypatch.setattr(upload_sessions, "UPLOAD_SESSION_BYTES_PER_USER", 3 * len(DATA))
+    first = (await _create(client, users.mentor_headers))["id"]
+    await _create(client, users.mentor_headers)
+    r = await client.post("/api/uploads", json={"filename": "c.pdf", "size": 1, "purpose": "attachment"}, headers=users.mentor_headers)
+    assert r.status_code == 429
+    # A completed session no longer counts; a file past the byte cap still does not fit.
+    for i in range(3):
+        await _put(client, users.mentor_headers, first, i)
+    await client.post(f"/api/uploads/{first}/complete", headers=users.mentor_headers)
+    r = await client.post(
+        "/api/uploads", json={"filename": "c.pdf", "size": 2 * len(DATA) + 1, "purpose": "attachment"}, headers=users.mentor_headers,
+    )
+    assert r.status_code == 429
+    await _create(client, users.mentor_headers)
+
+
+@pytest.fixture
+async def direct(fake, users, client):
+    """A direct upload grant for a 100-byte attachment of the mentor, with the file uploaded to its signed URL."""
+    r = await client.post(
+        "/api/uploads/direct", json={"purpose": "attachment", "files": [{"filename": "a.pdf", "size": 100}]},
+        headers=users.mentor_headers,
+    )
+    assert r.status_code == 200, r.text
+    [grant] = r.json()["uploads"]
+    fake.storage.from_(SUPABASE_TASK_BUCKET).upload_to_signed_url(grant["path"], grant["token"], b"x" * 100)
+    return grant
+
+
+async def test_direct_upload_key_accepted(users, direct):
+    [file] = await finalized_direct_uploads(users.mentor, [direct["upload_key"]], "attachment")
+    assert file == {"name": "a.pdf", "type": "application/octet-stream", "size": 100, "url": direct["url"]}
+
+
+async def _rejected(owner: str, keys: list[str], purpose: str = "attachment", task_id: str | None = None) -> str:
+    with pytest.raises(HTTPException) as exc:
+        await finalized_direct_uploads(owner, keys, purpose, task_id)
+    assert exc.value.status_code == 400
+    return exc.value.detail
+
+
+async def test_direct_upload_key_checks(fake, users, direct):
+    key = direct["upload_key"]
+    invalid = "유효하지 않거나 만료된 업로드 키입니다."
+    assert await _rejected(users.student, [key]) == invalid
+    assert await _rejected(users.mentor, [key], "submission") == invalid
+    assert await _rejected(users.mentor, [key[:-2] + ("AA" if not key.endswith("AA") else "BB")]) == invalid
+    # An access token signed with another secret and audience is not an upload key.
+    assert await _rejected(users.mentor, [make_token(users.mentor, "mentor")]) == invalid
+
+    fake.objects[f"{SUPABASE_TASK_BUCKET}/{direct['path']}"] = 99
+    assert (await _rejected(users.mentor, [key])).startswith("업로드된 파일 크기가 다릅니다")
+    del fake.objects[f"{SUPABASE_TASK_BUCKET}/{direct['path']}"]
+    assert (await _rejected(users.mentor, [key])).startswith("업로드되지 않은 파일이 있습니다")
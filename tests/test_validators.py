@@ -0,0 +1,35 @@
+"""validators: the YYYY-MM-DD date and from/to range checks shared by the routers."""
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+
+from validators import parse_date, parse_range
+
+
+@pytest.mark.parametrize("value", ["20250101", "2025-W01-1", "2025-1-01", "2025-02-30", ""])
+def test_only_yyyy_mm_dd_accepted(value):
+    with pytest.raises(HTTPException) as exc:
+        parse_date(value, "from")
+    assert exc.value.status_code == 400
+    assert exc.value.detail == "from must be YYYY-MM-DD"
+
+
+def test_range_is_inclusive_and_capped():
+    assert parse_range("2025-01-01", "2025-01-31", 31) == (date(2025, 1, 1), date(2025, 1, 31))
+    for from_date, to_date, detail in [
+        ("2025-01-01", "20250131", "from/to must be YYYY-MM-DD"),
+        ("2025-01-02", "2025-01-01", "to must be on or after from"),
+        ("2025-01-01", "2025-02-01", "range must be at most 31 days"),
+    ]:
+        with pytest.raises(HTTPException) as exc:
+            parse_range(from_date, to_date, 31)
+        assert exc.value.detail == detail
+
+
+@pytest.mark.anyio
+async def test_feedback_range_rejects_basic_format(fake, users, client):
+    r = await client.get(
+        "/api/feedback/me/range", params={"from": "20250101", "to": "2025-01-31"}, headers=users.student_headers,
+    )
+    assert r.status_code == 400
@@ -0,0 +1,292 @@
+"""Resumable upload sessions on local disk (uploads_router). One directory per session under UPLOAD_SESSION_DIR:
+   meta.json (owner, file, chunk size; the public URL once completed), data (a sparse file of the final size that every
+   chunk is written into at its offset) and chunks/<index>, created only after that chunk is fully on disk. Progress is
+   read from the markers, so chunks can arrive in parallel on any worker process of the host without locks."""
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import AsyncIterator
+
+import anyio
+from fastapi import HTTPException
+
+from config import (
+    UPLOAD_CHUNK_SIZE, UPLOAD_SESSION_BYTES_PER_USER, UPLOAD_SESSION_DIR, UPLOAD_SESSION_TTL, UPLOAD_SESSIONS_PER_USER,
+)
+from storage_helper import upload_submission_files, upload_task_attachments
+
+# Request body bytes buffered before each disk write; bounds memory per chunk upload in flight.
+WRITE_BUFFER_SIZE = 1024 * 1024
+# Expired sessions are removed at most this often (seconds), when a session is created.
+SWEEP_INTERVAL = 60
+# A completion lock older than this (seconds) was left by a crashed process and is taken over.
+STALE_LOCK_AGE = 600
+
+_META = "meta.json"
+_DATA = "data"
+_CHUNKS = "chunks"
+_COMPLETE_LOCK = "complete.lock"
+_NOT_FOUND = "업로드를 찾을 수 없습니다."
+_COMPLETING = "업로드를 처리하고 있습니다. 잠시 후 다시 시도해 주세요."
+
+_last_sweep = 0.0
+
+
+def _root() -> Path:
+    return Path(UPLOAD_SESSION_DIR)
+
+
+def _session_dir(upload_id: str) -> Path:
+    # Ids are uuid4 hex; anything else (e.g. "../x") never names a session directory.
+    if len(upload_id) != 32 or any(c not in "0123456789abcdef" for c in upload_id):
+        raise HTTPException(status_code=404, detail=_NOT_FOUND)
+    return _root() / upload_id
+
+
+def _write_meta(meta: dict) -> None:
+    path = _session_dir(meta["id"]) / _META
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(meta))
+    os.replace(tmp, path)
+
+
+def _sweep() -> None:
+    now = time.time()
+    for entry in _root().iterdir():
+        try:
+            expires_at = json.loads((entry / _META).read_text())["expires_at"]
+        except (OSError, ValueError, KeyError):
+            expires_at = entry.stat().st_mtime + UPLOAD_SESSION_TTL
+        if expires_at < now:
+            shutil.rmtree(entry, ignore_errors=True)
+
+
+def _check_quota(owner: str, size: int) -> None:
+    """429 if owner already has UPLOAD_SESSIONS_PER_USER open sessions, or size would take their files past
+    UPLOAD_SESSION_BYTES_PER_USER. Completed sessions hold no data and do not count. Checked without a lock, so
+    concurrent creates on several workers can overshoot by a few sessions."""
+    count, total, now = 0, size, time.time()
+    for entry in _root().iterdir():
+        try:
+            meta = json.loads((entry / _META).read_text())
+        except (OSError, ValueError):
+            continue
+        if meta.get("owner") == owner and not meta.get("url") and meta.get("expires_at", 0) >= now:
+            count += 1
+            total += meta.get("size", 0)
+    if count >= UPLOAD_SESSIONS_PER_USER:
+        raise HTTPException(status_code=429, detail="진행 중인 업로드가 너무 많습니다. 완료하거나 만료된 뒤 다시 시도해 주세요.")
+    if total > UPLOAD_SESSION_BYTES_PER_USER:
+        raise HTTPException(
+            status_code=429,
+            detail=f"진행 중인 업로드는 합계 {UPLOAD_SESSION_BYTES_PER_USER // (1024*1024)}MB를 넘을 수 없습니다.",
+        )
+
+
+def _create(owner: str, purpose: str, filename: str, content_type: str, size: int, task_id: str | None, sha256: str | None) -> dict:
+    global _last_sweep
+    _root().mkdir(parents=True, exist_ok=True)
+    if time.time() - _last_sweep > SWEEP_INTERVAL:
+        _last_sweep = time.time()
+        _sweep()
+    _check_quota(owner, size)
+    now = time.time()
+    meta = {
+        "id": uuid.uuid4().hex,
+        "owner": owner,
+        "purpose": purpose,
+        "task_id": task_id,
+        "filename": filename,
+        "content_type": content_type or "application/octet-stream",
+        "size": size,
+        "chunk_size": UPLOAD_CHUNK_SIZE,
+        "sha256": sha256,
+        "created_at": now,
+        "expires_at": now + UPLOAD_SESSION_TTL,
+        "url": None,
+    }
+    directory = _session_dir(meta["id"])
+    (directory / _CHUNKS).mkdir(parents=True)
+    with open(directory / _DATA, "wb") as f:
+        f.truncate(size)
+    _write_meta(meta)
+    return meta
+
+
+def _load(upload_id: str, owner: str) -> dict:
+    try:
+        meta = json.loads((_session_dir(upload_id) / _META).read_text())
+    except (OSError, ValueError):
+        raise HTTPException(status_code=404, detail=_NOT_FOUND)
+    if meta["owner"] != owner or meta["expires_at"] < time.time():
+        raise HTTPException(status_code=404, detail=_NOT_FOUND)
+    return meta
+
+
+def chunk_count(meta: dict) -> int:
+    return -(-meta["size"] // meta["chunk_size"])
+
+
+def _received(meta: dict) -> set[int]:
+    try:
+        return {int(name) for name in os.listdir(_session_dir(meta["id"]) / _CHUNKS)}
+    except FileNotFoundError:
+        return set()
+
+
+def _progress(meta: dict) -> dict:
+    """Session state for clients: which chunks are still missing (resend only those), and the URL once completed."""
+    if meta["url"]:
+        missing: list[int] = []
+    else:
+        received = _received(meta)
+        missing = [i for i in range(chunk_count(meta)) if i not in received]
+    last = chunk_count(meta) - 1
+    missing_bytes = sum(meta["size"] - i * meta["chunk_size"] if i == last else meta["chunk_size"] for i in missing)
+    return {
+        "id": meta["id"],
+        "filename": meta["filename"],
+        "size": meta["size"],
+        "chunk_size": meta["chunk_size"],
+        "received_bytes": meta["size"] - missing_bytes,
+        "missing_chunks": missing,
+        "completed": meta["url"] is not None,
+        "url": meta["url"],
+        "expires_at": meta["expires_at"],
+    }
+
+
+async def create_session(
+    owner: str, purpose: str, filename: str, content_type: str, size: int, task_id: str | None = None, sha256: str | None = None,
+) -> dict:
+    """Create a session for one file of `size` bytes. Returns its progress (all chunks missing)."""
+    meta = await anyio.to_thread.run_sync(_create, owner, purpose, filename, content_type, size, task_id, sha256)
+    return _progress(meta)
+
+
+async def load_session(upload_id: str, owner: str) -> dict:
+    """Session metadata; 404 unless it exists, belongs to owner and has not expired."""
+    return await anyio.to_thread.run_sync(_load, upload_id, owner)
+
+
+async def session_progress(meta: dict) -> dict:
+    return await anyio.to_thread.run_sync(_progress, meta)
+
+
+async def write_chunk(meta: dict, offset: int, body: AsyncIterator[bytes]) -> None:
+    """Stream one chunk (the request body) into the data file at offset. Offsets are multiples of chunk_size and each
+    chunk is exactly chunk_size bytes (the last one the remainder). Writing a chunk again replaces it."""
+    if meta["url"]:
+        raise HTTPException(status_code=409, detail="이미 완료된 업로드입니다.")
+    if offset % meta["chunk_size"] or offset >= meta["size"]:
+        raise HTTPException(status_code=400, detail=f"offset은 {meta['chunk_size']}의 배수이고 파일 크기보다 작아야 합니다.")
+    expected = min(meta["chunk_size"], meta["size"] - offset)
+    directory = _session_dir(meta["id"])
+    if await anyio.to_thread.run_sync((directory / _COMPLETE_LOCK).exists):
+        raise HTTPException(status_code=409, detail=_COMPLETING)
+    marker = directory / _CHUNKS / str(offset // meta["chunk_size"])
+    # The chunk counts as missing until it is fully written again: a rejected or dropped resend leaves it half-overwritten.
+    await anyio.to_thread.run_sync(lambda: marker.unlink(missing_ok=True))
+    fd = await anyio.to_thread.run_sync(os.open, directory / _DATA, os.O_WRONLY)
+    try:
+        written = 0
+        buffer = bytearray()
+        async for data in body:
+            if written + len(buffer) + len(data) > expected:
+                raise HTTPException(status_code=400, detail=f"조각 크기는 {expected}바이트여야 합니다.")
+            buffer += data
+            if len(buffer) >= WRITE_BUFFER_SIZE:
+                await anyio.to_thread.run_sync(os.pwrite, fd, bytes(buffer), offset + written)
+                written += len(buffer)
+                buffer.clear()
+        if buffer:
+            await anyio.to_thread.run_sync(os.pwrite, fd, bytes(buffer), offset + written)
+            written += len(buffer)
+        if written != expected:
+            raise HTTPException(status_code=400, detail=f"조각 크기는 {expected}바이트여야 합니다.")
+    finally:
+        os.close(fd)
+    await anyio.to_thread.run_sync(marker.touch)
+
+
+def _lock(path: Path) -> bool:
+    """Create the lock file; False if another request holds it."""
+    for _ in range(2):
+        try:
+            os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except FileExistsError:
+            try:
+                if time.time() - path.stat().st_mtime < STALE_LOCK_AGE:
+                    return False
+                path.unlink()
+            except FileNotFoundError:
+                pass
+    return False
+
+
+def _sha256_of(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1024 * 1024):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+async def complete_session(meta: dict) -> dict:
+    """Check that every chunk arrived (and the sha256, if given), then store the file in the task bucket through
+    storage_helper like a multipart upload of the same purpose. Returns the progress with the public URL."""
+    if meta["url"]:
+        return await session_progress(meta)
+    directory = _session_dir(meta["id"])
+    if not await anyio.to_thread.run_sync(_lock, directory / _COMPLETE_LOCK):
+        raise HTTPException(status_code=409, detail=_COMPLETING)
+    try:
+        progress = await session_progress(meta)
+        if progress["missing_chunks"]:
+            raise HTTPException(status_code=409, detail=f"받지 못한 조각이 {len(progress['missing_chunks'])}개 있습니다.")
+        data = directory / _DATA
+        if meta["sha256"] and await anyio.to_thread.run_sync(_sha256_of, data) != meta["sha256"]:
+            # Some chunk was corrupted; all must be sent again.
+            await anyio.to_thread.run_sync(shutil.rmtree, directory / _CHUNKS)
+            await anyio.to_thread.run_sync((directory / _CHUNKS).mkdir)
+            raise HTTPException(status_code=422, detail="파일 내용이 sha256과 일치하지 않습니다. 다시 업로드해 주세요.")
+        with open(data, "rb") as reader:
+            file = [(reader, meta["filename"], meta["content_type"])]
+            if meta["purpose"] == "attachment":
+                [url] = await upload_task_attachments(file)
+            else:
+                [url] = await upload_submission_files(meta["task_id"], file)
+        meta = {**meta, "url": url}
+        await anyio.to_thread.run_sync(_write_meta, meta)
+        await anyio.to_thread.run_sync(_discard_data, directory)
+    finally:
+        await anyio.to_thread.run_sync(lambda: (directory / _COMPLETE_LOCK).unlink(missing_ok=True))
+    return await session_progress(meta)
+
+
+def _discard_data(directory: Path) -> None:
+    (directory / _DATA).unlink(missing_ok=True)
+    shutil.rmtree(directory / _CHUNKS, ignore_errors=True)
+
+
+def _completed(owner: str, upload_ids: list[str], purpose: str, task_id: str | None) -> list[dict]:
+    files = []
+    for upload_id in upload_ids:
+        meta = _load(upload_id, owner)
+        if not meta["url"] or meta["purpose"] != purpose or (task_id is not None and meta["task_id"] != task_id):
+            raise HTTPException(status_code=400, detail="완료되지 않았거나 이 요청에 쓸 수 없는 업로드입니다.")
+        files.append({"name": meta["filename"], "type": meta["content_type"], "size": meta["size"], "url": meta["url"]})
+    return files
+
+
+async def completed_uploads(owner: str, upload_ids: list[str], purpose: str, task_id: str | None = None) -> list[dict]:
+    """{name, type, size, url} of completed sessions referenced by a create/submit request (upload_ids form field).
+    Sessions stay until they expire, so a retried request can reference them again."""
+    if not upload_ids:
+        return []
+    return await anyio.to_thread.run_sync(_completed, owner, upload_ids, purpose, task_id)
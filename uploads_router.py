@@ -0,0 +1,123 @@
+"""Uploads outside the create/submit request.
+   Resumable chunked uploads: create a session, PUT chunks (in any order, several at once), check progress, complete.
+   A completed upload is stored in the task bucket and referenced by id (upload_ids) from task creation or submission,
+   so large files and flaky connections never depend on one multipart request.
+   Direct uploads: POST /api/uploads/direct returns signed Storage URLs; the client uploads there and passes the
+   upload_keys, so the bytes never pass through this backend."""
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from pydantic import BaseModel, Field
+
+from auth_deps import get_current_user
+from config import DIRECT_UPLOAD_MAX_FILE_SIZE, UPLOAD_CHUNK_SIZE, UPLOAD_SESSION_MAX_FILE_SIZE
+from direct_uploads import create_direct_uploads
+from fast_json import json_response
+from repository import get_repository
+from upload_sessions import complete_session, create_session, load_session, session_progress, write_chunk
+
+router = APIRouter(prefix="/api/uploads", tags=["uploads"])
+
+# Files per direct-upload request: the most a submission accepts (MAX_FILES_SUBMIT in tasks_router).
+MAX_DIRECT_FILES = 10
+# Request body limits enforced in main (see tasks_router.BODY_LIMITS): a chunk is the raw body, at most UPLOAD_CHUNK_SIZE.
+BODY_LIMITS = [("PUT", r"/api/uploads/[^/]+", UPLOAD_CHUNK_SIZE, None)]
+
+
+class UploadSessionIn(BaseModel):
+    filename: str = Field(..., min_length=1, max_length=255)
+    content_type: str = Field("application/octet-stream", max_length=255)
+    size: int = Field(..., gt=0)
+    # attachment: mentor task attachment (POST /api/tasks, /api/tasks/bulk); submission: student file for task_id.
+    purpose: Literal["attachment", "submission"]
+    task_id: str | None = None
+    # Optional SHA-256 (hex) of the whole file, checked on completion.
+    sha256: str | None = Field(None, pattern="^[0-9a-f]{64}$")
+
+
+class DirectUploadFileIn(BaseModel):
+    filename: str = Field(..., min_length=1, max_length=255)
+    content_type: str = Field("application/octet-stream", max_length=255)
+    size: int = Field(..., gt=0)
+
+
+class DirectUploadIn(BaseModel):
+    purpose: Literal["attachment", "submission"]
+    task_id: str | None = None
+    files: list[DirectUploadFileIn] = Field(..., min_length=1, max_length=MAX_DIRECT_FILES)
+
+
+async def _upload_task_id(purpose: str, task_id: str | None, current: dict, repo) -> str | None:
+    """Check the caller may upload for purpose: attachments are the mentor's, submission files the student's own
+    task's. Returns the task id for submissions (None for attachments)."""
+    role = current.get("role") or "student"
+    if purpose == "attachment":
+        if role != "mentor":
+            raise HTTPException(status_code=403, detail="멘토만 이용할 수 있습니다.")
+        return None
+    if role != "student":
+        raise HTTPException(status_code=403, detail="학생만 이용할 수 있습니다.")
+    task = await repo.get_task(task_id) if task_id else None
+    if task is None or str(task["student_id"]) != current["sub"]:
+        raise HTTPException(status_code=404, detail="과제를 찾을 수 없습니다.")
+    return str(task["id"])
+
+
+@router.post("/direct")
+async def create_direct_upload(
+    body: DirectUploadIn,
+    current: dict = Depends(get_current_user),
+    repo=Depends(get_repository),
+):
+    """Signed Storage upload URLs, one per file: {upload_key, path, signed_url, token, url, expires_at}. PUT each file
+    to its signed_url (multipart field "file", valid 2 hours), then pass the upload_keys when creating the task or
+    submitting; the backend only checks that each object exists with the declared size."""
+    for f in body.files:
+        if f.size > DIRECT_UPLOAD_MAX_FILE_SIZE:
+            raise HTTPException(status_code=400, detail=f"파일 크기는 {DIRECT_UPLOAD_MAX_FILE_SIZE // (1024*1024)}MB 이하여야 합니다.")
+    task_id = await _upload_task_id(body.purpose, body.task_id, current, repo)
+    grants = await create_direct_uploads(current["sub"], body.purpose, [f.model_dump() for f in body.files], task_id)
+    return json_response({"uploads": grants})
+
+
+@router.post("", status_code=201)
+async def create_upload(
+    body: UploadSessionIn,
+    current: dict = Depends(get_current_user),
+    repo=Depends(get_repository),
+):
+    """Start a resumable upload. The response has the session id, chunk_size and missing_chunks (all of them)."""
+    if body.size > UPLOAD_SESSION_MAX_FILE_SIZE:
+        raise HTTPException(status_code=400, detail=f"파일 크기는 {UPLOAD_SESSION_MAX_FILE_SIZE // (1024*1024)}MB 이하여야 합니다.")
+    task_id = await _upload_task_id(body.purpose, body.task_id, current, repo)
+    progress = await create_session(
+        current["sub"], body.purpose, body.filename, body.content_type, body.size, task_id, body.sha256,
+    )
+    return json_response(progress, {"Location": f"/api/uploads/{progress['id']}"}, status_code=201)
+
+
+@router.get("/{upload_id}")
+async def get_upload(upload_id: str, current: dict = Depends(get_current_user)):
+    """Progress: received_bytes and missing_chunks (after a failure, resend only those), url once completed."""
+    return json_response(await session_progress(await load_session(upload_id, current["sub"])))
+
+
+@router.put("/{upload_id}")
+async def put_chunk(
+    upload_id: str,
+    request: Request,
+    offset: int = Query(..., ge=0, description="Byte offset of the chunk: a multiple of chunk_size"),
+    current: dict = Depends(get_current_user),
+):
+    """Upload one chunk as the raw request body (chunk_size bytes; the last chunk is the remainder).
+    Chunks may be sent in parallel and in any order; sending one again replaces it. Returns the progress."""
+    meta = await load_session(upload_id, current["sub"])
+    await write_chunk(meta, offset, request.stream())
+    return json_response(await session_progress(meta))
+
+
+@router.post("/{upload_id}/complete")
+async def complete_upload(upload_id: str, current: dict = Depends(get_current_user)):
+    """Store the assembled file in the task bucket once every chunk has arrived (409 with the count otherwise).
+    Returns the progress with url; pass the id in upload_ids when creating the task or submitting."""
+    return json_response(await complete_session(await load_session(upload_id, current["sub"])))
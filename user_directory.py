@@ -0,0 +1,169 @@
+"""In-process directory of auth_users (id, email, name, role) for student role checks and the student list.
+   Served from memory; refreshed in the background after USER_DIRECTORY_TTL, synchronously past USER_DIRECTORY_MAX_STALENESS."""
+import asyncio
+import logging
+import time
+
+from config import USER_DIRECTORY_MAX_STALENESS, USER_DIRECTORY_TTL
+from repository import FETCH_CHUNK
+from supabase_admin import get_supabase_db
+
+logger = logging.getLogger(__name__)
+
+_USER_COLS = "id, email, name, role"
+
+
+def _user_from_row(row: dict) -> dict:
+    return {"id": str(row["id"]), "email": row["email"], "name": row.get("name"), "role": row.get("role")}
+
+
+def _student_out(user: dict) -> dict:
+    """Shape used by GET /api/students."""
+    return {"id": user["id"], "email": user["email"], "name": user.get("name") or user["email"]}
+
+
+def _sorted_students(users: dict[str, dict]) -> list[dict]:
+    # Same order as .order("name"): by name, users without a name last.
+    students = [u for u in users.values() if u.get("role") == "student"]
+    students.sort(key=lambda u: (u.get("name") is None, u.get("name") or ""))
+    return [_student_out(u) for u in students]
+
+
+class UserDirectory:
+    """Snapshot of auth_users with TTL. Unknown ids fall back to a single-row lookup (e.g. a user who just signed up)."""
+
+    def __init__(self, ttl: float = USER_DIRECTORY_TTL, max_staleness: float = USER_DIRECTORY_MAX_STALENESS) -> None:
+        self.ttl = ttl
+        self.max_staleness = max(ttl, max_staleness)
+        self._users: dict[str, dict] = {}
+        self._students: list[dict] = []
+        self._loaded_at: float | None = None
+        # Everything runs on the event loop, so only refreshes need a lock (to load once per expiry).
+        self._refresh_lock = asyncio.Lock()
+        self._refresh_task: asyncio.Task | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def _age(self) -> float:
+        loaded_at = self._loaded_at
+        return float("inf") if loaded_at is None else time.monotonic() - loaded_at
+
+    async def _load(self) -> None:
+        # Pages of FETCH_CHUNK: PostgREST caps an unranged select at its max-rows (1000 by default).
+        db = await get_supabase_db()
+        users: dict[str, dict] = {}
+        offset = 0
+        while True:
+            r = await (
+                db.table("auth_users")
+                .select(_USER_COLS)
+                .order("id")
+                .range(offset, offset + FETCH_CHUNK - 1)
+                .execute()
+            )
+            chunk = r.data or []
+            users.update((str(row["id"]), _user_from_row(row)) for row in chunk)
+            if len(chunk) < FETCH_CHUNK:
+                break
+            offset += FETCH_CHUNK
+        self._users, self._students = users, _sorted_students(users)
+        self._loaded_at = time.monotonic()
+
+    async def refresh(self) -> None:
+        """Reload every user from auth_users (one query per FETCH_CHUNK users) and rebuild the sorted student list."""
+        async with self._refresh_lock:
+            await self._load()
+
+    def invalidate(self) -> None:
+        """Force the next lookup to wait for a fresh snapshot."""
+        self._loaded_at = None
+
+    def _refresh_in_background(self) -> None:
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        self._refresh_task = asyncio.get_running_loop().create_task(self._background_refresh())
+
+    async def _background_refresh(self) -> None:
+        try:
+            await self.refresh()
+        except Exception:
+            logger.exception("User directory refresh failed; serving previous snapshot")
+
+    async def _ensure_fresh(self) -> None:
+        age = self._age()
+        if age <= self.ttl:
+            return
+        if age <= self.max_staleness:
+            self._refresh_in_background()
+            return
+        async with self._refresh_lock:
+            # Another request may have refreshed while we waited for the lock.
+            if self._age() > self.max_staleness:
+                await self._load()
+
+    def _remember(self, *new_users: dict) -> None:
+        users = {**self._users, **{u["id"]: u for u in new_users}}
+        self._users = users
+        if any(u.get("role") == "student" for u in new_users):
+            self._students = _sorted_students(users)
+
+    async def get(self, user_id: str) -> dict | None:
+        """Return {id, email, name, role} for a user, or None if not in auth_users."""
+        db = await get_supabase_db()
+        if not self.enabled:
+            r = await db.table("auth_users").select(_USER_COLS).eq("id", user_id).execute()
+            return _user_from_row(r.data[0]) if r.data else None
+        await self._ensure_fresh()
+        user = self._users.get(user_id)
+        if user is None:
+            r = await db.table("auth_users").select(_USER_COLS).eq("id", user_id).execute()
+            if not r.data:
+                return None
+            user = _user_from_row(r.data[0])
+            self._remember(user)
+        return user
+
+    async def get_many(self, user_ids: list[str]) -> dict[str, dict]:
+        """Resolve several users at once: {id: user} for ids that exist. Ids missing from the snapshot are fetched in one query."""
+        found: dict[str, dict] = {}
+        if self.enabled:
+            await self._ensure_fresh()
+            users = self._users
+            found = {uid: users[uid] for uid in user_ids if uid in users}
+        missing = [uid for uid in user_ids if uid not in found]
+        if missing:
+            db = await get_supabase_db()
+            r = await db.table("auth_users").select(_USER_COLS).in_("id", missing).execute()
+            fetched = [_user_from_row(row) for row in (r.data or [])]
+            found.update((u["id"], u) for u in fetched)
+            if self.enabled and fetched:
+                self._remember(*fetched)
+        return found
+
+    async def students(self) -> list[dict]:
+        """All students as {id, email, name}, ordered by name."""
+        if not self.enabled:
+            db = await get_supabase_db()
+            r = await (
+                db.table("auth_users")
+                .select("id, email, name")
+                .eq("role", "student")
+                .order("name")
+                .execute()
+            )
+            return [_student_out(_user_from_row({**x, "role": "student"})) for x in (r.data or [])]
+        await self._ensure_fresh()
+        return self._students
+
+
+_directory: UserDirectory | None = None
+
+
+async def get_user_directory() -> UserDirectory:
+    """Singleton user directory. FastAPI dependency."""
+    global _directory
+    if _directory is None:
+        _directory = UserDirectory()
+    return _directory
@@ -0,0 +1,52 @@
+"""Request checks shared by the routers."""
+import uuid
+from datetime import date
+
+from fastapi import HTTPException
+
+
+def is_uuid(value: str) -> bool:
+    try:
+        uuid.UUID(value)
+    except ValueError:
+        return False
+    return True
+
+
+def target_student(current: dict, student_id: str | None) -> str:
+    """Student: always self. Mentor: student_id is required; a malformed one is an unknown student (404)."""
+    if (current.get("role") or "student") == "student":
+        return current["sub"]
+    if not student_id:
+        raise HTTPException(status_code=400, detail="student_id is required")
+    if not is_uuid(student_id):
+        raise HTTPException(status_code=404, detail="학생을 찾을 수 없습니다.")
+    return student_id
+
+
+def _iso_date(value: str) -> date | None:
+    # date.fromisoformat alone also takes "20250101" and "2025-W01-1" (Python 3.11+); only YYYY-MM-DD is accepted.
+    try:
+        return date.fromisoformat(value) if len(value) == 10 and value[4] == value[7] == "-" else None
+    except ValueError:
+        return None
+
+
+def parse_date(value: str, name: str = "date") -> date:
+    """A YYYY-MM-DD parameter; 400 "<name> must be YYYY-MM-DD" otherwise."""
+    parsed = _iso_date(value)
+    if parsed is None:
+        raise HTTPException(status_code=400, detail=f"{name} must be YYYY-MM-DD")
+    return parsed
+
+
+def parse_range(from_date: str, to_date: str, max_days: int) -> tuple[date, date]:
+    """An inclusive from/to range of YYYY-MM-DD dates, to not before from and at most max_days days long (400 otherwise)."""
+    start, end = _iso_date(from_date), _iso_date(to_date)
+    if start is None or end is None:
+        raise HTTPException(status_code=400, detail="from/to must be YYYY-MM-DD")
+    if end < start:
+        raise HTTPException(status_code=400, detail="to must be on or after from")
+    if (end - start).days + 1 > max_days:
+        raise HTTPException(status_code=400, detail=f"range must be at most {max_days} days")
+    return start, end